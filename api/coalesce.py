@@ -0,0 +1,163 @@
+"""
+Single-flight request coalescing for the Focus Group Search API.
+
+When a demo is shown to a room, many analysts fire the same query within
+seconds. Without coalescing, every one of them pays for its own router call,
+embedding call, Pinecone queries and synthesis completion.
+
+- SingleFlight: concurrent calls with the same key await one shared computation
+- StreamFanout: one upstream token stream is fanned out to every subscriber
+
+Both run the (blocking) upstream work in the threadpool so the event loop
+stays free to accept the duplicate requests that get coalesced.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single computation.
+
+    Usage:
+        search_flight = SingleFlight("search_unified")
+        result, shared = await search_flight.do(cache_key, run_search, query)
+
+    The computation runs as its own task, so a leader that disconnects does
+    not cancel the work other requests are waiting on.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> tuple:
+        """
+        Run fn(*args, **kwargs) once per key among concurrent callers.
+
+        Returns:
+            (result, shared) - shared is True when this caller joined an
+            in-flight computation instead of starting one
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if shared:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(run_in_threadpool(fn, *args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        result = await asyncio.shield(task)
+        return result, shared
+
+    def _finish(self, key: str, task: asyncio.Future):
+        """Drop the finished computation so the next request starts fresh."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+class _Broadcast:
+    """Buffered output of one upstream stream, shared by its subscribers."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Future] = None
+
+
+class StreamFanout:
+    """
+    Fans one upstream stream out to every concurrent subscriber with the same key.
+
+    Usage:
+        fanout = StreamFanout("synthesize_stream")
+        return StreamingResponse(fanout.subscribe(key, stream_generator), ...)
+
+    make_stream must be a generator function (calling it must not do I/O);
+    it is iterated in the threadpool. Subscribers that join late replay the
+    chunks produced so far, then follow the live stream.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, _Broadcast] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def subscribe(self, key: str, make_stream: Callable[[], Iterator[Any]]) -> AsyncIterator[Any]:
+        """Join the in-flight stream for key, starting it if needed."""
+        broadcast = self._inflight.get(key)
+
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = _Broadcast()
+            self._inflight[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._pump(key, broadcast, make_stream))
+        else:
+            self.coalesced += 1
+
+        return self._replay(broadcast)
+
+    async def _pump(self, key: str, broadcast: _Broadcast, make_stream: Callable[[], Iterator[Any]]):
+        """Consume the upstream stream once, publishing each chunk."""
+        try:
+            async for chunk in iterate_in_threadpool(make_stream()):
+                async with broadcast.changed:
+                    broadcast.chunks.append(chunk)
+                    broadcast.changed.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            # New requests after this point start a fresh upstream stream
+            if self._inflight.get(key) is broadcast:
+                del self._inflight[key]
+            async with broadcast.changed:
+                broadcast.done = True
+                broadcast.changed.notify_all()
+
+    async def _replay(self, broadcast: _Broadcast) -> AsyncIterator[Any]:
+        """Yield every chunk of the broadcast, waiting for live ones."""
+        position = 0
+        while True:
+            async with broadcast.changed:
+                while position >= len(broadcast.chunks) and not broadcast.done:
+                    await broadcast.changed.wait()
+                pending = broadcast.chunks[position:]
+                finished = broadcast.done
+
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+
+            if finished and position >= len(broadcast.chunks):
+                break
+
+        if broadcast.error is not None:
+            raise broadcast.error
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
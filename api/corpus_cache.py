@@ -0,0 +1,219 @@
+"""
+Prebuilt, HTTP-cacheable payloads for the corpus explorer endpoints.
+
+The corpus only changes when preprocessing runs, so /corpus and
+/corpus/{doc_type}/{doc_id} are serialized once and served as bytes:
+
+- Strong ETag (sha256 of the JSON body) and Last-Modified on every response
+- If-None-Match / If-Modified-Since answered with 304 and no body
+- gzip (and brotli, if the optional `brotli` package is installed) variants
+  compressed once, picked per request from Accept-Encoding
+- Documents larger than CORPUS_STREAM_THRESHOLD bytes are streamed from the
+  file handle instead of being read into memory
+
+Repeat views from the frontend cost a dict lookup and a stat().
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from api.schemas import CorpusItem, DocumentContent
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Documents above this size stream from disk rather than being cached in memory
+CORPUS_STREAM_THRESHOLD = int(os.getenv("CORPUS_STREAM_THRESHOLD", str(512 * 1024)))
+STREAM_CHUNK_CHARS = 64 * 1024
+
+# Clients may cache but must revalidate (cheap: 304 with no body)
+CACHE_CONTROL = "public, no-cache"
+
+
+@dataclass(frozen=True)
+class PrebuiltPayload:
+    """A JSON response serialized and compressed once."""
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+    etag: str            # quoted, e.g. "3f2a..."
+    last_modified: str   # HTTP-date
+    mtime: float         # seconds since epoch, for If-Modified-Since
+
+
+def build_payload(content, mtime: float) -> PrebuiltPayload:
+    """Serialize content the same way FastAPI's JSONResponse does, then compress."""
+    body = json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+    return PrebuiltPayload(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body, quality=11) if brotli else None,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        last_modified=formatdate(int(mtime), usegmt=True),
+        mtime=int(mtime),
+    )
+
+
+def _is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """RFC 7232: If-None-Match wins over If-Modified-Since when both are sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison; also accept our per-encoding suffixed tags
+        base = etag.strip('"')
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag == base or tag.rsplit("-", 1)[0] == base:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _negotiate_encoding(request: Request, payload: PrebuiltPayload) -> Optional[str]:
+    accept = request.headers.get("accept-encoding", "")
+    encodings = {part.split(";")[0].strip().lower() for part in accept.split(",")}
+    if "br" in encodings and payload.brotli_body is not None:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def payload_response(request: Request, payload: PrebuiltPayload) -> Response:
+    """Serve a prebuilt payload: 304, compressed variant or identity."""
+    headers = {
+        "ETag": payload.etag,
+        "Last-Modified": payload.last_modified,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if _is_not_modified(request, payload.etag, payload.mtime):
+        return Response(status_code=304, headers=headers)
+
+    encoding = _negotiate_encoding(request, payload)
+    if encoding == "br":
+        body = payload.brotli_body
+    elif encoding == "gzip":
+        body = payload.gzip_body
+    else:
+        body = payload.body
+
+    if encoding:
+        # Each representation needs its own strong validator
+        base = payload.etag.strip('"')
+        headers["ETag"] = f'"{base}-{encoding}"'
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ============ Corpus Payload Caches ============
+
+_listing_lock = threading.Lock()
+_listing_cache: Tuple[object, Optional[PrebuiltPayload]] = (None, None)
+
+_document_lock = threading.Lock()
+_document_cache: Dict[str, Tuple[int, int, PrebuiltPayload]] = {}
+
+
+def get_listing_payload(snapshot) -> PrebuiltPayload:
+    """
+    /corpus payload for a registry snapshot, rebuilt only when the snapshot changes.
+
+    Args:
+        snapshot: MetadataSnapshot whose corpus_listing has been validated
+    """
+    global _listing_cache
+    cached_snapshot, payload = _listing_cache
+    if cached_snapshot is snapshot and payload is not None:
+        return payload
+
+    with _listing_lock:
+        cached_snapshot, payload = _listing_cache
+        if cached_snapshot is snapshot and payload is not None:
+            return payload
+
+        items = [CorpusItem(**item).model_dump() for item in snapshot.corpus_listing]
+        mtimes = [entry[1] for entry in snapshot.signature if entry[1] is not None]
+        mtime = max(mtimes) / 1e9 if mtimes else snapshot.loaded_at
+        payload = build_payload(items, mtime)
+        _listing_cache = (snapshot, payload)
+        return payload
+
+
+def document_response(request: Request, full_path: Path, source: str) -> Response:
+    """
+    Serve a corpus document as a DocumentContent JSON body.
+
+    Small documents are serialized/compressed once per (mtime, size); large
+    ones are streamed from the file handle as a JSON string.
+    """
+    stat = full_path.stat()
+
+    if stat.st_size > CORPUS_STREAM_THRESHOLD:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(int(stat.st_mtime), usegmt=True),
+            "Cache-Control": CACHE_CONTROL,
+        }
+        if _is_not_modified(request, etag, stat.st_mtime):
+            return Response(status_code=304, headers=headers)
+        return StreamingResponse(
+            _stream_document(full_path, source),
+            media_type="application/json",
+            headers=headers
+        )
+
+    key = str(full_path)
+    cached = _document_cache.get(key)
+    if cached is None or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+        with open(full_path, "r") as f:
+            content = f.read()
+        document = DocumentContent(content=content, metadata={"source": source})
+        payload = build_payload(document.model_dump(), stat.st_mtime)
+        with _document_lock:
+            _document_cache[key] = (stat.st_mtime_ns, stat.st_size, payload)
+        cached = _document_cache[key]
+
+    return payload_response(request, cached[2])
+
+
+def _stream_document(full_path: Path, source: str) -> Iterator[bytes]:
+    """Yield a DocumentContent JSON body without holding the file in memory."""
+    yield b'{"content":"'
+    with open(full_path, "r") as f:
+        while True:
+            text = f.read(STREAM_CHUNK_CHARS)
+            if not text:
+                break
+            # Escaping is per-character, so chunks can be escaped independently
+            yield json.dumps(text, ensure_ascii=False)[1:-1].encode("utf-8")
+    metadata = json.dumps({"source": source}, ensure_ascii=False, separators=(",", ":"))
+    yield f'","metadata":{metadata}}}'.encode("utf-8")
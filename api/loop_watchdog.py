@@ -0,0 +1,265 @@
+"""
+Event-loop lag watchdog for the Focus Group Search API.
+
+Sync work inside an `async def` endpoint (a blocking HTTP call, a big JSON
+parse) freezes every request on the worker, and nothing in the request
+latencies says which route did it. The watchdog has two parts:
+
+- A heartbeat on the loop: a callback scheduled every LOOP_LAG_INTERVAL_MS
+  records how late it ran into focus_group_event_loop_lag_seconds.
+- A watcher thread: when the heartbeat is more than LOOP_BLOCK_THRESHOLD_MS
+  overdue, the loop is stuck in one callback. The thread then captures the
+  loop thread's Python stack and the route of the task being run (the
+  middleware maps request tasks to their scope). When the loop comes back,
+  the episode is logged with how long it lasted, counted in
+  focus_group_event_loop_blocked_total{endpoint}, and kept in
+  /stats -> event_loop (the last LOOP_BLOCK_HISTORY episodes).
+
+Strict mode (LOOP_WATCHDOG_STRICT=true, or `loop_watchdog.strict = True` in a
+test) turns a blocking episode inside a request into an error. The request
+raises LoopBlockedError when it finishes, so a TestClient call fails with the
+offending stack. Blocking outside requests (startup, background tasks) is
+still only recorded.
+
+Cost: one loop callback per interval, a thread that wakes every
+threshold/2, and a dict insert/delete per request.
+
+Usage:
+    LOOP_BLOCK_THRESHOLD_MS=50 uvicorn api.main:app
+    curl localhost:8000/stats | jq .event_loop
+
+    loop_watchdog.strict = True            # in a test, before the TestClient calls
+    client.post("/search/unified", ...)    # raises LoopBlockedError if the route blocked > threshold
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, Optional
+
+from api.metrics import metrics
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG", "true").lower() == "true"
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_WATCHDOG_STRICT = os.getenv("LOOP_WATCHDOG_STRICT", "false").lower() == "true"
+LOOP_BLOCK_HISTORY = int(os.getenv("LOOP_BLOCK_HISTORY", "20"))
+STACK_LIMIT = 40  # innermost frames kept per captured stack
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "focus_group_event_loop_lag_seconds",
+    "How late the event-loop heartbeat ran (time the loop was busy with other callbacks)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_BLOCKED = metrics.counter(
+    "focus_group_event_loop_blocked_total",
+    "Times one callback blocked the event loop longer than LOOP_BLOCK_THRESHOLD_MS, by route",
+    ("endpoint",)
+)
+
+
+@dataclass
+class BlockedEvent:
+    """One episode of the loop stuck in a single callback."""
+    endpoint: Optional[str]   # route template of the request being run, None outside requests
+    path: Optional[str]
+    task: str                 # the asyncio task's coroutine, for blocking outside requests
+    blocked_ms: float         # how late the heartbeat ran: a lower bound on the block
+    stack: str                # loop thread stack, captured while blocked
+    at: float                 # wall clock when the block was detected
+
+
+class LoopBlockedError(RuntimeError):
+    """Strict mode: a request blocked the event loop longer than the threshold."""
+
+    def __init__(self, event: BlockedEvent):
+        self.event = event
+        super().__init__(
+            f"{event.endpoint or event.path} blocked the event loop for {event.blocked_ms:.0f} ms "
+            f"(threshold {LOOP_BLOCK_THRESHOLD_MS:.0f} ms); stack while blocked:\n{event.stack}"
+        )
+
+
+def _endpoint(scope: Dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class LoopWatchdog:
+    """Heartbeat on the loop plus a watcher thread that catches it stuck."""
+
+    def __init__(
+        self,
+        interval_ms: float = LOOP_LAG_INTERVAL_MS,
+        threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS,
+        strict: bool = LOOP_WATCHDOG_STRICT,
+    ):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.strict = strict
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.expected = 0.0                      # monotonic time the next heartbeat is due
+        self.requests: Dict[int, Dict] = {}      # id(task) -> ASGI scope of the request it runs
+        self.events: Deque[BlockedEvent] = deque(maxlen=LOOP_BLOCK_HISTORY)
+        self.blocked_total = 0
+        self._pending: Optional[BlockedEvent] = None  # captured by the watcher, finished by the heartbeat
+        self._pending_task: Optional[int] = None
+        self._violations: Dict[int, BlockedEvent] = {}  # strict mode: id(task) -> event to raise
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start on the running loop (call from the lifespan)."""
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self.expected = time.monotonic() + self.interval
+        self._handle = self.loop.call_later(self.interval, self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # ---- loop side ----
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        LOOP_LAG_SECONDS.observe(max(0.0, now - self.expected))
+        self._finish_pending(now)
+        self.expected = now + self.interval
+        self._handle = self.loop.call_later(self.interval, self._heartbeat)
+
+    def _finish_pending(self, now: float):
+        """Record the episode the watcher captured, now that the loop is running again."""
+        event, task_id = self._pending, self._pending_task
+        if event is None:
+            return
+        self._pending = self._pending_task = None
+        event.blocked_ms = round(max(0.0, now - self.expected) * 1000, 1)
+        self._record(event, task_id)
+
+    def _record(self, event: BlockedEvent, task_id: Optional[int]):
+        self.blocked_total += 1
+        self.events.append(event)
+        LOOP_BLOCKED.labels(event.endpoint or "none").inc()
+        where = f"{event.endpoint} ({event.path})" if event.endpoint else f"task {event.task}"
+        print(f"Event loop blocked for {event.blocked_ms:.0f} ms in {where}; stack while blocked:\n{event.stack}")
+        if self.strict and task_id is not None and event.endpoint is not None:
+            self._violations[task_id] = event
+
+    # ---- watcher thread ----
+
+    def _watch(self):
+        period = max(self.threshold / 2, 0.005)
+        while not self._stop.wait(period):
+            overdue = time.monotonic() - self.expected
+            if overdue > self.threshold and self._pending is None:
+                self._capture()
+
+    def _capture(self):
+        """Snapshot what the loop thread is doing right now (it is stuck in one callback)."""
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+        task = asyncio.current_task(self.loop)  # the task whose step is blocking, if any
+        scope = self.requests.get(id(task)) if task is not None else None
+        task_name = "none"
+        if task is not None:
+            coro = task.get_coro()
+            task_name = getattr(coro, "__qualname__", None) or task.get_name()
+        self._pending_task = id(task) if task is not None else None
+        self._pending = BlockedEvent(
+            endpoint=_endpoint(scope) if scope is not None else None,
+            path=scope.get("path") if scope is not None else None,
+            task=task_name,
+            blocked_ms=0.0,
+            stack=stack,
+            at=time.time(),
+        )
+
+    # ---- requests ----
+
+    def request_started(self, scope: Dict) -> Optional[int]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        task_id = id(task)
+        self.requests[task_id] = scope
+        return task_id
+
+    def request_finished(self, task_id: Optional[int]) -> Optional[BlockedEvent]:
+        """Forget the request; in strict mode, the blocking event it caused (if any)."""
+        if task_id is None:
+            return None
+        if self._pending_task == task_id:
+            # It blocked and finished in the same loop step, before the heartbeat could run
+            self._finish_pending(time.monotonic())
+        self.requests.pop(task_id, None)
+        return self._violations.pop(task_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        series = LOOP_LAG_SECONDS.labels()
+        lag = {
+            f"p{int(q * 100)}_ms": round(series.quantile(q) * 1000, 2) if series.count else None
+            for q in (0.5, 0.95, 0.99)
+        }
+        return {
+            "running": self.running,
+            "strict": self.strict,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "heartbeats": series.count,
+            "lag": lag,
+            "blocked_total": self.blocked_total,
+            "recent_blocks": [asdict(event) for event in reversed(self.events)],
+        }
+
+
+loop_watchdog = LoopWatchdog()
+
+
+class LoopWatchdogMiddleware:
+    """
+    ASGI middleware: tells the watchdog which route each request task runs.
+
+    In strict mode, a request that blocked the loop past the threshold raises
+    LoopBlockedError once it has finished.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task_id = loop_watchdog.request_started(scope)
+        violation = None
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            violation = loop_watchdog.request_finished(task_id)
+        if violation is not None:
+            raise LoopBlockedError(violation)
@@ -1,13 +1,12 @@
 import sys
 import os
+import asyncio
 from pathlib import Path
 import time
 import json
 import hashlib
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from contextlib import asynccontextmanager
-from datetime import date
-from collections import defaultdict
 
 # Demo cache: simple dicts populated from JSON on startup (no TTLCache needed)
 
@@ -16,20 +15,29 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # Production config: disable reranker to stay under 512MB memory limit
+# (MEMORY_BUDGET_MODE=true fits hybrid + an int8 reranker - see README "Memory budget")
 USE_RERANKER = os.getenv("USE_RERANKER", "false").lower() == "true"
+# Threads building resources in parallel at startup (budget mode: 1, for a lower peak and exact per-stage RSS)
+STARTUP_WORKERS = int(os.getenv("STARTUP_WORKERS", "8"))
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 
 from scripts.retrieve import (
     FocusGroupRetrieverV2, LLMRouter, RetrievalResult,
     StrategyMemoRetriever, StrategyRetrievalResult, RouterResult
 )
 from scripts.synthesize import FocusGroupSynthesizer, get_friendly_error
-from eval.config import STRATEGY_TOP_K_PER_RACE, DATA_DIR, PROJECT_ROOT, USE_HYBRID_RETRIEVAL
+from scripts.retrieval.registry import MetadataRegistry
+from scripts.retrieval.base import SharedResources
+from scripts.retrieval.shared_index import shared_index_stats
+from scripts.usage import chat_completion
+from eval.config import (
+    STRATEGY_TOP_K_PER_RACE, PROJECT_ROOT, USE_HYBRID_RETRIEVAL, MEMORY_BUDGET_MODE
+)
 
-# Lazy import for hybrid retrieval (requires rank_bm25, not in prod requirements)
+# Lazy import for hybrid retrieval (only loaded when enabled)
 HybridFocusGroupRetriever = None
 if USE_HYBRID_RETRIEVAL:
     try:
@@ -38,16 +46,30 @@ if USE_HYBRID_RETRIEVAL:
         print("Warning: HybridFocusGroupRetriever not available, falling back to dense retrieval")
 from api.schemas import (
     SearchRequest, SearchResponse, SynthesisRequest, MacroSynthesisRequest,
-    GroupedResult, RetrievalChunk,
     LightMacroSynthesisRequest, DeepMacroSynthesisRequest, DeepMacroResponse,
-    StrategyChunk, StrategyGroupedResult, UnifiedSearchResponse,
+    UnifiedSearchResponse,
     StrategySynthesisRequest, StrategyMacroSynthesisRequest,
     UnifiedMacroSynthesisRequest, CorpusItem, DocumentContent
 )
 from api.observability import (
-    QueryTracer, log_retrieval_decision, log_score_distribution,
+    QueryTracer, exporter as trace_exporter, log_retrieval_decision, log_score_distribution,
     log_router_decision, log_result_summary
 )
+from api.coalesce import SingleFlight, StreamFanout
+from api.semantic_cache import SemanticQueryCache
+from api.corpus_cache import payload_response, get_listing_payload, document_response
+from api.serialization import FastJSONResponse, dumps_str
+from api.memory import MemoryReport, release_memory
+from api.metrics import (
+    metrics, MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, ROUTER_FALLBACKS, record_cache, usage_snapshot
+)
+from api.profiling import (
+    PROFILE_INTERVAL_MS, PROFILING_TOKEN, ProfilerBusy, ProfilingMiddleware, check_admin_token, profiler
+)
+from api.startup import Startup
+from api.rate_limit import RateLimitMiddleware, create_rate_limiter
+from api.loop_watchdog import LOOP_WATCHDOG_ENABLED, LoopWatchdogMiddleware, loop_watchdog
+from api.warmup import WARMUP_TIMEOUT, build_warm_tasks
 
 # Global instances
 retriever: Optional[FocusGroupRetrieverV2] = None
@@ -66,9 +88,28 @@ strategy_light_cache: Dict[str, str] = {}
 strategy_deep_cache: Dict[str, str] = {}
 strategy_macro_cache: Dict[str, str] = {}
 
-# Rate limiting: IP -> {"count": int, "date": date}
-rate_limits: Dict[str, Dict] = defaultdict(lambda: {"count": 0, "date": date.today()})
-DAILY_RATE_LIMIT = int(os.getenv("DAILY_RATE_LIMIT", "100"))
+# Startup memory accounting (served under "memory" in /stats)
+memory_report = MemoryReport()
+
+# Background startup: phases and readiness (served by /ready)
+startup = Startup(workers=1 if MEMORY_BUDGET_MODE else STARTUP_WORKERS)
+
+# Rate limiting: sliding window per client IP, weighted by route (api/rate_limit.py; None when DAILY_RATE_LIMIT=0)
+rate_limiter = create_rate_limiter()
+
+# === Request Coalescing (identical in-flight requests share one computation) ===
+search_flight = SingleFlight("search_unified")
+synthesis_flight = SingleFlight("synthesize")
+synthesis_fanout = StreamFanout("synthesize_stream")
+
+# === Semantic Cache (near-duplicate queries served from recent answers) ===
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256"))
+semantic_cache = SemanticQueryCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+)
 
 
 def _get_cache_key(query: str, top_k: int, score_threshold: float, use_hybrid: bool = False) -> str:
@@ -77,21 +118,29 @@ def _get_cache_key(query: str, top_k: int, score_threshold: float, use_hybrid: b
     return hashlib.md5(raw.encode()).hexdigest()
 
 
-def _check_rate_limit(client_ip: str) -> bool:
-    """Check if client is within rate limit. Returns True if allowed."""
-    today = date.today()
-    entry = rate_limits[client_ip]
+def _get_request_key(endpoint: str, request) -> str:
+    """
+    Generate coalescing key for a synthesis request.
+
+    Synthesis output depends on the full body (quotes, summaries, metadata),
+    not just the query, so the whole request is hashed.
+    """
+    body = request.model_dump_json()
+    return f"{endpoint}:{hashlib.md5(body.encode()).hexdigest()}"
 
-    # Reset count if new day
-    if entry["date"] != today:
-        entry["count"] = 0
-        entry["date"] = today
 
-    if entry["count"] >= DAILY_RATE_LIMIT:
-        return False
+def _get_semantic_filters(search_request: SearchRequest, route_result) -> tuple:
+    """Routing filters a semantic cache hit must match exactly."""
+    fg_ids = route_result.focus_group_ids
+    return (
+        route_result.content_type,
+        tuple(sorted(fg_ids)) if fg_ids else None,
+        route_result.outcome_filter,
+        search_request.top_k,
+        search_request.score_threshold,
+        USE_HYBRID_RETRIEVAL,
+    )
 
-    entry["count"] += 1
-    return True
 
 # Example queries to pre-warm (from frontend landing page)
 # Selected for variety: quotes-only, lessons-only, and mixed routing
@@ -339,7 +388,8 @@ Write a 1-2 sentence summary of the key lesson(s) from this race relevant to the
 Be specific - include what worked/failed and why. No fluff."""
 
                 try:
-                    response = synthesizer.client.chat.completions.create(
+                    response = chat_completion(
+                        synthesizer.client, "strategy_light_summary",
                         model=synthesizer.model,
                         messages=[{"role": "user", "content": prompt}],
                         max_tokens=150,
@@ -352,46 +402,148 @@ Be specific - include what worked/failed and why. No fluff."""
                     print(f"    Failed to pre-warm strategy summary for {race_id}: {e}")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Initialize expensive resources on startup."""
-    global retriever, strategy_retriever, router, synthesizer
-    print(f"Initializing resources (reranker={'enabled' if USE_RERANKER else 'disabled'}, hybrid={'enabled' if USE_HYBRID_RETRIEVAL else 'disabled'})...")
+def _account_memory(registry) -> None:
+    """Attribute startup memory to components, shared resources first (so they're counted once)."""
+    memory_report.add("metadata registry", registry)
+    memory_report.add("embedding client", SharedResources.get_embedding_model())
+    memory_report.add("pinecone index", SharedResources.get_pinecone_index())
+    memory_report.add("chunk store", SharedResources.get_chunk_store())
+    if USE_RERANKER:
+        memory_report.add("reranker", SharedResources.get_reranker_model())
+    memory_report.add("router", router)
+    memory_report.add("bm25 index", getattr(retriever, "bm25_retriever", None))
+    memory_report.add("retrievers", retriever, strategy_retriever)
+    memory_report.add("synthesizer", synthesizer)
+    memory_report.add(
+        "demo cache", search_cache, light_summary_cache, macro_synthesis_cache, deep_summary_cache,
+        unified_macro_cache, strategy_light_cache, strategy_deep_cache, strategy_macro_cache
+    )
+    memory_report.add("semantic cache", semantic_cache)
+    memory_report.finish()
+    memory_report.log()
+
+
+def _load_bm25_index():
+    from scripts.retrieval.bm25 import BM25Retriever
+    return BM25Retriever()
+
+
+def _build_focus_group_retriever():
     # Initialize with same settings as app.py
     # Note: app.py uses st.cache_resource, here we use global singletons
-    # USE_RERANKER=false for production (512MB limit), true for local dev
     # USE_HYBRID_RETRIEVAL=false by default, enables BM25+dense fusion
     if USE_HYBRID_RETRIEVAL and HybridFocusGroupRetriever is not None:
-        retriever = HybridFocusGroupRetriever(use_router=True, use_reranker=USE_RERANKER, verbose=False)
-    else:
-        retriever = FocusGroupRetrieverV2(use_router=True, use_reranker=USE_RERANKER, verbose=False)
-    strategy_retriever = StrategyMemoRetriever(use_reranker=USE_RERANKER, verbose=False)
-    router = LLMRouter()
-    synthesizer = FocusGroupSynthesizer(verbose=False)
+        return HybridFocusGroupRetriever(use_router=True, use_reranker=USE_RERANKER, verbose=False)
+    return FocusGroupRetrieverV2(use_router=True, use_reranker=USE_RERANKER, verbose=False)
+
+
+def _staged(name: str, fn: Callable):
+    """Wrap a startup step so its load time and RSS growth land in the memory report."""
+    def run():
+        with memory_report.stage(name):
+            return fn()
+    return run
+
+
+def _prewarm_live():
+    """No demo cache file: warm the example queries with live LLM calls (after ready)."""
+    print(f"Pre-warming cache with {len(EXAMPLE_QUERIES)} example queries...")
+    for query in EXAMPLE_QUERIES:
+        try:
+            _prewarm_query(query)
+            print(f"  Cached: {query}")
+        except Exception as e:
+            print(f"  Failed to cache '{query}': {e}")
+    print("Cache pre-warming complete.")
+
+
+async def _initialize():
+    """Build every resource in the background; /ready flips to 200 when done."""
+    global retriever, strategy_retriever, router, synthesizer
+    prewarm = os.getenv("PREWARM_CACHE", "true").lower() == "true"
+
+    # Phase 1: independent resources, in parallel (one embedder, index, chunk store,
+    # reranker and router shared by every retriever)
+    steps = {
+        "metadata registry": MetadataRegistry.get,
+        "embedding client": SharedResources.get_embedding_model,
+        "pinecone index": SharedResources.get_pinecone_index,
+        "chunk store": SharedResources.get_chunk_store,
+        "router": SharedResources.get_router,
+        "synthesizer": lambda: FocusGroupSynthesizer(verbose=False),
+    }
+    # USE_RERANKER=false for production (512MB limit), true for local dev
+    if USE_RERANKER:
+        steps["reranker"] = SharedResources.get_reranker_model
+    if USE_HYBRID_RETRIEVAL and HybridFocusGroupRetriever is not None:
+        steps["bm25 index"] = _load_bm25_index
+    resources = await startup.run_phase("resources", {name: _staged(name, fn) for name, fn in steps.items()})
+    registry = resources["metadata registry"]
+    router = resources["router"]
+    print(f"Metadata registry loaded ({len(registry.fg_ids)} focus groups, {len(registry.race_ids)} strategy memos)")
+
+    # Phase 2: retrievers (wire up the shared resources from phase 1)
+    built = await startup.run_phase("retrievers", {
+        "focus group retriever": _staged("retrievers", _build_focus_group_retriever),
+        "strategy retriever": _staged(
+            "retrievers", lambda: StrategyMemoRetriever(use_reranker=USE_RERANKER, verbose=False)
+        ),
+    })
+    strategy_retriever = built["strategy retriever"]
+    synthesizer = resources["synthesizer"]
+    # Assigned last: endpoints answer 503 until the retriever is set
+    retriever = built["focus group retriever"]
     print("Resources initialized.")
 
-    # Load demo cache from JSON (zero LLM cost) or fall back to live pre-warming
-    if os.getenv("PREWARM_CACHE", "true").lower() == "true":
-        # Try loading from persistent JSON cache first
-        if _load_demo_cache():
+    # Phase 3: warm connections, caches and models so the first request runs at steady-state latency
+    warm_tasks = build_warm_tasks(
+        hybrid=USE_HYBRID_RETRIEVAL and HybridFocusGroupRetriever is not None,
+        reranker=USE_RERANKER
+    )
+    await startup.run_phase("warmup", warm_tasks, required=False, timeout=WARMUP_TIMEOUT)
+
+    # Demo cache: whenever PREWARM_CACHE is on (not subject to WARMUP_TASKS), and without a
+    # timeout, so the live fallback below never runs while the loader is still filling the caches
+    demo_cache_loaded = None
+    if prewarm:
+        loaded = await startup.run_phase("demo cache", {"demo cache": _staged("demo cache", _load_demo_cache)},
+                                         required=False)
+        demo_cache_loaded = loaded.get("demo cache", False)
+
+    # Budget mode: hand the heap freed by startup parsing back to the OS
+    if MEMORY_BUDGET_MODE:
+        release_memory()
+    _account_memory(registry)
+    startup.mark_ready()
+
+    if demo_cache_loaded is not None:
+        if demo_cache_loaded:
             print("Demo cache loaded from file (no LLM calls needed).")
         else:
-            # Fall back to live pre-warming (makes LLM calls)
-            print(f"Pre-warming cache with {len(EXAMPLE_QUERIES)} example queries...")
-            for query in EXAMPLE_QUERIES:
-                try:
-                    _prewarm_query(query)
-                    print(f"  Cached: {query}")
-                except Exception as e:
-                    print(f"  Failed to cache '{query}': {e}")
-            print("Cache pre-warming complete.")
+            # Fall back to live pre-warming (makes LLM calls) - off the startup path
+            await asyncio.to_thread(_prewarm_live)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start serving at once; initialize expensive resources in the background (see /ready)."""
+    print(f"Initializing resources (reranker={'enabled' if USE_RERANKER else 'disabled'}, hybrid={'enabled' if USE_HYBRID_RETRIEVAL else 'disabled'}, memory budget mode={'on' if MEMORY_BUDGET_MODE else 'off'}, startup workers={startup.workers})...")
+    startup.start(_initialize())
+    if LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
 
     yield
     # Cleanup if needed
     print("Shutting down...")
+    loop_watchdog.stop()
+    startup.shutdown()
+    trace_exporter.flush()
 
 app = FastAPI(title="Focus Group Search API", lifespan=lifespan)
 
+# Per-client request budget with RateLimit-* headers (added before CORS so 429s get CORS headers too)
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -403,82 +555,160 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"],
 )
+# Request latency histograms and in-flight gauge (served at /metrics)
+app.add_middleware(MetricsMiddleware)
+# Event-loop lag and blocking-callback detection (served at /metrics and /stats)
+if LOOP_WATCHDOG_ENABLED:
+    app.add_middleware(LoopWatchdogMiddleware)
+# Admin-only profiling: not even installed unless PROFILING_TOKEN is set
+if PROFILING_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+@app.get("/live")
+async def live():
+    """Liveness: the process is up and serving (never waits on startup)."""
+    return {"status": "ok"}
+
 
 @app.get("/health")
 async def health_check():
+    """Health: green while the process serves, 503 once a required startup step has failed."""
+    if startup.error:
+        return FastJSONResponse({"status": "failed", "error": startup.error}, status_code=503)
     return {"status": "ok", "resources_loaded": retriever is not None}
 
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 503 until resources are built and warm tasks have run, with per-step timings."""
+    return FastJSONResponse(startup.to_dict(), status_code=200 if startup.ready else 503)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Step and request latency histograms, cache/router/upstream counters (Prometheus text format)."""
+    return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/stats")
+async def stats():
+    """Request coalescing counters, semantic cache hit rates, startup memory, HTTP pool usage, latency, event-loop lag, rate limiting, tracing, LLM token usage and which worker answered."""
+    from scripts.http_clients import http_pool_stats  # httpx isn't needed at import time
+    return {
+        "coalescing": {
+            "search_unified": search_flight.stats(),
+            "synthesize": synthesis_flight.stats(),
+            "synthesize_stream": synthesis_fanout.stats(),
+        },
+        "semantic_cache": semantic_cache.stats(),
+        "memory": memory_report.to_dict(),
+        "http_pools": http_pool_stats(),
+        "latency": metrics.snapshot(),
+        "event_loop": loop_watchdog.stats(),
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "tracing": trace_exporter.stats(),
+        "llm_usage": usage_snapshot(),
+        # Everything above is per process: with several workers (api/serve.py), this one's
+        "worker": {"pid": os.getpid(), "shared_index": shared_index_stats()},
+    }
+
+
+# ============ Admin: profiling (api/profiling.py) ============
+
+def _require_admin(request: Request):
+    """Profiling endpoints exist only with PROFILING_TOKEN set, and need it in X-Admin-Token."""
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_admin_token(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.post("/admin/profile/start", dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def profile_start(
+    seconds: Optional[float] = None,
+    requests: Optional[int] = None,
+    route: Optional[str] = None,
+    interval_ms: float = PROFILE_INTERVAL_MS,
+):
+    """Sample all threads for `seconds`, or until `requests` requests under path prefix `route` finish."""
+    try:
+        session = profiler.start(seconds=seconds, requests=requests, route=route, interval_ms=interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.to_dict()
+
+
+@app.post("/admin/profile/stop", dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def profile_stop():
+    profiler.stop()
+    return profiler.status()
+
+
+@app.get("/admin/profile", dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def profile_status(limit: int = 30):
+    """Session state and the top functions by self / total samples."""
+    return profiler.status(limit)
+
+
+@app.get("/admin/profile/collapsed", dependencies=[Depends(_require_admin)], include_in_schema=False)
+async def profile_collapsed():
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno."""
+    return Response(profiler.collapsed(), media_type="text/plain; charset=utf-8")
+
+def _fg_group_payload(fg_id: str, chunks: List[RetrievalResult]) -> dict:
+    """GroupedResult-shaped dict; chunks stay as dataclasses for direct serialization."""
+    return {
+        "focus_group_id": fg_id,
+        "focus_group_metadata": retriever._load_focus_group_metadata(fg_id),
+        "chunks": chunks
+    }
+
+
+def _strategy_group_payload(race_id: str, chunks: List[StrategyRetrievalResult]) -> dict:
+    """StrategyGroupedResult-shaped dict; chunks stay as dataclasses."""
+    return {
+        "race_id": race_id,
+        "race_metadata": strategy_retriever._get_race_metadata(race_id),
+        "chunks": chunks
+    }
+
+
+def _build_search_payload(results_by_fg: Dict, retrieval_time: float) -> dict:
+    """SearchResponse-shaped dict for /search and /search/stream."""
+    grouped_results = [
+        _fg_group_payload(fg_id, chunks)
+        for fg_id, chunks in results_by_fg.items() if chunks
+    ]
+    return {
+        "results": grouped_results,
+        "stats": {
+            "retrieval_time_ms": round(retrieval_time),
+            "total_quotes": sum(len(g["chunks"]) for g in grouped_results),
+            "focus_groups_count": len(grouped_results)
+        }
+    }
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     if not retriever or not router:
         raise HTTPException(status_code=503, detail="Service not ready")
 
     start_time = time.time()
-    
-    # 1. Route (retriever handles routing internally if filter_focus_groups is None)
-    # The retriever.retrieve_per_focus_group handles routing internally if filter_focus_groups is None
-    # but app.py does it explicitly to show the decision. Let's rely on retriever's internal logic 
-    # OR replicate app.py if we want to return the routing decision in stats.
-    
-    # Let's replicate app.py logic to capture routing time stats if possible, 
-    # but retrieve_per_focus_group is convenient.
-    # For now, we'll let retrieve_per_focus_group handle it, or we can add a router endpoint later if needed.
-    
-    # Actually, app.py calls router.route() explicitly. 
-    # To keep it simple and robust, let's just call retrieve_per_focus_group.
-    # It returns a dict of results.
 
+    # retrieve_per_focus_group routes internally when filter_focus_groups is None
     results_by_fg = retriever.retrieve_per_focus_group(
         query=request.query,
         top_k_per_fg=request.top_k,
         score_threshold=request.score_threshold
     )
-    
+
     retrieval_time = (time.time() - start_time) * 1000
 
-    # Convert to response model
-    grouped_results = []
-    total_quotes = 0
-    
-    for fg_id, chunks in results_by_fg.items():
-        if not chunks:
-            continue
-            
-        fg_meta = retriever._load_focus_group_metadata(fg_id)
-        
-        # Convert dataclass chunks to Pydantic chunks
-        api_chunks = []
-        for c in chunks:
-            api_chunks.append(RetrievalChunk(
-                chunk_id=c.chunk_id,
-                score=c.score,
-                content=c.content,
-                content_original=c.content_original,
-                focus_group_id=c.focus_group_id,
-                participant=c.participant,
-                participant_profile=c.participant_profile,
-                section=c.section,
-                source_file=c.source_file,
-                line_number=c.line_number,
-                preceding_moderator_q=c.preceding_moderator_q
-            ))
-            
-        grouped_results.append(GroupedResult(
-            focus_group_id=fg_id,
-            focus_group_metadata=fg_meta,
-            chunks=api_chunks
-        ))
-        total_quotes += len(api_chunks)
-
-    return SearchResponse(
-        results=grouped_results,
-        stats={
-            "retrieval_time_ms": round(retrieval_time),
-            "total_quotes": total_quotes,
-            "focus_groups_count": len(grouped_results)
-        }
-    )
+    # Dataclass chunks serialize straight to JSON (no per-chunk Pydantic models)
+    return FastJSONResponse(_build_search_payload(results_by_fg, retrieval_time))
 
 
 @app.post("/search/stream")
@@ -487,49 +717,6 @@ async def search_stream(request: SearchRequest):
     if not retriever or not router:
         raise HTTPException(status_code=503, detail="Service not ready")
 
-    def build_response(results_by_fg: Dict, retrieval_time: float) -> dict:
-        """Build the final response dict."""
-        grouped_results = []
-        total_quotes = 0
-
-        for fg_id, chunks in results_by_fg.items():
-            if not chunks:
-                continue
-
-            fg_meta = retriever._load_focus_group_metadata(fg_id)
-
-            api_chunks = []
-            for c in chunks:
-                api_chunks.append({
-                    "chunk_id": c.chunk_id,
-                    "score": c.score,
-                    "content": c.content,
-                    "content_original": c.content_original,
-                    "focus_group_id": c.focus_group_id,
-                    "participant": c.participant,
-                    "participant_profile": c.participant_profile,
-                    "section": c.section,
-                    "source_file": c.source_file,
-                    "line_number": c.line_number,
-                    "preceding_moderator_q": c.preceding_moderator_q
-                })
-
-            grouped_results.append({
-                "focus_group_id": fg_id,
-                "focus_group_metadata": fg_meta,
-                "chunks": api_chunks
-            })
-            total_quotes += len(api_chunks)
-
-        return {
-            "results": grouped_results,
-            "stats": {
-                "retrieval_time_ms": round(retrieval_time),
-                "total_quotes": total_quotes,
-                "focus_groups_count": len(grouped_results)
-            }
-        }
-
     def event_generator():
         start_time = time.time()
 
@@ -538,7 +725,7 @@ async def search_stream(request: SearchRequest):
 
         fg_ids = router.route(request.query)
         if fg_ids is None:
-            fg_ids = router._get_all_ids()
+            fg_ids = router._get_all_fg_ids()
             yield json.dumps({"type": "status", "step": "filtering", "message": f"Searching all {len(fg_ids)} focus groups..."}) + "\n"
         else:
             yield json.dumps({"type": "status", "step": "filtering", "message": f"Routing to {len(fg_ids)} relevant focus groups..."}) + "\n"
@@ -562,14 +749,14 @@ async def search_stream(request: SearchRequest):
         yield json.dumps({"type": "status", "step": "complete", "message": "Done"}) + "\n"
 
         # Final results
-        response_data = build_response(results_by_fg, retrieval_time)
-        yield json.dumps({"type": "results", "data": response_data}) + "\n"
+        response_data = _build_search_payload(results_by_fg, retrieval_time)
+        yield dumps_str({"type": "results", "data": response_data}) + "\n"
 
     return StreamingResponse(event_generator(), media_type="application/x-ndjson")
 
 
 @app.post("/search/unified", response_model=UnifiedSearchResponse)
-async def search_unified(search_request: SearchRequest, request: Request):
+async def search_unified(search_request: SearchRequest):
     """
     Unified search that routes to quotes (focus groups) and/or lessons (strategy memos).
     Uses LLM router to determine content type based on query intent.
@@ -577,14 +764,6 @@ async def search_unified(search_request: SearchRequest, request: Request):
     if not retriever or not strategy_retriever or not router:
         raise HTTPException(status_code=503, detail="Service not ready")
 
-    # Rate limiting
-    client_ip = request.client.host if request.client else "unknown"
-    if not _check_rate_limit(client_ip):
-        raise HTTPException(
-            status_code=429,
-            detail="Daily request limit reached. Please try again tomorrow."
-        )
-
     # Check cache first
     cache_key = _get_cache_key(
         search_request.query,
@@ -592,39 +771,80 @@ async def search_unified(search_request: SearchRequest, request: Request):
         search_request.score_threshold,
         USE_HYBRID_RETRIEVAL
     )
-    if cache_key in search_cache:
+    if record_cache("exact", cache_key in search_cache):
         cached = search_cache[cache_key]
         # Add cache hit indicator to stats
         cached_response = cached.copy()
-        cached_response["stats"] = {**cached["stats"], "cached": True}
-        return UnifiedSearchResponse(**cached_response)
+        cached_response["stats"] = {**cached["stats"], "cached": True, "cache_tier": "exact"}
+        return FastJSONResponse(cached_response)
+
+    # Identical in-flight searches share one router/embedding/Pinecone pass
+    response, shared = await search_flight.do(cache_key, _run_unified_search, search_request)
+    if shared:
+        response = {**response, "stats": {**response["stats"], "coalesced": True}}
+    # Serialized directly from the retrieval dataclasses; response_model only documents the shape
+    return FastJSONResponse(response)
 
+
+def _run_unified_search(search_request: SearchRequest) -> dict:
+    """Route and retrieve for /search/unified (blocking; runs in the threadpool)."""
     # Initialize tracer for observability
     tracer = QueryTracer(query=search_request.query)
 
     quotes_results = []
     lessons_results = []
+    retrieval_failed = False
 
     # Route to determine content type
     try:
         with tracer.step("routing"):
             route_result = router.route_unified(search_request.query)
             content_type = route_result.content_type
+            if route_result.fallback:
+                ROUTER_FALLBACKS.labels("unparseable").inc()
             log_router_decision(
                 tracer, content_type, route_result.outcome_filter,
                 f"FG IDs: {route_result.focus_group_ids[:3] if route_result.focus_group_ids else 'all'}"
             )
     except Exception as e:
         tracer.log("error", {"type": "routing_failure", "message": str(e)})
+        ROUTER_FALLBACKS.labels("error").inc()
         # Fallback to searching both when router fails
         content_type = "both"
         route_result = RouterResult(
             content_type="both",
             focus_group_ids=None,
-            outcome_filter=None,
-            reasoning="Router failed, falling back to comprehensive search"
+            race_ids=None,
+            outcome_filter=None
         )
 
+    # Embed once: shared by the semantic cache and both retrievers
+    query_embedding = None
+    try:
+        with tracer.step("embedding"):
+            query_embedding = strategy_retriever._embed_query(search_request.query)
+    except Exception as e:
+        tracer.log("error", {"type": "embedding_failure", "message": str(e)})
+
+    # Second-tier cache: near-duplicate query with identical routing filters
+    semantic_filters = _get_semantic_filters(search_request, route_result)
+    if SEMANTIC_CACHE_ENABLED and query_embedding is not None:
+        hit = semantic_cache.lookup(query_embedding, semantic_filters)
+        if record_cache("semantic", hit is not None):
+            tracer.log("semantic_cache_hit", {
+                "matched_query": hit["query"],
+                "similarity": round(hit["similarity"], 4)
+            })
+            tracer.complete({"content_type": content_type, "cache_tier": "semantic"})
+            cached_response = hit["response"]
+            return {**cached_response, "stats": {
+                **cached_response["stats"],
+                "cached": True,
+                "cache_tier": "semantic",
+                "semantic_similarity": round(hit["similarity"], 4),
+                "matched_query": hit["query"]
+            }}
+
     # Fetch focus group quotes if needed
     if content_type in ("quotes", "both"):
         try:
@@ -634,7 +854,8 @@ async def search_unified(search_request: SearchRequest, request: Request):
                     query=search_request.query,
                     top_k_per_fg=search_request.top_k,
                     score_threshold=search_request.score_threshold,
-                    filter_focus_groups=fg_ids
+                    filter_focus_groups=fg_ids,
+                    query_embedding=query_embedding
                 )
 
                 # Log score distribution for debugging
@@ -649,36 +870,16 @@ async def search_unified(search_request: SearchRequest, request: Request):
                     if top_score < search_request.score_threshold:
                         continue
 
-                    fg_meta = retriever._load_focus_group_metadata(fg_id)
-                    api_chunks = [
-                        RetrievalChunk(
-                            chunk_id=c.chunk_id,
-                            score=c.score,
-                            content=c.content,
-                            content_original=c.content_original,
-                            focus_group_id=c.focus_group_id,
-                            participant=c.participant,
-                            participant_profile=c.participant_profile,
-                            section=c.section,
-                            source_file=c.source_file,
-                            line_number=c.line_number,
-                            preceding_moderator_q=c.preceding_moderator_q
-                        )
-                        for c in chunks
-                    ]
-                    quotes_results.append(GroupedResult(
-                        focus_group_id=fg_id,
-                        focus_group_metadata=fg_meta,
-                        chunks=api_chunks
-                    ))
+                    quotes_results.append(_fg_group_payload(fg_id, chunks))
 
                 log_score_distribution(tracer, "fg", all_fg_scores)
                 tracer.log("fg_results", {
                     "focus_groups": len(quotes_results),
-                    "total_quotes": sum(len(g.chunks) for g in quotes_results)
+                    "total_quotes": sum(len(g["chunks"]) for g in quotes_results)
                 })
         except Exception as e:
             tracer.log("error", {"type": "fg_retrieval_failure", "message": str(e)})
+            retrieval_failed = True
             # Continue without FG results rather than failing completely
 
     # Fetch strategy lessons if needed
@@ -689,7 +890,8 @@ async def search_unified(search_request: SearchRequest, request: Request):
                     query=search_request.query,
                     top_k=STRATEGY_TOP_K_PER_RACE * 5,
                     outcome_filter=route_result.outcome_filter,
-                    score_threshold=0.0  # Rely on threshold filter below
+                    score_threshold=0.0,  # Rely on threshold filter below
+                    query_embedding=query_embedding
                 )
 
                 # Track filtering for observability
@@ -710,29 +912,7 @@ async def search_unified(search_request: SearchRequest, request: Request):
                         })
                         continue
 
-                    race_meta = strategy_retriever._get_race_metadata(group.race_id)
-                    api_chunks = [
-                        StrategyChunk(
-                            chunk_id=c.chunk_id,
-                            score=c.score,
-                            content=c.content,
-                            race_id=c.race_id,
-                            section=c.section,
-                            subsection=c.subsection,
-                            outcome=c.outcome,
-                            state=c.state,
-                            year=c.year,
-                            margin=c.margin,
-                            source_file=c.source_file,
-                            line_number=c.line_number
-                        )
-                        for c in top_chunks
-                    ]
-                    lessons_results.append(StrategyGroupedResult(
-                        race_id=group.race_id,
-                        race_metadata=race_meta,
-                        chunks=api_chunks
-                    ))
+                    lessons_results.append(_strategy_group_payload(group.race_id, top_chunks))
 
                 # Log filtering decision
                 log_retrieval_decision(
@@ -744,20 +924,21 @@ async def search_unified(search_request: SearchRequest, request: Request):
 
                 tracer.log("strategy_results", {
                     "races": len(lessons_results),
-                    "total_lessons": sum(len(g.chunks) for g in lessons_results),
+                    "total_lessons": sum(len(g["chunks"]) for g in lessons_results),
                     "filtered_out": filtered_races
                 })
         except Exception as e:
             tracer.log("error", {"type": "strategy_retrieval_failure", "message": str(e)})
+            retrieval_failed = True
             # Continue without strategy results rather than failing completely
 
     # Complete trace with final summary
     log_result_summary(
         tracer,
         len(quotes_results),
-        sum(len(g.chunks) for g in quotes_results),
+        sum(len(g["chunks"]) for g in quotes_results),
         len(lessons_results),
-        sum(len(g.chunks) for g in lessons_results)
+        sum(len(g["chunks"]) for g in lessons_results)
     )
     trace = tracer.complete({
         "content_type": content_type,
@@ -765,15 +946,15 @@ async def search_unified(search_request: SearchRequest, request: Request):
         "races_count": len(lessons_results)
     })
 
-    # Build response
-    response_data = {
+    # Build response (UnifiedSearchResponse shape; chunks are still dataclasses)
+    response = {
         "content_type": content_type,
         "quotes": quotes_results,
         "lessons": lessons_results,
         "stats": {
             "retrieval_time_ms": round(trace["total_duration_ms"]),
-            "total_quotes": sum(len(g.chunks) for g in quotes_results),
-            "total_lessons": sum(len(g.chunks) for g in lessons_results),
+            "total_quotes": sum(len(g["chunks"]) for g in quotes_results),
+            "total_lessons": sum(len(g["chunks"]) for g in lessons_results),
             "focus_groups_count": len(quotes_results),
             "races_count": len(lessons_results),
             "routed_to": content_type,
@@ -782,126 +963,42 @@ async def search_unified(search_request: SearchRequest, request: Request):
         }
     }
 
-    return UnifiedSearchResponse(**response_data)
+    # Don't let a degraded (partially failed) response answer future queries
+    if SEMANTIC_CACHE_ENABLED and query_embedding is not None and not retrieval_failed:
+        semantic_cache.put(search_request.query, query_embedding, semantic_filters, response)
+    return response
 
 
 
 # ============ Corpus Explorer Endpoints ============
 
-def _get_race_path_map() -> Dict[str, str]:
-    """Helper to map race_id to directory path."""
-    try:
-        race_index_path = PROJECT_ROOT / "political-consulting-corpus" / "race-index.json"
-        if race_index_path.exists():
-            with open(race_index_path) as f:
-                data = json.load(f)
-                # Map race-001 -> races/race-001-michigan-gov-2022
-                return {r["race_id"]: r["path"] for r in data.get("races", [])}
-    except Exception as e:
-        print(f"Error loading race index: {e}")
-    return {}
-
 @app.get("/corpus", response_model=List[CorpusItem])
-async def list_corpus():
-    """List all documents in the corpus."""
-    items = []
-    race_paths = _get_race_path_map()
-
-    # 1. Focus Groups
-    try:
-        manifest_path = DATA_DIR / "manifest.json"
-        if manifest_path.exists():
-            with open(manifest_path) as f:
-                fg_data = json.load(f)
-                for fg in fg_data.get("focus_groups", []):
-                    fg_id = fg["focus_group_id"]
-                    # race-XXX-fg-YYY-location
-                    parts = fg_id.split("-fg-")
-                    if len(parts) >= 2:
-                        race_id = parts[0]
-                        race_dir = race_paths.get(race_id, f"races/{race_id}")
-                        
-                        # Filename: fg-YYY-location.md
-                        filename_suffix = fg_id.replace(f"{race_id}-", "")
-                        file_path = f"{race_dir}/focus-groups/{filename_suffix}.md"
-                        
-                        items.append(CorpusItem(
-                            id=fg_id,
-                            type="focus_group",
-                            title=f"{fg.get('location', 'Unknown')} ({fg.get('race_name', 'Unknown')})",
-                            date=fg.get("date"),
-                            location=fg.get("location"),
-                            race_name=fg.get("race_name"),
-                            outcome=fg.get("outcome"),
-                            file_path=file_path
-                        ))
-    except Exception as e:
-        print(f"Error loading FG manifest: {e}")
-
-    # 2. Strategy Memos
-    try:
-        strategy_manifest = DATA_DIR / "strategy_chunks" / "manifest.json"
-        if strategy_manifest.exists():
-            with open(strategy_manifest) as f:
-                strat_data = json.load(f)
-                for memo in strat_data.get("memos", []):
-                    race_id = memo["race_id"]
-                    race_dir = race_paths.get(race_id, f"races/{race_id}")
-                    
-                    items.append(CorpusItem(
-                        id=race_id,
-                        type="strategy_memo",
-                        title=f"Strategy: {memo.get('state')} {memo.get('year')} ({memo.get('outcome')})",
-                        date=str(memo.get("year")),
-                        location=memo.get("state"),
-                        race_name=f"{memo.get('state')} {memo.get('office')}",
-                        outcome=memo.get("outcome"),
-                        file_path=f"{race_dir}/strategy-memo.md"
-                    ))
-    except Exception as e:
-        print(f"Error loading strategy manifest: {e}")
-        
-    return items
+async def list_corpus(request: Request):
+    """List all documents in the corpus (prebuilt payload, ETag/304 aware)."""
+    return payload_response(request, get_listing_payload(MetadataRegistry.get()))
 
 @app.get("/corpus/{doc_type}/{doc_id}", response_model=DocumentContent)
-async def get_document(doc_type: str, doc_id: str):
+async def get_document(doc_type: str, doc_id: str, request: Request):
     """Get raw content of a document."""
     file_path = None
-    race_paths = _get_race_path_map()
-    
+    registry = MetadataRegistry.get()
+
     # Resolve path based on type and ID
     if doc_type == "focus_group":
-        manifest_path = DATA_DIR / "manifest.json"
-        if manifest_path.exists():
-            with open(manifest_path) as f:
-                fg_data = json.load(f)
-                for fg in fg_data.get("focus_groups", []):
-                    if fg["focus_group_id"] == doc_id:
-                        race_id = doc_id.split("-fg-")[0]
-                        race_dir = race_paths.get(race_id, f"races/{race_id}")
-                        filename_suffix = doc_id.replace(f"{race_id}-", "")
-                        file_path = f"{race_dir}/focus-groups/{filename_suffix}.md"
-                        break
+        file_path = registry.fg_file_paths.get(doc_id)
     elif doc_type == "strategy_memo":
-        race_dir = race_paths.get(doc_id, f"races/{doc_id}")
+        race_dir = registry.race_paths.get(doc_id, f"races/{doc_id}")
         file_path = f"{race_dir}/strategy-memo.md"
         
     if not file_path:
         raise HTTPException(status_code=404, detail="Document not found")
         
-    # Read file
     full_path = PROJECT_ROOT / "political-consulting-corpus" / file_path
     if not full_path.exists():
          raise HTTPException(status_code=404, detail=f"File not found on disk: {file_path}")
          
     try:
-        with open(full_path, "r") as f:
-            content = f.read()
-            
-        return DocumentContent(
-            content=content,
-            metadata={"source": str(file_path)}
-        )
+        return document_response(request, full_path, str(file_path))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -918,16 +1015,16 @@ async def synthesize_light(request: SynthesisRequest):
         cache_key = _get_cache_key(request.query, DEFAULT_TOP_K, DEFAULT_SCORE_THRESHOLD, USE_HYBRID_RETRIEVAL)
         summary_cache_key = f"{cache_key}:{fg_id}"
 
-        if summary_cache_key in light_summary_cache:
+        if record_cache("light_summary", summary_cache_key in light_summary_cache):
             return {"summary": light_summary_cache[summary_cache_key], "cached": True}
 
-    # Convert Pydantic chunks back to RetrievalResult dataclasses for the script
-    # The script expects objects with attribute access
-    script_chunks = [
-        RetrievalResult(**c.model_dump()) for c in request.quotes
-    ]
+    # The synthesizer only uses attribute access, so the validated request
+    # chunks are passed through as-is (no RetrievalResult(**model_dump()) copy)
+    script_chunks = request.quotes
 
-    summary = synthesizer.light_summary(
+    summary, _ = await synthesis_flight.do(
+        _get_request_key("light", request),
+        synthesizer.light_summary,
         quotes=script_chunks,
         query=request.query,
         focus_group_name=request.focus_group_name
@@ -947,7 +1044,7 @@ async def synthesize_deep(request: SynthesisRequest):
     deep_cache_key = f"deep:{cache_key}:{fg_id}"
 
     # Check cache first - return cached content as stream
-    if deep_cache_key in deep_summary_cache:
+    if record_cache("deep_summary", deep_cache_key in deep_summary_cache):
         cached_content = deep_summary_cache[deep_cache_key]
 
         async def cached_stream():
@@ -955,9 +1052,7 @@ async def synthesize_deep(request: SynthesisRequest):
 
         return StreamingResponse(cached_stream(), media_type="text/event-stream")
 
-    script_chunks = [
-        RetrievalResult(**c.model_dump()) for c in request.quotes
-    ]
+    script_chunks = request.quotes
 
     # If context not provided, fetch it
     context = request.context
@@ -991,8 +1086,9 @@ Provide a synthesis that:
 
 Keep it to 2-3 paragraphs. Be analytical, not just descriptive."""
 
-    async def stream_generator():
-        stream = synthesizer.client.chat.completions.create(
+    def stream_generator():
+        stream = chat_completion(
+            synthesizer.client, "deep_synthesis",
             model=synthesizer.model,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=1200,
@@ -1003,7 +1099,10 @@ Keep it to 2-3 paragraphs. Be analytical, not just descriptive."""
             if chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("deep", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 @app.post("/synthesize/macro")
 async def synthesize_macro(request: MacroSynthesisRequest):
@@ -1061,8 +1160,9 @@ Format:
 
 Be specific and analytical. Avoid generic observations."""
 
-    async def stream_generator():
-        stream = synthesizer.client.chat.completions.create(
+    def stream_generator():
+        stream = chat_completion(
+            synthesizer.client, "macro_synthesis",
             model=synthesizer.model,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=1500,
@@ -1073,7 +1173,10 @@ Be specific and analytical. Avoid generic observations."""
             if chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("macro", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 
 # ============ V2 Macro Synthesis Endpoints ============
@@ -1093,7 +1196,7 @@ async def synthesize_macro_light(request: LightMacroSynthesisRequest):
     cache_key = _get_cache_key(request.query, DEFAULT_TOP_K, DEFAULT_SCORE_THRESHOLD, USE_HYBRID_RETRIEVAL)
     macro_cache_key = f"macro:{cache_key}"
 
-    if macro_cache_key in macro_synthesis_cache:
+    if record_cache("macro_synthesis", macro_cache_key in macro_synthesis_cache):
         # Stream cached result
         cached_content = macro_synthesis_cache[macro_cache_key]
 
@@ -1102,14 +1205,10 @@ async def synthesize_macro_light(request: LightMacroSynthesisRequest):
 
         return StreamingResponse(cached_stream(), media_type="text/event-stream")
 
-    # Convert Pydantic chunks to dataclasses for the synthesizer
-    top_quotes_dataclass = {}
-    for fg_id, chunks in request.top_quotes.items():
-        top_quotes_dataclass[fg_id] = [
-            RetrievalResult(**c.model_dump()) for c in chunks
-        ]
+    # RetrievalChunk has the same attributes as RetrievalResult; no copy needed
+    top_quotes_dataclass = request.top_quotes
 
-    async def stream_generator():
+    def stream_generator():
         for chunk in synthesizer.light_macro_synthesis_stream(
             fg_summaries=request.fg_summaries,
             top_quotes=top_quotes_dataclass,
@@ -1118,7 +1217,10 @@ async def synthesize_macro_light(request: LightMacroSynthesisRequest):
         ):
             yield chunk
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("macro_light", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 
 @app.post("/synthesize/macro/deep")
@@ -1135,12 +1237,8 @@ async def synthesize_macro_deep(request: DeepMacroSynthesisRequest):
     if not synthesizer:
         raise HTTPException(status_code=503, detail="Service not ready")
 
-    # Convert Pydantic chunks to dataclasses for the synthesizer
-    top_quotes_dataclass = {}
-    for fg_id, chunks in request.top_quotes.items():
-        top_quotes_dataclass[fg_id] = [
-            RetrievalResult(**c.model_dump()) for c in chunks
-        ]
+    # RetrievalChunk has the same attributes as RetrievalResult; no copy needed
+    top_quotes_dataclass = request.top_quotes
 
     def stream_generator():
         for event in synthesizer.deep_macro_synthesis_stream(
@@ -1151,7 +1249,10 @@ async def synthesize_macro_deep(request: DeepMacroSynthesisRequest):
         ):
             yield json.dumps(event) + "\n"
 
-    return StreamingResponse(stream_generator(), media_type="application/x-ndjson")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("macro_deep", request), stream_generator),
+        media_type="application/x-ndjson"
+    )
 
 
 # ============ Strategy Synthesis Endpoints ============
@@ -1168,7 +1269,7 @@ async def synthesize_strategy_light(request: StrategySynthesisRequest):
     strategy_cache_key = f"strategy:{cache_key}:{race_id}"
 
     # Check cache first
-    if strategy_cache_key in strategy_light_cache:
+    if record_cache("strategy_light", strategy_cache_key in strategy_light_cache):
         return {"summary": strategy_light_cache[strategy_cache_key], "cached": True}
 
     # Build context from chunks
@@ -1188,14 +1289,20 @@ Strategy memo excerpts:
 Write a 1-2 sentence summary of the key lesson(s) from this race relevant to the query.
 Be specific - include what worked/failed and why. No fluff."""
 
-    try:
-        response = synthesizer.client.chat.completions.create(
+    def generate_summary() -> str:
+        response = chat_completion(
+            synthesizer.client, "strategy_light_summary",
             model=synthesizer.model,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=150,
             temperature=0.3
         )
-        summary = response.choices[0].message.content.strip()
+        return response.choices[0].message.content.strip()
+
+    try:
+        summary, _ = await synthesis_flight.do(
+            _get_request_key("strategy_light", request), generate_summary
+        )
         return {"summary": summary}
     except Exception as e:
         return {"summary": get_friendly_error(e)}
@@ -1213,7 +1320,7 @@ async def synthesize_strategy_deep(request: StrategySynthesisRequest):
     strategy_deep_key = f"strategy_deep:{cache_key}:{race_id}"
 
     # Check cache first - return cached content as stream
-    if strategy_deep_key in strategy_deep_cache:
+    if record_cache("strategy_deep", strategy_deep_key in strategy_deep_cache):
         cached_content = strategy_deep_cache[strategy_deep_key]
 
         async def cached_stream():
@@ -1242,9 +1349,10 @@ Provide a detailed analysis that:
 
 Keep it to 2-3 paragraphs. Be analytical and specific."""
 
-    async def stream_generator():
+    def stream_generator():
         try:
-            stream = synthesizer.client.chat.completions.create(
+            stream = chat_completion(
+                synthesizer.client, "strategy_deep",
                 model=synthesizer.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=800,
@@ -1257,7 +1365,10 @@ Keep it to 2-3 paragraphs. Be analytical and specific."""
         except Exception as e:
             yield get_friendly_error(e)
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("strategy_deep", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 
 @app.post("/synthesize/strategy/macro")
@@ -1272,7 +1383,7 @@ async def synthesize_strategy_macro(request: StrategyMacroSynthesisRequest):
     strategy_macro_key = f"strategy_macro:{cache_key}:{race_ids_hash}"
 
     # Check cache first
-    if strategy_macro_key in strategy_macro_cache:
+    if record_cache("strategy_macro", strategy_macro_key in strategy_macro_cache):
         cached_content = strategy_macro_cache[strategy_macro_key]
 
         async def cached_stream():
@@ -1314,9 +1425,10 @@ Provide a cross-race synthesis that:
 
 Be specific and actionable. Reference the races by name."""
 
-    async def stream_generator():
+    def stream_generator():
         try:
-            stream = synthesizer.client.chat.completions.create(
+            stream = chat_completion(
+                synthesizer.client, "strategy_macro",
                 model=synthesizer.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1000,
@@ -1329,7 +1441,10 @@ Be specific and actionable. Reference the races by name."""
         except Exception as e:
             yield get_friendly_error(e)
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("strategy_macro", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 
 # ============ Unified Macro Synthesis (FG + Strategy) ============
@@ -1353,7 +1468,7 @@ async def synthesize_unified_macro(request: UnifiedMacroSynthesisRequest):
     unified_cache_key = f"unified:{cache_key}:{fg_ids_hash}:{race_ids_hash}"
 
     # Check cache first
-    if unified_cache_key in unified_macro_cache:
+    if record_cache("unified_macro", unified_cache_key in unified_macro_cache):
         cached_content = unified_macro_cache[unified_cache_key]
 
         async def cached_stream():
@@ -1411,9 +1526,10 @@ Provide a unified synthesis that:
 
 Structure your response with clear themes. Reference specific focus groups and races."""
 
-    async def stream_generator():
+    def stream_generator():
         try:
-            stream = synthesizer.client.chat.completions.create(
+            stream = chat_completion(
+                synthesizer.client, "unified_macro",
                 model=synthesizer.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1200,
@@ -1426,7 +1542,10 @@ Structure your response with clear themes. Reference specific focus groups and r
         except Exception as e:
             yield get_friendly_error(e)
 
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+    return StreamingResponse(
+        synthesis_fanout.subscribe(_get_request_key("unified_macro", request), stream_generator),
+        media_type="text/event-stream"
+    )
 
 
 if __name__ == "__main__":
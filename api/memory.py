@@ -0,0 +1,217 @@
+"""
+Memory accounting for the API process (512 MB production container).
+
+At startup the lifespan wraps each expensive resource in a stage and then
+registers the objects it holds:
+
+- RSS delta per stage: what loading the component cost the process,
+  including native allocations (torch weights, numpy buffers, imports)
+- Python bytes per component: deep size of the objects it references.
+  Components are walked in registration order with one shared "seen" set,
+  so an object reachable from several components (the embedder, Pinecone
+  index and chunk store every retriever holds) is attributed once, to the
+  first one registered; the rest report it as shared.
+
+Memory-mapped files (the chunk store) are reported by mapped size - those
+pages are file-backed and reclaimable, not anonymous heap.
+
+The report is printed at startup and served under "memory" in /stats.
+
+Usage:
+    report = MemoryReport()
+    with report.stage("embedding model"):
+        model = SharedResources.get_embedding_model()
+    report.add("embedding model", model)
+    report.log()
+"""
+
+import ctypes
+import gc
+import mmap
+import sys
+import time
+import types
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+MB = 1024 * 1024
+
+# Never descend into these: shared by the whole interpreter, not by a component
+_SKIP_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType,
+)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), 0 if unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def malloc_trim() -> bool:
+    """Return freed heap pages to the OS (glibc only). True if it ran."""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def _tensor_bytes(module: Any) -> int:
+    """Parameter + buffer bytes of a torch nn.Module (its weights live outside the Python heap)."""
+    total = 0
+    for tensors in (module.parameters(), module.buffers()):
+        for tensor in tensors:
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> Tuple[int, int]:
+    """
+    Bytes reachable from obj that aren't in seen (updated in place).
+
+    Returns:
+        (heap bytes, memory-mapped bytes)
+    """
+    seen = set() if seen is None else seen
+    heap = mapped = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, mmap.mmap):
+            mapped += len(current)
+            continue
+        if isinstance(current, np.ndarray):
+            # getsizeof includes the data only if the array owns it; a view's base is walked instead
+            heap += sys.getsizeof(current)
+            if current.base is not None:
+                stack.append(current.base)
+            continue
+        if callable(getattr(current, "parameters", None)) and callable(getattr(current, "buffers", None)):
+            try:
+                heap += _tensor_bytes(current)
+            except Exception:
+                pass
+
+        try:
+            heap += sys.getsizeof(current)
+        except TypeError:
+            continue
+
+        if isinstance(current, (dict, types.MappingProxyType)):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, int, float, bool, memoryview)):
+            continue
+        else:
+            attrs = getattr(current, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if slot not in ("__dict__", "__weakref__") and hasattr(current, slot):
+                        stack.append(getattr(current, slot))
+    return heap, mapped
+
+
+@dataclass
+class ComponentMemory:
+    name: str
+    rss_delta: int = 0        # RSS growth while the component loaded
+    heap_bytes: int = 0       # Python-reachable bytes attributed to this component
+    shared_bytes: int = 0     # reachable bytes already attributed to an earlier component
+    mapped_bytes: int = 0     # memory-mapped file bytes (reclaimable page cache)
+    load_seconds: float = 0.0
+
+
+class MemoryReport:
+    """Per-component memory at startup: RSS deltas and deduplicated object sizes."""
+
+    def __init__(self):
+        self.baseline_rss = rss_bytes()
+        self.components: Dict[str, ComponentMemory] = {}
+        self.finished_rss = 0
+        self._seen: Set[int] = set()
+
+    def _component(self, name: str) -> ComponentMemory:
+        # setdefault: stages may run in parallel startup threads
+        return self.components.setdefault(name, ComponentMemory(name))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measure the RSS growth and time of loading a component.
+
+        Stages that overlap (parallel startup) also see each other's growth;
+        budget mode starts serially so each delta is exact.
+        """
+        before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            component = self._component(name)
+            component.rss_delta += rss_bytes() - before
+            component.load_seconds += time.perf_counter() - start
+
+    def add(self, name: str, *objects: Any):
+        """Attribute the objects reachable from a component (call in sharing order)."""
+        component = self._component(name)
+        for obj in objects:
+            if obj is None:
+                continue
+            heap, mapped = deep_sizeof(obj, self._seen)
+            component.heap_bytes += heap
+            component.mapped_bytes += mapped
+            component.shared_bytes += max(0, deep_sizeof(obj)[0] - heap)
+
+    def finish(self):
+        self.finished_rss = rss_bytes()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "baseline_rss_mb": round(self.baseline_rss / MB, 1),
+            "startup_rss_mb": round(self.finished_rss / MB, 1),
+            "current_rss_mb": round(rss_bytes() / MB, 1),
+            "components": {
+                c.name: {
+                    "rss_delta_mb": round(c.rss_delta / MB, 1),
+                    "python_mb": round(c.heap_bytes / MB, 2),
+                    "shared_mb": round(c.shared_bytes / MB, 2),
+                    "mapped_mb": round(c.mapped_bytes / MB, 1),
+                    "load_seconds": round(c.load_seconds, 2),
+                }
+                for c in self.components.values()
+            },
+        }
+
+    def log(self):
+        rows: List[ComponentMemory] = list(self.components.values())
+        print("Memory by component (MB):")
+        print(f"  {'component':<22} {'RSS +':>7} {'python':>8} {'shared':>8} {'mapped':>8} {'load s':>7}")
+        for c in rows:
+            print(f"  {c.name:<22} {c.rss_delta / MB:>7.1f} {c.heap_bytes / MB:>8.2f} "
+                  f"{c.shared_bytes / MB:>8.2f} {c.mapped_bytes / MB:>8.1f} {c.load_seconds:>7.2f}")
+        print(f"  RSS: {self.baseline_rss / MB:.1f} MB at import -> {self.finished_rss / MB:.1f} MB after startup")
+
+
+def release_memory() -> bool:
+    """Collect garbage and hand freed heap back to the OS (after startup loading)."""
+    gc.collect()
+    return malloc_trim()
@@ -0,0 +1,403 @@
+"""
+In-process metrics for the Focus Group Search API, exposed at /metrics.
+
+QueryTracer logs each query as JSON, which answers "what happened to this
+query" but not "what is p95 routing latency". This registry aggregates in
+memory and renders the Prometheus text format (version 0.0.4):
+
+- focus_group_step_seconds{step,status}       histogram, fed by QueryTracer.step()
+- focus_group_request_seconds{endpoint,method,status}
+                                              histogram, fed by MetricsMiddleware
+- focus_group_requests_in_flight              gauge
+- focus_group_cache_lookups_total{cache,result}
+                                              counter (demo, exact and semantic caches)
+- focus_group_router_fallbacks_total{reason}  counter
+- focus_group_upstream_*{host}                HTTP pool requests, 429s, 5xx, errors,
+                                              connections (scripts/http_clients.py),
+                                              collected at scrape time
+- focus_group_llm_calls_total{endpoint,component,model}
+- focus_group_llm_tokens_total{endpoint,component,model,type}
+                                              prompt / completion / embedding tokens
+- focus_group_llm_cost_usd_total{endpoint,component,model}
+- focus_group_llm_upstream_seconds{component,model}
+                                              histogram; all four fed by scripts/usage.py
+
+Histograms use fixed buckets (bisect into a bucket list under a per-series
+lock), so an observation costs about a microsecond; eval/bench_metrics.py
+measures it. /stats-style JSON with estimated p50/p95/p99 is available from
+`metrics.snapshot()`, and token/cost totals from `usage_snapshot()`.
+
+Usage:
+    STEP_SECONDS.labels("routing", "success").observe(0.42)
+    CACHE_LOOKUPS.labels("semantic", "hit").inc()
+    metrics.render()          # /metrics body
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from scripts.usage import LLMCall, add_usage_observer, begin_request, end_request
+
+# Seconds: covers cached responses (sub-ms) through slow LLM synthesis
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, type, help, labels, value) rows produced by a collector at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter (one label combination)."""
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down (one label combination)."""
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    """Fixed-bucket histogram (one label combination)."""
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above the largest bucket (+Inf)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket (as histogram_quantile does)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower  # above the top bucket: only the lower bound is known
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+class MetricFamily:
+    """A named metric with labels; .labels(...) returns the series for one combination."""
+
+    def __init__(self, name: str, kind: str, help_text: str, label_names: Tuple[str, ...], factory: Callable):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.label_names = label_names
+        self._factory = factory
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not label_names:
+            self._series[()] = factory()
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._factory())
+        return series
+
+    # Unlabelled families act as their single series
+    def inc(self, amount: float = 1.0):
+        self._series[()].inc(amount)
+
+    def observe(self, value: float):
+        self._series[()].observe(value)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, series in self.items():
+            if self.kind == "histogram":
+                cumulative = 0
+                for bound, bucket_count in zip(series.buckets + (float("inf"),), series.counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, values, le)} {cumulative}")
+                labels = _format_labels(self.label_names, values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{labels} {series.count}")
+            else:
+                lines.append(f"{self.name}{_format_labels(self.label_names, values)} {_format_value(series.value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and scrape-time collectors; renders /metrics."""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, "counter", help_text, labels, Counter))
+
+    def gauge(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, "gauge", help_text, labels, Gauge))
+
+    def histogram(
+        self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        return self._register(MetricFamily(name, "histogram", help_text, labels, lambda: Histogram(buckets)))
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Register a callable producing samples at scrape time (state owned elsewhere)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        collected: Dict[str, List[Sample]] = {}
+        for collector in self._collectors:
+            try:
+                for sample in collector():
+                    collected.setdefault(sample[0], []).append(sample)
+            except Exception as e:
+                lines.append(f"# collector error: {type(e).__name__}: {e}")
+        for name, samples in collected.items():
+            _, kind, help_text, _, _ = samples[0]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for _, _, _, labels, value in samples:
+                names, values = tuple(labels), tuple(labels.values())
+                lines.append(f"{name}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """Histogram summaries as JSON: count, mean and estimated p50/p95/p99 in ms."""
+        result = {}
+        for family in self._families.values():
+            if family.kind != "histogram":
+                continue
+            result[family.name] = {
+                ",".join(values) or "all": {
+                    "count": series.count,
+                    "mean_ms": round(series.sum / series.count * 1000, 2) if series.count else None,
+                    **{
+                        f"p{int(q * 100)}_ms": (round(series.quantile(q) * 1000, 2) if series.count else None)
+                        for q in (0.5, 0.95, 0.99)
+                    },
+                }
+                for values, series in family.items()
+            }
+        return result
+
+
+metrics = MetricsRegistry()
+
+STEP_SECONDS = metrics.histogram(
+    "focus_group_step_seconds", "Duration of traced pipeline steps (QueryTracer.step)", ("step", "status")
+)
+REQUEST_SECONDS = metrics.histogram(
+    "focus_group_request_seconds", "HTTP request duration by route", ("endpoint", "method", "status")
+)
+IN_FLIGHT = metrics.gauge("focus_group_requests_in_flight", "HTTP requests being handled")
+CACHE_LOOKUPS = metrics.counter(
+    "focus_group_cache_lookups_total", "Response cache lookups by cache and result", ("cache", "result")
+)
+ROUTER_FALLBACKS = metrics.counter(
+    "focus_group_router_fallbacks_total",
+    "Queries routed to everything because the router failed (error) or answered unparseably (unparseable)",
+    ("reason",)
+)
+LLM_CALLS = metrics.counter(
+    "focus_group_llm_calls_total", "Upstream LLM and embedding calls", ("endpoint", "component", "model")
+)
+LLM_TOKENS = metrics.counter(
+    "focus_group_llm_tokens_total",
+    "Tokens by type: prompt, completion (chat) or embedding",
+    ("endpoint", "component", "model", "type")
+)
+LLM_COST = metrics.counter(
+    "focus_group_llm_cost_usd_total",
+    "LLM cost in USD (upstream-reported, else estimated from list prices)",
+    ("endpoint", "component", "model")
+)
+LLM_SECONDS = metrics.histogram(
+    "focus_group_llm_upstream_seconds", "Upstream LLM and embedding call latency", ("component", "model")
+)
+
+
+def record_cache(cache: str, hit: bool) -> bool:
+    """Count a cache lookup; returns hit so it can wrap the membership test."""
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+    return hit
+
+
+def upstream_samples() -> Iterable[Sample]:
+    """Per-host HTTP pool counters from scripts/http_clients.py (scraped, not pushed)."""
+    from scripts.http_clients import http_pool_stats
+    counters = {
+        "requests": "Requests sent to the upstream host",
+        "new_connections": "Requests that opened a new connection (TCP + TLS handshake)",
+        "tls_handshakes": "TLS handshakes performed",
+        "rate_limited": "Upstream 429 responses",
+        "server_errors": "Upstream 5xx responses",
+        "errors": "Requests that failed without a response (connect/read errors)",
+        "pool_timeouts": "Requests that found no free pooled connection in time",
+    }
+    gauges = {
+        "in_flight": "Requests currently in flight to the upstream host",
+        "open_connections": "Connections open in the pool",
+        "idle_connections": "Idle keep-alive connections in the pool",
+    }
+    for host, stats in http_pool_stats().items():
+        labels = {"host": host}
+        for key, help_text in counters.items():
+            yield f"focus_group_upstream_{key}_total", "counter", help_text, labels, stats[key]
+        for key, help_text in gauges.items():
+            yield f"focus_group_upstream_{key}", "gauge", help_text, labels, stats[key]
+
+
+metrics.add_collector(upstream_samples)
+
+
+def record_llm_call(call: LLMCall, endpoint: str):
+    """Usage observer: aggregate one call's tokens, cost and latency."""
+    LLM_CALLS.labels(endpoint, call.component, call.model).inc()
+    if call.kind == "embedding":
+        LLM_TOKENS.labels(endpoint, call.component, call.model, "embedding").inc(call.prompt_tokens)
+    else:
+        LLM_TOKENS.labels(endpoint, call.component, call.model, "prompt").inc(call.prompt_tokens)
+        LLM_TOKENS.labels(endpoint, call.component, call.model, "completion").inc(call.completion_tokens)
+    if call.cost_usd:
+        LLM_COST.labels(endpoint, call.component, call.model).inc(call.cost_usd)
+    LLM_SECONDS.labels(call.component, call.model).observe(call.seconds)
+
+
+add_usage_observer(record_llm_call)
+
+
+def usage_snapshot() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Calls, tokens and cost so far, totalled by endpoint, by component and by model (for /stats)."""
+    views: Dict[str, Dict[str, Dict[str, Any]]] = {"by_endpoint": {}, "by_component": {}, "by_model": {}}
+
+    def add(labels: Tuple[str, ...], key: str, value: float):
+        endpoint, component, model = labels[:3]
+        for view, name in (("by_endpoint", endpoint), ("by_component", component), ("by_model", model)):
+            totals = views[view].setdefault(name, {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "embedding_tokens": 0, "cost_usd": 0.0
+            })
+            totals[key] += value
+
+    for labels, series in LLM_CALLS.items():
+        add(labels, "calls", int(series.value))
+    for labels, series in LLM_TOKENS.items():
+        add(labels, f"{labels[3]}_tokens", int(series.value))
+    for labels, series in LLM_COST.items():
+        add(labels, "cost_usd", series.value)
+    for view in views.values():
+        for totals in view.values():
+            totals["cost_usd"] = round(totals["cost_usd"], 6)
+    return views
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: request duration histogram and in-flight gauge per route.
+
+    The endpoint label is the matched route's path template (/document/{doc_id},
+    not the raw path) so label cardinality stays bounded. Streaming responses
+    are timed until the last body chunk is sent. LLM calls made while handling
+    the request (scripts/usage.py) are attributed to the same endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+        gauge = IN_FLIGHT.labels()
+        gauge.inc()
+        usage_token = begin_request()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            gauge.dec()
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.labels(endpoint, scope["method"], str(status["code"])).observe(
+                time.perf_counter() - start
+            )
+            end_request(usage_token, endpoint)
@@ -2,23 +2,57 @@
 Observability module for the Focus Group Search API.
 
 Provides structured logging and tracing for debugging retrieval issues.
-Logs are structured JSON for easy parsing and analysis.
+Each query is a trace of nested spans (scripts/tracing.py): QueryTracer
+steps are children of the query's root span, and library code adds its own
+spans below them (router -> embed -> per-group vector queries -> fusion ->
+rerank -> hydration).
+
+Tracing is head-sampled: TRACE_SAMPLE_RATE (0-1, default 1) of queries are
+traced; the rest only feed the step-latency histogram and skip span and
+event bookkeeping entirely. Errors are logged either way.
+
+Finished traces are handed to a background exporter thread, which batches
+them and writes one structured "query_trace" log line per trace (JSON when
+LOG_FORMAT=json) - serialization and logging happen off the request path.
+With TRACE_OTLP_FILE set, each batch is also appended to that file as an
+OTLP/JSON ExportTraceServiceRequest line, which an OpenTelemetry Collector
+(otlpjsonfile receiver) or Jaeger/Tempo import can read.
+
+Usage:
+    TRACE_SAMPLE_RATE=0.1 TRACE_OTLP_FILE=logs/traces.jsonl uvicorn api.main:app
 """
 
 import os
 import json
 import time
+import queue
+import random
 import logging
-from datetime import datetime
-from typing import Any, Optional
-from dataclasses import dataclass, asdict
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
 from contextlib import contextmanager
-from functools import wraps
+from pathlib import Path
+
+from api.metrics import STEP_SECONDS
+from api.profiling import format_cprofile, request_profile, start_cprofile
+from scripts.tracing import Span, Trace, current_span, end_trace, span, start_trace
+from scripts.usage import current_usage
 
 # Configure logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
 
+# Tracing
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_OTLP_FILE = os.getenv("TRACE_OTLP_FILE")  # Optional OTLP/JSON lines file
+TRACE_EXPORT_BATCH = int(os.getenv("TRACE_EXPORT_BATCH", "64"))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "1.0"))  # Seconds between flushes
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "2048"))  # Traces dropped beyond this backlog
+
+SERVICE_NAME = "focus-group-api"
+
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
     format='%(message)s' if LOG_FORMAT == "json" else '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -39,6 +73,199 @@ class QueryTrace:
     error: Optional[str] = None
 
 
+# ============ Export ============
+
+def _iso(unix_ns: int) -> str:
+    return datetime.fromtimestamp(unix_ns / 1e9, tz=timezone.utc).isoformat()
+
+
+def trace_to_log(trace: Trace) -> Dict[str, Any]:
+    """The "query_trace" log record: root fields plus spans as a parent-linked list."""
+    root = trace.spans[-1]  # the root ends last
+    attributes = dict(root.attributes)
+    spans = []
+    for s in sorted(trace.spans[:-1], key=lambda s: s.start_ns):
+        record = {
+            "span": s.name,
+            "span_id": s.span_id,
+            "parent_id": s.parent_id,
+            "start_offset_ms": round((s.start_ns - trace.perf_start_ns) / 1e6, 3),
+            "duration_ms": round(s.duration_ms, 3),
+            "status": s.status,
+        }
+        if s.error:
+            record["error"] = s.error
+        if s.attributes:
+            record["attributes"] = s.attributes
+        if s.events:
+            record["events"] = [
+                {"event": name, "offset_ms": round((ts - trace.perf_start_ns) / 1e6, 3), "data": data}
+                for ts, name, data in s.events
+            ]
+        spans.append(record)
+    return {
+        "type": "query_trace",
+        "query_id": attributes.pop("query_id", None),
+        "trace_id": trace.trace_id,
+        "query": attributes.pop("query", None),
+        "timestamp": _iso(trace.wall_start_ns),
+        "total_duration_ms": round(root.duration_ms),
+        "spans": spans,
+        "events": [{"event": name, "data": data} for _, name, data in root.events],
+        "result_summary": attributes,
+    }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    trace = s.trace
+    record = {
+        "traceId": trace.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 2 if s.parent_id is None else 1,  # SERVER for the root, INTERNAL below it
+        "startTimeUnixNano": str(trace.unix_ns(s.start_ns)),
+        "endTimeUnixNano": str(trace.unix_ns(s.end_ns)),
+        "attributes": _otlp_attributes(s.attributes),
+        "events": [
+            {"timeUnixNano": str(trace.unix_ns(ts)), "name": name, "attributes": _otlp_attributes(data)}
+            for ts, name, data in s.events
+        ],
+        "status": {"code": 2, "message": s.error or ""} if s.status == "error" else {"code": 1},
+    }
+    if s.parent_id:
+        record["parentSpanId"] = s.parent_id
+    return record
+
+
+def traces_to_otlp(traces: List[Trace]) -> Dict[str, Any]:
+    """One OTLP/JSON ExportTraceServiceRequest holding every span of the given traces."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{
+            "scope": {"name": SERVICE_NAME},
+            "spans": [_otlp_span(s) for trace in traces for s in trace.spans],
+        }],
+    }]}
+
+
+class TraceExporter:
+    """
+    Batches finished traces on a daemon thread and writes them out.
+
+    submit() is a non-blocking queue put; when the backlog exceeds
+    TRACE_QUEUE_SIZE traces are dropped (and counted) rather than slowing
+    requests down.
+    """
+
+    def __init__(
+        self,
+        otlp_file: Optional[str] = TRACE_OTLP_FILE,
+        batch_size: int = TRACE_EXPORT_BATCH,
+        interval: float = TRACE_EXPORT_INTERVAL,
+        max_queue: int = TRACE_QUEUE_SIZE,
+    ):
+        self.otlp_file = Path(otlp_file) if otlp_file else None
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def submit(self, trace: Trace):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch: List[Trace] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: List[Trace]):
+        try:
+            for trace in batch:
+                record = trace_to_log(trace)
+                if LOG_FORMAT == "json":
+                    logger.info(json.dumps(record, default=str))
+                else:
+                    logger.info(
+                        f"[{record['query_id']}] COMPLETE: {record['total_duration_ms']}ms "
+                        f"({len(record['spans'])} spans) - {record['result_summary']}"
+                    )
+            if self.otlp_file:
+                self.otlp_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.otlp_file, "a") as f:
+                    f.write(json.dumps(traces_to_otlp(batch), default=str) + "\n")
+            self.exported += len(batch)
+        except Exception as e:
+            logger.warning(f"Trace export failed ({len(batch)} traces): {type(e).__name__}: {e}")
+
+    def flush(self, timeout: float = 5.0):
+        """Export everything queued so far and stop the thread (called at shutdown)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "otlp_file": str(self.otlp_file) if self.otlp_file else None,
+        }
+
+
+exporter = TraceExporter()
+
+
+# ============ Query tracer ============
+
 class QueryTracer:
     """
     Traces a query through the retrieval pipeline.
@@ -49,84 +276,81 @@ class QueryTracer:
             result = router.route(query)
             tracer.log("route_decision", {"content_type": result.content_type})
         tracer.complete({"total_results": 10})
+
+    Create it on the thread that runs the pipeline: the trace becomes that
+    context's current span, so spans opened by retrievers nest under it.
+    Requests sent with "X-Profile: cprofile" (api/profiling.py) are always
+    sampled and run under cProfile until complete().
     """
 
-    def __init__(self, query: str, query_id: Optional[str] = None):
+    def __init__(self, query: str, query_id: Optional[str] = None, sampled: Optional[bool] = None):
         self.query = query
         self.query_id = query_id or f"q-{int(time.time() * 1000)}"
-        self.start_time = time.time()
-        self.steps = []
-        self.current_step = None
-        self.current_step_start = None
+        self.sampled = random.random() < TRACE_SAMPLE_RATE if sampled is None else sampled
+        self._profile_request = request_profile()
+        self._cprofile = None
+        if self._profile_request is not None:
+            self.sampled = True
+            self._cprofile = start_cprofile()
+        self.start_ns = time.perf_counter_ns()
+        self.root, self._token = start_trace(
+            "query", self.sampled, query_id=self.query_id, query=query[:100]
+        )
+
+    @property
+    def trace_id(self) -> Optional[str]:
+        return self.root.trace.trace_id if self.root is not None else None
 
     @contextmanager
     def step(self, step_name: str):
-        """Context manager for timing a step."""
-        self.current_step = step_name
-        self.current_step_start = time.time()
-        step_data = {
-            "step": step_name,
-            "started_at": datetime.now().isoformat(),
-            "events": []
-        }
-
+        """Context manager for timing a step (a child span of the query when sampled)."""
+        start = time.perf_counter()
+        status = "success"
         try:
-            yield
-            step_data["status"] = "success"
-        except Exception as e:
-            step_data["status"] = "error"
-            step_data["error"] = str(e)
+            with span(step_name):
+                yield
+        except Exception:
+            status = "error"
             raise
         finally:
-            step_data["duration_ms"] = (time.time() - self.current_step_start) * 1000
-            self.steps.append(step_data)
-            self.current_step = None
+            STEP_SECONDS.labels(step_name, status).observe(time.perf_counter() - start)
 
     def log(self, event: str, data: dict):
-        """Log an event within the current step."""
-        event_data = {
-            "event": event,
-            "timestamp": datetime.now().isoformat(),
-            "data": data
-        }
-
-        if self.steps and self.current_step:
-            self.steps[-1]["events"].append(event_data)
-        else:
-            # Log outside of step
-            self.steps.append({"event": event, **event_data})
-
-        # Also emit to logger for real-time visibility
-        if LOG_FORMAT == "json":
-            logger.info(json.dumps({
-                "query_id": self.query_id,
-                "event": event,
-                **data
-            }))
-        else:
-            logger.info(f"[{self.query_id}] {event}: {data}")
+        """Attach an event to the current span (the open step, or the query itself)."""
+        if self.sampled:
+            current_span().event(event, data)
+        if event == "error":
+            # Errors are worth a log line even for unsampled queries
+            if LOG_FORMAT == "json":
+                logger.warning(json.dumps({"query_id": self.query_id, "event": event, **data}, default=str))
+            else:
+                logger.warning(f"[{self.query_id}] {event}: {data}")
 
     def complete(self, result_summary: dict):
-        """Complete the trace with final results."""
-        total_duration = (time.time() - self.start_time) * 1000
+        """Complete the trace with final results and queue it for export."""
+        total_duration = (time.perf_counter_ns() - self.start_ns) / 1e6
+        if self.root is not None:
+            self.root.set(**result_summary)
+            usage = current_usage()
+            if usage is not None and usage.calls:
+                self.root.set(**usage.totals())
+            if self._cprofile is not None:
+                self.root.set(cprofile=format_cprofile(self._cprofile))
+                self._cprofile = None
+                self._profile_request.trace_id = self.trace_id
+        trace = end_trace(self.root, self._token)
+        if trace is not None:
+            exporter.submit(trace)
 
-        trace = {
+        return {
             "type": "query_trace",
             "query_id": self.query_id,
-            "query": self.query[:100],  # Truncate for logs
-            "timestamp": datetime.now().isoformat(),
+            "trace_id": self.trace_id,
+            "sampled": self.sampled,
             "total_duration_ms": round(total_duration),
-            "steps": self.steps,
             "result_summary": result_summary
         }
 
-        if LOG_FORMAT == "json":
-            logger.info(json.dumps(trace))
-        else:
-            logger.info(f"[{self.query_id}] COMPLETE: {total_duration:.0f}ms - {result_summary}")
-
-        return trace
-
 
 def log_retrieval_decision(
     tracer: QueryTracer,
@@ -0,0 +1,333 @@
+"""
+On-demand profiling for the running API (admin-only, off unless PROFILING_TOKEN is set).
+
+Two tools, both idle until asked for:
+
+1. Sampling profiler. A daemon thread snapshots every thread's Python stack
+   (sys._current_frames) every PROFILE_INTERVAL_MS and counts identical
+   stacks. It runs for N seconds, or until the next N requests whose path
+   starts with a prefix have finished (it samples only while one of them is
+   in flight). Results are a collapsed-stack file (one "frame;frame;frame
+   count" line per stack - feed it to flamegraph.pl or speedscope) and a
+   top-functions table by self and total samples. Threads parked in an idle
+   wait (thread-pool workers, the event loop's select) are left out, since
+   they would otherwise dominate every profile.
+
+2. Per-request cProfile. A request with the header "X-Profile: cprofile"
+   (and the admin token) runs its query pipeline under cProfile; the top
+   functions are attached to that query's trace (forced to be sampled) and
+   the response carries X-Trace-Id to find it in the logs.
+
+Without PROFILING_TOKEN the middleware isn't installed and the admin
+endpoints return 404. With it, a request while nothing is being profiled
+pays a flag check and a scan of its header list for X-Profile.
+
+Usage:
+    PROFILING_TOKEN=secret uvicorn api.main:app
+    curl -XPOST -H "X-Admin-Token: secret" "localhost:8000/admin/profile/start?seconds=30"
+    curl -XPOST -H "X-Admin-Token: secret" "localhost:8000/admin/profile/start?requests=50&route=/search/unified"
+    curl -H "X-Admin-Token: secret" localhost:8000/admin/profile                 # status + top functions
+    curl -H "X-Admin-Token: secret" localhost:8000/admin/profile/collapsed > out.folded
+    flamegraph.pl out.folded > out.svg
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")  # Unset: profiling disabled entirely
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))  # Hard cap on any session
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-admin-token"
+
+_ROOT = str(Path(__file__).parent.parent) + os.sep
+
+# Trailing per-thread ids ("ThreadPoolExecutor-0_3", "asyncio-portal-7f8a...") so stacks group by thread kind
+_THREAD_ID_SUFFIX = re.compile(r"[-_ ](?=[0-9a-f_-]*\d)[0-9a-f_-]+$")
+
+# Innermost frames that mean "this thread is parked, not working"
+IDLE_LEAVES = {
+    ("threading.py", "Condition.wait"),       # anyio workers, queue.Queue.get
+    ("threading.py", "Event.wait"),
+    ("thread.py", "_worker"),                 # ThreadPoolExecutor worker on an empty queue
+    ("selectors.py", "EpollSelector.select"), # event loop with nothing ready
+    ("selectors.py", "KqueueSelector.select"),
+}
+
+
+class ProfilerBusy(Exception):
+    """A sampling session is already running."""
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+# ============ Sampling profiler ============
+
+@dataclass
+class ProfileSession:
+    """One sampling run: its stop condition and what it collected."""
+    interval: float
+    seconds: Optional[float]
+    requests: Optional[int]
+    route: Optional[str]
+    started_at: float
+    stopped_at: Optional[float] = None
+    stop_reason: Optional[str] = None
+    samples: int = 0               # sampling ticks taken
+    matched_requests: int = 0      # route mode: finished requests
+    in_flight: int = 0             # route mode: matching requests being handled
+    sampling_seconds: float = 0.0  # time spent inside the sampler itself
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.stopped_at or time.time()
+        return {
+            "running": self.stopped_at is None,
+            "seconds": self.seconds,
+            "requests": self.requests,
+            "route": self.route,
+            "interval_ms": self.interval * 1000,
+            "elapsed_s": round(end - self.started_at, 2),
+            "samples": self.samples,
+            "matched_requests": self.matched_requests,
+            "stop_reason": self.stop_reason,
+            "sampler_overhead_pct": round(self.sampling_seconds / max(end - self.started_at, 1e-9) * 100, 2),
+        }
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler over all Python threads (one session at a time)."""
+
+    def __init__(self):
+        self.active = False  # read on every request by the middleware: keep it a plain attribute
+        self.session: Optional[ProfileSession] = None
+        self.stacks: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(
+        self,
+        seconds: Optional[float] = None,
+        requests: Optional[int] = None,
+        route: Optional[str] = None,
+        interval_ms: float = PROFILE_INTERVAL_MS,
+    ) -> ProfileSession:
+        """Start sampling; stops after `seconds`, or after `requests` matching `route` finish."""
+        if requests is None and seconds is None:
+            seconds = 30.0
+        with self._lock:
+            if self.active:
+                raise ProfilerBusy("A profiling session is already running")
+            self.session = ProfileSession(
+                interval=max(interval_ms, 1.0) / 1000,
+                seconds=min(seconds, PROFILE_MAX_SECONDS) if seconds is not None else None,
+                requests=requests,
+                route=route or "/",
+                started_at=time.time(),
+            )
+            self.stacks = Counter()
+            self._stop.clear()
+            self.active = True
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return self.session
+
+    def stop(self, reason: str = "stopped"):
+        with self._lock:
+            if not self.active:
+                return
+            self.active = False
+            self.session.stop_reason = reason
+            self.session.stopped_at = time.time()
+            self._stop.set()
+
+    # Route mode: the middleware reports matching requests (only while active)
+    def request_started(self, path: str) -> Optional[ProfileSession]:
+        """The session counting this request, or None if it doesn't match."""
+        session = self.session
+        if session is None or session.requests is None or not path.startswith(session.route):
+            return None
+        with self._lock:
+            session.in_flight += 1
+        return session
+
+    def request_finished(self, session: ProfileSession):
+        with self._lock:
+            session.in_flight -= 1
+            session.matched_requests += 1
+            done = session is self.session and session.matched_requests >= session.requests
+        if done:
+            self.stop("requests")
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(_ROOT):
+                filename = filename[len(_ROOT):]
+            elif "site-packages" + os.sep in filename:
+                filename = filename.split("site-packages" + os.sep, 1)[1]
+            else:
+                filename = os.path.basename(filename)
+            label = f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_id: int):
+        names = {t.ident: _THREAD_ID_SUFFIX.sub("", t.name) for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_qualname) in IDLE_LEAVES:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            stack = [names.get(thread_id, "thread")]
+            stack.extend(self._label(code) for code in reversed(codes))
+            self.stacks[";".join(stack)] += 1
+
+    def _run(self):
+        session = self.session
+        own_id = threading.get_ident()
+        deadline = session.started_at + session.seconds if session.seconds is not None else None
+        hard_deadline = session.started_at + PROFILE_MAX_SECONDS
+        while not self._stop.wait(session.interval):
+            now = time.time()
+            if now >= hard_deadline or (deadline is not None and now >= deadline):
+                self.stop("seconds" if deadline is not None and now >= deadline else "max_seconds")
+                break
+            if session.requests is not None and session.in_flight <= 0:
+                continue
+            tick = time.perf_counter()
+            self._sample(own_id)
+            session.samples += 1
+            session.sampling_seconds += time.perf_counter() - tick
+
+    def collapsed(self) -> str:
+        """Collapsed stacks ("frame;frame count" per line) for flamegraph.pl / speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Functions by self samples (innermost frame) with their total (inclusive) samples."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]  # drop the thread-name root
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        stack_samples = sum(self.stacks.values()) or 1
+        ranked = sorted(total_counts, key=lambda f: (self_counts[f], total_counts[f]), reverse=True)
+        return [
+            {
+                "function": frame,
+                "self": self_counts[frame],
+                "self_pct": round(self_counts[frame] / stack_samples * 100, 2),
+                "total": total_counts[frame],
+                "total_pct": round(total_counts[frame] / stack_samples * 100, 2),
+            }
+            for frame in ranked[:limit]
+        ]
+
+    def status(self, limit: int = 30) -> Dict[str, Any]:
+        if self.session is None:
+            return {"running": False}
+        return {**self.session.to_dict(), "stack_samples": sum(self.stacks.values()), "top": self.top(limit)}
+
+
+profiler = SamplingProfiler()
+
+
+# ============ Per-request cProfile ============
+
+@dataclass
+class RequestProfile:
+    """Filled in by the request's QueryTracer; read back by the middleware."""
+    trace_id: Optional[str] = None
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def request_profile() -> Optional[RequestProfile]:
+    """The current request's profile holder if it asked for cProfile (X-Profile: cprofile)."""
+    return _request_profile.get()
+
+
+def start_cprofile() -> cProfile.Profile:
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def format_cprofile(profile: cProfile.Profile, limit: int = 25) -> str:
+    """Stop the profile and render its top functions by cumulative time."""
+    profile.disable()
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware feeding the profiler route mode and per-request cProfile.
+
+    Installed only when PROFILING_TOKEN is set. With no session running and no
+    X-Profile header it only checks profiler.active and scans the header list.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracked = profiler.active and profiler.request_started(scope["path"])
+        holder = token = None
+        if _header(scope, PROFILE_HEADER) == "cprofile" and check_admin_token(_header(scope, TOKEN_HEADER)):
+            holder = RequestProfile()
+            token = _request_profile.set(holder)
+
+        async def send_wrapper(message):
+            if holder is not None and holder.trace_id and message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-trace-id", holder.trace_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper if holder is not None else send)
+        finally:
+            if token is not None:
+                _request_profile.reset(token)
+            if tracked:
+                profiler.request_finished(tracked)
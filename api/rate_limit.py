@@ -0,0 +1,453 @@
+"""
+Per-client rate limiting for the Focus Group Search API.
+
+Sliding-window counters: each client has a count for the current window and
+one for the previous window. A request is allowed if
+
+    previous * (share of the previous window still inside the sliding window) + current + cost <= limit
+
+That takes two numbers and a window start per client, so memory is O(1) per
+active client. Requests are weighted by route (ROUTE_COSTS, in units of one
+search). A deep macro synthesis costs two searches. Corpus reads and the
+per-card light summaries are free: the frontend requests a light summary for
+every focus group and race in each result set, so their cost is covered by
+the search. The defaults allow DAILY_RATE_LIMIT searches per
+RATE_LIMIT_WINDOW seconds (one day), plus whatever deep and macro synthesis
+the user asks for within the same budget.
+
+Backends (RATE_LIMIT_BACKEND) hold the counters:
+
+- memory            one process; LRU-ordered, so idle clients are evicted
+                    from the front and at most RATE_LIMIT_MAX_CLIENTS are kept
+- sqlite[:path]     one file shared by every worker on the host (default
+                    data/rate_limits.sqlite); idle rows are deleted periodically
+- redis://host/db   shared across hosts; one key per client per window, with a
+                    TTL of two windows (needs the redis package)
+- redis-standin     the Redis code path against an in-process store, for
+                    development and tests without a Redis server
+
+Responses from limited routes carry RateLimit-Limit, RateLimit-Remaining,
+RateLimit-Reset (seconds until the current window rolls over) and
+RateLimit-Policy headers. A 429 also carries Retry-After, estimated from the
+window weights.
+
+Usage:
+    DAILY_RATE_LIMIT=100 RATE_LIMIT_BACKEND=sqlite uvicorn api.main:app --workers 4
+    RATE_LIMIT_COSTS="/synthesize/deep=1,/corpus=0.1" uvicorn api.main:app   # override route costs
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from api.metrics import metrics
+from api.serialization import dumps
+
+DAILY_RATE_LIMIT = int(os.getenv("DAILY_RATE_LIMIT", "100"))  # searches (cost units) per window; 0 = off
+RATE_LIMIT_WINDOW = float(os.getenv("RATE_LIMIT_WINDOW", "86400"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+DEFAULT_SQLITE_PATH = Path(__file__).parent.parent / "data" / "rate_limits.sqlite"
+
+# Cost of one request in searches; routes not listed (or costing 0) are not limited
+ROUTE_COSTS: Dict[str, float] = {
+    "/search": 1,
+    "/search/stream": 1,
+    "/search/unified": 1,
+    # Fired by the frontend for every result card of a search, without the user asking
+    "/synthesize/light": 0,
+    "/synthesize/strategy/light": 0,
+    "/synthesize/macro/light": 0.5,
+    "/synthesize/deep": 0.5,
+    "/synthesize/strategy/deep": 0.5,
+    "/synthesize/macro": 1,
+    "/synthesize/macro/deep": 2,
+    "/synthesize/strategy/macro": 2,
+    "/synthesize/unified/macro": 2,
+}
+
+RATE_LIMITED = metrics.counter(
+    "focus_group_rate_limited_total", "Requests rejected with 429 by the rate limiter, by route", ("endpoint",)
+)
+
+# (window_start, previous_count, current_count)
+WindowState = Tuple[float, float, float]
+
+
+def parse_costs(spec: Optional[str]) -> Dict[str, float]:
+    """ROUTE_COSTS with "path=cost,path=cost" overrides applied."""
+    costs = dict(ROUTE_COSTS)
+    for item in (spec or "").split(","):
+        if "=" in item:
+            path, cost = item.split("=", 1)
+            costs[path.strip()] = float(cost)
+    return costs
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: float
+    remaining: float
+    reset: float                 # seconds until the current window rolls over
+    retry_after: Optional[float] = None
+
+    def headers(self, window: float) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (b"ratelimit-limit", str(int(self.limit)).encode()),
+            (b"ratelimit-remaining", str(max(0, math.floor(self.remaining))).encode()),
+            (b"ratelimit-reset", str(math.ceil(self.reset)).encode()),
+            (b"ratelimit-policy", f"{int(self.limit)};w={int(window)}".encode()),
+        ]
+        if self.retry_after is not None:
+            headers.append((b"retry-after", str(math.ceil(self.retry_after)).encode()))
+        return headers
+
+
+def _roll(state: Optional[WindowState], window_start: float, window: float) -> Tuple[float, float]:
+    """(previous, current) counts for the window starting at window_start."""
+    if state is None:
+        return 0.0, 0.0
+    start, previous, current = state
+    if start == window_start:
+        return previous, current
+    if start == window_start - window:
+        return current, 0.0
+    return 0.0, 0.0
+
+
+def _decide(
+    previous: float, current: float, cost: float, limit: float, window: float, window_start: float, now: float
+) -> Tuple[RateLimitDecision, float]:
+    """The decision for one request and the current-window count afterwards."""
+    elapsed = now - window_start
+    weighted = previous * (1 - elapsed / window) + current
+    allowed = weighted + cost <= limit
+    if allowed:
+        current += cost
+        weighted += cost
+    decision = RateLimitDecision(allowed, limit, limit - weighted, window - elapsed)
+    if not allowed:
+        decision.retry_after = _retry_after(previous, current, cost, limit, window, elapsed)
+    return decision, current
+
+
+def _retry_after(previous: float, current: float, cost: float, limit: float, window: float, elapsed: float) -> float:
+    """Seconds until the sliding count has decayed enough for this cost."""
+    room = limit - current - cost
+    if room >= 0 and previous > 0:  # later in this window, once more of the previous one slides out
+        return max(0.0, window * (1 - room / previous) - elapsed)
+    to_next = window - elapsed  # after rollover, the current count becomes the decaying previous one
+    if cost > limit:
+        return to_next + window
+    if current <= 0:
+        return to_next
+    return to_next + max(0.0, window * (1 - (limit - cost) / current))
+
+
+# ============ Backends ============
+
+class MemoryBackend:
+    """Counters in this process only, least recently seen client first."""
+
+    blocking = False
+
+    def __init__(self, window: float, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.window = window
+        self.max_clients = max_clients
+        self.clients: "OrderedDict[str, WindowState]" = OrderedDict()
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float, limit: float, now: float) -> RateLimitDecision:
+        window_start = now - now % self.window
+        with self._lock:
+            previous, current = _roll(self.clients.get(key), window_start, self.window)
+            decision, current = _decide(previous, current, cost, limit, self.window, window_start, now)
+            self.clients[key] = (window_start, previous, current)
+            self.clients.move_to_end(key)
+            self._evict(window_start)
+        return decision
+
+    def _evict(self, window_start: float):
+        # Front = least recently seen; entries two windows old count nothing
+        while self.clients:
+            oldest = next(iter(self.clients.values()))
+            if oldest[0] >= window_start - self.window and len(self.clients) <= self.max_clients:
+                break
+            self.clients.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> Dict:
+        return {"backend": "memory", "clients": len(self.clients), "evicted": self.evicted}
+
+
+class SQLiteBackend:
+    """Counters in a SQLite file, so every worker on the host shares them."""
+
+    blocking = True
+    SWEEP_EVERY = 1000  # acquisitions between deletes of idle rows
+
+    def __init__(self, window: float, path: Path = DEFAULT_SQLITE_PATH):
+        self.window = window
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._calls = 0
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start REAL, previous REAL, current REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        # A connection opened before a fork (api/serve.py) must not be used by the child
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def acquire(self, key: str, cost: float, limit: float, now: float) -> RateLimitDecision:
+        window_start = now - now % self.window
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT window_start, previous, current FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            previous, current = _roll(row, window_start, self.window)
+            decision, current = _decide(previous, current, cost, limit, self.window, window_start, now)
+            db.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_start, previous, current) VALUES (?, ?, ?, ?)",
+                (key, window_start, previous, current),
+            )
+            self._calls += 1
+            if self._calls % self.SWEEP_EVERY == 0:
+                db.execute("DELETE FROM rate_limits WHERE window_start < ?", (window_start - self.window,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return decision
+
+    def stats(self) -> Dict:
+        clients = self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+        return {"backend": "sqlite", "path": str(self.path), "clients": clients}
+
+
+class RedisBackend:
+    """
+    Counters in Redis (or anything with its get/incrbyfloat/expire/pipeline).
+
+    One key per client per window, expiring after two windows, so idle
+    clients cost nothing. The cost is added first and taken back if the
+    request is over the limit, which keeps concurrent workers from
+    overshooting without a script.
+    """
+
+    blocking = True
+
+    def __init__(self, window: float, client, prefix: str = "ratelimit:"):
+        self.window = window
+        self.client = client
+        self.prefix = prefix
+
+    def acquire(self, key: str, cost: float, limit: float, now: float) -> RateLimitDecision:
+        index = int(now // self.window)
+        window_start = index * self.window
+        current_key = f"{self.prefix}{key}:{index}"
+        pipe = self.client.pipeline()
+        pipe.incrbyfloat(current_key, cost)
+        pipe.expire(current_key, int(self.window * 2))
+        pipe.get(f"{self.prefix}{key}:{index - 1}")
+        current_after, _, previous = pipe.execute()
+        previous = float(previous or 0)
+        decision, _ = _decide(previous, float(current_after) - cost, cost, limit, self.window, window_start, now)
+        if not decision.allowed:
+            self.client.incrbyfloat(current_key, -cost)
+        return decision
+
+    def stats(self) -> Dict:
+        return {"backend": "redis", "client": type(self.client).__name__}
+
+
+class RedisStandIn:
+    """In-process stand-in for the Redis commands RedisBackend uses (expired keys are swept on writes)."""
+
+    SWEEP_EVERY = 1000  # writes between sweeps of expired keys
+
+    def __init__(self):
+        self.values: Dict[str, float] = {}
+        self.expires: Dict[str, float] = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> bool:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return repr(self.values[key]).encode() if self._live(key) else None
+
+    def incrbyfloat(self, key: str, amount: float) -> float:
+        with self._lock:
+            self.values[key] = (self.values[key] if self._live(key) else 0.0) + amount
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                now = time.time()
+                for expired in [k for k, at in self.expires.items() if at <= now]:
+                    self.values.pop(expired, None)
+                    del self.expires[expired]
+            return self.values[key]
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._live(key):
+                return False
+            self.expires[key] = time.time() + seconds
+            return True
+
+    def pipeline(self) -> "_StandInPipeline":
+        return _StandInPipeline(self)
+
+
+class _StandInPipeline:
+    def __init__(self, store: RedisStandIn):
+        self.store = store
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        return [getattr(self.store, name)(*args) for name, args in self.calls]
+
+
+def create_backend(spec: str, window: float):
+    """Backend from a RATE_LIMIT_BACKEND value."""
+    if spec == "memory":
+        return MemoryBackend(window)
+    if spec == "sqlite" or spec.startswith("sqlite:"):
+        path = spec.split(":", 1)[1] if ":" in spec else DEFAULT_SQLITE_PATH
+        return SQLiteBackend(window, path)
+    if spec.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis://... needs the redis package (pip install redis)")
+        return RedisBackend(window, redis.Redis.from_url(spec))
+    if spec == "redis-standin":
+        return RedisBackend(window, RedisStandIn())
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {spec!r} (memory, sqlite[:path], redis://..., redis-standin)")
+
+
+# ============ Limiter ============
+
+class RateLimiter:
+    """Route costs and the limit, over one backend."""
+
+    def __init__(self, backend, limit: float, window: float, costs: Optional[Dict[str, float]] = None):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+        self.costs = costs if costs is not None else dict(ROUTE_COSTS)
+        self.allowed = 0
+        self.rejected = 0
+
+    def cost(self, path: str) -> float:
+        return self.costs.get(path, 0.0)
+
+    def check(self, key: str, cost: float, now: Optional[float] = None) -> RateLimitDecision:
+        decision = self.backend.acquire(key, cost, self.limit, time.time() if now is None else now)
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "window_s": self.window,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            **self.backend.stats(),
+        }
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """The limiter configured by the environment, or None when DAILY_RATE_LIMIT is 0."""
+    if DAILY_RATE_LIMIT <= 0:
+        return None
+    backend = create_backend(RATE_LIMIT_BACKEND, RATE_LIMIT_WINDOW)
+    return RateLimiter(backend, DAILY_RATE_LIMIT, RATE_LIMIT_WINDOW, parse_costs(os.getenv("RATE_LIMIT_COSTS")))
+
+
+def _wait_text(seconds: float) -> str:
+    minutes = max(1, math.ceil(seconds / 60))
+    if minutes < 90:
+        return f"{minutes} minute{'s' if minutes > 1 else ''}"
+    return f"{round(minutes / 60)} hours"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware: charges each request to a limited route against its
+    client's budget, answers 429 when it is spent, and adds RateLimit-*
+    headers to the response either way. Other routes pass straight through.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        cost = self.limiter.cost(scope["path"]) if scope["type"] == "http" else 0.0
+        if not cost:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        key = client[0] if client else "unknown"
+        if self.limiter.backend.blocking:
+            decision = await run_in_threadpool(self.limiter.check, key, cost)
+        else:
+            decision = self.limiter.check(key, cost)
+        headers = decision.headers(self.limiter.window)
+
+        if not decision.allowed:
+            RATE_LIMITED.labels(scope["path"]).inc()
+            body = dumps({"detail": f"Request limit reached. Please try again in {_wait_text(decision.retry_after)}."})
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,116 @@
+"""
+Semantic near-duplicate query cache for /search/unified.
+
+The exact cache keys on md5(query.lower().strip()), so "Ohio voters on the
+economy" and "ohio voters on economy?" are separate misses. This second tier
+keeps the embeddings of recently answered queries in a small in-memory matrix
+and serves the cached response when:
+
+- cosine similarity to a cached query >= threshold, AND
+- the routing filters match (content type, focus groups, outcome filter,
+  top_k, score threshold) - so "Ohio voters" never answers "Michigan voters"
+
+Entries are evicted least-recently-used once max_entries is reached.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """
+    Bounded LRU cache of responses keyed by query embedding + routing filters.
+
+    Usage:
+        cache = SemanticQueryCache(threshold=0.95, max_entries=256)
+        hit = cache.lookup(embedding, filters)
+        if hit is None:
+            cache.put(query, embedding, filters, response)
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        # Row i of the matrix belongs to slot i; rows are L2-normalized
+        self._vectors: Optional[np.ndarray] = None
+        self._filters: List[Optional[Tuple]] = [None] * max_entries
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # slot -> None, oldest first
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def lookup(self, embedding, filters: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar cached query with identical routing filters.
+
+        Returns:
+            {"query", "response", "similarity"} or None on a miss
+        """
+        with self._lock:
+            if not self._lru:
+                self.misses += 1
+                return None
+
+            query_vec = self._normalize(embedding)
+            slots = [slot for slot in self._lru if self._filters[slot] == filters]
+            if not slots:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[slots] @ query_vec
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            slot = slots[best]
+            self._lru.move_to_end(slot)
+            self.hits += 1
+            entry = self._entries[slot]
+            return {"query": entry["query"], "response": entry["response"], "similarity": similarity}
+
+    def put(self, query: str, embedding, filters: Tuple, response: Any):
+        """Cache a response, evicting the least recently used entry if full."""
+        query_vec = self._normalize(embedding)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, query_vec.shape[0]), dtype=np.float32)
+
+            if len(self._lru) < self.max_entries:
+                slot = len(self._lru)
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                self.evictions += 1
+
+            self._vectors[slot] = query_vec
+            self._filters[slot] = filters
+            self._entries[slot] = {"query": query, "response": response}
+            self._lru[slot] = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
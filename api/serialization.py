@@ -0,0 +1,61 @@
+"""
+Fast JSON serialization for search responses.
+
+Retrieval results are slotted dataclasses built from trusted internal data
+(Pinecone matches, the chunk files, the metadata registry). Re-wrapping every
+chunk in a Pydantic model and revalidating it at the response_model boundary
+costs more than the serialization itself, so search endpoints hand the
+dataclasses straight to orjson and return the bytes.
+
+The endpoints keep their response_model for the OpenAPI schema; returning a
+Response instance makes FastAPI skip validation.
+
+orjson is optional: without it the stdlib json module is used (slower, same
+output).
+"""
+
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Handle types orjson/json don't serialize natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "item"):
+        # numpy scalars (e.g. reranker scores)
+        return obj.item()
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes; dataclasses are serialized field by field."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_str(content: Any) -> str:
+    """Serialize to a JSON string (for NDJSON lines)."""
+    return dumps(content).decode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSONResponse that serializes with orjson and never revalidates."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,212 @@
+"""
+Multi-worker serving: pre-forked workers over shared read-only indexes.
+
+`uvicorn --workers N` starts N fresh interpreters, and each one imports the
+app and builds the BM25 index, chunk id indexes and metadata registry on its
+own, so memory grows by a full API per worker. This launcher instead:
+
+1. sets SHARED_INDEX=true, imports the app once, and preloads the client
+   libraries startup would otherwise import in every worker (PRELOAD_MODULES),
+2. writes the shared index segments (scripts/retrieval/shared_index.py),
+3. binds the listening socket, freezes the heap (gc.freeze) and forks the workers.
+
+Workers share the imported modules copy-on-write and map the segments
+(the chunk store files are mapped already), so the large read-only data has
+one physical copy. Private to each worker: its event loop, HTTP pools,
+embedding/Pinecone clients, caches (semantic, demo, coalescing), metrics and
+/stats, and the reranker model if USE_RERANKER is on (N copies of the
+weights: keep it off with several workers). The kernel spreads connections
+over the workers accepting on the shared socket. A worker that dies is
+restarted with exponential backoff; one that dies MAX_CRASHES times in a row
+within CRASH_WINDOW seconds of starting (e.g. a required startup phase keeps
+failing) stops the server with status 1, as plain uvicorn would, so the
+platform's restart policy takes over. SIGINT/SIGTERM stop them all.
+
+Rate limits: the memory backend would count per worker (N times the
+limit), so with more than one worker RATE_LIMIT_BACKEND defaults to sqlite.
+
+Usage:
+    python -m api.serve --workers 4 --port 8000
+    SHARED_INDEX_DIR=/dev/shm/focus-group-index python -m api.serve --workers 2
+    python -m api.serve --workers 4 --no-shared-index    # fork only, every worker builds its own indexes
+    python eval/bench_workers.py                         # memory per worker at 1, 2, 4 and 8 workers
+"""
+
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+RESTART_DELAY = 1.0  # seconds before a dead worker is replaced, doubled per consecutive crash
+MAX_RESTART_DELAY = 30.0
+CRASH_WINDOW = 60.0  # a worker dying sooner than this after it started counts as a crash
+MAX_CRASHES = 5  # consecutive crashes of one worker before the server gives up
+
+# Imported lazily by the startup steps and the first requests (embedder, Pinecone and
+# OpenRouter clients, HTTP/2); importing them before the fork shares their code objects
+# instead of loading ~1100 modules per worker. Importing only: no clients, connections or
+# threads are created before the fork.
+PRELOAD_MODULES = (
+    "scripts.embeddings", "scripts.http_clients", "httpx", "httpcore", "h2.connection", "anyio._backends._asyncio",
+    "openai", "openai.resources.chat", "openai.resources.embeddings", "openai.resources.models",
+    "openai.lib.streaming.chat", "pinecone", "pinecone._client", "pinecone.index", "uvloop",
+)
+
+
+def _listen(host: str, port: int, backlog: int) -> socket.socket:
+    """The one listening socket every worker accepts on."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Forks the workers, restarts any that die, and stops them all on SIGINT/SIGTERM."""
+
+    def __init__(self, config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.count = workers
+        self.workers: Dict[int, int] = {}  # pid -> worker number
+        self.started: Dict[int, float] = {}  # pid -> start time
+        self.crashes: Dict[int, int] = {}  # worker number -> consecutive crashes
+        self.stopping = False
+        self.exit_code = 0
+
+    def _serve(self, number: int):
+        """Worker process body: one uvicorn server on the inherited socket."""
+        import uvicorn
+
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        uvicorn.Server(self.config).run(sockets=[self.sock])
+
+    def spawn(self, number: int):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve(number)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        self.workers[pid] = number
+        self.started[pid] = time.monotonic()
+        print(f"Started worker {number} (pid {pid})")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """Serve until stopped; returns the exit status (1 if a worker kept crashing)."""
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        for number in range(self.count):
+            self.spawn(number)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            number = self.workers.pop(pid, None)
+            if number is None:
+                continue
+            lifetime = time.monotonic() - self.started.pop(pid)
+            if self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            crashes = self.crashes.get(number, 0) + 1 if lifetime < CRASH_WINDOW else 1
+            self.crashes[number] = crashes
+            if lifetime < CRASH_WINDOW and crashes >= MAX_CRASHES:
+                print(f"Worker {number} (pid {pid}) exited with {code} {crashes} times within {CRASH_WINDOW:.0f}s "
+                      f"of starting, stopping the server")
+                self.exit_code = 1
+                self._stop(None, None)
+                continue
+            delay = min(RESTART_DELAY * 2 ** (crashes - 1), MAX_RESTART_DELAY)
+            print(f"Worker {number} (pid {pid}) exited with {code} after {lifetime:.1f}s, restarting in {delay:.0f}s")
+            time.sleep(delay)
+            if not self.stopping:
+                self.spawn(number)
+        print("All workers stopped.")
+        return self.exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers over shared read-only indexes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="Worker processes (env WEB_CONCURRENCY)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Listen backlog of the shared socket")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-shared-index", action="store_true",
+                        help="Don't build or attach shared segments (every worker builds its own indexes)")
+    args = parser.parse_args()
+
+    # Before the app is imported: these are read at import time
+    os.environ["SHARED_INDEX"] = "false" if args.no_shared_index else "true"
+    if args.workers > 1 and "RATE_LIMIT_BACKEND" not in os.environ:
+        os.environ["RATE_LIMIT_BACKEND"] = "sqlite"
+
+    import uvicorn
+    from api.main import app
+    from eval.config import USE_HYBRID_RETRIEVAL
+    from scripts.retrieval.shared_index import build_shared_index
+
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Not preloading {module}: {e}")
+    # Loaded here (imports the HTTP protocol and lifespan classes) rather than in every worker
+    config = uvicorn.Config(app, log_level=args.log_level)
+    config.load()
+
+    if not args.no_shared_index:
+        build_shared_index(bm25=USE_HYBRID_RETRIEVAL)
+
+    if threading.active_count() > 1:
+        # A thread running at fork time leaves its locks held in every worker
+        print(f"Warning: {threading.active_count() - 1} threads running before fork: "
+              f"{[t.name for t in threading.enumerate() if t is not threading.main_thread()]}")
+
+    sock = _listen(args.host, args.port, args.backlog)
+    print(f"Serving on {args.host}:{args.port} with {args.workers} workers "
+          f"(shared index {'off' if args.no_shared_index else 'on'}, rate limits: "
+          f"{os.getenv('RATE_LIMIT_BACKEND', 'memory')})")
+
+    # Objects created so far are never collected: the GC won't write to (and un-share) their pages
+    gc.collect()
+    gc.freeze()
+    sys.exit(Supervisor(config, sock, args.workers).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Background startup for the Focus Group Search API.
+
+The lifespan used to construct every resource before the server accepted a
+connection. Now the server starts serving at once (/live and /health answer
+immediately) while resources are built in background threads, in phases:
+each phase's steps run in parallel, phases run in order (retrievers need the
+shared embedder, index and router first). /ready returns 503 until every
+phase has finished, so a load balancer only routes traffic to a warm instance.
+Optional phases (warmup) record failures and timeouts without failing startup.
+A required phase that fails exits the process (status 1), as the blocking
+lifespan did, so the platform's restart policy replaces the instance instead
+of leaving it up and never ready.
+
+Usage:
+    startup = Startup(workers=8)
+
+    async def initialize():
+        await startup.run_phase("resources", {
+            "pinecone index": SharedResources.get_pinecone_index,
+            "router": SharedResources.get_router,
+        })
+        await startup.run_phase("retrievers", {"retrievers": build_retrievers})
+        await startup.run_phase("warmup", warm_tasks, required=False, timeout=30)
+        startup.mark_ready()
+
+    startup.start(initialize())   # in lifespan, before yield
+    startup.to_dict()             # /ready payload
+"""
+
+import asyncio
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+
+@dataclass
+class StepStatus:
+    """One startup step: pending -> running -> done | failed | timeout."""
+    name: str
+    phase: str
+    status: str = "pending"
+    started_at: Optional[float] = None
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class StartupError(RuntimeError):
+    """A startup step failed; the instance never becomes ready."""
+
+
+class Startup:
+    """Runs startup phases in background threads and tracks readiness."""
+
+    def __init__(self, workers: int = 8, exit_on_failure: bool = True):
+        self.workers = max(1, workers)
+        self.exit_on_failure = exit_on_failure
+        self.started_at = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.steps: Dict[str, StepStatus] = {}
+        self.phases: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="startup")
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def _run_step(self, step: StepStatus, fn: Callable[[], Any]) -> Any:
+        step.status = "running"
+        step.started_at = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            if step.status != "timeout":
+                step.status = "failed"
+                step.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # A step that outlived its phase's timeout keeps that status, with its real duration
+            step.seconds = round(time.perf_counter() - step.started_at, 3)
+        if step.status != "timeout":
+            step.status = "done"
+        return result
+
+    async def run_phase(
+        self,
+        phase: str,
+        steps: Dict[str, Callable[[], Any]],
+        required: bool = True,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a phase's steps in parallel worker threads.
+
+        Args:
+            phase: Phase name (shown in /ready)
+            steps: {step name: zero-argument callable}
+            required: If False, failed or timed-out steps are only reported
+            timeout: Seconds to wait for the phase; steps still running are
+                marked "timeout" (their threads finish in the background)
+
+        Returns:
+            {step name: result} for the steps that finished
+
+        Raises:
+            StartupError: if a required phase had a failed or timed-out step
+        """
+        self.phases.append(phase)
+        statuses = {name: StepStatus(name, phase) for name in steps}
+        self.steps.update(statuses)
+        if not steps:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        futures = {
+            name: loop.run_in_executor(self._executor, self._run_step, statuses[name], fn)
+            for name, fn in steps.items()
+        }
+        await asyncio.wait(futures.values(), timeout=timeout)
+
+        results, failed = {}, []
+        for name, future in futures.items():
+            if not future.done():
+                statuses[name].status = "timeout"
+                statuses[name].error = f"still running after {timeout}s"
+                failed.append(name)
+                # Retrieve a late exception so asyncio doesn't log it as unhandled
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                print(f"Startup step '{name}' timed out after {timeout}s")
+            elif future.exception() is not None:
+                error = future.exception()
+                failed.append(name)
+                print(f"Startup step '{name}' failed: {error}")
+                if required:
+                    traceback.print_exception(type(error), error, error.__traceback__)
+            else:
+                results[name] = future.result()
+        if failed and required:
+            raise StartupError(f"Startup phase '{phase}' failed: {', '.join(failed)}")
+        return results
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+        print(f"Ready after {self.ready_at - self.started_at:.2f}s")
+
+    def start(self, initialize: Coroutine):
+        """Run the initialize coroutine in the background (call from lifespan)."""
+        async def run():
+            try:
+                await initialize
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"Startup failed: {self.error}")
+                if self.exit_on_failure:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    os._exit(1)
+        self._task = asyncio.create_task(run())
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for startup to finish (ready or failed); True if ready."""
+        if self._task is not None:
+            await asyncio.wait({self._task}, timeout=timeout)
+        return self.ready
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.ready_at or time.perf_counter()) - self.started_at
+        return {
+            "ready": self.ready,
+            "status": "ready" if self.ready else ("failed" if self.error else "starting"),
+            "seconds": round(elapsed, 3),
+            "error": self.error,
+            "phases": {
+                phase: {
+                    step.name: {"status": step.status, "seconds": step.seconds, "error": step.error}
+                    for step in self.steps.values() if step.phase == phase
+                }
+                for phase in self.phases
+            },
+        }
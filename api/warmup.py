@@ -0,0 +1,90 @@
+"""
+Warm tasks run after the retrievers are built and before /ready goes green.
+
+Constructing a client doesn't open a connection and loading an index doesn't
+touch its pages, so without warming the first real request pays for TLS
+handshakes to OpenRouter, OpenAI and Pinecone, the first embedding round
+trip, page faults on the BM25 postings and the reranker's first forward pass.
+Each task does the cheapest call that pays that cost once:
+
+- connections: list OpenRouter models (TLS + connection pool for routing/synthesis)
+- embedding:   embed one short string (OpenAI connection, or local model first pass)
+- pinecone:    describe_index_stats (Pinecone connection)
+- bm25:        one BM25 query (faults in postings and chunk store columns)
+- reranker:    score one (query, passage) pair
+
+Warming is best effort: a failed or timed-out task is reported in /ready but
+doesn't keep the instance out of rotation (the resource still works, the
+first request is just slower). The demo cache is not a warm task: api/main.py
+loads it in its own phase whenever PREWARM_CACHE is on.
+
+Config:
+    WARMUP_TASKS=all                       # or a comma list, or "none"
+    WARMUP_TIMEOUT=30                      # seconds before /ready stops waiting
+
+Usage:
+    tasks = build_warm_tasks(hybrid=True, reranker=False)
+    await startup.run_phase("warmup", tasks, required=False, timeout=WARMUP_TIMEOUT)
+"""
+
+import os
+from typing import Callable, Dict, List
+
+from scripts.retrieval.base import SharedResources
+
+WARMUP_QUERY = "voters on the economy"
+
+WARM_TASKS = ["connections", "embedding", "pinecone", "bm25", "reranker"]
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
+
+
+def enabled_warm_tasks() -> List[str]:
+    """Task names from WARMUP_TASKS ("all", "none" or a comma list)."""
+    setting = os.getenv("WARMUP_TASKS", "all").strip().lower()
+    if setting == "all":
+        return list(WARM_TASKS)
+    if setting in ("", "none"):
+        return []
+    names = [name.strip() for name in setting.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WARM_TASKS]
+    if unknown:
+        print(f"Warning: unknown WARMUP_TASKS {unknown} (known: {', '.join(WARM_TASKS)})")
+    return [name for name in names if name in WARM_TASKS]
+
+
+def warm_connections():
+    """Open the shared OpenRouter connection (router + synthesizer use the same client)."""
+    client = SharedResources.get_openrouter_client()
+    client.with_options(timeout=WARMUP_TIMEOUT, max_retries=0).models.list()
+
+
+def warm_embedding():
+    SharedResources.get_embedding_model().encode([WARMUP_QUERY])
+
+
+def warm_pinecone():
+    SharedResources.get_pinecone_index().describe_index_stats()
+
+
+def warm_bm25():
+    from scripts.retrieval.bm25 import BM25Retriever
+    BM25Retriever().retrieve(WARMUP_QUERY, top_k=5)
+
+
+def warm_reranker():
+    SharedResources.get_reranker_model().warmup()
+
+
+def build_warm_tasks(hybrid: bool, reranker: bool) -> Dict[str, Callable[[], object]]:
+    """Enabled warm tasks that apply to this configuration."""
+    tasks = {
+        "connections": warm_connections,
+        "embedding": warm_embedding,
+        "pinecone": warm_pinecone,
+    }
+    if hybrid:
+        tasks["bm25"] = warm_bm25
+    if reranker:
+        tasks["reranker"] = warm_reranker
+    enabled = enabled_warm_tasks()
+    return {name: fn for name, fn in tasks.items() if name in enabled}
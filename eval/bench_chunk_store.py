@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar chunk store against parsing the JSON chunk tree.
+
+Each mode runs in a fresh interpreter and reports load time and the
+resident-set growth it caused:
+
+- json tree:     json.load every all_chunks.json (focus groups + strategy)
+                 - what BM25, embed.py and reindex_openai.py used to do
+- store records: load_chunks() for both collections (full dicts)
+- store columns: open both tables and touch the chunk_id, focus_group_id
+                 codes and content columns (zero-copy views)
+- store lookup:  open the hydration store and fetch 200 random chunk ids
+
+Usage:
+    python eval/bench_chunk_store.py
+    python eval/bench_chunk_store.py --repeat 5
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MODES = ["json tree", "store records", "store columns", "store lookup"]
+
+
+def rss_kb() -> int:
+    """Current resident set size in KB (Linux), 0 if unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def run_mode(mode: str) -> Dict:
+    """Run one mode in this process (called in a child interpreter)."""
+    # Import everything up front so only the load itself is measured
+    from scripts.retrieval.chunk_store import ChunkStore, _source_files, load_chunks, open_table
+
+    rss_before = rss_kb()
+    start = time.perf_counter()
+
+    if mode == "json tree":
+        chunks = []
+        for collection in ("focus_groups", "strategy"):
+            for path in _source_files(collection):
+                with open(path) as f:
+                    chunks.extend(json.load(f))
+        count = len(chunks)
+    elif mode == "store records":
+        chunks = load_chunks("focus_groups") + load_chunks("strategy")
+        count = len(chunks)
+    elif mode == "store columns":
+        table = open_table("focus_groups", verbose=False)
+        table.column("focus_group_id").codes.max()   # scan the codes
+        table.column("content").data.nbytes         # map the text blob
+        count = len(table.column("chunk_id"))
+        count += len(open_table("strategy", verbose=False).column("chunk_id"))
+    elif mode == "store lookup":
+        store = ChunkStore.open(verbose=False)
+        table = store.tables[0]
+        ids = random.Random(0).sample(list(table.column("chunk_id")), 200)
+        lookup_start = time.perf_counter()
+        records = [store.get(chunk_id) for chunk_id in ids]
+        lookup_us = (time.perf_counter() - lookup_start) * 1e6 / len(records)
+        count = len(records)
+    else:
+        raise ValueError(mode)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    result = {"mode": mode, "load_ms": elapsed_ms, "rss_kb": rss_kb() - rss_before, "count": count}
+    if mode == "store lookup":
+        result["lookup_us"] = lookup_us
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark columnar chunk store vs JSON tree")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-process runs per mode")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    # Make sure the store is built (and warm in the page cache) before timing
+    from scripts.retrieval.chunk_store import open_table
+    for collection in ("focus_groups", "strategy"):
+        open_table(collection)
+
+    rows = []
+    for mode in MODES:
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        rows.append({
+            "mode": mode,
+            "load_ms": min(r["load_ms"] for r in runs),
+            "rss_kb": min(r["rss_kb"] for r in runs),
+            "count": runs[0]["count"],
+            "lookup_us": min(r.get("lookup_us", 0.0) for r in runs),
+        })
+
+    baseline = rows[0]
+    print("\n" + "=" * 74)
+    print(f"CHUNK LOADING (best of {args.repeat} fresh processes)")
+    print("=" * 74)
+    print(f"{'mode':<14} | {'rows':>6} | {'load ms':>8} | {'RSS +MB':>8} | {'vs json':>7} | {'per get()':>10}")
+    print("-" * 74)
+    for row in rows:
+        speedup = baseline["load_ms"] / row["load_ms"] if row["load_ms"] else 0.0
+        lookup = f"{row['lookup_us']:.1f}µs" if row["lookup_us"] else "-"
+        print(f"{row['mode']:<14} | {row['count']:>6} | {row['load_ms']:>8.1f} | "
+              f"{row['rss_kb'] / 1024:>8.1f} | {speedup:>6.1f}x | {lookup:>10}")
+    print("\nRSS counts resident pages only: mapped column data is shared page cache.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark connection reuse: shared tuned pool vs SDK defaults.
+
+Starts eval/stub_ingest_server.py and sends waves of concurrent embedding
+requests through the OpenAI SDK, with an idle gap between waves (like
+traffic between user queries):
+
+- per-call: a new OpenAI client per request (the old generate_section_summary)
+- default:  one client on httpx defaults (idle connections dropped after 5 s)
+- shared:   scripts/http_clients.py (one tuned keep-alive pool per host)
+
+Every mode runs on the metered transport, so new connections (each one a
+TCP + TLS handshake against a real https upstream), reuse rate and pool
+waits are counted the same way. The stub is plain http on localhost, so
+latency differences here understate production, where a handshake costs
+one or two extra round trips.
+
+Usage:
+    python eval/bench_http_pools.py
+    python eval/bench_http_pools.py --waves 5 --concurrency 32 --gap 8
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from scripts.http_clients import MeteredTransport, PoolStats, _transports, get_http_client, upstream_host
+
+MODES = ["per-call", "default", "shared"]
+
+
+def start_stub(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).parent / "stub_ingest_server.py"), "--port", str(port),
+         "--tpm", "1e9", "--rpm", "1e7", "--embed-latency", "0.02", "--keep-alive", "90"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=0.5)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+def client_factory(mode: str, base_url: str) -> Tuple[Callable, PoolStats]:
+    """(callable giving the OpenAI client for one request, the pool stats it records into)."""
+    import openai
+
+    if mode == "shared":
+        client = openai.OpenAI(api_key="stub", base_url=base_url, http_client=get_http_client(base_url))
+        return (lambda: client), _transports[upstream_host(base_url)].stats
+
+    # httpx defaults: 100 connections, 20 keep-alive, 5 s keep-alive expiry
+    stats = PoolStats(host=mode, max_connections=100, http2=False)
+
+    def new_client():
+        return openai.OpenAI(
+            api_key="stub", base_url=base_url, http_client=httpx.Client(transport=MeteredTransport(stats))
+        )
+
+    if mode == "per-call":
+        return new_client, stats
+    client = new_client()
+    return (lambda: client), stats
+
+
+def run_mode(mode: str, args) -> Dict:
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    get_client, stats = client_factory(mode, base_url)
+    latencies: List[float] = []
+
+    def one(i: int):
+        start = time.perf_counter()
+        get_client().embeddings.create(model="text-embedding-3-small", input=[f"query {i}"], dimensions=8)
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for wave in range(args.waves):
+            if wave:
+                time.sleep(args.gap)
+            list(pool.map(one, range(args.requests)))
+    return {"mode": mode, "latencies": latencies, "stats": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared HTTP pools vs SDK defaults")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--waves", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=64, help="Requests per wave")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--gap", type=float, default=6.0, help="Idle seconds between waves")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    server = start_stub(args.port)
+    try:
+        rows = [run_mode(mode, args) for mode in args.modes]
+    finally:
+        server.terminate()
+        server.wait()
+
+    total = args.waves * args.requests
+    print("\n" + "=" * 84)
+    print(f"CONNECTION REUSE ({args.waves} waves x {args.requests} requests, {args.concurrency} concurrent, "
+          f"{args.gap:.0f}s idle between waves)")
+    print("=" * 84)
+    print(f"{'mode':<9} | {'requests':>8} | {'new conns':>9} | {'reuse':>6} | {'p50 ms':>7} | "
+          f"{'p95 ms':>7} | {'pool wait max':>13}")
+    print("-" * 84)
+    for row in rows:
+        stats, latencies = row["stats"], sorted(row["latencies"])
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{row['mode']:<9} | {total:>8} | {stats.new_connections:>9} | "
+              f"{1 - stats.new_connections / total:>6.0%} | {statistics.median(latencies) * 1000:>7.1f} | "
+              f"{p95 * 1000:>7.1f} | {stats.pool_wait_max * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
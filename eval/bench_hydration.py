@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark chunk hydration for retrieve_per_focus_group.
+
+Compares, per retrieve_per_focus_group call (one Pinecone query per focus
+group):
+
+- metadata: include_metadata=True - every candidate carries its (truncated)
+  text, profile and moderator question; all of it is decoded
+- hydrated: include_metadata=False - ids and scores only; the survivors are
+  read from the memory-mapped chunk store
+
+Offline mode (default) replays synthetic Pinecone query responses built from
+the real chunk files, in the shape reindex_openai.py upserts, so it needs no
+API keys. --live runs real queries against the index with both modes.
+
+Usage:
+    python eval/bench_hydration.py                          # offline, all focus groups
+    python eval/bench_hydration.py --top-k 5 --iterations 50
+    python eval/bench_hydration.py --live --query "What did Ohio voters say about the economy?"
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import DATA_DIR, FG_SCORE_THRESHOLD
+from scripts.retrieval.chunk_store import ChunkStore
+from scripts.retrieve import _fg_result, _hydrate_matches
+
+CHUNKS_DIR = DATA_DIR / "chunks_enriched"
+
+
+def pinecone_metadata(chunk: Dict) -> Dict:
+    """Child metadata exactly as reindex_openai.py upserts it."""
+    return {
+        "focus_group_id": chunk.get("focus_group_id", ""),
+        "participant": chunk.get("participant", ""),
+        "participant_profile": chunk.get("participant_profile", ""),
+        "section": chunk.get("section", ""),
+        "content": chunk.get("content", "")[:1000],
+        "content_original": chunk.get("content_original", chunk.get("content", ""))[:500],
+        "source_file": chunk.get("source_file", ""),
+        "line_number": chunk.get("line_number", 0),
+        "preceding_moderator_q": chunk.get("preceding_moderator_q", ""),
+        "type": "child",
+    }
+
+
+def build_responses(search_k: int, with_metadata: bool) -> List[bytes]:
+    """One serialized query response per focus group (REST wire format)."""
+    rng = random.Random(0)
+    responses = []
+    for fg_dir in sorted(CHUNKS_DIR.iterdir()):
+        chunks_file = fg_dir / "all_chunks.json"
+        if not chunks_file.exists():
+            continue
+        with open(chunks_file) as f:
+            chunks = json.load(f)
+        candidates = rng.sample(chunks, min(search_k, len(chunks)))
+        scores = sorted((rng.uniform(0.35, 0.85) for _ in candidates), reverse=True)
+
+        matches = []
+        for chunk, score in zip(candidates, scores):
+            match = {"id": chunk["chunk_id"], "score": score, "values": []}
+            if with_metadata:
+                match["metadata"] = pinecone_metadata(chunk)
+            matches.append(match)
+        responses.append(json.dumps(
+            {"matches": matches, "namespace": "openai", "usage": {"readUnits": 6}}
+        ).encode("utf-8"))
+    return responses
+
+
+def run_call(responses: List[bytes], chunk_store, top_k: int, threshold: float) -> int:
+    """Decode every response and build results as retrieve_per_focus_group does."""
+    total = 0
+    for body in responses:
+        data = json.loads(body)
+        matches = [
+            SimpleNamespace(id=m["id"], score=m["score"], metadata=m.get("metadata"))
+            for m in data["matches"]
+        ]
+        matches = [m for m in matches if m.score >= threshold][:top_k]
+        results = [
+            _fg_result(match.id, match.score, meta)
+            for match, meta in _hydrate_matches(matches, chunk_store, None, "openai")
+        ]
+        total += len(results)
+    return total
+
+
+def time_mode(responses: List[bytes], chunk_store, args) -> Dict:
+    run_call(responses, chunk_store, args.top_k, args.threshold)  # warm up
+    timings = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        results = run_call(responses, chunk_store, args.top_k, args.threshold)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "bytes": sum(len(r) for r in responses),
+        "mean_ms": sum(timings) / len(timings),
+        "p95_ms": timings[int(len(timings) * 0.95)],
+        "results": results,
+    }
+
+
+def run_offline(args) -> List:
+    search_k = args.top_k * 2  # retrieve_per_focus_group without reranker
+    store = ChunkStore.open()
+    return [
+        ("metadata", time_mode(build_responses(search_k, True), None, args)),
+        ("hydrated", time_mode(build_responses(search_k, False), store, args)),
+    ]
+
+
+def run_live(args) -> List:
+    from scripts.retrieve import FocusGroupRetrieverV2
+
+    retriever = FocusGroupRetrieverV2(use_router=False, verbose=False)
+    store = retriever.chunk_store
+    embedding = retriever._embed_query(args.query)
+
+    # Measure the wire size of every query response
+    index = retriever.index
+    sizes: List[int] = []
+
+    class MeasuringIndex:
+        def __getattr__(self, name):
+            return getattr(index, name)
+
+        def query(self, **kwargs):
+            response = index.query(**kwargs)
+            sizes.append(len(json.dumps(response.to_dict(), default=str)))
+            return response
+
+    retriever.index = MeasuringIndex()
+
+    rows = []
+    for name, chunk_store in (("metadata", None), ("hydrated", store)):
+        retriever.chunk_store = chunk_store
+        timings = []
+        for _ in range(args.iterations):
+            sizes.clear()
+            start = time.perf_counter()
+            results = retriever.retrieve_per_focus_group(
+                args.query, top_k_per_fg=args.top_k, score_threshold=args.threshold,
+                query_embedding=embedding
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        rows.append((name, {
+            "bytes": sum(sizes),
+            "mean_ms": sum(timings) / len(timings),
+            "p95_ms": timings[int(len(timings) * 0.95)],
+            "results": sum(len(c) for c in results.values()),
+        }))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunk hydration vs Pinecone metadata")
+    parser.add_argument("--top-k", type=int, default=5, help="top_k_per_fg")
+    parser.add_argument("--threshold", type=float, default=FG_SCORE_THRESHOLD)
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Calls per mode (each live call is one query per focus group)")
+    parser.add_argument("--live", action="store_true", help="Query the real Pinecone index")
+    parser.add_argument("--query", default="What did voters say about the economy?")
+    args = parser.parse_args()
+
+    rows = run_live(args) if args.live else run_offline(args)
+
+    baseline = rows[0][1]
+    print("\n" + "=" * 72)
+    print(f"PER retrieve_per_focus_group CALL ({'live' if args.live else 'offline'}, "
+          f"top_k_per_fg={args.top_k}, {args.iterations} iterations)")
+    print("=" * 72)
+    print(f"{'mode':<10} | {'response bytes':>14} | {'mean ms':>8} | {'p95 ms':>8} | {'results':>7} | {'bytes saved':>11}")
+    print("-" * 72)
+    for name, row in rows:
+        saved = 1 - row["bytes"] / baseline["bytes"] if baseline["bytes"] else 0.0
+        print(f"{name:<10} | {row['bytes']:>14,} | {row['mean_ms']:>8.2f} | {row['p95_ms']:>8.2f} | "
+              f"{row['results']:>7} | {saved:>10.0%}")
+    if not args.live:
+        print("\nOffline latency covers JSON decode + result construction only (no network).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark embedding + upsert ingestion against the local stand-in server.
+
+Starts eval/stub_ingest_server.py (rate-limited OpenAI embeddings + Pinecone
+upsert stand-in) and ingests the real corpus texts (chunks + parents, as
+reindex_openai.py builds them) with:
+
+- serial:   the previous flow - OpenAIEmbedder.encode in sequential batches of
+            100 (client-side retries), then upsert 100 vectors at a time
+- pipeline: scripts/ingest.py - token-sized batches, N concurrent embed
+            workers honoring Retry-After, bounded queue, M upsert workers
+
+Each mode runs in a fresh process through the real OpenAI and Pinecone
+clients. Reports throughput against the configured tokens-per-minute limit,
+429s, peak vectors held in memory and peak RSS growth. --scale replicates
+the corpus (with distinct ids) to show memory staying flat.
+
+Usage:
+    python eval/bench_ingest.py
+    python eval/bench_ingest.py --tpm 1000000 --embed-workers 8 --upsert-workers 4
+    python eval/bench_ingest.py --scale 4 --modes pipeline
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+MODES = ["serial", "pipeline"]
+NAMESPACE = "bench"
+
+
+def rss_kb() -> int:
+    """Current resident set size in KB (Linux), 0 if unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def load_items(scale: int) -> List:
+    from scripts.reindex_openai import chunk_item, load_all_chunks, load_hierarchical_parents, parent_item
+
+    items = [chunk_item(c) for c in load_all_chunks()] + [parent_item(p) for p in load_hierarchical_parents()]
+    scaled = []
+    for copy in range(scale):
+        scaled.extend(replace(item, id=f"{item.id}-x{copy}") if copy else item for item in items)
+    return scaled
+
+
+def run_mode(mode: str, args) -> Dict:
+    """Run one ingestion mode in this process (called in a child interpreter)."""
+    import io
+    import contextlib
+
+    from pinecone import Pinecone
+    from scripts.embeddings import OpenAIEmbedder
+    from scripts.ingest import IngestPipeline
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    with contextlib.redirect_stdout(io.StringIO()):
+        items = load_items(args.scale)
+    index = Pinecone(api_key="stub").Index(host=base_url)
+
+    rss_before = rss_kb()
+    start = time.perf_counter()
+
+    if mode == "serial":
+        embedder = OpenAIEmbedder(base_url=f"{base_url}/v1", max_retries=8)
+        embeddings = embedder.encode([item.text for item in items])
+        vectors = [
+            {"id": item.id, "values": embedding, "metadata": item.metadata}
+            for item, embedding in zip(items, embeddings)
+        ]
+        for i in range(0, len(vectors), 100):
+            index.upsert(vectors=vectors[i:i + 100], namespace=NAMESPACE)
+        count, peak_in_flight = len(vectors), len(vectors)
+    else:
+        embedder = OpenAIEmbedder(base_url=f"{base_url}/v1", max_retries=0)
+        pipeline = IngestPipeline(
+            embed_fn=embedder.embed_batch,
+            upsert_fn=lambda vectors: index.upsert(vectors=vectors, namespace=NAMESPACE),
+            embed_workers=args.embed_workers,
+            upsert_workers=args.upsert_workers,
+            max_batch_tokens=args.batch_tokens,
+            verbose=False,
+        )
+        stats = pipeline.run(items)
+        count, peak_in_flight = stats.items, stats.peak_in_flight
+
+    elapsed = time.perf_counter() - start
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "vectors": count,
+        "seconds": elapsed,
+        "tokens": embedder.usage_tokens,
+        "peak_in_flight": peak_in_flight,
+        "rss_growth_kb": max(0, peak_rss_kb - rss_before),
+    }
+
+
+def start_stub(args) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).parent / "stub_ingest_server.py"),
+         "--port", str(args.port), "--tpm", str(args.tpm), "--rpm", str(args.rpm), "--burst", str(args.burst)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/stats", timeout=0.5)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pipelined embed + upsert")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the corpus N times")
+    parser.add_argument("--tpm", type=float, default=5_000_000, help="Stub tokens/min limit")
+    parser.add_argument("--rpm", type=float, default=5000, help="Stub requests/min limit")
+    parser.add_argument("--burst", type=float, default=2.0, help="Stub burst (seconds of limit)")
+    parser.add_argument("--embed-workers", type=int, default=4)
+    parser.add_argument("--upsert-workers", type=int, default=4)
+    parser.add_argument("--batch-tokens", type=int, default=20_000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    server = start_stub(args)
+    rows = []
+    try:
+        for mode in args.modes:
+            httpx.post(f"http://127.0.0.1:{args.port}/stats/reset")
+            time.sleep(args.burst)  # refill the stub's buckets between modes
+            output = subprocess.run(
+                [sys.executable, __file__, *sys.argv[1:], "--mode", mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            stub = httpx.get(f"http://127.0.0.1:{args.port}/stats").json()
+            row["rate_limited"] = stub["embed_rate_limited"] + stub["upsert_rate_limited"]
+            row["peak_upserts"] = stub["peak_upsert_concurrency"]
+            rows.append(row)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("\n" + "=" * 96)
+    print(f"INGESTION ({rows[0]['vectors']} vectors, stub limit {args.tpm:,.0f} tokens/min, "
+          f"{args.embed_workers} embed / {args.upsert_workers} upsert workers)")
+    print("=" * 96)
+    print(f"{'mode':<9} | {'seconds':>7} | {'vectors/s':>9} | {'tokens/min':>11} | {'% limit':>7} | "
+          f"{'429s':>5} | {'in flight':>9} | {'RSS +MB':>7} | {'speedup':>7}")
+    print("-" * 96)
+    baseline = rows[0]["seconds"]
+    for row in rows:
+        tpm = row["tokens"] / row["seconds"] * 60
+        print(f"{row['mode']:<9} | {row['seconds']:>7.1f} | {row['vectors'] / row['seconds']:>9.0f} | "
+              f"{tpm:>11,.0f} | {tpm / args.tpm:>6.0%} | {row['rate_limited']:>5} | "
+              f"{row['peak_in_flight']:>9} | {row['rss_growth_kb'] / 1024:>7.1f} | "
+              f"{baseline / row['seconds']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Measure the per-observation cost of the in-process metrics (api/metrics.py).
+
+Times, per call (best of --repeats runs of --n calls each):
+- histogram observe on a cached series
+- labels() lookup + observe (what QueryTracer.step does)
+- counter inc via labels()
+- a full QueryTracer.step() with and without the histogram, to isolate
+  what metrics add to a traced step
+- rendering /metrics
+
+Usage:
+    python eval/bench_metrics.py
+    python eval/bench_metrics.py --n 200000 --threads 4
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import observability
+from api.metrics import CACHE_LOOKUPS, STEP_SECONDS, MetricsRegistry, metrics
+from api.observability import QueryTracer
+
+
+def per_call_us(fn: Callable[[int], None], n: int, repeats: int, threads: int = 1) -> float:
+    """Best-of-repeats microseconds per call (threads split the n calls)."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        if threads == 1:
+            fn(n)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(fn, [n // threads] * threads))
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+class _NoopSeries:
+    def observe(self, value):
+        pass
+
+
+class _NoopFamily:
+    def labels(self, *values):
+        return _NoopSeries()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-observation overhead of api/metrics.py")
+    parser.add_argument("--n", type=int, default=100_000, help="Calls per timed run")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent observer threads")
+    args = parser.parse_args()
+
+    series = STEP_SECONDS.labels("bench", "success")
+
+    def observe(n):
+        for _ in range(n):
+            series.observe(0.042)
+
+    def labels_observe(n):
+        for _ in range(n):
+            STEP_SECONDS.labels("bench", "success").observe(0.042)
+
+    def counter_inc(n):
+        for _ in range(n):
+            CACHE_LOOKUPS.labels("bench", "hit").inc()
+
+    # Unsampled, so the step is timing + histogram only (eval/bench_tracing.py covers spans)
+    tracer = QueryTracer("bench query", sampled=False)
+
+    def traced_step(n):
+        for _ in range(n):
+            with tracer.step("bench"):
+                pass
+
+    rows = [
+        ("histogram observe", per_call_us(observe, args.n, args.repeats, args.threads)),
+        ("labels() + observe", per_call_us(labels_observe, args.n, args.repeats, args.threads)),
+        ("labels() + counter inc", per_call_us(counter_inc, args.n, args.repeats, args.threads)),
+    ]
+
+    # Traced step with and without the histogram (single thread: the tracer isn't shared across threads)
+    step_with = per_call_us(traced_step, args.n // 4, args.repeats)
+    original = observability.STEP_SECONDS
+    observability.STEP_SECONDS = _NoopFamily()
+    try:
+        step_without = per_call_us(traced_step, args.n // 4, args.repeats)
+    finally:
+        observability.STEP_SECONDS = original
+    rows += [
+        ("QueryTracer.step (with metrics)", step_with),
+        ("QueryTracer.step (no metrics)", step_without),
+        ("  -> metrics share of a step", step_with - step_without),
+    ]
+
+    # Scrape cost with a realistic number of series
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "bench", ("endpoint", "status"))
+    for endpoint in range(20):
+        for status in ("200", "429", "503"):
+            histogram.labels(f"/endpoint/{endpoint}", status).observe(0.1)
+    start = time.perf_counter()
+    for _ in range(100):
+        registry.render()
+    render_ms = (time.perf_counter() - start) / 100 * 1000
+
+    print("\n" + "=" * 60)
+    print(f"METRICS OVERHEAD ({args.n:,} calls, best of {args.repeats}, {args.threads} thread(s))")
+    print("=" * 60)
+    print(f"{'operation':<36} | {'us / call':>10}")
+    print("-" * 60)
+    for name, us in rows:
+        print(f"{name:<36} | {us:>10.2f}")
+    print(f"{'render /metrics (60 histograms)':<36} | {render_ms * 1000:>10.0f}")
+    print(f"\nCurrent registry: {len(metrics.render().splitlines())} /metrics lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure what the on-demand profiler (api/profiling.py) costs.
+
+- idle: ProfilingMiddleware around a no-op ASGI app with no session running,
+  against the bare app - what every request pays when the profiler is
+  compiled in (PROFILING_TOKEN set) but unused
+- sampling: throughput of CPU-bound worker threads (a BM25-like scoring
+  loop) with the sampler off and running at several intervals, plus the
+  sampler's own time share as the session reports it. Configurations are
+  interleaved across --repeats rounds and medians reported, since thread
+  throughput on a small box drifts by more than the effect being measured.
+
+Usage:
+    python eval/bench_profiler.py
+    python eval/bench_profiler.py --threads 8 --seconds 3 --intervals 1 5 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("PROFILING_TOKEN", "bench")
+
+from api.profiling import ProfilingMiddleware, profiler
+
+
+def idle_overhead_us(n: int) -> tuple:
+    """(bare app, with middleware) microseconds per request, no session running."""
+    scope = {
+        "type": "http", "method": "POST", "path": "/search/unified",
+        "headers": [(b"host", b"api"), (b"content-type", b"application/json"), (b"user-agent", b"bench"),
+                    (b"accept", b"*/*"), (b"origin", b"https://campaign-intel.vercel.app")],
+    }
+
+    async def app(scope, receive, send):
+        pass
+
+    async def run(handler):
+        start = time.perf_counter()
+        for _ in range(n):
+            await handler(scope, None, None)
+        return (time.perf_counter() - start) / n * 1e6
+
+    bare = min(asyncio.run(run(app)) for _ in range(3))
+    wrapped = min(asyncio.run(run(ProfilingMiddleware(app))) for _ in range(3))
+    return bare, wrapped
+
+
+def work_rate(threads: int, seconds: float) -> float:
+    """Scoring iterations per second across `threads` CPU-bound threads."""
+    stop = threading.Event()
+    counts = [0] * threads
+    postings = {f"term{i}": list(range(i, 2000, 7)) for i in range(50)}
+
+    def worker(slot: int):
+        while not stop.is_set():
+            scores = {}
+            for term in ("term3", "term17", "term42"):
+                for doc in postings[term]:
+                    scores[doc] = scores.get(doc, 0.0) + 1.2 / (1 + doc % 13)
+            sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:10]
+            counts[slot] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Idle and sampling overhead of the on-demand profiler")
+    parser.add_argument("--n", type=int, default=200_000, help="Requests for the idle middleware timing")
+    parser.add_argument("--threads", type=int, default=4, help="CPU-bound worker threads while sampling")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Seconds per sampling run")
+    parser.add_argument("--intervals", type=float, nargs="+", default=[1.0, 5.0, 10.0], help="Sampling intervals (ms)")
+    parser.add_argument("--repeats", type=int, default=3, help="Interleaved rounds per configuration")
+    args = parser.parse_args()
+
+    bare, wrapped = idle_overhead_us(args.n)
+
+    runs = {interval: [] for interval in [None] + args.intervals}
+    for _ in range(args.repeats):
+        for interval in runs:
+            if interval is None:
+                runs[None].append((work_rate(args.threads, args.seconds), 0, 0.0, 0))
+                continue
+            profiler.start(seconds=args.seconds + 1, interval_ms=interval)
+            rate = work_rate(args.threads, args.seconds)
+            profiler.stop()
+            session = profiler.session.to_dict()
+            runs[interval].append((rate, session["samples"], session["sampler_overhead_pct"], len(profiler.stacks)))
+
+    def median(interval, column):
+        return statistics.median(run[column] for run in runs[interval])
+
+    baseline = median(None, 0)
+    baseline_runs = [run[0] for run in runs[None]]
+    spread = (max(baseline_runs) - min(baseline_runs)) / 2 / baseline
+    rows = [
+        (interval, median(interval, 0), median(interval, 1), median(interval, 2), median(interval, 3))
+        for interval in args.intervals
+    ]
+
+    print("\n" + "=" * 72)
+    print("PROFILER OVERHEAD")
+    print("=" * 72)
+    print(f"Idle middleware: {wrapped - bare:.2f} us / request "
+          f"(bare ASGI call {bare:.2f} us, wrapped {wrapped:.2f} us)")
+    print(f"\nSampling, {args.threads} CPU-bound threads, {args.seconds:.0f}s per run, "
+          f"median of {args.repeats} interleaved runs:")
+    print(f"{'interval':>9} | {'work/s':>9} | {'slowdown':>8} | {'samples/s':>9} | {'sampler %':>9} | {'stacks':>6}")
+    print("-" * 72)
+    print(f"{'off':>9} | {baseline:>9,.0f} | {'-':>8} | {'-':>9} | {'-':>9} | {'-':>6}")
+    for interval, rate, samples, sampler_pct, stacks in rows:
+        print(f"{interval:>6.0f} ms | {rate:>9,.0f} | {1 - rate / baseline:>8.1%} | {samples / args.seconds:>9.0f} | "
+              f"{sampler_pct:>8.2f}% | {stacks:>6.0f}")
+    print(f"\nRun-to-run spread of the baseline: +/-{spread:.1%} (slowdowns inside it are noise)")
+    print("samples/s below 1000/interval: the sampler thread waits for the GIL behind busy threads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval latency benchmark with JSON baselines and a regression gate.
+
+Replays eval/test_queries.json and eval/hybrid_test_queries.json through the
+real retrievers with the network cut out: Pinecone and the embedding API are
+replaced by eval/local_backend.py (recorded vectors when
+eval/fixtures/retrieval_embeddings.npz exists, deterministic synthetic ones
+otherwise). The router and reranker are off, so every run does the same work.
+
+Retrievers, one call per query:
+- dense: FocusGroupRetrieverV2.retrieve (direct child search + hydration)
+- bm25: BM25Retriever.retrieve
+- hybrid: HybridFocusGroupRetriever.retrieve (dense + BM25 + RRF fusion)
+- per_fg: FocusGroupRetrieverV2.retrieve_per_focus_group (one query per focus group)
+- strategy: StrategyMemoRetriever.retrieve_grouped (parents -> children)
+
+Each retriever gets --warmup untimed passes over the query set, then
+--iterations timed passes; every call is timed on its own (perf_counter).
+Reported: p50/p95/p99/mean over all calls, throughput (calls / wall time,
+one thread), and q-p50/q-p95 - percentiles across queries of each query's
+median latency, which ignore one-off stalls and are what the gate checks. Local vector search is part of the timing, so numbers measure this
+repo's code plus a fixed in-memory search, not Pinecone.
+
+Baselines are this run's JSON. --check compares against one and exits 1
+when a gated metric got slower by more than --max-regression (and by more
+than --min-delta-ms, so sub-millisecond jitter can't fail a run). Compare
+runs from the same machine and backend only: each run also times a fixed
+calibration loop, and the comparison says when the machine itself is running
+faster or slower than it did for the baseline.
+
+Usage:
+    python eval/bench_retrieval.py
+    python eval/bench_retrieval.py --save-baseline                 # on main
+    python eval/bench_retrieval.py --check --max-regression 0.15   # on a branch
+    python eval/bench_retrieval.py --retrievers dense hybrid --iterations 20 --output run.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import EVAL_DIR
+from eval.local_backend import FIXTURE_PATH, install_local_backend, load_query_set
+
+BASELINE_PATH = EVAL_DIR / "baselines" / "retrieval.json"
+RETRIEVERS = ["dense", "bm25", "hybrid", "per_fg", "strategy"]
+GATE_METRICS = ["query_p50_ms", "query_p95_ms"]
+
+
+def build_calls(top_k: int, per_fg_threshold: float, strategy_threshold: float) -> Dict[str, Callable[[str], int]]:
+    """Retriever name -> call(query) returning the number of results."""
+    from scripts.retrieval.bm25 import BM25Retriever
+    from scripts.retrieval.hybrid import HybridFocusGroupRetriever
+    from scripts.retrieve import FocusGroupRetrieverV2, StrategyMemoRetriever
+
+    fg = FocusGroupRetrieverV2(use_router=False)
+    bm25 = BM25Retriever()
+    hybrid = HybridFocusGroupRetriever(use_router=False)
+    strategy = StrategyMemoRetriever()
+
+    return {
+        "dense": lambda q: len(fg.retrieve(q, top_k=top_k)),
+        "bm25": lambda q: len(bm25.retrieve(q, top_k=top_k)),
+        "hybrid": lambda q: len(hybrid.retrieve(q, top_k=top_k)),
+        "per_fg": lambda q: sum(map(len, fg.retrieve_per_focus_group(
+            q, top_k_per_fg=top_k, score_threshold=per_fg_threshold).values())),
+        "strategy": lambda q: sum(len(g.chunks) for g in strategy.retrieve_grouped(
+            q, top_k=top_k * 2, score_threshold=strategy_threshold)),
+    }
+
+
+def calibrate(rounds: int = 7) -> float:
+    """Milliseconds for a fixed dict/sort/numpy workload (best of rounds): this machine's speed right now."""
+    matrix = np.random.default_rng(0).standard_normal((2000, 256)).astype(np.float32)
+    vector = matrix[0]
+    best = float("inf")
+    for _ in range(rounds):
+        tick = time.perf_counter()
+        for _ in range(20):
+            scores = {}
+            for doc in range(0, 4000, 3):
+                scores[doc] = scores.get(doc, 0.0) + 1.2 / (1 + doc % 13)
+            sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:10]
+            np.argsort(-(matrix @ vector))[:10]
+        best = min(best, time.perf_counter() - tick)
+    return round(best * 1000, 3)
+
+
+def bench(call: Callable[[str], int], queries: List[str], warmup: int, iterations: int) -> Dict[str, Any]:
+    """Warmup passes, then timed passes; latency stats per call."""
+    for _ in range(warmup):
+        for query in queries:
+            call(query)
+    gc.collect()
+
+    latencies = np.zeros((iterations, len(queries)))
+    results = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        for j, query in enumerate(queries):
+            tick = time.perf_counter()
+            results += call(query)
+            latencies[i, j] = time.perf_counter() - tick
+    wall = time.perf_counter() - started
+
+    ms = latencies * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    # Each query's median over the iterations drops one-off stalls (GC, scheduler),
+    # so percentiles across queries move only when the code does: the gate uses these
+    query_p50, query_p95 = np.percentile(np.median(ms, axis=0), [50, 95])
+    return {
+        "calls": ms.size,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "query_p50_ms": round(float(query_p50), 3),
+        "query_p95_ms": round(float(query_p95), 3),
+        "throughput_qps": round(ms.size / wall, 1),
+        "mean_results": round(results / ms.size, 2),
+    }
+
+
+def compare(baseline: Dict, current: Dict, gates: List[str], max_regression: float, min_delta_ms: float) -> List[str]:
+    """Print current vs baseline; return the regressions that fail the gate."""
+    failures = []
+    print(f"\nvs baseline {baseline['created']} ({baseline['backend']}, {baseline['host']['platform']})")
+    speed = current["calibration_ms"] / baseline["calibration_ms"] - 1
+    if abs(speed) > 0.10:
+        print(f"Note: the calibration loop is {speed:+.0%} vs the baseline run - the machine itself is "
+              f"{'slower' if speed > 0 else 'faster'}, so changes of that size are not the code")
+    print(f"{'retriever':<10} | {'metric':<12} | {'baseline':>9} | {'current':>9} | {'change':>8} | status")
+    print("-" * 69)
+    for name, stats in current["retrievers"].items():
+        base = baseline["retrievers"].get(name)
+        if base is None:
+            print(f"{name:<10} | {'-':<12} | {'-':>9} | {'-':>9} | {'-':>8} | new")
+            continue
+        for metric in gates:
+            change = stats[metric] / base[metric] - 1 if base[metric] else 0.0
+            regressed = change > max_regression and stats[metric] - base[metric] > min_delta_ms
+            if regressed:
+                failures.append(f"{name} {metric}: {base[metric]:.2f} -> {stats[metric]:.2f} ms ({change:+.1%})")
+            print(f"{name:<10} | {metric:<12} | {base[metric]:>9.2f} | {stats[metric]:>9.2f} | {change:>+8.1%} | "
+                  f"{'REGRESSED' if regressed else 'ok'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval latency benchmark with regression gate")
+    parser.add_argument("--retrievers", nargs="+", choices=RETRIEVERS, default=RETRIEVERS)
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed passes over the query set")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed passes over the query set")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--per-fg-threshold", type=float, default=0.5, help="retrieve_per_focus_group score threshold")
+    parser.add_argument("--strategy-threshold", type=float, default=0.5, help="retrieve_grouped score threshold")
+    parser.add_argument("--synthetic", action="store_true", help="Synthetic vectors even if the fixture exists")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a gated metric regressed vs --baseline")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="Allowed slowdown (0.20 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.25, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--gate", nargs="+", default=GATE_METRICS, help="Metrics the gate checks")
+    parser.add_argument("--output", type=Path, help="Also write this run's JSON here")
+    args = parser.parse_args()
+
+    print("Loading local backend...")
+    backend = install_local_backend(FIXTURE_PATH, synthetic=args.synthetic)
+    queries = [q["query"] for q in load_query_set()]
+    calls = build_calls(args.top_k, args.per_fg_threshold, args.strategy_threshold)
+
+    run = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "backend": backend.describe(),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "calibration_ms": calibrate(),
+        "settings": {"warmup": args.warmup, "iterations": args.iterations},
+        "workload": {
+            "queries": len(queries),
+            "top_k": args.top_k,
+            "per_fg_threshold": args.per_fg_threshold,
+            "strategy_threshold": args.strategy_threshold,
+        },
+        "retrievers": {},
+    }
+    for name in args.retrievers:
+        print(f"  {name}...")
+        run["retrievers"][name] = bench(calls[name], queries, args.warmup, args.iterations)
+
+    print("\n" + "=" * 90)
+    print(f"RETRIEVAL LATENCY ({backend.describe()}; {len(queries)} queries x {args.iterations} iterations)")
+    print("=" * 90)
+    print(f"{'retriever':<10} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'mean ms':>7} | "
+          f"{'q-p50 ms':>8} | {'q-p95 ms':>8} | {'qps':>7} | {'results':>7}")
+    print("-" * 90)
+    for name, stats in run["retrievers"].items():
+        print(f"{name:<10} | {stats['p50_ms']:>7.2f} | {stats['p95_ms']:>7.2f} | {stats['p99_ms']:>7.2f} | "
+              f"{stats['mean_ms']:>7.2f} | {stats['query_p50_ms']:>8.2f} | {stats['query_p95_ms']:>8.2f} | "
+              f"{stats['throughput_qps']:>7.1f} | {stats['mean_results']:>7.2f}")
+    print("q-p50/q-p95: percentiles of each query's median over the iterations (what --check gates on)")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"\nWrote {args.output}")
+
+    failures = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["backend"] != run["backend"] or baseline["workload"] != run["workload"]:
+            print(f"\nBaseline {args.baseline} was recorded with a different backend or workload:")
+            print(f"  baseline: {baseline['backend']}, {baseline['workload']}")
+            print(f"  current:  {run['backend']}, {run['workload']}")
+            if args.check:
+                sys.exit(2)
+        else:
+            failures = compare(baseline, run, args.gate, args.max_regression, args.min_delta_ms)
+    elif args.check:
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline first)")
+        sys.exit(2)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"\nSaved baseline {args.baseline}")
+
+    if failures:
+        print(f"\n{len(failures)} regression(s) over {args.max_regression:.0%}:")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark /search/unified response serialization.
+
+Compares the cost of turning retrieval results into JSON bytes:
+
+- pydantic: the previous path - copy every RetrievalResult field by field into
+  a RetrievalChunk, wrap in GroupedResult/UnifiedSearchResponse, revalidate at
+  the response_model boundary, jsonable_encoder, json.dumps
+- direct:   the current path - dicts of slotted dataclasses handed straight to
+  api.serialization.dumps (orjson, or stdlib json when orjson is missing)
+
+Chunks are real focus group chunks from data/chunks_enriched (synthetic
+filler if the directory is missing), so payload sizes match production.
+
+Usage:
+    python eval/bench_serialization.py                      # 37 groups x 5 chunks
+    python eval/bench_serialization.py --groups 10 --chunks 3 --iterations 500
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+import api.serialization as serialization
+from api.schemas import GroupedResult, RetrievalChunk, UnifiedSearchResponse
+from eval.config import DATA_DIR
+from scripts.retrieve import RetrievalResult
+
+CHUNKS_DIR = DATA_DIR / "chunks_enriched"
+
+
+def load_results(groups: int, chunks_per_group: int) -> Dict[str, List[RetrievalResult]]:
+    """results_by_fg as retrieve_per_focus_group would return it."""
+    rng = random.Random(0)
+    results_by_fg: Dict[str, List[RetrievalResult]] = {}
+
+    fg_dirs = sorted(CHUNKS_DIR.iterdir()) if CHUNKS_DIR.exists() else []
+    for fg_dir in fg_dirs[:groups]:
+        chunks_file = fg_dir / "all_chunks.json"
+        if not chunks_file.exists():
+            continue
+        with open(chunks_file) as f:
+            chunks = json.load(f)
+        results_by_fg[fg_dir.name] = [
+            RetrievalResult(
+                chunk_id=c["chunk_id"],
+                score=rng.uniform(0.5, 0.9),
+                content=c["content"],
+                content_original=c.get("content_original", ""),
+                focus_group_id=c["focus_group_id"],
+                participant=c["participant"],
+                participant_profile=c["participant_profile"],
+                section=c["section"],
+                source_file=c["source_file"],
+                line_number=int(c["line_number"]),
+                preceding_moderator_q=c.get("preceding_moderator_q", ""),
+            )
+            for c in chunks[:chunks_per_group]
+        ]
+
+    # Synthetic filler when the corpus has fewer groups than requested
+    while len(results_by_fg) < groups:
+        fg_id = f"race-999-fg-{len(results_by_fg):03d}-synthetic"
+        results_by_fg[fg_id] = [
+            RetrievalResult(
+                chunk_id=f"{fg_id}-chunk-{i:03d}",
+                score=rng.uniform(0.5, 0.9),
+                content="[Synthetic | P1: F, 52, Small business owner]\n\"" + "lorem ipsum " * 60 + "\"",
+                content_original="lorem ipsum " * 60,
+                focus_group_id=fg_id,
+                participant="P1",
+                participant_profile="F, 52, Small business owner",
+                section="Opening: General Political Environment",
+                source_file=f"races/race-999/focus-groups/{fg_id}.md",
+                line_number=10 * i,
+                preceding_moderator_q="What's on your mind?",
+            )
+            for i in range(chunks_per_group)
+        ]
+    return results_by_fg
+
+
+def fg_metadata(fg_id: str) -> Dict:
+    return {"focus_group_id": fg_id, "location": fg_id.split("-fg-")[-1], "date": "2022-09-14",
+            "race_name": "Michigan Governor 2022", "outcome": "win"}
+
+
+STATS = {"retrieval_time_ms": 812, "focus_groups_count": 0, "races_count": 0,
+         "routed_to": "quotes", "outcome_filter": None, "cached": False}
+
+
+def pydantic_path(results_by_fg: Dict[str, List[RetrievalResult]]) -> bytes:
+    """Previous path: per-chunk models + response_model revalidation + json.dumps."""
+    quotes = []
+    for fg_id, chunks in results_by_fg.items():
+        api_chunks = [
+            RetrievalChunk(
+                chunk_id=c.chunk_id, score=c.score, content=c.content,
+                content_original=c.content_original, focus_group_id=c.focus_group_id,
+                participant=c.participant, participant_profile=c.participant_profile,
+                section=c.section, source_file=c.source_file, line_number=c.line_number,
+                preceding_moderator_q=c.preceding_moderator_q
+            )
+            for c in chunks
+        ]
+        quotes.append(GroupedResult(
+            focus_group_id=fg_id, focus_group_metadata=fg_metadata(fg_id), chunks=api_chunks
+        ))
+    response = UnifiedSearchResponse(content_type="quotes", quotes=quotes, lessons=[], stats=STATS)
+
+    # What FastAPI's serialize_response does with a response_model
+    validated = UnifiedSearchResponse.model_validate(response.model_dump())
+    content = jsonable_encoder(validated)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def direct_path(results_by_fg: Dict[str, List[RetrievalResult]]) -> bytes:
+    """Current path: dataclasses serialized straight to bytes."""
+    quotes = [
+        {"focus_group_id": fg_id, "focus_group_metadata": fg_metadata(fg_id), "chunks": chunks}
+        for fg_id, chunks in results_by_fg.items()
+    ]
+    return serialization.dumps({"content_type": "quotes", "quotes": quotes, "lessons": [], "stats": STATS})
+
+
+def time_path(fn: Callable, results_by_fg: Dict, iterations: int) -> Dict:
+    fn(results_by_fg)  # warm up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = fn(results_by_fg)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return {
+        "mean_us": sum(timings) / len(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p95_us": timings[int(len(timings) * 0.95)],
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search response serialization")
+    parser.add_argument("--groups", type=int, default=37, help="Focus groups per response")
+    parser.add_argument("--chunks", type=int, default=5, help="Chunks per focus group")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results_by_fg = load_results(args.groups, args.chunks)
+    total_chunks = sum(len(c) for c in results_by_fg.values())
+
+    rows = [("pydantic + json", time_path(pydantic_path, results_by_fg, args.iterations))]
+    orjson_module = serialization.orjson
+    if orjson_module is not None:
+        rows.append(("direct + orjson", time_path(direct_path, results_by_fg, args.iterations)))
+    # Fallback used when orjson isn't installed
+    serialization.orjson = None
+    try:
+        rows.append(("direct + json", time_path(direct_path, results_by_fg, args.iterations)))
+    finally:
+        serialization.orjson = orjson_module
+
+    # Both paths must produce the same document
+    assert json.loads(pydantic_path(results_by_fg)) == json.loads(direct_path(results_by_fg))
+
+    baseline = rows[0][1]["mean_us"]
+    print("\n" + "=" * 72)
+    print(f"SERIALIZATION COST PER RESPONSE ({len(results_by_fg)} groups x {args.chunks} chunks "
+          f"= {total_chunks} chunks, {args.iterations} iterations)")
+    print("=" * 72)
+    print(f"{'path':<18} | {'mean µs':>9} | {'p50 µs':>9} | {'p95 µs':>9} | {'bytes':>8} | {'speedup':>7}")
+    print("-" * 72)
+    for name, row in rows:
+        print(f"{name:<18} | {row['mean_us']:>9.0f} | {row['p50_us']:>9.0f} | {row['p95_us']:>9.0f} | "
+              f"{row['bytes']:>8} | {baseline / row['mean_us']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
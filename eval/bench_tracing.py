@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure what tracing (scripts/tracing.py, api/observability.py) costs a query.
+
+Replays the span shape of one /search/unified request - routing, embedding,
+per-focus-group vector queries with hydration, strategy retrieval, rerank,
+plus the tracer's events - with no real work inside, so the numbers are pure
+tracing overhead:
+
+- untraced:   the same control flow with tracing bypassed (baseline)
+- unsampled:  QueryTracer with sampled=False (what 1 - TRACE_SAMPLE_RATE of queries pay)
+- sampled:    QueryTracer with sampled=True, up to handing the trace to the exporter
+- export:     background cost to format one trace (log line + OTLP/JSON), off the request path
+
+The exporter thread is detached during the timed runs: at benchmark rates it
+would format thousands of traces a second and mostly measure GIL contention.
+At real query rates its share is the export rows times the sampled query rate.
+
+Usage:
+    python eval/bench_tracing.py
+    python eval/bench_tracing.py --n 20000 --focus-groups 12
+"""
+
+import argparse
+import contextlib
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api import observability
+from api.observability import QueryTracer, trace_to_log, traces_to_otlp
+from scripts.tracing import span
+
+
+def per_call_us(fn: Callable[[], None], n: int, repeats: int) -> float:
+    """Best-of-repeats microseconds per call."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def simulated_query(tracer, focus_groups: int):
+    """The span/event shape of one unified search (no I/O)."""
+    with tracer.step("routing"):
+        with span("router_llm", model="bench"):
+            pass
+        tracer.log("router_decision", {"content_type": "both", "outcome_filter": None})
+    with tracer.step("embedding"):
+        with span("embed"):
+            pass
+    with tracer.step("fg_retrieval"):
+        for i in range(focus_groups):
+            with span("vector_query", focus_group_id=f"fg-{i}") as s:
+                s.set(matches=20)
+            with span("hydrate", matches=5):
+                pass
+        tracer.log("fg_results", {"focus_groups": focus_groups, "total_quotes": focus_groups * 5})
+    with tracer.step("strategy_retrieval"):
+        for level in ("parent", "child"):
+            with span("vector_query", level=level) as s:
+                s.set(matches=20)
+        with span("rerank", candidates=40, top_k=10):
+            pass
+        tracer.log("strategy_results", {"races": 4, "total_lessons": 12})
+    return tracer.complete({"content_type": "both", "fg_count": focus_groups, "races_count": 4})
+
+
+class _Untraced:
+    """QueryTracer stand-in that does nothing: the control-flow baseline."""
+
+    def step(self, name):
+        return contextlib.nullcontext()
+
+    def log(self, event, data):
+        pass
+
+    def complete(self, summary):
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-query overhead of nested span tracing")
+    parser.add_argument("--n", type=int, default=5000, help="Simulated queries per timed run")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--focus-groups", type=int, default=8, help="Per-group vector queries per query")
+    args = parser.parse_args()
+
+    # Detach the exporter during the timed runs; formatting is measured separately below
+    finished = []
+    observability.exporter.submit = lambda trace: finished.append(trace) if not finished else None
+
+    untraced = per_call_us(lambda: simulated_query(_Untraced(), args.focus_groups), args.n, args.repeats)
+    unsampled = per_call_us(
+        lambda: simulated_query(QueryTracer("bench query", sampled=False), args.focus_groups), args.n, args.repeats
+    )
+    sampled = per_call_us(
+        lambda: simulated_query(QueryTracer("bench query", sampled=True), args.focus_groups), args.n, args.repeats
+    )
+
+    # One representative trace, formatted the way the exporter thread does it
+    trace = finished[0]
+    export_log = per_call_us(lambda: observability.json.dumps(trace_to_log(trace)), args.n // 5, args.repeats)
+    export_otlp = per_call_us(lambda: observability.json.dumps(traces_to_otlp([trace])), args.n // 5, args.repeats)
+
+    spans = len(trace.spans)
+    print("\n" + "=" * 64)
+    print(f"TRACING OVERHEAD ({args.n:,} queries, {spans} spans each, best of {args.repeats})")
+    print("=" * 64)
+    print(f"{'mode':<30} | {'us / query':>10} | {'over baseline':>13}")
+    print("-" * 64)
+    print(f"{'untraced (baseline)':<30} | {untraced:>10.1f} | {'-':>13}")
+    print(f"{'unsampled':<30} | {unsampled:>10.1f} | {unsampled - untraced:>10.1f} us")
+    print(f"{'sampled (request path)':<30} | {sampled:>10.1f} | {sampled - untraced:>10.1f} us")
+    print(f"{'export: log line (bg thread)':<30} | {export_log:>10.1f} |")
+    print(f"{'export: OTLP/JSON (bg thread)':<30} | {export_otlp:>10.1f} |")
+    print(f"\nPer sampled span on the request path: {(sampled - untraced) / spans:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Memory per worker of multi-worker serving, at 1, 2, 4 and 8 workers.
+
+For each mode and worker count: start the API against the stub upstreams
+(eval/stub_upstreams.py, started once), wait until every worker is ready,
+send --requests searches and corpus listings over fresh connections (so
+every worker serves some), then read /proc/<pid>/smaps_rollup of the
+supervisor and each worker:
+
+- RSS: resident pages; a page shared by N processes counts in full N times
+- PSS: shared pages split evenly between the processes mapping them;
+  summed over the processes it is the real footprint of the deployment
+- USS: pages private to the process (Private_Clean + Private_Dirty): what
+  one more worker costs at least
+
+Modes:
+- uvicorn:          `uvicorn --workers N` - spawned interpreters, nothing shared
+- prefork-private:  `python -m api.serve --no-shared-index` - forked after
+                    the imports (shared code), every worker builds its indexes
+- prefork:          `python -m api.serve` - forked, plus the shared index
+                    segments (BM25, chunk id indexes, registry)
+
+Hybrid retrieval is on (so BM25 is built or attached); rate limiting is off.
+"+/worker" is the slope of total PSS from 1 worker; "fit 512MB" extrapolates
+it to the production container.
+
+Usage:
+    python eval/bench_workers.py
+    python eval/bench_workers.py --workers 1,2,4 --modes uvicorn,prefork --requests 400
+    python eval/bench_workers.py --json eval/results/bench_workers.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.load_test import HOST, READY_TIMEOUT, free_port, wait_for
+from eval.stub_upstreams import STUB_FLAGS, add_stub_arguments
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MODES = ("uvicorn", "prefork-private", "prefork")
+MEMORY_LIMIT_MB = 512
+MB = 1024  # smaps_rollup reports kB
+
+
+@dataclass
+class ProcessMemory:
+    pid: int
+    rss_mb: float
+    pss_mb: float
+    uss_mb: float
+
+
+@dataclass
+class WorkerRun:
+    mode: str
+    workers: int
+    startup_seconds: float
+    requests: int
+    errors: int
+    supervisor: Optional[ProcessMemory]
+    processes: List[ProcessMemory] = field(default_factory=list)
+
+    @property
+    def total_pss_mb(self) -> float:
+        own = self.supervisor.pss_mb if self.supervisor else 0.0
+        return own + sum(p.pss_mb for p in self.processes)
+
+    def mean(self, attr: str) -> float:
+        return sum(getattr(p, attr) for p in self.processes) / len(self.processes) if self.processes else 0.0
+
+
+# ============ /proc ============
+
+def process_memory(pid: int) -> Optional[ProcessMemory]:
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                match = re.match(r"(\w+):\s+(\d+) kB", line)
+                if match:
+                    fields[match.group(1)] = int(match.group(2))
+    except OSError:
+        return None
+    return ProcessMemory(
+        pid=pid,
+        rss_mb=round(fields.get("Rss", 0) / MB, 1),
+        pss_mb=round(fields.get("Pss", 0) / MB, 1),
+        uss_mb=round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / MB, 1),
+    )
+
+
+def child_pids(parent: int) -> List[int]:
+    """Direct children of a process (scans /proc/*/stat for the parent pid)."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        # multiprocessing's resource tracker isn't a worker
+        if ppid == parent and b"resource_tracker" not in cmdline:
+            children.append(int(entry))
+    return sorted(children)
+
+
+# ============ Runs ============
+
+def server_command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "api.main:app", "--host", HOST, "--port", str(port),
+                "--log-level", "warning", "--workers", str(workers)]
+    command = [sys.executable, "-m", "api.serve", "--host", HOST, "--port", str(port),
+               "--log-level", "warning", "--workers", str(workers)]
+    if mode == "prefork-private":
+        command.append("--no-shared-index")
+    return command
+
+
+def drive(url: str, queries: List[str], count: int, concurrency: int) -> int:
+    """Send count requests (searches and /corpus, alternating) on fresh connections. Returns errors."""
+    def send(i: int) -> bool:
+        headers = {"Connection": "close"}  # a new connection per request spreads them over the workers
+        try:
+            if i % 2:
+                response = httpx.get(f"{url}/corpus", headers=headers, timeout=60)
+            else:
+                response = httpx.post(f"{url}/search/unified", json={"query": queries[i // 2 % len(queries)]},
+                                      headers=headers, timeout=60)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sum(not ok for ok in pool.map(send, range(count)))
+
+
+def run_one(mode: str, workers: int, env: Dict[str, str], queries: List[str], args) -> WorkerRun:
+    port = free_port()
+    url = f"http://{HOST}:{port}"
+    log_path = Path(tempfile.gettempdir()) / f"bench_workers_{mode}_{workers}.log"
+    start = time.perf_counter()
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(server_command(mode, workers, port), env={**os.environ, **env},
+                                   stdout=log, stderr=subprocess.STDOUT, cwd=PROJECT_ROOT)
+    try:
+        # Every worker prints "Ready after" once its startup phases are done
+        deadline = time.monotonic() + READY_TIMEOUT
+        while log_path.read_text().count("Ready after") < workers:
+            if process.poll() is not None:
+                raise RuntimeError(f"{mode} x{workers} exited with {process.returncode}, see {log_path}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{mode} x{workers}: workers not ready after {READY_TIMEOUT:.0f}s, see {log_path}")
+            time.sleep(0.25)
+        wait_for(f"{url}/ready", READY_TIMEOUT, process=process)
+        startup_seconds = time.perf_counter() - start
+
+        errors = drive(url, queries, args.requests, args.concurrency)
+        time.sleep(args.settle)
+
+        pids = child_pids(process.pid)
+        supervisor = process_memory(process.pid)
+        if not pids:
+            # uvicorn --workers 1 serves from the main process: no supervisor
+            pids, supervisor = [process.pid], None
+        run = WorkerRun(
+            mode=mode, workers=workers, startup_seconds=round(startup_seconds, 1),
+            requests=args.requests, errors=errors, supervisor=supervisor,
+            processes=[memory for memory in map(process_memory, pids) if memory is not None],
+        )
+        if len(run.processes) != workers:
+            print(f"  warning: found {len(run.processes)} worker processes, expected {workers}")
+        return run
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def print_table(runs: List[WorkerRun]):
+    print(f"\n{'mode':<16} {'workers':>7} {'total PSS':>10} {'PSS/wkr':>8} {'USS/wkr':>8} {'RSS/wkr':>8} "
+          f"{'superv.':>8} {'+/worker':>9} {'start s':>8} {'errors':>7}")
+    for mode in MODES:
+        mode_runs = [run for run in runs if run.mode == mode]
+        if not mode_runs:
+            continue
+        base = mode_runs[0]
+        for run in mode_runs:
+            slope = ((run.total_pss_mb - base.total_pss_mb) / (run.workers - base.workers)
+                     if run.workers > base.workers else None)
+            supervisor = f"{run.supervisor.pss_mb:.1f}" if run.supervisor else "-"
+            print(f"{mode:<16} {run.workers:>7} {run.total_pss_mb:>10.1f} {run.mean('pss_mb'):>8.1f} "
+                  f"{run.mean('uss_mb'):>8.1f} {run.mean('rss_mb'):>8.1f} {supervisor:>8} "
+                  f"{(f'{slope:.1f}' if slope is not None else '-'):>9} {run.startup_seconds:>8.1f} {run.errors:>7}")
+        if len(mode_runs) > 1:
+            last = mode_runs[-1]
+            slope = (last.total_pss_mb - base.total_pss_mb) / (last.workers - base.workers)
+            fit = base.workers + int((MEMORY_LIMIT_MB - base.total_pss_mb) // slope) if slope > 0 else None
+            print(f"{'':<16} fit {MEMORY_LIMIT_MB}MB: ~{fit} workers" if fit is not None and fit >= 1
+                  else f"{'':<16} fit {MEMORY_LIMIT_MB}MB: none")
+    print("MB throughout. PSS splits shared pages between processes; USS is private to one worker.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per worker of multi-worker serving")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated, from {', '.join(MODES)}")
+    parser.add_argument("--requests", type=int, default=200, help="Requests sent before measuring")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight while driving traffic")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait after the traffic")
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON")
+    add_stub_arguments(parser)
+    parser.set_defaults(chat_latency=0.05, embed_latency=0.01, pinecone_latency=0.005, token_interval=0.0)
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    from eval.local_backend import load_query_set
+    queries = [q["query"] for q in load_query_set()]
+
+    stub_port = free_port()
+    stub_url = f"http://{HOST}:{stub_port}"
+    stub_cmd = [sys.executable, str(PROJECT_ROOT / "eval" / "stub_upstreams.py"), "--port", str(stub_port)]
+    for flag in STUB_FLAGS:
+        stub_cmd += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+    stub_log = open(Path(tempfile.gettempdir()) / "bench_workers_stubs.log", "w")
+    stubs = subprocess.Popen(stub_cmd, stdout=stub_log, stderr=subprocess.STDOUT, cwd=PROJECT_ROOT)
+    print(f"Starting stub upstreams on {stub_url}...")
+
+    runs: List[WorkerRun] = []
+    with tempfile.TemporaryDirectory(prefix="shared_index_") as shared_dir:
+        env = {
+            "OPENROUTER_BASE_URL": f"{stub_url}/v1",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "PINECONE_HOST": stub_url,
+            "OPENROUTER_API_KEY": "stub",
+            "OPENAI_API_KEY": "stub",
+            "PINECONE_API_KEY": "stub",
+            "USE_HYBRID_RETRIEVAL": "true",
+            "DAILY_RATE_LIMIT": "0",
+            "SHARED_INDEX_DIR": shared_dir,
+            "PYTHONUNBUFFERED": "1",  # "Ready after" lines reach the log as they happen
+        }
+        try:
+            wait_for(f"{stub_url}/stats", READY_TIMEOUT, process=stubs)
+            for mode in modes:
+                for workers in worker_counts:
+                    print(f"Running {mode} x{workers}...")
+                    run = run_one(mode, workers, env, queries, args)
+                    runs.append(run)
+                    print(f"  total PSS {run.total_pss_mb:.1f} MB, {run.mean('uss_mb'):.1f} MB private per worker, "
+                          f"{run.errors}/{run.requests} errors")
+        finally:
+            stubs.terminate()
+            stubs.wait(timeout=30)
+
+    print_table(runs)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        payload = [{**asdict(run), "total_pss_mb": round(run.total_pss_mb, 1)} for run in runs]
+        args.json.write_text(json.dumps(payload, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,25 @@ A/B comparison of dense-only vs hybrid retrieval.
 Compares FocusGroupRetrieverV2 (dense) against HybridFocusGroupRetriever
 on a set of test queries and outputs detailed comparison metrics.
 
+Queries run concurrently (--workers, --rate) through eval/eval_runner.py:
+router decisions and query embeddings are cached in eval/.cache/, so a re-run
+after a fusion change makes no router or embedding calls, and per-query
+results go to eval/results/compare_retrieval.jsonl as they finish (--resume
+continues an interrupted run). Latencies are measured under concurrency.
+
 Usage:
     python eval/compare_retrieval.py                    # Run all test queries
     python eval/compare_retrieval.py --query "P7"       # Single query
     python eval/compare_retrieval.py --no-router        # Disable LLM router (search all FGs)
+    python eval/compare_retrieval.py --workers 8 --rate 4 --resume
+    python eval/compare_retrieval.py --no-cache --workers 1   # old behaviour: sequential, live calls
 """
 
 import argparse
 import json
 import sys
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Optional, Set
 from collections import defaultdict
 import time
@@ -24,7 +32,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scripts.retrieve import FocusGroupRetrieverV2, RetrievalResult
 from scripts.retrieval.hybrid import HybridFocusGroupRetriever
-from scripts.retrieval.bm25 import BM25Retriever
+from scripts.retrieval.bm25 import BM25Retriever, BM25Result
+from eval.eval_runner import RESULTS_DIR, EvalCache, EvalRunner
+
+TOP_K = 10
 
 
 @dataclass
@@ -58,6 +69,21 @@ class QueryResult:
     dense_found_keywords: bool = False
     hybrid_found_keywords: bool = False
 
+    def to_record(self) -> Dict:
+        """Per-query fields for the JSONL results file (query_id/query are the runner's)."""
+        record = asdict(self)
+        del record["query_id"], record["query"]
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "QueryResult":
+        fields = {k: v for k, v in record.items()
+                  if k in cls.__dataclass_fields__ and k not in ("query_id", "query")}
+        fields["dense_results"] = [RetrievalResult(**r) for r in record["dense_results"]]
+        fields["hybrid_results"] = [RetrievalResult(**r) for r in record["hybrid_results"]]
+        fields["bm25_results"] = [BM25Result(**r) for r in record["bm25_results"]]
+        return cls(query_id=record["id"], query=record["query"], **fields)
+
 
 def check_expected_fg(results: List[RetrievalResult], expected_fgs: Optional[List[str]]) -> bool:
     """Check if any expected FG appears in top-5 results."""
@@ -95,61 +121,89 @@ def format_result(r: RetrievalResult, rank: int) -> str:
     return f"  {rank}. [{r.score:.4f}] {r.focus_group_id} - {r.participant}\n     {preview}"
 
 
+def compare_query(
+    q: Dict,
+    dense: FocusGroupRetrieverV2,
+    hybrid: HybridFocusGroupRetriever,
+    bm25: BM25Retriever,
+) -> QueryResult:
+    """Run dense, hybrid and BM25 retrieval for one query and check expectations."""
+    qr = QueryResult(
+        query_id=q["id"],
+        query=q["query"],
+        category=q["category"],
+        expected_fgs=q.get("expected_focus_groups"),
+        expected_participant=q.get("expected_participant"),
+        expected_keywords=q.get("expected_keywords"),
+    )
+
+    # Run dense retrieval
+    start = time.time()
+    qr.dense_results = dense.retrieve(qr.query, top_k=TOP_K)
+    qr.dense_time_ms = (time.time() - start) * 1000
+
+    # Run hybrid retrieval
+    start = time.time()
+    qr.hybrid_results = hybrid.retrieve(qr.query, top_k=TOP_K)
+    qr.hybrid_time_ms = (time.time() - start) * 1000
+
+    # Run BM25-only for debugging
+    qr.bm25_results = bm25.retrieve(qr.query, top_k=TOP_K)
+
+    # Check expectations
+    qr.dense_found_expected_fg = check_expected_fg(qr.dense_results, qr.expected_fgs)
+    qr.hybrid_found_expected_fg = check_expected_fg(qr.hybrid_results, qr.expected_fgs)
+    qr.dense_found_expected_participant = check_expected_participant(qr.dense_results, qr.expected_participant)
+    qr.hybrid_found_expected_participant = check_expected_participant(qr.hybrid_results, qr.expected_participant)
+    qr.dense_found_keywords = check_keywords(qr.dense_results, qr.expected_keywords)
+    qr.hybrid_found_keywords = check_keywords(qr.hybrid_results, qr.expected_keywords)
+    return qr
+
+
 def run_comparison(
     queries: List[Dict],
     use_router: bool = True,
     verbose: bool = False,
+    workers: int = 4,
+    rate: Optional[float] = None,
+    use_cache: bool = True,
+    results_path: Optional[Path] = RESULTS_DIR / "compare_retrieval.jsonl",
+    resume: bool = False,
 ) -> List[QueryResult]:
-    """Run comparison on all queries."""
+    """
+    Run comparison on all queries.
+
+    Args:
+        workers: Queries evaluated concurrently
+        rate: Max query starts per second (None = unlimited)
+        use_cache: Answer repeated router/embedding calls from eval/.cache/
+        results_path: JSONL file with one record per query (None = don't write)
+        resume: Reuse records in results_path from an interrupted run of the same queries
+    """
+    cache = None
+    if use_cache:
+        cache = EvalCache.open()
+        cache.install()
 
     print("Initializing retrievers...")
     dense = FocusGroupRetrieverV2(use_router=use_router, verbose=False)
     hybrid = HybridFocusGroupRetriever(use_router=use_router, verbose=False)
     bm25 = BM25Retriever(verbose=False)
 
-    results = []
-
-    for q in queries:
-        query_id = q["id"]
-        query = q["query"]
-        category = q["category"]
-
-        if verbose:
-            print(f"\nProcessing: {query_id} - '{query}'")
-
-        qr = QueryResult(
-            query_id=query_id,
-            query=query,
-            category=category,
-            expected_fgs=q.get("expected_focus_groups"),
-            expected_participant=q.get("expected_participant"),
-            expected_keywords=q.get("expected_keywords"),
-        )
-
-        # Run dense retrieval
-        start = time.time()
-        qr.dense_results = dense.retrieve(query, top_k=10)
-        qr.dense_time_ms = (time.time() - start) * 1000
-
-        # Run hybrid retrieval
-        start = time.time()
-        qr.hybrid_results = hybrid.retrieve(query, top_k=10)
-        qr.hybrid_time_ms = (time.time() - start) * 1000
-
-        # Run BM25-only for debugging
-        qr.bm25_results = bm25.retrieve(query, top_k=10)
-
-        # Check expectations
-        qr.dense_found_expected_fg = check_expected_fg(qr.dense_results, qr.expected_fgs)
-        qr.hybrid_found_expected_fg = check_expected_fg(qr.hybrid_results, qr.expected_fgs)
-        qr.dense_found_expected_participant = check_expected_participant(qr.dense_results, qr.expected_participant)
-        qr.hybrid_found_expected_participant = check_expected_participant(qr.hybrid_results, qr.expected_participant)
-        qr.dense_found_keywords = check_keywords(qr.dense_results, qr.expected_keywords)
-        qr.hybrid_found_keywords = check_keywords(qr.hybrid_results, qr.expected_keywords)
-
-        results.append(qr)
+    if verbose:
+        print(f"Workers: {workers}" + (f", rate limit {rate}/s" if rate else ""))
+    runner = EvalRunner(workers=workers, rate=rate, results_path=results_path, resume=resume)
+    records = runner.run(
+        queries,
+        lambda q: compare_query(q, dense, hybrid, bm25).to_record(),
+        settings={"use_router": use_router, "top_k": TOP_K},
+    )
+    if results_path:
+        print(f"Per-query results: {results_path}")
+    if cache is not None:
+        print(cache.summary())
 
-    return results
+    return [QueryResult.from_record(record) for record in records if record["error"] is None]
 
 
 def print_detailed_results(results: List[QueryResult]):
@@ -279,6 +333,12 @@ def main():
     parser.add_argument("--query", type=str, help="Run single query instead of test set")
     parser.add_argument("--no-router", action="store_true", help="Disable LLM router")
     parser.add_argument("--brief", action="store_true", help="Only show summary")
+    parser.add_argument("--workers", type=int, default=4, help="Queries run concurrently (default: 4)")
+    parser.add_argument("--rate", type=float, help="Max query starts per second (default: unlimited)")
+    parser.add_argument("--no-cache", action="store_true", help="Call the router and embedding API for every query")
+    parser.add_argument("--results", type=Path, default=RESULTS_DIR / "compare_retrieval.jsonl",
+                        help="Per-query JSONL results (default: eval/results/compare_retrieval.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="Skip queries already in --results from the same run")
     args = parser.parse_args()
 
     if args.query:
@@ -298,7 +358,19 @@ def main():
     print(f"Running comparison on {len(queries)} queries...")
     print(f"Router: {'enabled' if not args.no_router else 'disabled'}")
 
-    results = run_comparison(queries, use_router=not args.no_router, verbose=True)
+    results = run_comparison(
+        queries,
+        use_router=not args.no_router,
+        verbose=True,
+        workers=args.workers,
+        rate=args.rate,
+        use_cache=not args.no_cache,
+        results_path=args.results,
+        resume=args.resume,
+    )
+    if not results:
+        print("No queries completed.")
+        sys.exit(1)
 
     if not args.brief:
         print_detailed_results(results)
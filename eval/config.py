@@ -4,16 +4,19 @@ Loads API keys from .env file.
 """
 
 import os
+import json
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file (override=True to ignore system env vars)
+# Load environment variables from .env file (override=True to ignore system env vars).
+# Deployments set real env vars and ship no .env - skip importing dotenv there.
 env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(env_path, override=True)
+if env_path.exists():
+    from dotenv import load_dotenv
+    load_dotenv(env_path, override=True)
 
 # API Configuration (all paid LLM calls go through OpenRouter for centralized cost tracking)
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")  # override for stub servers
 
 # Model configuration (all configurable via .env)
 # Default models for specific providers/tasks
@@ -39,6 +42,7 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "focus-group-v1")
 PINECONE_CLOUD = os.getenv("PINECONE_CLOUD", "aws")
 PINECONE_REGION = os.getenv("PINECONE_REGION", "us-east-1")
+PINECONE_HOST = os.getenv("PINECONE_HOST")  # Index data-plane URL; set to skip the host lookup (or to use a stub)
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -60,6 +64,33 @@ HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
 HYBRID_DENSE_WEIGHT = float(os.getenv("HYBRID_DENSE_WEIGHT", "0.6"))
 HYBRID_BM25_WEIGHT = float(os.getenv("HYBRID_BM25_WEIGHT", "0.4"))
 
+# Memory budget mode (512 MB container): int8 reranker, one torch thread,
+# heap trimmed after startup - see README "Memory budget"
+MEMORY_BUDGET_MODE = os.getenv("MEMORY_BUDGET_MODE", "false").lower() == "true"
+_reranker_max_length = os.getenv("RERANKER_MAX_LENGTH", "256" if MEMORY_BUDGET_MODE else "")
+RERANKER_MAX_LENGTH = int(_reranker_max_length) if _reranker_max_length else None  # None = model default
+
+# HTTP connection pools (one shared keep-alive pool per upstream host - scripts/http_clients.py)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # seconds an idle connection is kept
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "120"))  # LLM responses can be slow
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))  # wait for a free connection
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # needs the h2 package
+
+# LLM list prices in USD per million tokens (input, output) for per-request cost
+# estimates (scripts/usage.py). Cost reported by the upstream (OpenRouter's
+# usage.cost) wins when present. Extend with LLM_PRICES='{"model": [input, output]}'.
+LLM_PRICES_PER_MTOK = {
+    "google/gemini-3-flash-preview": (0.50, 3.00),
+    "google/gemini-2.0-flash-001": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+LLM_PRICES_PER_MTOK.update({k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+
 # Evaluation targets (based on Rachel's requirements)
 EVAL_TARGETS = {
     "faithfulness": 1.0,        # 100% - "One bad hallucination and I'm done"
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Parallel, cached and resumable executor for the retrieval evals.
+
+An eval pass is mostly waiting on the router LLM, the embedding API and
+Pinecone. This runs queries on a thread pool, caches the two paid calls on
+disk, and records each finished query so an interrupted run picks up where
+it stopped:
+
+- EvalCache: append-only JSONL files under eval/.cache/ (router.jsonl,
+  embeddings.jsonl), replayed on open like scripts/embedding_ledger.py.
+  install() puts it in front of the shared router and embedding model, so a
+  re-run after a fusion tweak makes no router or embedding calls. Router
+  entries are keyed by model + system prompt + query (editing the prompt
+  invalidates them); embeddings by model + dimensions + text. Router
+  fallbacks (unparseable answers) are not cached.
+- RateLimiter: token bucket on query starts (--rate per second, burst of
+  one per worker), shared by all workers.
+- EvalRunner: runs fn(query) for each query with --workers threads. Each
+  finished query is appended to a JSONL results file (header line with the
+  run's fingerprint, then one record per query). With resume=True, queries
+  already recorded under the same fingerprint are loaded instead of re-run
+  (failed ones are retried). Results come back in input order, and the file
+  is rewritten in input order when the run completes, so neither depends on
+  which query finished first.
+
+Usage:
+    from eval.eval_runner import EvalCache, EvalRunner
+
+    cache = EvalCache.open()
+    cache.install()                               # before building retrievers
+    runner = EvalRunner(workers=8, rate=5, results_path=Path("eval/results/x.jsonl"), resume=True)
+    records = runner.run(queries, lambda q: {...}, settings={"top_k": 10})
+    print(cache.summary())
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+# ============ Disk cache ============
+
+class _JsonlTable:
+    """One append-only JSONL file of {"key": ..., "value": ...}; last line per key wins."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        if path.exists():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from an interrupted run
+                    self.entries[entry["key"]] = entry["value"]
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def put(self, key: str, value: Any, **extra):
+        line = json.dumps({"key": key, **extra, "value": value}) + "\n"
+        with self.lock:
+            self.entries[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+@dataclass
+class CacheCounters:
+    hits: int = 0
+    misses: int = 0
+
+
+class CachedEmbedder:
+    """Embedding model wrapper that answers repeated texts from the cache."""
+
+    def __init__(self, inner, cache: "EvalCache"):
+        self.inner = inner
+        self.cache = cache
+        if hasattr(inner, "dimensions"):  # OpenAIEmbedder
+            self.model_id = f"{inner.model}/{inner.dimensions}"
+        else:  # SentenceTransformer
+            from eval.config import EMBEDDING_MODEL_LOCAL
+            self.model_id = EMBEDDING_MODEL_LOCAL
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        keys = [_hash(self.model_id, text) for text in batch]
+        vectors = [self.cache.embeddings.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        with self.cache.counters_lock:
+            self.cache.counters["embeddings"].hits += len(batch) - len(missing)
+            self.cache.counters["embeddings"].misses += len(missing)
+        if missing:
+            fresh = self.inner.encode([batch[i] for i in missing], **kwargs)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = [float(v) for v in vector]
+                self.cache.embeddings.put(keys[i], vectors[i], model=self.model_id)
+        if single:
+            return np.asarray(vectors[0], dtype=np.float32)
+        return vectors
+
+
+class EvalCache:
+    """Router decisions and query embeddings kept on disk between eval runs."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.router = _JsonlTable(cache_dir / "router.jsonl")
+        self.embeddings = _JsonlTable(cache_dir / "embeddings.jsonl")
+        self.counters = {"router": CacheCounters(), "embeddings": CacheCounters()}
+        self.counters_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, cache_dir: Path = CACHE_DIR) -> "EvalCache":
+        cache = cls(cache_dir)
+        print(f"Eval cache: {len(cache.router)} router decisions, "
+              f"{len(cache.embeddings)} embeddings ({cache_dir})")
+        return cache
+
+    def install(self):
+        """Route the shared router and embedding model through the cache."""
+        from scripts.retrieval.base import SharedResources
+
+        model = SharedResources.get_embedding_model()
+        if not isinstance(model, CachedEmbedder):
+            SharedResources._embedding_model = CachedEmbedder(model, self)
+
+        router = SharedResources.get_router()
+        if "route_unified" not in vars(router):
+            router.route_unified = self._cached_route(router, router.route_unified)
+
+    def _cached_route(self, router, route_unified: Callable) -> Callable:
+        from scripts.retrieval.types import RouterResult
+
+        prompt_hash = _hash(router.system_prompt)
+
+        def cached_route_unified(query: str) -> RouterResult:
+            key = _hash(router.model, prompt_hash, query)
+            entry = self.router.get(key)
+            with self.counters_lock:
+                self.counters["router"].hits += entry is not None
+                self.counters["router"].misses += entry is None
+            if entry is not None:
+                return RouterResult(**entry)
+            result = route_unified(query)
+            if not result.fallback:
+                self.router.put(key, asdict(result), model=router.model, query=query)
+            return result
+
+        return cached_route_unified
+
+    def summary(self) -> str:
+        parts = []
+        for name, counters in self.counters.items():
+            parts.append(f"{name} {counters.hits} hits / {counters.misses} misses")
+        return "Eval cache: " + ", ".join(parts)
+
+
+# ============ Runner ============
+
+class RateLimiter:
+    """Token bucket shared by worker threads: acquire() blocks until a start is allowed."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_fingerprint(queries: List[Dict], settings: Dict) -> str:
+    """Identifies a run: the queries (ids and text, in order) and the settings that change results."""
+    return _hash(json.dumps([[q["id"], q["query"]] for q in queries]), json.dumps(settings, sort_keys=True))
+
+
+class EvalRunner:
+    """Runs one function per query on a thread pool, recording results as they finish."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        rate: Optional[float] = None,
+        results_path: Optional[Path] = None,
+        resume: bool = False,
+    ):
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate, burst=self.workers) if rate else None
+        self.results_path = results_path
+        self.resume = resume
+
+    def _load_previous(self, fingerprint: str) -> Dict[str, Dict]:
+        """Successful records from an earlier run with the same fingerprint."""
+        if not (self.resume and self.results_path and self.results_path.exists()):
+            return {}
+        previous = {}
+        with open(self.results_path) as f:
+            for i, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line
+                if i == 0:
+                    if record.get("fingerprint") != fingerprint:
+                        print(f"Not resuming: {self.results_path} is from a different query set or settings")
+                        return {}
+                    continue
+                if record.get("error") is None:
+                    previous[record["id"]] = record
+        return previous
+
+    def run(
+        self,
+        queries: List[Dict],
+        fn: Callable[[Dict], Dict],
+        settings: Optional[Dict] = None,
+        on_result: Optional[Callable[[Dict, Dict], None]] = None,
+    ) -> List[Dict]:
+        """
+        Run fn over the queries and return one record per query, in input order.
+
+        Args:
+            fn: Evaluates one query and returns a JSON-serializable dict
+            settings: Options that change results; part of the resume fingerprint
+            on_result: Called with (query, record) as each query finishes
+
+        A record is {"id", "query", "index", "elapsed_ms", "error", **fn(query)};
+        a query that raised gets error set to the exception and nothing else.
+        """
+        fingerprint = run_fingerprint(queries, settings or {})
+        previous = self._load_previous(fingerprint)
+        records: Dict[str, Dict] = {qid: record for qid, record in previous.items()}
+        pending = [(i, q) for i, q in enumerate(queries) if q["id"] not in previous]
+        if previous:
+            print(f"Resuming: {len(previous)} of {len(queries)} queries already done")
+
+        header = {"type": "header", "fingerprint": fingerprint, "settings": settings or {}, "queries": len(queries)}
+        out = None
+        if self.results_path:
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            out = open(self.results_path, "w")
+            out.write(json.dumps(header) + "\n")
+            for i, q in enumerate(queries):
+                if q["id"] in previous:
+                    out.write(json.dumps(previous[q["id"]]) + "\n")
+            out.flush()
+
+        def evaluate(index: int, query: Dict) -> Dict:
+            if self.limiter:
+                self.limiter.acquire()
+            start = time.perf_counter()
+            record = {"type": "result", "id": query["id"], "query": query["query"], "index": index}
+            try:
+                record.update(fn(query))
+                record["error"] = None
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+            record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return record
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eval")
+        try:
+            futures = {pool.submit(evaluate, i, q): q for i, q in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                query, record = futures[future], future.result()
+                records[query["id"]] = record
+                if out is not None:
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+                status = "ERROR" if record["error"] else f"{record['elapsed_ms']:.0f}ms"
+                print(f"  [{done}/{len(pending)}] {query['id']}: {status}")
+                if on_result is not None:
+                    on_result(query, record)
+        finally:
+            # On Ctrl-C, let running queries finish but don't start queued ones
+            pool.shutdown(wait=True, cancel_futures=True)
+            if out is not None:
+                out.close()
+
+        ordered = [records[q["id"]] for q in queries]
+        if self.results_path:
+            # Rewrite in input order: the file is the same whatever order queries finished in
+            tmp = self.results_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                f.write(json.dumps(header) + "\n")
+                f.writelines(json.dumps(record) + "\n" for record in ordered)
+            os.replace(tmp, self.results_path)
+
+        failed = sum(1 for record in records.values() if record["error"])
+        if failed:
+            print(f"{failed} queries failed; re-run with --resume to retry only those")
+        return ordered
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator for the API, run against stub upstreams.
+
+Boots eval/stub_upstreams.py (OpenRouter, OpenAI embeddings and Pinecone
+stand-ins with injected latency and errors) and the API pointed at it -
+as a uvicorn subprocess (default) or in this process (--app inprocess, on
+a thread: easier to debug, but it shares the GIL with the generator) - or
+targets an already running instance with --target.
+
+Requests are mixed by weight (--mix) from a query log (default: the eval
+query sets): /search/unified, /synthesize/light, /synthesize/deep,
+/synthesize/macro/light (streaming) and /corpus. Synthesis payloads are
+built from quotes a first search pass returns.
+
+- closed loop (--users N): N clients each send, wait for the full response,
+  optionally think, and send again - throughput is what the server sustains
+- open loop (--rate R): Poisson arrivals at R/s regardless of completions;
+  latency counts from the scheduled send time, so queueing isn't hidden
+  (no coordinated omission). At most --max-outstanding requests in flight;
+  arrivals beyond that are counted as dropped.
+
+Reported per endpoint: requests, errors, RPS, latency and time-to-first-byte
+percentiles. Event-loop lag of the server is measured from outside: GET /live
+does no work, so its latency under load minus its idle latency is time the
+request waited for the loop; the API's own watchdog numbers
+(api/loop_watchdog.py, from /stats) are shown beside it. The generator's own
+loop lag is reported too (if it is high, the generator is the bottleneck).
+Ends with the stubs' per-upstream counts and the API's HTTP pool usage from /stats.
+
+--strict-loop [MS] is a regression guard for the concurrency model: the API
+runs with LOOP_WATCHDOG_STRICT=true and a block threshold of MS (default
+20), and the run exits 1 if any request blocked the event loop that long
+(sync I/O in an async route), printing the route and its stack.
+
+Usage:
+    python eval/load_test.py                                          # closed loop, 8 users, 30 s
+    python eval/load_test.py --users 32 --duration 60 --chat-latency 1.5
+    python eval/load_test.py --rate 20 --mix search=1                 # open loop, searches only
+    python eval/load_test.py --pinecone-errors 0.05 --error-status 429 --json results.json
+    python eval/load_test.py --target http://localhost:8000 --users 4 # a running instance, no stubs
+    python eval/load_test.py --strict-loop --mix synthesize_light=1,synthesize_deep=1,synthesize_macro_light=1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Nothing here may import eval.config: --app inprocess sets the API's env first
+from eval.stub_upstreams import STUB_FLAGS, add_stub_arguments
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HOST = "127.0.0.1"
+DEFAULT_MIX = "search=6,synthesize_light=1,synthesize_deep=1,synthesize_macro_light=1,corpus=1"
+STREAMING = {"synthesize_deep", "synthesize_macro_light"}
+READY_TIMEOUT = 180.0
+STRICT_LOOP_THRESHOLD_MS = 20.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float, ok=lambda r: r.status_code == 200, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url}: process exited with {process.returncode}")
+        try:
+            if ok(httpx.get(url, timeout=2)):
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+# ============ Stack (stubs + app) ============
+
+class Stack:
+    """Starts the stub upstreams and the API; stop() tears both down."""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes: List[subprocess.Popen] = []
+        self.server = None
+        self.stub_url: Optional[str] = None
+        self.log_path = Path(tempfile.gettempdir()) / "load_test_app.log"
+
+    def app_env(self) -> Dict[str, str]:
+        env = {
+            "OPENROUTER_BASE_URL": f"{self.stub_url}/v1",
+            "OPENAI_BASE_URL": f"{self.stub_url}/v1",
+            "PINECONE_HOST": self.stub_url,
+            "OPENROUTER_API_KEY": "stub",
+            "OPENAI_API_KEY": "stub",
+            "PINECONE_API_KEY": "stub",
+            "DAILY_RATE_LIMIT": "1000000000",
+            # Repeated log queries would all be near-duplicate hits otherwise
+            "SEMANTIC_CACHE_ENABLED": "true" if self.args.semantic_cache else "false",
+        }
+        if self.args.strict_loop is not None:
+            env["LOOP_WATCHDOG"] = "true"
+            env["LOOP_WATCHDOG_STRICT"] = "true"
+            env["LOOP_BLOCK_THRESHOLD_MS"] = str(self.args.strict_loop)
+            # A block is seen only if a heartbeat falls due inside it: at a quarter of the threshold,
+            # every block longer than 1.25x the threshold is caught
+            env["LOOP_LAG_INTERVAL_MS"] = str(self.args.strict_loop / 4)
+        for item in self.args.app_env:
+            key, _, value = item.partition("=")
+            env[key] = value
+        return env
+
+    def start(self) -> str:
+        args = self.args
+        stub_port = free_port()
+        self.stub_url = f"http://{HOST}:{stub_port}"
+        stub_cmd = [sys.executable, str(PROJECT_ROOT / "eval" / "stub_upstreams.py"), "--port", str(stub_port)]
+        for flag in STUB_FLAGS:
+            stub_cmd += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+        log = open(self.log_path, "w")
+        self.processes.append(subprocess.Popen(stub_cmd, stdout=log, stderr=subprocess.STDOUT, cwd=PROJECT_ROOT))
+        print(f"Starting stub upstreams on {self.stub_url}...")
+        wait_for(f"{self.stub_url}/stats", READY_TIMEOUT, process=self.processes[0])
+
+        app_port = free_port()
+        app_url = f"http://{HOST}:{app_port}"
+        env = self.app_env()
+        if args.app == "inprocess":
+            import uvicorn
+            os.environ.update(env)
+            # Claims the root logger first, so the API's basicConfig leaves its log lines in the file
+            logging.basicConfig(handlers=[logging.FileHandler(self.log_path)], level=logging.INFO)
+            config = uvicorn.Config("api.main:app", host=HOST, port=app_port, log_level="warning")
+            self.server = uvicorn.Server(config)
+            threading.Thread(target=self.server.run, name="app-server", daemon=True).start()
+            app_process = None
+        else:
+            cmd = [sys.executable, "-m", "uvicorn", "api.main:app", "--host", HOST, "--port", str(app_port),
+                   "--log-level", "warning", "--workers", str(args.app_workers)]
+            app_process = subprocess.Popen(
+                cmd, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT, cwd=PROJECT_ROOT)
+            self.processes.append(app_process)
+        print(f"Starting API ({args.app}) on {app_url}, log: {self.log_path}...")
+        wait_for(f"{app_url}/ready", READY_TIMEOUT, process=app_process)
+        return app_url
+
+    def stub_stats(self) -> Optional[Dict[str, Any]]:
+        if self.stub_url is None:
+            return None
+        try:
+            return httpx.get(f"{self.stub_url}/stats", timeout=5).json()
+        except httpx.HTTPError:
+            return None
+
+    def stop(self):
+        if self.server is not None:
+            self.server.should_exit = True
+        for process in reversed(self.processes):
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# ============ Workload ============
+
+@dataclass
+class RequestSpec:
+    kind: str
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+
+def load_query_log(path: Optional[Path]) -> List[str]:
+    """Queries from a .json query set, a .jsonl log ({"query": ...} per line) or plain text lines."""
+    if path is None:
+        from eval.local_backend import load_query_set
+        return [q["query"] for q in load_query_set()]
+    text = path.read_text()
+    if path.suffix == ".json":
+        data = json.loads(text)
+        items = data["queries"] if isinstance(data, dict) else data
+        return [item["query"] if isinstance(item, dict) else item for item in items]
+    if path.suffix == ".jsonl":
+        return [json.loads(line)["query"] for line in text.splitlines() if line.strip()]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"search", "synthesize_light", "synthesize_deep", "synthesize_macro_light", "corpus"}
+    if unknown:
+        raise SystemExit(f"Unknown --mix entries: {sorted(unknown)}")
+    return mix
+
+
+def build_workload(base_url: str, queries: List[str], mix: Dict[str, float], harvest: int) -> Dict[str, List[RequestSpec]]:
+    """Request specs per kind; synthesis bodies reuse quotes from one search per harvested query."""
+    specs: Dict[str, List[RequestSpec]] = {kind: [] for kind in mix}
+    if "search" in mix:
+        specs["search"] = [RequestSpec("search", "POST", "/search/unified", {"query": q}) for q in queries]
+    if "corpus" in mix:
+        specs["corpus"] = [RequestSpec("corpus", "GET", "/corpus")]
+
+    if any(kind.startswith("synthesize") for kind in mix):
+        harvested = queries[:harvest]
+        print(f"Harvesting quotes for synthesis payloads ({len(harvested)} searches)...")
+
+        async def search_all():
+            async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                responses = await asyncio.gather(*(client.post("/search/unified", json={"query": q}) for q in harvested))
+                return [response.json().get("quotes", []) for response in responses]
+
+        for query, groups in zip(harvested, asyncio.run(search_all())):
+            if not groups:
+                continue
+            group = groups[0]
+            body = {"quotes": group["chunks"][:5], "query": query,
+                    "focus_group_name": group["focus_group_metadata"].get("location", "")}
+            if "synthesize_light" in mix:
+                specs["synthesize_light"].append(RequestSpec("synthesize_light", "POST", "/synthesize/light", body))
+            if "synthesize_deep" in mix:
+                specs["synthesize_deep"].append(RequestSpec("synthesize_deep", "POST", "/synthesize/deep", body))
+            if "synthesize_macro_light" in mix:
+                top = groups[:4]
+                specs["synthesize_macro_light"].append(RequestSpec("synthesize_macro_light", "POST", "/synthesize/macro/light", {
+                    "query": query,
+                    "fg_summaries": {g["focus_group_id"]: f"Summary of {g['focus_group_id']}." for g in top},
+                    "top_quotes": {g["focus_group_id"]: g["chunks"][:3] for g in top},
+                    "fg_metadata": {g["focus_group_id"]: g["focus_group_metadata"] for g in top},
+                }))
+    empty = [kind for kind, kind_specs in specs.items() if not kind_specs]
+    for kind in empty:
+        print(f"  No payloads for {kind} (no search returned quotes) - dropped from the mix")
+        del specs[kind]
+    return specs
+
+
+# ============ Load runner ============
+
+@dataclass(slots=True)
+class Sample:
+    kind: str
+    status: int              # 0 = no response (connection error / timeout)
+    seconds: float
+    ttfb: Optional[float]
+
+
+@dataclass
+class LoadRunner:
+    base_url: str
+    specs: Dict[str, List[RequestSpec]]
+    mix: Dict[str, float]
+    rng: random.Random
+    timeout: float
+    samples: List[Sample] = field(default_factory=list)
+    recording: bool = False
+    dropped: int = 0
+    live_ms: List[float] = field(default_factory=list)
+    client_lag_ms: List[float] = field(default_factory=list)
+
+    def pick(self) -> RequestSpec:
+        kinds = list(self.specs)
+        kind = self.rng.choices(kinds, weights=[self.mix[k] for k in kinds])[0]
+        return self.rng.choice(self.specs[kind])
+
+    async def issue(self, client: httpx.AsyncClient, spec: RequestSpec, started: Optional[float] = None):
+        started = started if started is not None else time.perf_counter()
+        status, ttfb = 0, None
+        try:
+            async with client.stream(spec.method, spec.path, json=spec.body) as response:
+                status = response.status_code
+                async for _ in response.aiter_raw():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        if self.recording:
+            self.samples.append(Sample(spec.kind, status, time.perf_counter() - started, ttfb))
+
+    async def closed_loop(self, client: httpx.AsyncClient, users: int, think: float, deadline: float):
+        async def user():
+            while time.perf_counter() < deadline:
+                await self.issue(client, self.pick())
+                if think > 0:
+                    await asyncio.sleep(self.rng.expovariate(1 / think))
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def open_loop(self, client: httpx.AsyncClient, rate: float, max_outstanding: int, deadline: float):
+        pending = set()
+        scheduled = time.perf_counter()
+        while True:
+            scheduled += self.rng.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            if len(pending) >= max_outstanding:
+                if self.recording:
+                    self.dropped += 1
+                continue
+            task = asyncio.create_task(self.issue(client, self.pick(), started=scheduled))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending, timeout=self.timeout)
+
+    async def probe_live(self, interval: float, deadline: float, out: List[float]):
+        """GET /live on its own connection every interval; latencies in ms."""
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as probe:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await probe.get("/live")
+                    out.append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(interval)
+
+    async def probe_client_loop(self, interval: float, deadline: float):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.client_lag_ms.append((time.perf_counter() - started - interval) * 1000)
+
+    async def run(self, args) -> float:
+        """Warmup, then the measured phase; returns the measured phase's wall seconds."""
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=max(args.users, 64))
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            async def phase(seconds: float, record: bool):
+                self.recording = record
+                deadline = time.perf_counter() + seconds
+                probes = []
+                if record:
+                    probes = [self.probe_live(args.probe_interval, deadline, self.live_ms),
+                              self.probe_client_loop(args.probe_interval, deadline)]
+                if args.rate:
+                    load = self.open_loop(client, args.rate, args.max_outstanding, deadline)
+                else:
+                    load = self.closed_loop(client, args.users, args.think, deadline)
+                await asyncio.gather(load, *probes)
+
+            if args.warmup > 0:
+                print(f"Warmup {args.warmup:.0f}s...")
+                await phase(args.warmup, record=False)
+            print(f"Measuring {args.duration:.0f}s...")
+            started = time.perf_counter()
+            await phase(args.duration, record=True)
+            return time.perf_counter() - started
+
+
+# ============ Report ============
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 1), "p95": round(float(p95), 1), "p99": round(float(p99), 1),
+            "max": round(float(max(values)), 1)}
+
+
+def summarize(samples: List[Sample], wall: float) -> Dict[str, Any]:
+    by_kind: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_kind.setdefault(sample.kind, []).append(sample)
+    by_kind["all"] = samples
+    summary = {}
+    for kind, group in by_kind.items():
+        ok = [s for s in group if 200 <= s.status < 400]
+        summary[kind] = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "statuses": {str(code): sum(1 for s in group if s.status == code) for code in sorted({s.status for s in group})},
+            "rps": round(len(ok) / wall, 2),
+            "latency_ms": percentiles([s.seconds * 1000 for s in ok]),
+            "ttfb_ms": percentiles([s.ttfb * 1000 for s in ok if s.ttfb is not None]),
+        }
+    return summary
+
+
+def fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:,.0f}"
+
+
+def print_report(args, summary, live_idle, runner: LoadRunner, stub_stats, app_stats):
+    mode = f"open loop, {args.rate}/s" if args.rate else f"closed loop, {args.users} users"
+    print("\n" + "=" * 100)
+    print(f"LOAD TEST ({mode}, {args.duration:.0f}s)")
+    print("=" * 100)
+    print(f"{'endpoint':<24} | {'requests':>8} | {'errors':>6} | {'rps':>6} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'p99 ms':>7} | {'max ms':>7} | {'ttfb p50':>8} | {'ttfb p95':>8}")
+    print("-" * 100)
+    for kind, stats in summary.items():
+        if kind == "all":
+            print("-" * 100)
+        lat, ttfb = stats["latency_ms"], stats["ttfb_ms"]
+        show_ttfb = kind in STREAMING
+        print(f"{kind:<24} | {stats['requests']:>8} | {stats['errors']:>6} | {stats['rps']:>6.1f} | "
+              f"{fmt(lat['p50']):>7} | {fmt(lat['p95']):>7} | {fmt(lat['p99']):>7} | {fmt(lat['max']):>7} | "
+              f"{fmt(ttfb['p50']) if show_ttfb else '':>8} | {fmt(ttfb['p95']) if show_ttfb else '':>8}")
+    errors = {code: n for code, n in summary["all"]["statuses"].items() if not code.startswith(("2", "3"))}
+    if errors:
+        print(f"Error statuses: {errors} (0 = no response)")
+    if args.rate:
+        print(f"Dropped arrivals (over {args.max_outstanding} outstanding): {runner.dropped}")
+
+    live = percentiles(runner.live_ms)
+    idle = float(np.median(live_idle)) if live_idle else 0.0
+    print(f"\nServer event loop (GET /live every {args.probe_interval * 1000:.0f} ms): idle {idle:.1f} ms; "
+          f"under load p50 {fmt(live['p50'])}, p95 {fmt(live['p95'])}, p99 {fmt(live['p99'])}, max {fmt(live['max'])} ms")
+    if live["p99"] is not None:
+        print(f"  -> estimated loop lag p99 {max(0.0, live['p99'] - idle):.0f} ms, max {max(0.0, live['max'] - idle):.0f} ms")
+    watchdog = (app_stats or {}).get("event_loop")
+    if watchdog and watchdog.get("running"):
+        lag = watchdog["lag"]
+        blocked = Counter(block["endpoint"] or block["task"] for block in watchdog["recent_blocks"])
+        print(f"  watchdog (/stats, since start): lag p50 {fmt(lag['p50_ms'])}, p99 {fmt(lag['p99_ms'])} ms; "
+              f"{watchdog['blocked_total']} blocks over {watchdog['threshold_ms']:.0f} ms"
+              + (f" (recent: {dict(blocked)})" if blocked else ""))
+    client = percentiles(runner.client_lag_ms)
+    print(f"Generator event loop lag: p99 {fmt(client['p99'])} ms, max {fmt(client['max'])} ms"
+          f"{'  (high: the generator may be the bottleneck)' if (client['p99'] or 0) > 50 else ''}")
+
+    if stub_stats:
+        print("\nStub upstreams:")
+        for name, stats in stub_stats.items():
+            print(f"  {name:<12} requests {stats['requests']:>6}  peak in flight {stats['peak_in_flight']:>4}  "
+                  f"injected errors {stats['injected_errors']}")
+    pools = (app_stats or {}).get("http_pools") or {}
+    if pools:
+        print("API HTTP pools (/stats):")
+        for host, pool in pools.items():
+            print(f"  {host:<22} requests {pool['requests']:>6}  peak in flight {pool['peak_in_flight']:>4}/"
+                  f"{pool['max_connections']}  pool wait max {pool['pool_wait_max_ms']:.0f} ms  "
+                  f"timeouts {pool['pool_timeouts']}  errors {pool['errors']}")
+
+
+async def measure_idle_live(base_url: str, count: int = 20) -> List[float]:
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=10) as probe:
+        for _ in range(count):
+            started = time.perf_counter()
+            await probe.get("/live")
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.02)
+    return latencies
+
+
+def check_loop_blocks(app_stats) -> bool:
+    """--strict-loop: False (with the offending routes and stacks) if a request blocked the loop."""
+    watchdog = (app_stats or {}).get("event_loop")
+    if not watchdog or not watchdog.get("running"):
+        print("\nStrict loop check: the API's loop watchdog isn't running (LOOP_WATCHDOG=false?)")
+        return False
+    blocks = [block for block in watchdog["recent_blocks"] if block["endpoint"]]
+    if not blocks:
+        print(f"\nStrict loop check passed: no request blocked the event loop over {watchdog['threshold_ms']:.0f} ms")
+        return True
+    print(f"\nStrict loop check FAILED: {len(blocks)} request(s) blocked the event loop "
+          f"over {watchdog['threshold_ms']:.0f} ms")
+    for block in blocks:
+        print(f"\n{block['endpoint']} blocked for {block['blocked_ms']:.0f} ms; stack while blocked:\n{block['stack']}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against stub upstreams")
+    parser.add_argument("--target", help="Base URL of a running instance (no stubs or app are started)")
+    parser.add_argument("--app", choices=["subprocess", "inprocess"], default="subprocess")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn --workers (subprocess mode)")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="Extra API env (repeatable)")
+    parser.add_argument("--semantic-cache", action="store_true", help="Keep the semantic cache on (off by default)")
+    parser.add_argument("--users", type=int, default=8, help="Closed loop: concurrent clients")
+    parser.add_argument("--think", type=float, default=0.0, help="Closed loop: mean think time between requests (s)")
+    parser.add_argument("--rate", type=float, help="Open loop: arrivals per second (replaces --users)")
+    parser.add_argument("--max-outstanding", type=int, default=256, help="Open loop: in-flight cap")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. search=6,corpus=1")
+    parser.add_argument("--query-log", type=Path, help="Queries (.json query set, .jsonl log or text lines)")
+    parser.add_argument("--harvest", type=int, default=12, help="Searches run to build synthesis payloads")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between /live probes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write the results here")
+    parser.add_argument("--strict-loop", type=float, nargs="?", const=STRICT_LOOP_THRESHOLD_MS, metavar="MS",
+                        help="Run the API in loop-watchdog strict mode with this block threshold (default "
+                             f"{STRICT_LOOP_THRESHOLD_MS:.0f} ms); exit 1 if a request blocked the loop")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # the API's log config would print every request
+    stack = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        stack = Stack(args)
+    try:
+        if stack is not None:
+            base_url = stack.start()
+        queries = load_query_log(args.query_log)
+        specs = build_workload(base_url, queries, mix, args.harvest)
+        runner = LoadRunner(base_url, specs, mix, random.Random(args.seed), args.timeout)
+        live_idle = asyncio.run(measure_idle_live(base_url))
+        if stack is not None:
+            httpx.post(f"{stack.stub_url}/stats/reset", timeout=5)
+        wall = asyncio.run(runner.run(args))
+        summary = summarize(runner.samples, wall)
+        stub_stats = stack.stub_stats() if stack is not None else None
+        try:
+            app_stats = httpx.get(f"{base_url}/stats", timeout=10).json()
+        except (httpx.HTTPError, ValueError):
+            app_stats = None
+    finally:
+        if stack is not None:
+            stack.stop()
+
+    print_report(args, summary, live_idle, runner, stub_stats, app_stats)
+    if args.json:
+        args.json.write_text(json.dumps({
+            "settings": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+            "endpoints": summary,
+            "dropped": runner.dropped,
+            "server_live_ms": {"idle_p50": round(float(np.median(live_idle)), 1), **percentiles(runner.live_ms)},
+            "client_loop_lag_ms": percentiles(runner.client_lag_ms),
+            "stubs": stub_stats,
+            "http_pools": (app_stats or {}).get("http_pools"),
+            "event_loop": (app_stats or {}).get("event_loop"),
+        }, indent=2) + "\n")
+        print(f"\nWrote {args.json}")
+    if args.strict_loop is not None and not check_loop_blocks(app_stats):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
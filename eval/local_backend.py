@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Network-free stand-ins for the Pinecone index and the embedding API.
+
+The retrievers only need two shared resources: an index answering
+query/fetch/describe_index_stats and a model answering encode().
+install_local_backend() puts local versions of both into SharedResources, so
+FocusGroupRetrieverV2, StrategyMemoRetriever and HybridFocusGroupRetriever
+run unchanged with no API keys and no network:
+
+- LocalVectorIndex: brute-force cosine search over an in-memory matrix,
+  with the metadata reindex_openai.py upserts and the filters the retrievers
+  use (equality and $in). Row sets per filter are cached, so a repeated
+  per-focus-group query costs one small matrix-vector product.
+- Vectors come from a recorded fixture (eval/fixtures/retrieval_embeddings.npz,
+  the real index vectors plus OpenAI embeddings of the eval queries) when it
+  exists, otherwise from SyntheticEmbedder: deterministic hashed
+  bag-of-words vectors with a shared component, so scores land in a
+  realistic 0.35-0.8 range and texts sharing words score higher. Synthetic
+  scores are not a relevance signal - they only reproduce the work.
+- With SHARED_INDEX=true, the matrix, ids and metadata are attached from the
+  shared vectors.seg segment (scripts/retrieval/shared_index.py) when one was
+  built from the same corpus and fixture, so parallel processes (eval
+  workers, stub servers) map one copy instead of each building their own.
+
+Usage:
+    from eval.local_backend import install_local_backend
+    backend = install_local_backend()     # before building any retriever
+    FocusGroupRetrieverV2(use_router=False).retrieve("What did Ohio voters say?")
+
+    python eval/local_backend.py --record    # write the fixture once (needs PINECONE_API_KEY, OPENAI_API_KEY)
+    python eval/local_backend.py             # show which backend would be used
+    python eval/local_backend.py --shared-index [--synthetic]   # write the shared vectors.seg segment
+"""
+
+import argparse
+import json
+import re
+import sys
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import DATA_DIR, EVAL_DIR
+
+FIXTURE_PATH = EVAL_DIR / "fixtures" / "retrieval_embeddings.npz"
+QUERY_FILES = [EVAL_DIR / "test_queries.json", EVAL_DIR / "hybrid_test_queries.json"]
+SYNTHETIC_DIMS = 256
+SHARED_WEIGHT = 0.6  # share of every synthetic vector along one common direction (cosine floor ~0.36)
+FETCH_BATCH_SIZE = 100
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def load_query_set(paths: Sequence[Path] = QUERY_FILES) -> List[Dict[str, Any]]:
+    """Eval queries from both query files, in file order, each tagged with its source file."""
+    queries = []
+    for path in paths:
+        with open(path) as f:
+            for query in json.load(f)["queries"]:
+                queries.append({**query, "source": path.name})
+    return queries
+
+
+def load_corpus() -> List[Any]:
+    """Every vector the index holds, as reindex_openai.py builds it (EmbeddingItem: id, text, metadata)."""
+    from scripts.reindex_openai import chunk_item, load_all_chunks, load_hierarchical_parents, parent_item
+    return [chunk_item(c) for c in load_all_chunks()] + [parent_item(p) for p in load_hierarchical_parents()]
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+# ============ Embedders ============
+
+class SyntheticEmbedder:
+    """Deterministic hashed bag-of-words embeddings (same text -> same vector, on any machine)."""
+
+    def __init__(self, dims: int = SYNTHETIC_DIMS, shared_weight: float = SHARED_WEIGHT):
+        self.dims = dims
+        self._shared = _unit(np.random.default_rng(0).standard_normal(dims)) * shared_weight
+        self._lexical_weight = float(np.sqrt(1 - shared_weight ** 2))
+        self._words: Dict[str, np.ndarray] = {}
+        self._texts: Dict[str, np.ndarray] = {}
+
+    def _word(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            rng = np.random.default_rng(zlib.crc32(word.encode()))
+            vector = self._words[word] = rng.standard_normal(self.dims)
+        return vector
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = self._texts.get(text)
+        if vector is None:
+            words = [w for w in _WORD.findall(text.lower()) if len(w) > 2]
+            lexical = _unit(np.sum([self._word(w) for w in words], axis=0)) if words else np.zeros(self.dims)
+            vector = self._texts[text] = _unit(self._shared + self._lexical_weight * lexical).astype(np.float32)
+        return vector
+
+    def encode(self, texts, **kwargs):
+        """OpenAIEmbedder.encode(list) -> list of lists; SentenceTransformer.encode(str) -> array."""
+        if isinstance(texts, str):
+            return self.embed(texts)
+        return [self.embed(text).tolist() for text in texts]
+
+
+class RecordedEmbedder:
+    """Query embeddings recorded by --record; texts that weren't recorded are an error, not a network call."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]):
+        self._vectors = vectors
+
+    def embed(self, text: str) -> np.ndarray:
+        try:
+            return self._vectors[text]
+        except KeyError:
+            raise KeyError(f"Query not in {FIXTURE_PATH.name}, re-run eval/local_backend.py --record: {text!r}") from None
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self.embed(texts)
+        return [self.embed(text).tolist() for text in texts]
+
+
+# ============ Vector index ============
+
+class LocalVectorIndex:
+    """In-memory (or shared, memory-mapped) cosine index answering the Pinecone calls the retrievers make."""
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict[str, Any]], namespace: str = ""):
+        self.ids = list(ids)
+        self.vectors = _unit(np.asarray(vectors, dtype=np.float32))
+        self.metadata = metadata
+        self.namespace = namespace
+        self._rows_by_id = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._filter_rows: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_segment(cls, segment) -> "LocalVectorIndex":
+        """Zero-copy index over a vectors.seg segment (ids, metadata and vectors stay in the mapping)."""
+        index = cls.__new__(cls)
+        index.ids = segment.strings("ids")
+        index.vectors = segment.array("vectors")
+        index.metadata = segment.json_values("metadata")
+        index.namespace = segment.meta["namespace"]
+        index._rows_by_id = segment.key_index("ids", keys=index.ids)
+        index._columns = {}
+        index._filter_rows = {}
+        return index
+
+    def save_segment(self, signature: Dict[str, Any]) -> int:
+        """Write the index to the shared vectors.seg segment. Returns its size in bytes."""
+        from scripts.retrieval.shared_index import json_arrays, key_index_arrays, string_arrays, write_segment
+
+        arrays = {
+            "vectors": self.vectors,
+            **string_arrays("ids", self.ids),
+            **key_index_arrays("ids", self.ids, store_keys=False),
+            **json_arrays("metadata", self.metadata),
+        }
+        return write_segment("vectors", arrays, signature, meta={"namespace": self.namespace})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _column(self, field: str) -> np.ndarray:
+        column = self._columns.get(field)
+        if column is None:
+            column = self._columns[field] = np.array([meta.get(field) for meta in self.metadata], dtype=object)
+        return column
+
+    def _rows(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Row indices matching a Pinecone metadata filter (None = all rows)."""
+        if not filter:
+            return None
+        key = json.dumps(filter, sort_keys=True)
+        if key in self._filter_rows:
+            return self._filter_rows[key]
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, condition in filter.items():
+            column = self._column(field)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op == "$eq":
+                    mask &= column == value
+                elif op == "$ne":
+                    mask &= column != value
+                elif op in ("$in", "$nin"):
+                    values = set(value)
+                    found = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+                    mask &= found if op == "$in" else ~found
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+        rows = self._filter_rows[key] = np.flatnonzero(mask)
+        return rows
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = False,
+        include_values: bool = False,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ):
+        rows = self._rows(filter)
+        candidates = self.vectors if rows is None else self.vectors[rows]
+        scores = candidates @ _unit(np.asarray(vector, dtype=np.float32))
+        k = min(top_k, len(scores))
+        if k == 0:
+            return SimpleNamespace(matches=[], namespace=namespace or self.namespace)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        matches = []
+        for i in top.tolist():
+            row = i if rows is None else int(rows[i])
+            matches.append(SimpleNamespace(
+                id=self.ids[row],
+                score=float(scores[i]),
+                metadata=dict(self.metadata[row]) if include_metadata else None,
+                values=self.vectors[row].tolist() if include_values else [],
+            ))
+        return SimpleNamespace(matches=matches, namespace=namespace or self.namespace)
+
+    def fetch(self, ids: Sequence[str], namespace: Optional[str] = None, **kwargs):
+        vectors = {}
+        for chunk_id in ids:
+            row = self._rows_by_id.get(chunk_id)
+            if row is not None:
+                vectors[chunk_id] = SimpleNamespace(
+                    id=chunk_id, values=self.vectors[row].tolist(), metadata=dict(self.metadata[row]))
+        return SimpleNamespace(vectors=vectors, namespace=namespace or self.namespace)
+
+    def describe_index_stats(self, **kwargs):
+        return SimpleNamespace(
+            dimension=self.vectors.shape[1],
+            total_vector_count=len(self.ids),
+            namespaces={self.namespace: SimpleNamespace(vector_count=len(self.ids))},
+        )
+
+
+# ============ Backend ============
+
+@dataclass
+class LocalBackend:
+    index: LocalVectorIndex
+    embedder: Any
+    source: str  # "recorded" or "synthetic"
+
+    def describe(self) -> str:
+        return f"{self.source}, {len(self.index)} vectors x {self.index.vectors.shape[1]} dims"
+
+
+def _file_stat(path: Path) -> Optional[List]:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [str(path), stat.st_mtime_ns, stat.st_size]
+
+
+def _backend_signature(fixture: Path, recorded: bool, dims: int) -> Dict[str, Any]:
+    """What a shared vectors.seg must have been built from: corpus sources, fixture and vector source."""
+    from scripts.retrieval.chunk_store import HYDRATION_COLLECTIONS, _signature
+
+    parents = [DATA_DIR / "hierarchical_parents.json", DATA_DIR / "strategy_chunks" / "hierarchical_parents.json"]
+    return {
+        "source": "recorded" if recorded else "synthetic",
+        "fixture": _file_stat(fixture) if recorded else None,
+        "dims": None if recorded else dims,
+        "chunks": [_signature(collection) for collection in HYDRATION_COLLECTIONS],
+        "parents": [_file_stat(path) for path in parents],
+    }
+
+
+def _recorded_embedder(data) -> RecordedEmbedder:
+    return RecordedEmbedder({
+        text: vector.astype(np.float32) for text, vector in zip(data["query_texts"].tolist(), data["query_vectors"])
+    })
+
+
+def build_backend(fixture: Path = FIXTURE_PATH, synthetic: bool = False, dims: int = SYNTHETIC_DIMS) -> LocalBackend:
+    """Local index + embedder from the recorded fixture, or synthetic vectors if there is none."""
+    from scripts.retrieval.base import PINECONE_NAMESPACE
+    from scripts.retrieval.shared_index import open_segment
+
+    recorded = not synthetic and fixture.exists()
+    segment = open_segment("vectors", _backend_signature(fixture, recorded, dims))
+    if segment is not None:
+        index = LocalVectorIndex.from_segment(segment)
+        embedder = _recorded_embedder(np.load(fixture)) if recorded else SyntheticEmbedder(dims)
+        return LocalBackend(index=index, embedder=embedder, source="recorded" if recorded else "synthetic")
+
+    items = load_corpus()
+    if recorded:
+        data = np.load(fixture)
+        rows = {chunk_id: row for row, chunk_id in enumerate(data["ids"].tolist())}
+        kept = [item for item in items if item.id in rows]
+        if len(kept) < len(items):
+            print(f"  {len(items) - len(kept)} local chunks have no recorded vector (fixture older than the data)")
+        vectors = data["vectors"][[rows[item.id] for item in kept]].astype(np.float32)
+        embedder = _recorded_embedder(data)
+        index = LocalVectorIndex([i.id for i in kept], vectors, [i.metadata for i in kept], PINECONE_NAMESPACE)
+        return LocalBackend(index=index, embedder=embedder, source="recorded")
+
+    embedder = SyntheticEmbedder(dims)
+    vectors = np.stack([embedder.embed(item.text) for item in items])
+    index = LocalVectorIndex([i.id for i in items], vectors, [i.metadata for i in items], PINECONE_NAMESPACE)
+    return LocalBackend(index=index, embedder=embedder, source="synthetic")
+
+
+def write_shared_backend(fixture: Path = FIXTURE_PATH, synthetic: bool = False, dims: int = SYNTHETIC_DIMS) -> int:
+    """Build the backend and write its index to the shared vectors.seg segment. Returns its size in bytes."""
+    backend = build_backend(fixture, synthetic=synthetic, dims=dims)
+    recorded = backend.source == "recorded"
+    return backend.index.save_segment(_backend_signature(fixture, recorded, dims))
+
+
+def install_local_backend(fixture: Path = FIXTURE_PATH, synthetic: bool = False) -> LocalBackend:
+    """Point SharedResources at the local backend; build retrievers after calling this."""
+    from scripts.retrieval.base import SharedResources
+
+    backend = build_backend(fixture, synthetic=synthetic)
+    SharedResources._pinecone_index = backend.index
+    SharedResources._embedding_model = backend.embedder
+    return backend
+
+
+def record_fixture(fixture: Path = FIXTURE_PATH):
+    """Fetch the live index's vectors and embed the eval queries once, for offline replay."""
+    from scripts.embeddings import OpenAIEmbedder
+    from scripts.retrieval.base import PINECONE_NAMESPACE, SharedResources
+
+    index = SharedResources.get_pinecone_index()
+    ids = [item.id for item in load_corpus()]
+    found_ids, vectors = [], []
+    for start in range(0, len(ids), FETCH_BATCH_SIZE):
+        response = index.fetch(ids=ids[start:start + FETCH_BATCH_SIZE], namespace=PINECONE_NAMESPACE)
+        for chunk_id, vector in response.vectors.items():
+            found_ids.append(chunk_id)
+            vectors.append(vector.values)
+        print(f"  Fetched {min(start + FETCH_BATCH_SIZE, len(ids))}/{len(ids)}")
+    if len(found_ids) < len(ids):
+        print(f"  {len(ids) - len(found_ids)} chunks are not in the index (run scripts/reindex_openai.py)")
+
+    texts = sorted({q["query"] for q in load_query_set()})
+    query_vectors = OpenAIEmbedder(dimensions=len(vectors[0])).encode(texts)
+
+    fixture.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        fixture,
+        ids=np.array(found_ids),
+        vectors=np.array(vectors, dtype=np.float16),  # halves the file; scores move by ~1e-4
+        query_texts=np.array(texts),
+        query_vectors=np.array(query_vectors, dtype=np.float32),
+    )
+    print(f"Wrote {fixture} ({len(found_ids)} vectors, {len(texts)} queries, {fixture.stat().st_size / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vector backend for offline retrieval runs")
+    parser.add_argument("--record", action="store_true", help="Record the fixture from the live index (needs API keys)")
+    parser.add_argument("--fixture", type=Path, default=FIXTURE_PATH, help="Fixture path")
+    parser.add_argument("--synthetic", action="store_true", help="Synthetic vectors even if the fixture exists")
+    parser.add_argument("--dims", type=int, default=SYNTHETIC_DIMS, help="Synthetic vector dimensions")
+    parser.add_argument("--shared-index", action="store_true",
+                        help="Write the shared vectors.seg segment (attached by processes run with SHARED_INDEX=true)")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixture(args.fixture)
+        return
+    if args.shared_index:
+        from scripts.retrieval.shared_index import segment_path
+        size = write_shared_backend(args.fixture, synthetic=args.synthetic, dims=args.dims)
+        print(f"Wrote {segment_path('vectors')} ({size / 1e6:.1f} MB)")
+        return
+    backend = build_backend(args.fixture, synthetic=args.synthetic, dims=args.dims)
+    print(f"Local backend: {backend.describe()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Profile API cold start: import time by module and startup time by phase.
+
+1. Imports: runs `python -X importtime -c "import api.main"` in fresh
+   interpreters and reports the slowest modules (cumulative, i.e. including
+   what they import) and the top-level packages by self time.
+2. Serving (--serve): starts uvicorn on api.main and polls /health and
+   /ready, reporting time-to-healthy, time-to-ready and the per-step
+   timings /ready exposes. Needs the API keys in .env (or the environment).
+
+Usage:
+    python eval/profile_startup.py
+    python eval/profile_startup.py --runs 5 --top 30
+    python eval/profile_startup.py --serve --port 8001
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(module: str) -> Tuple[Dict[str, Tuple[int, int, int]], float]:
+    """
+    Import module in a fresh interpreter with -X importtime.
+
+    Returns:
+        ({module: (self us, cumulative us, depth)}, wall seconds)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules, wall
+
+
+def report_imports(module: str, runs: int, top: int):
+    profiles = [profile_imports(module) for _ in range(runs)]
+    # Median over runs (the first run also pays for .pyc compilation and a cold page cache)
+    names = profiles[-1][0].keys()
+    median = {
+        name: (
+            statistics.median(p[name][0] for p, _ in profiles if name in p),
+            statistics.median(p[name][1] for p, _ in profiles if name in p),
+            profiles[-1][0][name][2],
+        )
+        for name in names
+    }
+    total = median[module][1]
+    walls = [wall for _, wall in profiles]
+
+    print("\n" + "=" * 72)
+    print(f"IMPORT {module}: {total / 1000:.0f} ms (median of {runs}), "
+          f"interpreter wall {statistics.median(walls):.2f}s")
+    print("=" * 72)
+    print(f"{'module (cumulative)':<44} | {'self ms':>8} | {'cum ms':>8} | {'%':>5}")
+    print("-" * 72)
+    slowest = sorted(median.items(), key=lambda kv: -kv[1][1])[:top]
+    for name, (self_us, cumulative_us, depth) in slowest:
+        label = ("  " * min(depth, 4) + name)[:44]
+        print(f"{label:<44} | {self_us / 1000:>8.1f} | {cumulative_us / 1000:>8.1f} | "
+              f"{cumulative_us / total:>5.0%}")
+
+    packages: Dict[str, float] = defaultdict(float)
+    for name, (self_us, _, _) in median.items():
+        packages[name.split(".")[0]] += self_us
+    print("\n" + f"{'package (self time)':<44} | {'ms':>8} | {'%':>5}")
+    print("-" * 62)
+    for package, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:top // 2]:
+        print(f"{package:<44} | {self_us / 1000:>8.1f} | {self_us / total:>5.0%}")
+
+
+def wait_for(url: str, deadline: float) -> Tuple[float, dict]:
+    """Poll url until it answers 200 (or reports a failed startup); returns (perf_counter, body)."""
+    while time.perf_counter() < deadline:
+        try:
+            response = httpx.get(url, timeout=1.0)
+            body = response.json()
+            if response.status_code == 200 or body.get("status") == "failed":
+                return time.perf_counter(), body
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not ready")
+
+
+def report_serving(port: int, timeout: float):
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        healthy = wait_for(f"http://127.0.0.1:{port}/health", deadline)[0] - start
+        ready_at, body = wait_for(f"http://127.0.0.1:{port}/ready", deadline)
+        ready = ready_at - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("\n" + "=" * 72)
+    print(f"SERVING: /health green after {healthy:.2f}s, /ready {body['status']} after {ready:.2f}s "
+          f"(startup {body['seconds']:.2f}s in the background)")
+    print("=" * 72)
+    print(f"{'phase':<12} | {'step':<24} | {'status':<8} | {'seconds':>8}")
+    print("-" * 62)
+    for phase, steps in body["phases"].items():
+        for step, status in steps.items():
+            seconds = f"{status['seconds']:.3f}" if status["seconds"] is not None else "-"
+            print(f"{phase:<12} | {step:<24} | {status['status']:<8} | {seconds:>8}")
+    if body.get("error"):
+        print(f"\nStartup error: {body['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API import time and startup phases")
+    parser.add_argument("--module", default="api.main", help="Module to profile imports of")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter import runs (median)")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the module table")
+    parser.add_argument("--serve", action="store_true", help="Also start uvicorn and time /health and /ready")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for /ready")
+    args = parser.parse_args()
+
+    report_imports(args.module, args.runs, args.top)
+    if args.serve:
+        report_serving(args.port, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 #!/bin/bash
 # Load env vars from project root
+#
+# Tests run concurrently (EVAL_WORKERS, default 4). EVAL_DELAY_MS spaces calls
+# out instead (promptfoo then runs them one at a time). promptfoo caches
+# responses on disk, so re-running after an interruption or a change to the
+# asserts only calls the model for prompts it hasn't seen (--no-cache to
+# force). Per-test results go to eval/results/router_eval.json.
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
 
@@ -8,6 +14,14 @@ set -a
 source .env
 set +a
 
+RESULTS_DIR="$PROJECT_ROOT/eval/results"
+mkdir -p "$RESULTS_DIR"
+RATE_ARGS=(--max-concurrency "${EVAL_WORKERS:-4}")
+if [ -n "$EVAL_DELAY_MS" ]; then
+  RATE_ARGS=(--delay "$EVAL_DELAY_MS")
+fi
+
 cd "$SCRIPT_DIR"
 # Default config, pass all args through
-npx promptfoo eval -c promptfooconfig_unified_router.yaml "$@"
+npx promptfoo eval -c promptfooconfig_unified_router.yaml "${RATE_ARGS[@]}" \
+  -o "$RESULTS_DIR/router_eval.json" "$@"
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the /search/unified semantic cache.
+
+Replays a query log through SemanticQueryCache at several similarity
+thresholds and reports hit rate versus result-overlap quality: for every
+semantic hit, the cached results are compared (Jaccard over chunk IDs) with
+the results a fresh search would have returned for that query.
+
+Each query is routed, embedded and retrieved once (live API calls); the
+threshold sweep itself is offline, so --save/--load lets you re-run it free.
+
+Query log formats:
+- API logs with LOG_FORMAT=json (lines with "type": "query_trace")
+- Test query files ({"queries": [{"query": ...}]}), e.g. eval/test_queries.json
+- Plain text, one query per line
+
+Usage:
+    python eval/semantic_cache_eval.py                                 # test_queries.json + variants
+    python eval/semantic_cache_eval.py --log api.log --save records.json
+    python eval/semantic_cache_eval.py --load records.json --thresholds 0.9 0.95
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.semantic_cache import SemanticQueryCache
+from eval.config import STRATEGY_TOP_K_PER_RACE
+
+DEFAULT_LOG = Path(__file__).parent / "test_queries.json"
+DEFAULT_THRESHOLDS = [0.85, 0.88, 0.90, 0.92, 0.94, 0.95, 0.96, 0.98]
+TOP_K = 5
+SCORE_THRESHOLD = 0.50
+
+
+def load_query_log(path: Path) -> List[str]:
+    """Load queries (in order, duplicates kept) from any supported log format."""
+    text = path.read_text()
+
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict) and "queries" in data:
+            return [q["query"] for q in data["queries"]]
+    except json.JSONDecodeError:
+        pass
+
+    queries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("type") == "query_trace" and record.get("query"):
+                queries.append(record["query"])
+        else:
+            queries.append(line)
+    return queries
+
+
+def make_variants(query: str) -> List[str]:
+    """Surface-level rewrites an analyst might type (case, punctuation, articles)."""
+    variants = [query.lower().rstrip("?.!") + "?"]
+    stripped = re.sub(r"\b(the|a|an)\b\s*", "", query, flags=re.IGNORECASE)
+    if stripped != query:
+        variants.append(stripped)
+    return variants
+
+
+def compute_records(queries: List[str]) -> List[Dict]:
+    """Route, embed and retrieve each query once (live API calls)."""
+    from scripts.retrieve import FocusGroupRetrieverV2, StrategyMemoRetriever, LLMRouter
+
+    print("Initializing retrievers...")
+    router = LLMRouter()
+    fg_retriever = FocusGroupRetrieverV2(use_router=False, verbose=False)
+    strategy_retriever = StrategyMemoRetriever(verbose=False)
+
+    records = []
+    for i, query in enumerate(queries, 1):
+        start = time.time()
+        route = router.route_unified(query)
+        embedding = strategy_retriever._embed_query(query)
+
+        chunk_ids = []
+        if route.content_type in ("quotes", "both"):
+            results_by_fg = fg_retriever.retrieve_per_focus_group(
+                query=query, top_k_per_fg=TOP_K, score_threshold=SCORE_THRESHOLD,
+                filter_focus_groups=route.focus_group_ids, query_embedding=embedding
+            )
+            for chunks in results_by_fg.values():
+                chunk_ids.extend(c.chunk_id for c in chunks)
+
+        if route.content_type in ("lessons", "both"):
+            grouped = strategy_retriever.retrieve_grouped(
+                query=query, top_k=STRATEGY_TOP_K_PER_RACE * 5,
+                outcome_filter=route.outcome_filter, score_threshold=SCORE_THRESHOLD,
+                query_embedding=embedding
+            )
+            for group in grouped:
+                top = sorted(group.chunks, key=lambda c: c.score, reverse=True)[:STRATEGY_TOP_K_PER_RACE]
+                chunk_ids.extend(c.chunk_id for c in top)
+
+        records.append({
+            "query": query,
+            "filters": [
+                route.content_type,
+                sorted(route.focus_group_ids) if route.focus_group_ids else None,
+                route.outcome_filter,
+            ],
+            "embedding": [float(x) for x in embedding],
+            "chunk_ids": chunk_ids,
+        })
+        print(f"  [{i}/{len(queries)}] {query[:60]} ({(time.time() - start) * 1000:.0f}ms)")
+
+    return records
+
+
+def jaccard(a: List[str], b: List[str]) -> float:
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def replay(records: List[Dict], threshold: float, max_entries: int) -> Dict:
+    """Replay the log through an exact tier + semantic tier at one threshold."""
+    cache = SemanticQueryCache(threshold=threshold, max_entries=max_entries)
+    exact: Dict[str, Dict] = {}
+    exact_hits = 0
+    overlaps = []
+
+    for record in records:
+        filters = json.dumps(record["filters"])
+        exact_key = f"{record['query'].lower().strip()}:{filters}"
+        if exact_key in exact:
+            exact_hits += 1
+            continue
+
+        hit = cache.lookup(record["embedding"], filters)
+        if hit is not None:
+            overlaps.append(jaccard(hit["response"], record["chunk_ids"]))
+            continue
+
+        cache.put(record["query"], record["embedding"], filters, record["chunk_ids"])
+        exact[exact_key] = record
+
+    overlaps.sort()
+    total = len(records)
+    return {
+        "threshold": threshold,
+        "exact_hits": exact_hits,
+        "semantic_hits": len(overlaps),
+        "hit_rate": (exact_hits + len(overlaps)) / total if total else 0.0,
+        "mean_overlap": sum(overlaps) / len(overlaps) if overlaps else None,
+        "p10_overlap": overlaps[len(overlaps) // 10] if overlaps else None,
+        "bad_hits": sum(1 for o in overlaps if o < 0.5),
+    }
+
+
+def print_report(rows: List[Dict], total: int):
+    print("\n" + "=" * 78)
+    print(f"SEMANTIC CACHE EVALUATION ({total} queries)")
+    print("=" * 78)
+    print(f"{'threshold':>9} | {'exact':>5} | {'semantic':>8} | {'hit rate':>8} | "
+          f"{'mean overlap':>12} | {'p10 overlap':>11} | {'bad (<0.5)':>10}")
+    print("-" * 78)
+    for row in rows:
+        mean = f"{row['mean_overlap']:.3f}" if row["mean_overlap"] is not None else "-"
+        p10 = f"{row['p10_overlap']:.3f}" if row["p10_overlap"] is not None else "-"
+        print(f"{row['threshold']:>9.3f} | {row['exact_hits']:>5} | {row['semantic_hits']:>8} | "
+              f"{row['hit_rate']:>7.1%} | {mean:>12} | {p10:>11} | {row['bad_hits']:>10}")
+    print("\nOverlap = Jaccard of cached vs fresh chunk IDs for each semantic hit.")
+    print("Pick the lowest threshold whose bad-hit count you can live with.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate semantic cache hit rate vs result quality")
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG, help="Query log to replay")
+    parser.add_argument("--no-variants", action="store_true",
+                        help="Replay the log as-is (default adds case/punctuation rewrites of each query)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--max-entries", type=int, default=256)
+    parser.add_argument("--save", type=Path, help="Save computed records for offline re-runs")
+    parser.add_argument("--load", type=Path, help="Load records instead of calling the APIs")
+    args = parser.parse_args()
+
+    if args.load:
+        with open(args.load) as f:
+            records = json.load(f)
+        print(f"Loaded {len(records)} records from {args.load}")
+    else:
+        queries = load_query_log(args.log)
+        if not args.no_variants:
+            queries = queries + [v for q in queries for v in make_variants(q)]
+        print(f"Replaying {len(queries)} queries from {args.log}")
+        records = compute_records(queries)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(records, f)
+            print(f"Saved records to {args.save}")
+
+    rows = [replay(records, t, args.max_entries) for t in sorted(args.thresholds)]
+    print_report(rows, len(records))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI embeddings and Pinecone upsert APIs.
+
+For exercising the ingestion pipeline (scripts/ingest.py) without API keys or
+cost, with realistic rate limiting and latency:
+
+- POST /v1/embeddings       OpenAI-compatible (float or base64 encoding).
+                            Token-bucket limits on tokens/min and requests/min;
+                            over the limit -> 429 with Retry-After-Ms / Retry-After.
+                            Latency = base + per-1k-token cost.
+- POST /vectors/upsert      Pinecone REST-compatible ({"vectors": [...], "namespace": ...}).
+                            Latency = base + per-vector cost; more than
+                            --max-upserts concurrent requests -> 429.
+- GET  /stats               Request, 429 and peak-concurrency counters.
+- POST /stats/reset
+
+The two endpoints live in IngestStub, which eval/stub_upstreams.py mounts
+too (with its own vectors, latency jitter and injected errors).
+
+Vectors are deterministic per text (seeded by its hash) and unit-normalized.
+
+Usage:
+    python eval/stub_ingest_server.py                          # :8765, 1M TPM, 3000 RPM
+    python eval/stub_ingest_server.py --tpm 200000 --rpm 500 --port 8766
+
+    OpenAIEmbedder(base_url="http://127.0.0.1:8765/v1", max_retries=0)
+    Pinecone(api_key="stub").Index(host="http://127.0.0.1:8765")
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+@dataclass
+class StubStats:
+    embed_requests: int = 0
+    embed_rate_limited: int = 0
+    embed_inputs: int = 0
+    embed_tokens: int = 0
+    upsert_requests: int = 0
+    upsert_rate_limited: int = 0
+    upserted_vectors: int = 0
+    peak_embed_concurrency: int = 0
+    peak_upsert_concurrency: int = 0
+
+
+class TokenBucket:
+    """Refills continuously at a per-minute rate, holding at most burst seconds' worth."""
+
+    def __init__(self, per_minute: float, burst: float = 60.0):
+        self.rate = per_minute / 60.0
+        self.capacity = self.rate * burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Take amount if available; else return seconds until it would be."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+def count_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def fake_vector(text: str, dims: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def rate_limited(wait: float, message: str) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": "rate_limit_exceeded", "code": "rate_limit_exceeded"}},
+        status_code=429,
+        headers={"retry-after-ms": str(int(wait * 1000) + 1), "retry-after": str(int(wait) + 1)},
+    )
+
+
+class IngestStub:
+    """
+    The embeddings and upsert endpoints, with their counters.
+
+    Served by this module and mounted by eval/stub_upstreams.py, so both stub
+    servers answer these routes the same way.
+
+    Args:
+        args: tpm and rpm (0 = unlimited), burst, embed_latency,
+            embed_latency_per_1k, upsert_latency, upsert_latency_per_vector,
+            max_upserts (0 = unlimited)
+        vector: (text, dims) -> unit vector
+        latency: applied to each computed delay (stub_upstreams adds jitter)
+    """
+
+    def __init__(
+        self,
+        args,
+        vector: Callable[[str, int], np.ndarray] = fake_vector,
+        latency: Optional[Callable[[float], float]] = None
+    ):
+        self.args = args
+        self.vector = vector
+        self.latency = latency or (lambda seconds: seconds)
+        self.stats = StubStats()
+        self.token_bucket = TokenBucket(args.tpm, args.burst) if args.tpm else None
+        self.request_bucket = TokenBucket(args.rpm, args.burst) if args.rpm else None
+        self.embedding = self.upserting = 0
+
+    def reset(self):
+        self.stats = StubStats()
+
+    def _rate_limit_wait(self, tokens: int) -> float:
+        waits = [bucket.take(amount) for bucket, amount in ((self.request_bucket, 1), (self.token_bucket, tokens))
+                 if bucket is not None]
+        return max(waits, default=0.0)
+
+    async def embeddings(self, request: Request):
+        body = await request.json()
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        tokens = sum(count_tokens(t) for t in texts)
+        stats = self.stats
+
+        wait = self._rate_limit_wait(tokens)
+        if wait > 0:
+            stats.embed_rate_limited += 1
+            return rate_limited(wait, f"Rate limit reached: {tokens} tokens requested")
+
+        stats.embed_requests += 1
+        stats.embed_inputs += len(texts)
+        stats.embed_tokens += tokens
+        self.embedding += 1
+        stats.peak_embed_concurrency = max(stats.peak_embed_concurrency, self.embedding)
+        try:
+            await asyncio.sleep(self.latency(self.args.embed_latency + tokens / 1000 * self.args.embed_latency_per_1k))
+        finally:
+            self.embedding -= 1
+
+        dims = body.get("dimensions") or 1536
+        base64_encoding = body.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(texts):
+            vector = np.asarray(self.vector(text, dims), dtype=np.float32)
+            embedding = base64.b64encode(vector.tobytes()).decode() if base64_encoding else vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        return JSONResponse({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    async def upsert(self, request: Request):
+        body = await request.json()
+        vectors = body.get("vectors", [])
+        stats = self.stats
+        if self.args.max_upserts and self.upserting >= self.args.max_upserts:
+            stats.upsert_rate_limited += 1
+            return rate_limited(0.05, "Too many concurrent upserts")
+
+        stats.upsert_requests += 1
+        self.upserting += 1
+        stats.peak_upsert_concurrency = max(stats.peak_upsert_concurrency, self.upserting)
+        try:
+            await asyncio.sleep(self.latency(
+                self.args.upsert_latency + len(vectors) * self.args.upsert_latency_per_vector
+            ))
+        finally:
+            self.upserting -= 1
+        stats.upserted_vectors += len(vectors)
+        return JSONResponse({"upsertedCount": len(vectors)})
+
+
+def create_app(args) -> Starlette:
+    stub = IngestStub(args)
+
+    async def get_stats(request: Request):
+        return JSONResponse(asdict(stub.stats))
+
+    async def reset_stats(request: Request):
+        stub.reset()
+        return JSONResponse({"ok": True})
+
+    return Starlette(routes=[
+        Route("/v1/embeddings", stub.embeddings, methods=["POST"]),
+        Route("/vectors/upsert", stub.upsert, methods=["POST"]),
+        Route("/stats", get_stats, methods=["GET"]),
+        Route("/stats/reset", reset_stats, methods=["POST"]),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in OpenAI embeddings + Pinecone upsert server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Embedding tokens per minute")
+    parser.add_argument("--rpm", type=float, default=3000, help="Embedding requests per minute")
+    parser.add_argument("--burst", type=float, default=60.0,
+                        help="Seconds of limit that can be spent at once (60 = a full minute's worth)")
+    parser.add_argument("--embed-latency", type=float, default=0.15, help="Seconds per embedding request")
+    parser.add_argument("--embed-latency-per-1k", type=float, default=0.02, help="Extra seconds per 1k tokens")
+    parser.add_argument("--upsert-latency", type=float, default=0.08, help="Seconds per upsert request")
+    parser.add_argument("--upsert-latency-per-vector", type=float, default=0.0005)
+    parser.add_argument("--max-upserts", type=int, default=8, help="Concurrent upserts before 429")
+    parser.add_argument("--keep-alive", type=int, default=5,
+                        help="Seconds the server keeps idle connections (uvicorn default 5; cloud APIs keep longer)")
+    args = parser.parse_args()
+
+    print(f"Stub ingest server on http://{args.host}:{args.port} "
+          f"({args.tpm:,.0f} TPM, {args.rpm:,.0f} RPM, {args.max_upserts} concurrent upserts)")
+    uvicorn.run(
+        create_app(args), host=args.host, port=args.port, log_level="warning", timeout_keep_alive=args.keep_alive
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for every upstream the API calls, for load tests.
+
+One server answers, with injected latency and error rates:
+
+- POST /v1/chat/completions   OpenRouter-compatible, streaming (SSE, with the
+                              include_usage chunk) and non-streaming. Router
+                              prompts get a valid routing JSON (content type
+                              picked per query, deterministically); everything
+                              else gets filler text. Latency = time to first
+                              token, then --token-interval per streamed token.
+- GET  /v1/models             OpenRouter model list (the API's connection warmup)
+- POST /v1/embeddings         OpenAI-compatible, synthetic vectors from
+                              eval/local_backend.py (same space as the index)
+- POST /vectors/upsert        (these two are eval/stub_ingest_server.py's
+                              IngestStub, without its rate limits)
+- POST /query                 Pinecone data plane over a LocalVectorIndex of the
+- GET  /vectors/fetch         real chunk metadata with synthetic vectors, so
+- POST /describe_index_stats  retrieval and hydration do their real work
+- GET  /stats, POST /stats/reset   per-upstream requests, injected errors, peak concurrency
+
+Point the API at it with:
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8770/v1 OPENAI_BASE_URL=http://127.0.0.1:8770/v1 \\
+    PINECONE_HOST=http://127.0.0.1:8770 OPENROUTER_API_KEY=stub OPENAI_API_KEY=stub PINECONE_API_KEY=stub \\
+    uvicorn api.main:app
+
+Usage:
+    python eval/stub_upstreams.py                                   # :8770, realistic latencies
+    python eval/stub_upstreams.py --chat-latency 2 --chat-errors 0.05 --pinecone-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.stub_ingest_server import IngestStub, count_tokens
+
+CONTENT_TYPES = ["quotes", "lessons", "both"]
+FILLER = ("Voters in this group kept returning to prices, trust and whether the campaign "
+          "understood their daily lives; several contrasted national messaging with local concerns.").split()
+
+
+@dataclass
+class UpstreamStats:
+    requests: int = 0
+    injected_errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+
+@dataclass
+class UpstreamTable:
+    upstreams: Dict[str, UpstreamStats] = field(default_factory=lambda: {
+        name: UpstreamStats() for name in ("chat", "chat_stream", "embeddings", "pinecone")
+    })
+
+    def to_dict(self):
+        return {name: asdict(stats) for name, stats in self.upstreams.items()}
+
+
+def create_app(args) -> Starlette:
+    from eval.local_backend import build_backend  # imports eval.config: keep it out of load_test.py's import
+
+    print("Building stub index...")
+    backend = build_backend(synthetic=True, dims=args.dims)
+    index, embedder = backend.index, backend.embedder
+    print(f"Stub index: {backend.describe()}")
+    stats = UpstreamTable()
+    rng = random.Random(args.seed)
+
+    def latency(base: float) -> float:
+        return max(0.0, base * rng.uniform(1 - args.jitter, 1 + args.jitter))
+
+    # Same handlers as the ingest stub: no rate limits, flat latencies, the index's vector space
+    ingest = IngestStub(
+        argparse.Namespace(
+            tpm=0, rpm=0, burst=60.0, max_upserts=0,
+            embed_latency=args.embed_latency, embed_latency_per_1k=0.0,
+            upsert_latency=args.pinecone_latency, upsert_latency_per_vector=0.0,
+        ),
+        vector=lambda text, dims: embedder.embed(text),
+        latency=latency,
+    )
+
+    def injected_error(upstream: str, rate: float):
+        """An error response with probability rate (counted), else None."""
+        if rate <= 0 or rng.random() >= rate:
+            return None
+        stats.upstreams[upstream].injected_errors += 1
+        headers = {"retry-after": "1"} if args.error_status == 429 else {}
+        return JSONResponse(
+            {"error": {"message": f"Injected {args.error_status} from stub", "type": "stub_error"}},
+            status_code=args.error_status, headers=headers,
+        )
+
+    class tracked:
+        """Counts a request as in flight for one upstream."""
+        def __init__(self, upstream: str):
+            self.stats = stats.upstreams[upstream]
+
+        def __enter__(self):
+            self.stats.requests += 1
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+
+        def __exit__(self, *exc):
+            self.stats.in_flight -= 1
+
+    def completion_text(messages, max_tokens: int) -> str:
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else ""
+        if '"content_type"' in system:
+            query = messages[-1].get("content", "")
+            content_type = CONTENT_TYPES[zlib.crc32(query.encode()) % len(CONTENT_TYPES)]
+            return json.dumps({
+                "content_type": content_type,
+                "focus_groups": {"all": True},
+                "strategy": {"all": True, "outcome_filter": None},
+            })
+        words = min(max_tokens or args.chat_tokens, args.chat_tokens)
+        return " ".join(FILLER[i % len(FILLER)] for i in range(words))
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stream = bool(body.get("stream"))
+        upstream = "chat_stream" if stream else "chat"
+        error = injected_error(upstream, args.chat_errors)
+        if error is not None:
+            return error
+
+        model = body.get("model", "stub")
+        text = completion_text(body.get("messages", []), body.get("max_tokens"))
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in body.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(text),
+                 "total_tokens": prompt_tokens + count_tokens(text)}
+        created = int(time.time())
+
+        if not stream:
+            with tracked(upstream):
+                await asyncio.sleep(latency(args.chat_latency))
+            return JSONResponse({
+                "id": "stub-chat", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: Dict, finish_reason=None) -> str:
+            return "data: " + json.dumps({
+                "id": "stub-chat", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        async def events():
+            with tracked(upstream):
+                await asyncio.sleep(latency(args.chat_latency))
+                yield chunk({"role": "assistant", "content": ""})
+                for i, word in enumerate(text.split(" ")):
+                    if i:
+                        await asyncio.sleep(args.token_interval)
+                    yield chunk({"content": word if i == 0 else " " + word})
+                yield chunk({}, finish_reason="stop")
+                if include_usage:
+                    yield "data: " + json.dumps({
+                        "id": "stub-chat", "object": "chat.completion.chunk", "created": created,
+                        "model": model, "choices": [], "usage": usage,
+                    }) + "\n\n"
+                yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def models(request: Request):
+        return JSONResponse({"object": "list", "data": [{"id": "stub", "object": "model", "created": 0, "owned_by": "stub"}]})
+
+    def upstream(name: str, error_rate: float, handler: Callable):
+        """An ingest handler with this server's injected errors and in-flight tracking."""
+        async def endpoint(request: Request):
+            error = injected_error(name, error_rate)
+            if error is not None:
+                return error
+            with tracked(name):
+                return await handler(request)
+        return endpoint
+
+    async def pinecone_call(request: Request, handler):
+        error = injected_error("pinecone", args.pinecone_errors)
+        if error is not None:
+            return error
+        with tracked("pinecone"):
+            await asyncio.sleep(latency(args.pinecone_latency))
+        return JSONResponse(await handler())
+
+    async def query(request: Request):
+        body = await request.json()
+
+        async def run():
+            result = index.query(
+                vector=body["vector"], top_k=body.get("topK", 10), filter=body.get("filter"),
+                include_metadata=body.get("includeMetadata", False), include_values=body.get("includeValues", False),
+            )
+            matches = []
+            for m in result.matches:
+                match = {"id": m.id, "score": m.score, "values": m.values}
+                if m.metadata is not None:
+                    match["metadata"] = m.metadata
+                matches.append(match)
+            return {"matches": matches, "namespace": body.get("namespace", ""), "usage": {"readUnits": 5}}
+
+        return await pinecone_call(request, run)
+
+    async def fetch(request: Request):
+        ids = request.query_params.getlist("ids")
+        namespace = request.query_params.get("namespace", "")
+
+        async def run():
+            result = index.fetch(ids)
+            vectors = {vid: {"id": vid, "values": v.values, "metadata": v.metadata} for vid, v in result.vectors.items()}
+            return {"vectors": vectors, "namespace": namespace, "usage": {"readUnits": 1}}
+
+        return await pinecone_call(request, run)
+
+    async def describe_index_stats(request: Request):
+        async def run():
+            return {
+                "namespaces": {index.namespace: {"vectorCount": len(index)}},
+                "dimension": args.dims, "indexFullness": 0.0, "totalVectorCount": len(index),
+            }
+
+        return await pinecone_call(request, run)
+
+    async def get_stats(request: Request):
+        return JSONResponse(stats.to_dict())
+
+    async def reset_stats(request: Request):
+        stats.upstreams.update(UpstreamTable().upstreams)
+        ingest.reset()
+        return JSONResponse({"ok": True})
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1/models", models, methods=["GET"]),
+        Route("/v1/embeddings", upstream("embeddings", args.embed_errors, ingest.embeddings), methods=["POST"]),
+        Route("/query", query, methods=["POST"]),
+        Route("/vectors/fetch", fetch, methods=["GET"]),
+        Route("/describe_index_stats", describe_index_stats, methods=["POST", "GET"]),
+        Route("/vectors/upsert", upstream("pinecone", args.pinecone_errors, ingest.upsert), methods=["POST"]),
+        Route("/stats", get_stats, methods=["GET"]),
+        Route("/stats/reset", reset_stats, methods=["POST"]),
+    ])
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """Latency and error flags, shared with eval/load_test.py (which passes them through)."""
+    group = parser.add_argument_group("stub upstreams")
+    group.add_argument("--chat-latency", type=float, default=0.6, help="Seconds to first token (router, synthesis)")
+    group.add_argument("--token-interval", type=float, default=0.01, help="Seconds between streamed tokens")
+    group.add_argument("--chat-tokens", type=int, default=150, help="Words per synthesis completion")
+    group.add_argument("--embed-latency", type=float, default=0.12, help="Seconds per embedding request")
+    group.add_argument("--pinecone-latency", type=float, default=0.04, help="Seconds per Pinecone request")
+    group.add_argument("--jitter", type=float, default=0.3, help="Latency varies uniformly by +/- this fraction")
+    group.add_argument("--chat-errors", type=float, default=0.0, help="Share of chat requests that fail")
+    group.add_argument("--embed-errors", type=float, default=0.0, help="Share of embedding requests that fail")
+    group.add_argument("--pinecone-errors", type=float, default=0.0, help="Share of Pinecone requests that fail")
+    group.add_argument("--error-status", type=int, default=500, help="Status of injected errors (500, 503, 429)")
+
+
+STUB_FLAGS = [
+    "chat_latency", "token_interval", "chat_tokens", "embed_latency", "pinecone_latency",
+    "jitter", "chat_errors", "embed_errors", "pinecone_errors", "error_status",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in OpenRouter, OpenAI embeddings and Pinecone server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--dims", type=int, default=1024, help="Vector dimensions (the API embeds at 1024)")
+    parser.add_argument("--seed", type=int, default=0)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app(args)
+    print(f"Stub upstreams on http://{args.host}:{args.port} (chat {args.chat_latency}s, "
+          f"embeddings {args.embed_latency}s, pinecone {args.pinecone_latency}s)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", timeout_keep_alive=60)
+
+
+if __name__ == "__main__":
+    main()
@@ -344,18 +344,30 @@ class BackendE2ETests:
         self._add_result("cache_hit_faster", passed, message, (time.time() - start) * 1000)
 
     def test_rate_limit_headers(self):
-        """Rate limit should not block normal usage (under 100/day)."""
+        """Rate limit should not block normal usage, and responses carry RateLimit-* headers."""
         start = time.time()
         query = "What did voters say?"
 
         try:
             # Make a few requests - should all succeed
+            remaining = []
             for i in range(3):
-                result = self._search(query)
-
-            # Should not hit rate limit with just 3 requests
-            passed = True
-            message = "3 requests succeeded without rate limiting"
+                response = requests.post(
+                    f"{self.base_url}/search/unified",
+                    json={"query": query, "top_k": 5, "score_threshold": self.threshold}
+                )
+                response.raise_for_status()
+                remaining.append(response.headers.get("RateLimit-Remaining"))
+
+            missing = [h for h in ("RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset")
+                       if h not in response.headers]
+            if missing:
+                passed = False
+                message = f"Missing headers: {', '.join(missing)}"
+            else:
+                # Should not hit rate limit with just 3 requests
+                passed = True
+                message = f"3 requests succeeded without rate limiting (remaining: {', '.join(remaining)})"
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 429:
@@ -0,0 +1,315 @@
+"""
+Build manifest for incremental preprocessing.
+
+Tracks what the preprocessing pipeline has already built, so each stage only
+touches what changed:
+
+- sources: per stage ("transcripts", "memos"), the content hash of every
+  source file plus the manifest entry it produced. A stage reprocesses only
+  new or changed files (or everything when its own script changes).
+- pending: per downstream consumer, the vector/chunk ids upserted or removed
+  in each collection since that consumer last ran, plus the groups (focus
+  groups / races) they belong to.
+
+Change propagation:
+
+    preprocess.py       -> "chunks"        -> enrich_chunks.py --changed
+    enrich_chunks.py    -> "focus_groups"  -> embed.py --changed-only
+    preprocess_memos.py -> "strategy"      -> preprocess_memos.py Phase 2 (section parents),
+                                              embed.py --changed-only
+
+reindex_openai.py needs no changeset: its embedding ledger diffs every text
+against what is already in the index (scripts/embedding_ledger.py).
+
+Changes are recorded before outputs are written and acknowledged only after a
+consumer finishes, so a crash never loses a change (at worst a consumer redoes
+some work).
+
+The manifest lives in data/build_manifest.json (local build state, not
+committed). Deleting it just makes the next run reprocess every source; chunk
+ids only enter the changeset when their records actually differ.
+
+Usage:
+    from scripts.build_manifest import BuildManifest, atomic_write_json, diff_records
+
+    build = BuildManifest.load()
+    dirty, removed = build.plan("transcripts", transcripts, code_file=Path(__file__))
+    build.record_changes("chunks", upserted, removed_ids, groups=[fg_id])
+    build.save()
+
+    changes = build.pending("enrich", "chunks")
+    ...
+    build.acknowledge("enrich", "chunks")
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import DATA_DIR, PROJECT_ROOT
+
+BUILD_MANIFEST_FILE = DATA_DIR / "build_manifest.json"
+MANIFEST_VERSION = 1
+
+DELETE_BATCH_SIZE = 1000  # Pinecone delete limit
+
+# Which consumers track changes to each collection
+CONSUMERS = {
+    "chunks": ["enrich"],
+    "focus_groups": ["embed"],
+    "strategy": ["parents", "embed"],
+}
+
+
+# ============ File Helpers ============
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write_json(path: Path, data, indent: Optional[int] = 2):
+    """Write JSON via a temp file + rename, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_json_list(path: Path) -> List[Dict]:
+    """Read a JSON list of records, or [] if the file doesn't exist."""
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff_records(old: List[Dict], new: List[Dict], key: str = "chunk_id") -> Tuple[List[str], List[str]]:
+    """
+    Compare two versions of a group's records.
+
+    Returns:
+        (upserted ids - new or changed records, removed ids)
+    """
+    old_by_id = {record[key]: record for record in old}
+    new_ids = {record[key] for record in new}
+    upserted = [record[key] for record in new if old_by_id.get(record[key]) != record]
+    removed = [record_id for record_id in old_by_id if record_id not in new_ids]
+    return upserted, removed
+
+
+def map_sources(fn: Callable, paths: List[Path], workers: int) -> Iterator[Tuple[Path, object, Optional[BaseException]]]:
+    """
+    Run fn(path) for every path in a process pool.
+
+    Yields (path, result, error) in input order; a failing file yields its
+    exception instead of aborting the run. workers <= 1 runs inline.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield path, fn(path), None
+            except Exception as e:
+                yield path, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = [pool.submit(fn, path) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                yield path, None, e
+
+
+# ============ Change Sets ============
+
+@dataclass
+class ChangeSet:
+    """Ids upserted/removed in one collection since a consumer last ran."""
+    upserted: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    groups: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.upserted or self.removed or self.groups)
+
+    def merge(self, upserted: Iterable[str], removed: Iterable[str], groups: Iterable[str]):
+        """Fold in newer changes (a later upsert cancels an earlier removal and vice versa)."""
+        for chunk_id in upserted:
+            self.upserted.add(chunk_id)
+            self.removed.discard(chunk_id)
+        for chunk_id in removed:
+            self.removed.add(chunk_id)
+            self.upserted.discard(chunk_id)
+        self.groups.update(groups)
+
+    def select(self, records: List[Dict], key: str = "chunk_id") -> List[Dict]:
+        """The records whose id was upserted."""
+        return [record for record in records if record[key] in self.upserted]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            "upserted": sorted(self.upserted),
+            "removed": sorted(self.removed),
+            "groups": sorted(self.groups),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ChangeSet":
+        return cls(
+            upserted=set(data.get("upserted", [])),
+            removed=set(data.get("removed", [])),
+            groups=set(data.get("groups", [])),
+        )
+
+
+# ============ Build Manifest ============
+
+class BuildManifest:
+    """Source fingerprints and pending downstream changes (data/build_manifest.json)."""
+
+    def __init__(self, data: Optional[Dict] = None, path: Path = BUILD_MANIFEST_FILE):
+        self.path = path
+        self.data = data or {"version": MANIFEST_VERSION, "stages": {}, "pending": {}}
+        self._hashes: Dict[str, str] = {}  # source_key -> hash seen by plan()
+        self._code_hashes: Dict[str, str] = {}  # stage -> script hash seen by plan()
+
+    @classmethod
+    def load(cls, path: Path = BUILD_MANIFEST_FILE) -> "BuildManifest":
+        if path.exists():
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return cls(data, path)
+            print(f"Build manifest version changed, rebuilding: {path}")
+        return cls(path=path)
+
+    def save(self):
+        atomic_write_json(self.path, self.data)
+
+    # --- Sources ---
+
+    def _stage(self, stage: str) -> Dict:
+        return self.data["stages"].setdefault(stage, {"code_hash": "", "sources": {}})
+
+    @staticmethod
+    def source_key(path: Path) -> str:
+        return str(Path(path).resolve().relative_to(PROJECT_ROOT.resolve()))
+
+    def plan(
+        self,
+        stage: str,
+        sources: List[Path],
+        code_file: Optional[Path] = None,
+        force: bool = False
+    ) -> Tuple[List[Path], Dict[str, Dict]]:
+        """
+        Decide what a stage needs to (re)process.
+
+        Args:
+            stage: Stage name
+            sources: All current source files
+            code_file: The stage's script - if it changed, every source is dirty
+            force: Treat every source as dirty
+
+        Returns:
+            (new or changed sources, {source_key: record} for deleted sources)
+        """
+        state = self._stage(stage)
+        code_hash = file_hash(code_file) if code_file else ""
+        if code_hash != state["code_hash"]:
+            force = True
+
+        known = state["sources"]
+        dirty = []
+        current = set()
+        for path in sources:
+            key = self.source_key(path)
+            current.add(key)
+            self._hashes[key] = file_hash(path)
+            record = known.get(key)
+            if force or record is None or record["hash"] != self._hashes[key]:
+                dirty.append(path)
+
+        removed = {key: record for key, record in known.items() if key not in current}
+        self._code_hashes[stage] = code_hash
+        return dirty, removed
+
+    def record_source(self, stage: str, path: Path, group_id: str, entry: Dict):
+        """Mark a source as built, with the manifest entry it produced."""
+        key = self.source_key(path)
+        self._stage(stage)["sources"][key] = {
+            # The hash plan() saw is the content that was processed
+            "hash": self._hashes.get(key) or file_hash(path),
+            "group_id": group_id,
+            "entry": entry,
+        }
+
+    def forget_source(self, stage: str, key: str):
+        self._stage(stage)["sources"].pop(key, None)
+
+    def finish_stage(self, stage: str):
+        """Record the script version the stage was built with (call after a successful run)."""
+        if stage in self._code_hashes:
+            self._stage(stage)["code_hash"] = self._code_hashes[stage]
+
+    def entries(self, stage: str) -> List[Dict]:
+        """Manifest entries of all built sources, in source path order."""
+        sources = self._stage(stage)["sources"]
+        return [sources[key]["entry"] for key in sorted(sources)]
+
+    # --- Pending changes ---
+
+    def record_changes(
+        self,
+        collection: str,
+        upserted: Iterable[str] = (),
+        removed: Iterable[str] = (),
+        groups: Iterable[str] = ()
+    ):
+        """Queue changed ids in a collection for every consumer of it."""
+        upserted, removed, groups = list(upserted), list(removed), list(groups)
+        if not (upserted or removed or groups):
+            return
+        for consumer in CONSUMERS.get(collection, []):
+            changes = self.pending(consumer, collection)
+            changes.merge(upserted, removed, groups)
+            self.data["pending"].setdefault(consumer, {})[collection] = changes.to_dict()
+
+    def pending(self, consumer: str, collection: str) -> ChangeSet:
+        """Changes in a collection a consumer hasn't processed yet."""
+        data = self.data["pending"].get(consumer, {}).get(collection, {})
+        return ChangeSet.from_dict(data)
+
+    def acknowledge(self, consumer: str, collection: str):
+        """Clear a consumer's pending changes for a collection (after it succeeded)."""
+        self.data["pending"].get(consumer, {}).pop(collection, None)
+
+
+# ============ Consumers ============
+
+def delete_removed(index, *changes: ChangeSet, namespace: str = "") -> int:
+    """Delete the vectors of removed chunks/parents from a Pinecone index. Returns the count."""
+    removed_ids = sorted(set().union(*(c.removed for c in changes)))
+    for i in range(0, len(removed_ids), DELETE_BATCH_SIZE):
+        index.delete(ids=removed_ids[i:i + DELETE_BATCH_SIZE], namespace=namespace)
+    return len(removed_ids)
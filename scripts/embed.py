@@ -9,6 +9,8 @@ Supports:
 
 Run: python scripts/embed.py
       python scripts/embed.py --strategy-only  # Just embed strategy memos
+      python scripts/embed.py --changed-only   # Only what preprocessing changed since last run
+      python scripts/embed.py --upsert-workers 8  # Upserts overlap embedding (scripts/ingest.py)
 """
 
 import json
@@ -20,12 +22,17 @@ from typing import List, Dict
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from eval.config import PINECONE_API_KEY, DATA_DIR, FOCUS_GROUPS_DIR, EMBEDDING_MODEL_LOCAL
+from scripts.build_manifest import BuildManifest, delete_removed
+from scripts.embedding_ledger import EmbeddingItem
+from scripts.ingest import IngestPipeline
+from scripts.retrieval.chunk_store import load_chunks
 from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone
+from scripts.http_clients import pinecone_client
 
 # Constants - bge-m3 uses 1024 dimensions
 INDEX_NAME = "focus-group-v3"
 MODEL_NAME = EMBEDDING_MODEL_LOCAL
+CONSUMER = "embed"  # build manifest consumer (--changed-only)
 
 # Auto-detect dimension based on model
 MODEL_DIMENSIONS = {
@@ -38,18 +45,7 @@ DIMENSION = MODEL_DIMENSIONS.get(MODEL_NAME, 1024)
 
 def load_all_children() -> List[Dict]:
     """Load all enriched children from all focus groups."""
-    chunks_dir = DATA_DIR / "chunks_enriched"
-    all_chunks = []
-
-    for fg_dir in sorted(chunks_dir.iterdir()):
-        if fg_dir.is_dir():
-            chunks_file = fg_dir / "all_chunks.json"
-            if chunks_file.exists():
-                with open(chunks_file) as f:
-                    chunks = json.load(f)
-                    all_chunks.extend(chunks)
-
-    return all_chunks
+    return load_chunks("focus_groups")
 
 
 def load_all_parents() -> List[Dict]:
@@ -65,18 +61,7 @@ def load_all_parents() -> List[Dict]:
 
 def load_strategy_chunks() -> List[Dict]:
     """Load all strategy memo chunks (children)."""
-    strategy_dir = DATA_DIR / "strategy_chunks"
-    all_chunks = []
-
-    for race_dir in sorted(strategy_dir.iterdir()):
-        if race_dir.is_dir() and race_dir.name.startswith("race-"):
-            chunks_file = race_dir / "all_chunks.json"
-            if chunks_file.exists():
-                with open(chunks_file) as f:
-                    chunks = json.load(f)
-                    all_chunks.extend(chunks)
-
-    return all_chunks
+    return load_chunks("strategy")
 
 
 def load_strategy_parents() -> List[Dict]:
@@ -100,7 +85,7 @@ def embed_texts(
     Note: bge-m3 doesn't require prefix, E5 models do.
     For simplicity, we skip prefix since bge-m3 is now default.
     """
-    embeddings = model.encode(texts, show_progress_bar=True, batch_size=batch_size)
+    embeddings = model.encode(texts, show_progress_bar=False, batch_size=batch_size)
     return embeddings.tolist()
 
 
@@ -114,9 +99,22 @@ def main():
     parser.add_argument("--strategy-only", action="store_true", help="Only embed strategy memos (additive)")
     parser.add_argument("--dry-run", action="store_true", help="Don't upload to Pinecone")
     parser.add_argument("--no-clear", action="store_true", help="Don't clear existing vectors (additive mode)")
+    parser.add_argument("--upsert-workers", type=int, default=4, help="Concurrent upsert requests")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Only embed/delete vectors changed by preprocessing since the last run")
 
     args = parser.parse_args()
 
+    # Changed-only upserts and deletes in place
+    build = BuildManifest.load()
+    fg_changes = build.pending(CONSUMER, "focus_groups") if args.changed_only else None
+    strategy_changes = build.pending(CONSUMER, "strategy") if args.changed_only else None
+    if args.changed_only:
+        args.no_clear = True
+        if not (fg_changes or strategy_changes):
+            print("Nothing changed since the last run")
+            return
+
     # Strategy-only implies no-clear and skip FG content
     if args.strategy_only:
         args.skip_parents = True
@@ -132,7 +130,7 @@ def main():
     model = SentenceTransformer(MODEL_NAME)
 
     # Initialize Pinecone
-    pc = Pinecone(api_key=PINECONE_API_KEY)
+    pc = pinecone_client(PINECONE_API_KEY)
 
     # Check if index exists, create if not
     existing_indexes = [idx.name for idx in pc.list_indexes()]
@@ -159,7 +157,8 @@ def main():
     else:
         print("\nAdditive mode: keeping existing vectors")
 
-    all_vectors = []
+    # Vectors to (re)build; embedded and upserted together by the ingestion pipeline
+    items: List[EmbeddingItem] = []
 
     # ========================================
     # FOCUS GROUP CONTENT
@@ -168,51 +167,46 @@ def main():
     # Process FG parents
     if not args.skip_parents:
         print("\n" + "=" * 60)
-        print("STEP 1: Embedding FG Parents")
+        print("STEP 1: Preparing FG Parents")
         print("=" * 60)
 
         parents = load_all_parents()
+        if fg_changes is not None:
+            parents = fg_changes.select(parents, key="id")
         print(f"Loaded {len(parents)} FG parents")
 
-        if parents:
-            parent_texts = [p["content"] for p in parents]
-            print("Embedding FG parents...")
-            parent_embeddings = embed_texts(model, parent_texts)
-
-            for parent, embedding in zip(parents, parent_embeddings):
-                all_vectors.append({
-                    "id": parent["id"],
-                    "values": embedding,
-                    "metadata": {
-                        "type": "parent",
-                        "focus_group_id": parent["focus_group_id"],
-                        "section": parent["section"],
-                        "content": parent["content"][:1000],
-                        "child_ids": json.dumps(parent.get("child_ids", []))
-                    }
-                })
-
-            print(f"Prepared {len(parents)} FG parent vectors")
+        for parent in parents:
+            items.append(EmbeddingItem(
+                id=parent["id"],
+                text=parent["content"],
+                metadata={
+                    "type": "parent",
+                    "focus_group_id": parent["focus_group_id"],
+                    "section": parent["section"],
+                    "content": parent["content"][:1000],
+                    "child_ids": json.dumps(parent.get("child_ids", []))
+                }
+            ))
+
+        print(f"Prepared {len(parents)} FG parent vectors")
 
     # Process FG children
     if not args.skip_children:
         print("\n" + "=" * 60)
-        print("STEP 2: Embedding FG Children")
+        print("STEP 2: Preparing FG Children")
         print("=" * 60)
 
         children = load_all_children()
+        if fg_changes is not None:
+            children = fg_changes.select(children)
         print(f"Loaded {len(children)} FG children")
 
-        # Use enriched content for embedding
-        child_texts = [c.get("content", c.get("content_original", "")) for c in children]
-        print("Embedding FG children...")
-        child_embeddings = embed_texts(model, child_texts)
-
-        for child, embedding in zip(children, child_embeddings):
-            all_vectors.append({
-                "id": child["chunk_id"],
-                "values": embedding,
-                "metadata": {
+        for child in children:
+            items.append(EmbeddingItem(
+                id=child["chunk_id"],
+                # Use enriched content for embedding
+                text=child.get("content", child.get("content_original", "")),
+                metadata={
                     "type": "child",
                     "focus_group_id": child["focus_group_id"],
                     "participant": child.get("participant", ""),
@@ -224,7 +218,7 @@ def main():
                     "line_number": child.get("line_number", 0),
                     "preceding_moderator_q": child.get("preceding_moderator_q", ""),
                 }
-            })
+            ))
 
         print(f"Prepared {len(children)} FG child vectors")
 
@@ -235,94 +229,105 @@ def main():
     if not args.skip_strategy:
         # Process strategy parents
         print("\n" + "=" * 60)
-        print("STEP 3: Embedding Strategy Parents")
+        print("STEP 3: Preparing Strategy Parents")
         print("=" * 60)
 
         strategy_parents = load_strategy_parents()
+        if strategy_changes is not None:
+            strategy_parents = strategy_changes.select(strategy_parents, key="id")
         print(f"Loaded {len(strategy_parents)} strategy parents")
 
-        if strategy_parents:
-            parent_texts = [p["content"] for p in strategy_parents]
-            print("Embedding strategy parents...")
-            parent_embeddings = embed_texts(model, parent_texts)
-
-            for parent, embedding in zip(strategy_parents, parent_embeddings):
-                all_vectors.append({
-                    "id": parent["id"],
-                    "values": embedding,
-                    "metadata": {
-                        "type": "strategy_parent",
-                        "race_id": parent["race_id"],
-                        "section": parent["section"],
-                        "summary": parent.get("summary", "")[:500],
-                        "content": parent["content"][:1000],
-                        "outcome": parent.get("outcome", ""),
-                        "state": parent.get("state", ""),
-                        "year": parent.get("year", 0),
-                        "margin": parent.get("margin", 0.0),
-                        "child_ids": json.dumps(parent.get("child_ids", []))
-                    }
-                })
-
-            print(f"Prepared {len(strategy_parents)} strategy parent vectors")
+        for parent in strategy_parents:
+            items.append(EmbeddingItem(
+                id=parent["id"],
+                text=parent["content"],
+                metadata={
+                    "type": "strategy_parent",
+                    "race_id": parent["race_id"],
+                    "section": parent["section"],
+                    "summary": parent.get("summary", "")[:500],
+                    "content": parent["content"][:1000],
+                    "outcome": parent.get("outcome", ""),
+                    "state": parent.get("state", ""),
+                    "year": parent.get("year", 0),
+                    "margin": parent.get("margin", 0.0),
+                    "child_ids": json.dumps(parent.get("child_ids", []))
+                }
+            ))
+
+        print(f"Prepared {len(strategy_parents)} strategy parent vectors")
 
         # Process strategy children (chunks)
         print("\n" + "=" * 60)
-        print("STEP 4: Embedding Strategy Children")
+        print("STEP 4: Preparing Strategy Children")
         print("=" * 60)
 
         strategy_chunks = load_strategy_chunks()
+        if strategy_changes is not None:
+            strategy_chunks = strategy_changes.select(strategy_chunks)
         print(f"Loaded {len(strategy_chunks)} strategy chunks")
 
-        if strategy_chunks:
-            chunk_texts = [c["content"] for c in strategy_chunks]
-            print("Embedding strategy chunks...")
-            chunk_embeddings = embed_texts(model, chunk_texts)
-
-            for chunk, embedding in zip(strategy_chunks, chunk_embeddings):
-                all_vectors.append({
-                    "id": chunk["chunk_id"],
-                    "values": embedding,
-                    "metadata": {
-                        "type": "strategy_memo",
-                        "race_id": chunk["race_id"],
-                        "section": chunk.get("section") or "",
-                        "subsection": chunk.get("subsection") or "",  # Handle null
-                        "content": chunk["content"][:1000],
-                        "outcome": chunk.get("outcome") or "",
-                        "state": chunk.get("state") or "",
-                        "year": chunk.get("year") or 0,
-                        "margin": chunk.get("margin") or 0.0,
-                        "source_file": chunk.get("source_file") or "",
-                        "line_number": chunk.get("line_number") or 0,
-                    }
-                })
-
-            print(f"Prepared {len(strategy_chunks)} strategy chunk vectors")
+        for chunk in strategy_chunks:
+            items.append(EmbeddingItem(
+                id=chunk["chunk_id"],
+                text=chunk["content"],
+                metadata={
+                    "type": "strategy_memo",
+                    "race_id": chunk["race_id"],
+                    "section": chunk.get("section") or "",
+                    "subsection": chunk.get("subsection") or "",  # Handle null
+                    "content": chunk["content"][:1000],
+                    "outcome": chunk.get("outcome") or "",
+                    "state": chunk.get("state") or "",
+                    "year": chunk.get("year") or 0,
+                    "margin": chunk.get("margin") or 0.0,
+                    "source_file": chunk.get("source_file") or "",
+                    "line_number": chunk.get("line_number") or 0,
+                }
+            ))
+
+        print(f"Prepared {len(strategy_chunks)} strategy chunk vectors")
 
     # ========================================
-    # UPLOAD TO PINECONE
+    # EMBED + UPLOAD TO PINECONE
     # ========================================
 
-    if not args.dry_run:
-        print("\n" + "=" * 60)
-        print("UPLOADING TO PINECONE")
-        print("=" * 60)
+    print("\n" + "=" * 60)
+    print("EMBEDDING + UPLOADING TO PINECONE" if not args.dry_run else "EMBEDDING (DRY RUN)")
+    print("=" * 60)
 
-        batch_size = 100
-        for i in range(0, len(all_vectors), batch_size):
-            batch = all_vectors[i:i + batch_size]
-            index.upsert(vectors=batch)
+    # Upserts stream out while the model keeps embedding; the bounded queue
+    # keeps memory flat however many vectors there are
+    pipeline = IngestPipeline(
+        embed_fn=lambda texts: (embed_texts(model, texts), 0),
+        upsert_fn=(lambda vectors: None) if args.dry_run else (lambda vectors: index.upsert(vectors=vectors)),
+        embed_workers=1,  # one local model; it parallelizes internally
+        upsert_workers=args.upsert_workers,
+        max_batch_items=256,
+    )
+    stats = pipeline.run(items)
+    print(f"  {stats.summary()}")
 
-            if (i + batch_size) % 500 == 0 or i + batch_size >= len(all_vectors):
-                print(f"  Uploaded {min(i + batch_size, len(all_vectors))}/{len(all_vectors)}")
+    if not args.dry_run:
+        # Delete vectors of removed chunks; mark the collections that were fully processed
+        if args.changed_only:
+            done = []
+            if not (args.skip_parents or args.skip_children):
+                done.append(("focus_groups", fg_changes))
+            if not args.skip_strategy:
+                done.append(("strategy", strategy_changes))
+            deleted = delete_removed(index, *(changes for _, changes in done))
+            print(f"  Deleted {deleted} vectors of removed chunks")
+            for collection, _ in done:
+                build.acknowledge(CONSUMER, collection)
+            build.save()
 
         # Verify
         time.sleep(3)
         stats = index.describe_index_stats()
         print(f"\nIndex stats: {stats.total_vector_count} vectors")
     else:
-        print(f"\n[DRY RUN] Would upload {len(all_vectors)} vectors")
+        print(f"\n[DRY RUN] Would upload {stats.items} vectors")
 
     print("\nDone!")
 
@@ -0,0 +1,189 @@
+"""
+Embedding ledger: what is already embedded and upserted in a Pinecone namespace.
+
+One append-only JSONL file per namespace (data/embedding_ledger/{namespace}.jsonl).
+Each line records a vector that is live in the index:
+
+    {"id": ..., "text_hash": ..., "meta_hash": ..., "model": ..., "dims": ...,
+     "checksum": ...}
+
+or a deletion: {"id": ..., "deleted": true}. Replaying the file (last line per
+id wins) gives the current state, so a crash mid-run loses at most the batch in
+flight - entries are appended and fsynced right after each upsert succeeds.
+compact() rewrites the file with one line per live vector.
+
+Planning compares the current texts/metadata against the ledger:
+
+- embed:  new id, or text / model / dimensions changed -> embed + upsert
+- update: text unchanged, metadata changed            -> metadata update only
+- skip:   unchanged
+- delete: in the ledger but gone from the corpus       -> delete the vector
+
+Usage:
+    from scripts.embedding_ledger import EmbeddingLedger, text_hash
+
+    ledger = EmbeddingLedger.open("openai")
+    plan = ledger.plan(items, model="text-embedding-3-small", dims=1024)
+    ...
+    ledger.record([ledger.entry(item, vector, model, dims) for ...])
+    ledger.delete(plan.delete)
+    ledger.compact()
+"""
+
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import DATA_DIR
+
+LEDGER_DIR = DATA_DIR / "embedding_ledger"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def metadata_hash(metadata: Dict) -> str:
+    return text_hash(json.dumps(metadata, sort_keys=True))
+
+
+def vector_checksum(values: Iterable[float]) -> str:
+    """Checksum of a vector as Pinecone stores it (float32)."""
+    return hashlib.sha256(np.asarray(values, dtype=np.float32).tobytes()).hexdigest()[:32]
+
+
+@dataclass
+class EmbeddingItem:
+    """One vector to keep in the index: id, the text to embed, its metadata."""
+    id: str
+    text: str
+    metadata: Dict
+
+
+@dataclass
+class EmbeddingPlan:
+    """What a run has to do to bring the namespace up to date."""
+    embed: List[EmbeddingItem] = field(default_factory=list)
+    update: List[EmbeddingItem] = field(default_factory=list)
+    skip: List[EmbeddingItem] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+
+
+class EmbeddingLedger:
+    """Append-only record of the vectors live in one namespace."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+
+    @classmethod
+    def open(cls, namespace: str, ledger_dir: Path = LEDGER_DIR) -> "EmbeddingLedger":
+        ledger = cls(ledger_dir / f"{namespace or 'default'}.jsonl")
+        ledger._replay()
+        return ledger
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write
+                    continue
+                if entry.get("deleted"):
+                    self.entries.pop(entry["id"], None)
+                else:
+                    self.entries[entry["id"]] = entry
+
+    def _append(self, lines: List[Dict]):
+        if not lines:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --- Planning ---
+
+    def plan(self, items: List[EmbeddingItem], model: str, dims: int) -> EmbeddingPlan:
+        """Diff the current items against the ledger."""
+        plan = EmbeddingPlan()
+        current = set()
+        for item in items:
+            current.add(item.id)
+            entry = self.entries.get(item.id)
+            if (
+                entry is None
+                or entry["text_hash"] != text_hash(item.text)
+                or entry["model"] != model
+                or entry["dims"] != dims
+            ):
+                plan.embed.append(item)
+            elif entry["meta_hash"] != metadata_hash(item.metadata):
+                plan.update.append(item)
+            else:
+                plan.skip.append(item)
+        plan.delete = sorted(chunk_id for chunk_id in self.entries if chunk_id not in current)
+        return plan
+
+    # --- Recording ---
+
+    @staticmethod
+    def entry(item: EmbeddingItem, vector: List[float], model: str, dims: int) -> Dict:
+        return {
+            "id": item.id,
+            "text_hash": text_hash(item.text),
+            "meta_hash": metadata_hash(item.metadata),
+            "model": model,
+            "dims": dims,
+            "checksum": vector_checksum(vector),
+        }
+
+    def record(self, entries: List[Dict]):
+        """Record upserted vectors (call after the upsert succeeded)."""
+        self._append(entries)
+        for entry in entries:
+            self.entries[entry["id"]] = entry
+
+    def record_metadata(self, items: List[EmbeddingItem]):
+        """Record metadata-only updates (call after the update succeeded)."""
+        entries = [{**self.entries[item.id], "meta_hash": metadata_hash(item.metadata)} for item in items]
+        self.record(entries)
+
+    def delete(self, ids: List[str]):
+        """Record deleted vectors (call after the delete succeeded)."""
+        self._append([{"id": chunk_id, "deleted": True} for chunk_id in ids])
+        for chunk_id in ids:
+            self.entries.pop(chunk_id, None)
+
+    def forget(self, ids: Iterable[str]):
+        """Drop ids from the ledger without touching the index (forces re-embedding)."""
+        self.delete(list(ids))
+
+    def compact(self):
+        """Rewrite the file with one line per live vector (atomically)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w") as f:
+            for chunk_id in sorted(self.entries):
+                f.write(json.dumps(self.entries[chunk_id]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, chunk_id: str) -> Optional[Dict]:
+        return self.entries.get(chunk_id)
@@ -6,9 +6,15 @@ For local dev with GPU, can use local BGE-M3.
 """
 
 import os
-from typing import List, Optional
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
 from functools import lru_cache
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.usage import create_embeddings
+
 # Embedding dimensions by model
 EMBEDDING_DIMENSIONS = {
     "BAAI/bge-m3": 1024,
@@ -23,20 +29,52 @@ USE_OPENAI_EMBEDDINGS = os.getenv("USE_OPENAI_EMBEDDINGS", "true").lower() == "t
 class OpenAIEmbedder:
     """OpenAI embeddings via API - fast for production."""
 
-    def __init__(self, model: str = "text-embedding-3-small", dimensions: int = 1024):
+    def __init__(
+        self,
+        model: str = "text-embedding-3-small",
+        dimensions: int = 1024,
+        max_retries: int = 2,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_retries: Client-level retries; 0 when the caller retries itself
+                (scripts/ingest.py honors 429 Retry-After across workers)
+            base_url: Override the API endpoint (e.g. a local stand-in server)
+        """
         import os
+        import threading
         from pathlib import Path
         from dotenv import load_dotenv
-        from openai import OpenAI
+        from scripts.http_clients import openai_client
 
         # Ensure we load the correct API key from .env
         env_path = Path(__file__).parent.parent / ".env"
         load_dotenv(env_path, override=True)
 
         api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key)
+        # Shared keep-alive pool for the API host (every embedder reuses its connections)
+        self.client = openai_client(base_url, api_key=api_key, max_retries=max_retries)
         self.model = model
         self.dimensions = dimensions
+        self.usage_tokens = 0  # API tokens billed so far
+        self._usage_lock = threading.Lock()
+
+    def embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """Embed texts in one API request. Returns (vectors, tokens used). Thread-safe."""
+        response = create_embeddings(
+            self.client, "embedding",
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions,
+        )
+        tokens = response.usage.total_tokens if response.usage is not None else 0
+        with self._usage_lock:
+            self.usage_tokens += tokens
+
+        # Sort by index to maintain order
+        sorted_data = sorted(response.data, key=lambda x: x.index)
+        return [item.embedding for item in sorted_data], tokens
 
     def encode(
         self,
@@ -51,15 +89,7 @@ class OpenAIEmbedder:
         for i in range(0, len(texts), batch_size):
             batch = texts[i:i + batch_size]
 
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=batch,
-                dimensions=self.dimensions,
-            )
-
-            # Sort by index to maintain order
-            sorted_data = sorted(response.data, key=lambda x: x.index)
-            batch_embeddings = [item.embedding for item in sorted_data]
+            batch_embeddings, _ = self.embed_batch(batch)
             all_embeddings.extend(batch_embeddings)
 
             if show_progress_bar:
@@ -6,9 +6,13 @@ Prepends structured context to each chunk:
 - Race name and location
 - Participant profile
 - Preceding moderator question
+
+Run: python scripts/enrich_chunks.py              # all focus groups
+     python scripts/enrich_chunks.py --changed    # only those preprocess.py changed
 """
 
 import json
+import shutil
 import sys
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -16,7 +20,9 @@ from typing import List, Dict, Optional
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from eval.config import DATA_DIR, CHUNKS_DIR, FOCUS_GROUPS_DIR
+from eval.config import DATA_DIR, FOCUS_GROUPS_DIR
+from scripts.build_manifest import BuildManifest, atomic_write_json, diff_records, read_json_list
+from scripts.retrieval.chunk_store import build_table, open_table
 
 
 def load_focus_group_metadata(fg_id: str) -> Dict:
@@ -30,18 +36,11 @@ def load_focus_group_metadata(fg_id: str) -> Dict:
 
 
 def load_chunks(fg_id: str) -> List[Dict]:
-    """Load all chunks for a focus group."""
-    chunks_dir = CHUNKS_DIR / fg_id
-    if not chunks_dir.exists():
-        raise FileNotFoundError(f"Chunks directory not found: {chunks_dir}")
-
-    chunks = []
-    for chunk_file in sorted(chunks_dir.glob("*.json")):
-        if chunk_file.name == "all_chunks.json":
-            continue
-        with open(chunk_file) as f:
-            chunks.append(json.load(f))
-
+    """Load all chunks for a focus group from the 'chunks' chunk store."""
+    table = open_table("chunks")
+    chunks = table.select("focus_group_id", fg_id) if table is not None else []
+    if not chunks:
+        raise FileNotFoundError(f"No chunks found for focus group: {fg_id}")
     return chunks
 
 
@@ -86,6 +85,13 @@ def enrich_chunk(chunk: Dict, fg_metadata: Dict) -> Dict:
     return enriched_chunk
 
 
+def save_enriched(fg_id: str, enriched_chunks: List[Dict], output_dir: Path):
+    """Write a focus group's enriched chunks (one file per focus group, atomically)."""
+    # Consumers read the columnar chunk store built from these files
+    atomic_write_json(output_dir / fg_id / "all_chunks.json", enriched_chunks)
+    print(f"  Saved to: {output_dir / fg_id}")
+
+
 def enrich_focus_group(fg_id: str, output_dir: Optional[Path] = None) -> List[Dict]:
     """
     Enrich all chunks for a focus group.
@@ -115,21 +121,7 @@ def enrich_focus_group(fg_id: str, output_dir: Optional[Path] = None) -> List[Di
 
     # Save if output directory specified
     if output_dir:
-        fg_output_dir = output_dir / fg_id
-        fg_output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save individual chunks
-        for i, chunk in enumerate(enriched_chunks, 1):
-            chunk_file = fg_output_dir / f"{i:03d}.json"
-            with open(chunk_file, "w") as f:
-                json.dump(chunk, f, indent=2)
-
-        # Save all chunks in one file
-        all_chunks_file = fg_output_dir / "all_chunks.json"
-        with open(all_chunks_file, "w") as f:
-            json.dump(enriched_chunks, f, indent=2)
-
-        print(f"  Saved to: {fg_output_dir}")
+        save_enriched(fg_id, enriched_chunks, output_dir)
 
     return enriched_chunks
 
@@ -142,37 +134,75 @@ def main():
     parser.add_argument("focus_groups", nargs="*", help="Focus group IDs to enrich (default: all)")
     parser.add_argument("--output", type=str, default="data/chunks_enriched",
                         help="Output directory for enriched chunks")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only focus groups changed by preprocess.py since the last run")
     parser.add_argument("--preview", action="store_true", help="Preview first chunk only")
 
     args = parser.parse_args()
 
     output_dir = Path(args.output)
+    canonical = output_dir.resolve() == (DATA_DIR / "chunks_enriched").resolve()
 
     # Get focus groups to process
+    table = open_table("chunks")
+    available = set(table.column("focus_group_id").dictionary) if table is not None else set()
+    build = BuildManifest.load()
     if args.focus_groups:
         fg_ids = args.focus_groups
+    elif args.changed:
+        # Focus groups preprocess.py changed since the last enrichment
+        fg_ids = sorted(build.pending("enrich", "chunks").groups)
     else:
         # All focus groups
-        fg_ids = [d.name for d in CHUNKS_DIR.iterdir() if d.is_dir()]
+        fg_ids = sorted(available)
 
     print(f"Processing {len(fg_ids)} focus group(s)")
     print(f"Output directory: {output_dir}")
     print()
 
-    for fg_id in fg_ids:
-        enriched = enrich_focus_group(
-            fg_id,
-            output_dir=None if args.preview else output_dir
-        )
-
-        if args.preview and enriched:
-            print("\n--- PREVIEW (first chunk) ---")
-            print(enriched[0]["content"])
-            print("--- END PREVIEW ---\n")
-            break
-
-    if not args.preview:
-        print(f"\nDone! Enriched chunks saved to: {output_dir}")
+    if args.preview:
+        for fg_id in fg_ids:
+            if fg_id in available:
+                enriched = enrich_focus_group(fg_id)
+                print("\n--- PREVIEW (first chunk) ---")
+                print(enriched[0]["content"])
+                print("--- END PREVIEW ---\n")
+                break
+        return
+
+    enriched_by_fg = {fg_id: enrich_focus_group(fg_id) for fg_id in fg_ids if fg_id in available}
+    removed_fgs = [fg_id for fg_id in fg_ids if fg_id not in available]
+
+    # Queue changed chunk ids for the embedders before writing, so a crash can't lose them
+    if canonical:
+        for fg_id, enriched in enriched_by_fg.items():
+            old = read_json_list(output_dir / fg_id / "all_chunks.json")
+            upserted, removed = diff_records(old, enriched)
+            if upserted or removed:
+                build.record_changes("focus_groups", upserted, removed, groups=[fg_id])
+        for fg_id in removed_fgs:
+            old = read_json_list(output_dir / fg_id / "all_chunks.json")
+            build.record_changes("focus_groups", removed=[c["chunk_id"] for c in old], groups=[fg_id])
+        build.save()
+
+    for fg_id, enriched in enriched_by_fg.items():
+        save_enriched(fg_id, enriched, output_dir)
+    for fg_id in removed_fgs:
+        # Its transcript was removed (or the id is unknown)
+        if (output_dir / fg_id).exists():
+            shutil.rmtree(output_dir / fg_id)
+            print(f"Removed: {output_dir / fg_id}")
+        else:
+            print(f"Skipping unknown focus group: {fg_id}")
+
+    print(f"\nDone! Enriched chunks saved to: {output_dir}")
+    if canonical:
+        if enriched_by_fg or removed_fgs:
+            build_table("focus_groups")
+        if not args.focus_groups:
+            # Every changed (or every) focus group is now enriched
+            build.acknowledge("enrich", "chunks")
+            build.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+"""
+Shared HTTP connection pools for the OpenAI, OpenRouter and Pinecone clients.
+
+Every SDK client used to bring its own default pool (httpx keeps idle
+connections for only 5 s), so bursts re-paid TCP + TLS handshakes and
+separate clients to the same host never shared a warm connection. Now there
+is one tuned httpx pool per upstream host, shared by every SDK client that
+talks to that host:
+
+    openai_client(base_url)   -> openai.OpenAI on the host's shared pool
+    pinecone_client()         -> Pinecone with the configured pool size
+    http_pool_stats()         -> per-host pool utilization and connection reuse
+
+HTTP/2 (one multiplexed connection per host) is used when the h2 package is
+installed and HTTP2_ENABLED isn't false. Pool size, keep-alive and timeouts
+come from HTTP_* settings in eval/config.py.
+
+Metrics per host come from httpcore's trace hooks: a request that didn't
+open a TCP connection reused a pooled one, and the time until the request
+got a connection is its pool wait (non-zero under pool exhaustion). A
+request stays in flight until its response body is closed, so streamed
+synthesis responses count for as long as they hold the connection.
+
+Usage:
+    client = openai_client(OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
+    print(http_pool_stats())   # {"openrouter.ai": {"requests": ..., "reuse_rate": ...}}
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from eval.config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_POOL_TIMEOUT,
+    HTTP2_ENABLED,
+    PINECONE_API_KEY,
+)
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install h2)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PoolStats:
+    """Counters for one upstream host's pool (updated from request threads)."""
+    host: str
+    max_connections: int
+    http2: bool
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    new_connections: int = 0     # requests that opened a TCP connection
+    tls_handshakes: int = 0
+    rate_limited: int = 0        # 429 responses
+    server_errors: int = 0       # 5xx responses
+    pool_timeouts: int = 0       # no connection free within HTTP_POOL_TIMEOUT
+    errors: int = 0              # no response (connect / read errors)
+    pool_wait_total: float = 0.0
+    pool_wait_max: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def begin(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(
+        self,
+        connected: bool,
+        tls: bool,
+        pool_wait: Optional[float],
+        status: Optional[int],
+        error: Optional[BaseException]
+    ):
+        """Record the outcome once the response headers (or an error) arrived."""
+        with self._lock:
+            if status == 429:
+                self.rate_limited += 1
+            elif status is not None and status >= 500:
+                self.server_errors += 1
+            self.new_connections += connected
+            self.tls_handshakes += tls
+            if pool_wait is not None:
+                self.pool_wait_total += pool_wait
+                self.pool_wait_max = max(self.pool_wait_max, pool_wait)
+            if isinstance(error, httpx.PoolTimeout):
+                self.pool_timeouts += 1
+            elif error is not None:
+                self.errors += 1
+
+    def release(self):
+        """The request no longer holds a connection (body closed, or it failed)."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def to_dict(self, open_connections: int, idle_connections: int) -> Dict[str, Any]:
+        completed = max(1, self.requests - self.in_flight)
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "utilization": round((open_connections - idle_connections) / self.max_connections, 3),
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reuse_rate": round(1 - self.new_connections / completed, 3) if self.requests else None,
+            "pool_wait_avg_ms": round(self.pool_wait_total / completed * 1000, 2),
+            "pool_wait_max_ms": round(self.pool_wait_max * 1000, 2),
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "pool_timeouts": self.pool_timeouts,
+            "errors": self.errors,
+        }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that calls release() once, when it is closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """httpx transport that records connection reuse and pool waits via httpcore trace events."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        events: Dict[str, float] = {}
+        inner: Optional[Callable] = request.extensions.get("trace")
+
+        def trace(name: str, info: Dict[str, Any]):
+            events.setdefault(name, time.perf_counter())
+            if inner is not None:
+                inner(name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self.stats.begin()
+        response = error = None
+        try:
+            response = super().handle_request(request)
+            # In flight until the body is closed (streamed responses hold the connection until then)
+            response.stream = _ReleasingStream(response.stream, self.stats.release)
+            return response
+        except BaseException as e:
+            error = e
+            self.stats.release()
+            raise
+        finally:
+            # First trace event = the request got a connection (new or pooled)
+            pool_wait = min(events.values()) - started if events else None
+            self.stats.end(
+                connected="connection.connect_tcp.started" in events,
+                tls="connection.start_tls.started" in events,
+                pool_wait=pool_wait,
+                status=response.status_code if response is not None else None,
+                error=error,
+            )
+
+    def connection_counts(self) -> tuple:
+        """(open, idle) connections currently in the pool."""
+        connections = list(self._pool.connections)
+        return len(connections), sum(1 for c in connections if c.is_idle())
+
+
+_clients: Dict[str, httpx.Client] = {}
+_transports: Dict[str, MeteredTransport] = {}
+_clients_lock = threading.Lock()
+
+
+def upstream_host(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    default_port = 443 if parts.scheme == "https" else 80
+    return parts.hostname if parts.port in (None, default_port) else f"{parts.hostname}:{parts.port}"
+
+
+def get_http_client(base_url: str) -> httpx.Client:
+    """The shared, tuned httpx client for base_url's host (created on first use)."""
+    host = upstream_host(base_url)
+    client = _clients.get(host)
+    if client is not None:
+        return client
+    with _clients_lock:
+        if host not in _clients:
+            http2 = HTTP2_ENABLED and http2_available() and base_url.startswith("https")
+            stats = PoolStats(host=host, max_connections=HTTP_MAX_CONNECTIONS, http2=http2)
+            transport = MeteredTransport(
+                stats,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            _transports[host] = transport
+            _clients[host] = httpx.Client(
+                transport=transport,
+                timeout=httpx.Timeout(
+                    HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT
+                ),
+                follow_redirects=True,
+            )
+        return _clients[host]
+
+
+def openai_client(base_url: Optional[str] = None, api_key: Optional[str] = None, max_retries: int = 2):
+    """
+    openai.OpenAI on the shared pool for base_url's host.
+
+    Clients with different keys or retry settings share connections when
+    they talk to the same host (e.g. the API's router and the memo summarizer).
+    """
+    import openai
+    base_url = base_url or OPENAI_BASE_URL
+    return openai.OpenAI(
+        api_key=api_key, base_url=base_url, max_retries=max_retries, http_client=get_http_client(base_url)
+    )
+
+
+def pinecone_client(api_key: Optional[str] = None):
+    """
+    Pinecone client with the configured pool size.
+
+    The SDK manages its own connection pool (one per Index handle, so keep a
+    single shared index - SharedResources does); only its size is tunable.
+    """
+    from pinecone import Pinecone
+    return Pinecone(api_key=api_key or PINECONE_API_KEY, connection_pool_maxsize=HTTP_MAX_CONNECTIONS)
+
+
+def http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-host pool utilization and connection reuse (served in the API's /stats)."""
+    stats = {}
+    for host, transport in list(_transports.items()):
+        stats[host] = transport.stats.to_dict(*transport.connection_counts())
+    return stats
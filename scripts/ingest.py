@@ -0,0 +1,359 @@
+"""
+Streaming embed + upsert pipeline.
+
+Replaces "embed everything, then upsert 100 at a time" with three stages
+connected by bounded queues:
+
+    producer (caller's iterable)
+        -> token-sized batches -> [embed queue]  -> N embed workers
+        -> 100-vector batches  -> [upsert queue] -> M upsert workers -> on_upserted()
+
+- Embedding batches are sized by estimated tokens, not item count, so every
+  request costs about the same against a tokens-per-minute limit.
+- Rate limits (429) honor Retry-After / Retry-After-Ms plus jitter, and pause
+  every worker calling the same endpoint until then (so four workers don't keep
+  hammering an exhausted limit); other transient errors (5xx, timeouts,
+  connection resets) back off exponentially with full jitter.
+- Both queues are bounded: when upserts fall behind, embed workers block,
+  which in turn blocks the producer. The number of vectors in memory is
+  capped by the worker and queue sizes, whatever the corpus size.
+- on_upserted runs (serialized) after each successful upsert - reindex_openai.py
+  records its embedding ledger there, so an interrupted run resumes cleanly.
+
+embed_fn(texts) returns (vectors, tokens_used); upsert_fn(vectors) takes
+Pinecone-style {"id", "values", "metadata"} dicts. Both are plain blocking
+calls (the OpenAI and Pinecone clients are synchronous), so workers are
+threads.
+
+Usage:
+    from scripts.ingest import IngestPipeline
+
+    pipeline = IngestPipeline(
+        embed_fn=embedder.embed_batch,
+        upsert_fn=lambda vectors: index.upsert(vectors=vectors, namespace="openai"),
+        on_upserted=lambda pairs: ledger.record(...),
+        embed_workers=4, upsert_workers=2,
+    )
+    stats = pipeline.run(items)      # items: iterable of EmbeddingItem
+    print(stats.summary())
+"""
+
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scripts.embedding_ledger import EmbeddingItem
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+# OpenAI embeddings: <= 2048 inputs and <= 300k tokens per request
+DEFAULT_BATCH_TOKENS = 50_000
+DEFAULT_BATCH_ITEMS = 512
+UPSERT_BATCH_SIZE = 100  # Pinecone recommends <= 100 vectors (2MB) per upsert
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+_SENTINEL = object()
+
+
+# ============ Batching ============
+
+def estimate_tokens(text: str) -> int:
+    """Token count (tiktoken when installed, else ~4 chars per token)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def token_batches(
+    items: Iterable[EmbeddingItem],
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    max_items: int = DEFAULT_BATCH_ITEMS
+) -> Iterator[Tuple[List[EmbeddingItem], int]]:
+    """Group items into batches of at most max_tokens (estimated) / max_items."""
+    batch: List[EmbeddingItem] = []
+    batch_tokens = 0
+    for item in items:
+        tokens = estimate_tokens(item.text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch, batch_tokens
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch, batch_tokens
+
+
+# ============ Retries ============
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 8  # per batch, for transient errors
+    max_rate_limited: int = 50  # per batch, for 429s (waiting out a limit is expected)
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status of an OpenAI / Pinecone / httpx error, if any."""
+    for attr in ("status_code", "status"):
+        status = getattr(exc, attr, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server-requested delay from Retry-After-Ms / Retry-After headers."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+    if not headers:
+        return None
+    for header, divisor in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return float(value) / divisor
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = _status_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # Connection resets / timeouts (openai.APIConnectionError, httpx.TransportError, ...)
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or "Connection" in name or "Timeout" in name
+
+
+# ============ Pipeline ============
+
+@dataclass
+class PipelineStats:
+    items: int = 0
+    embed_requests: int = 0
+    upsert_requests: int = 0
+    tokens: int = 0
+    estimated_tokens: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    peak_in_flight: int = 0  # vectors embedded but not yet upserted
+    wall_time: float = 0.0
+
+    def summary(self) -> str:
+        rate = self.items / self.wall_time if self.wall_time else 0.0
+        tokens = self.tokens or self.estimated_tokens
+        tpm = tokens / self.wall_time * 60 if self.wall_time else 0.0
+        return (
+            f"{self.items} vectors in {self.wall_time:.1f}s ({rate:.0f}/s, {tpm:,.0f} tokens/min) | "
+            f"{self.embed_requests} embed + {self.upsert_requests} upsert requests | "
+            f"{self.rate_limited} rate-limited, {self.retries} retries | "
+            f"peak {self.peak_in_flight} vectors in flight"
+        )
+
+
+class PipelineError(RuntimeError):
+    """A batch failed after all retries; the pipeline was stopped."""
+
+
+class IngestPipeline:
+    """Concurrent embed -> upsert with bounded queues and rate-limit-aware retries."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Tuple[List[List[float]], int]],
+        upsert_fn: Callable[[List[dict]], None],
+        on_upserted: Optional[Callable[[List[Tuple[EmbeddingItem, List[float]]]], None]] = None,
+        embed_workers: int = 4,
+        upsert_workers: int = 2,
+        max_batch_tokens: int = DEFAULT_BATCH_TOKENS,
+        max_batch_items: int = DEFAULT_BATCH_ITEMS,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        queue_size: Optional[int] = None,
+        retry: Optional[RetryPolicy] = None,
+        verbose: bool = True
+    ):
+        self.embed_fn = embed_fn
+        self.upsert_fn = upsert_fn
+        self.on_upserted = on_upserted
+        self.embed_workers = max(1, embed_workers)
+        self.upsert_workers = max(1, upsert_workers)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size or self.upsert_workers * 2
+        self.retry = retry or RetryPolicy()
+        self.verbose = verbose
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._in_flight = 0
+        self._resume_at: Dict[Callable, float] = {}  # fn -> monotonic time its rate limit lifts
+        self.stats = PipelineStats()
+
+    # --- Helpers ---
+
+    def _call(self, fn: Callable, *args):
+        """
+        Call with retries: Retry-After (+ jitter) for 429s, full-jitter backoff otherwise.
+
+        A 429 pauses every worker using fn until the Retry-After has passed.
+        """
+        attempts = rate_limited = 0
+        while True:
+            with self._lock:
+                pause = self._resume_at.get(fn, 0.0) - time.monotonic()
+            # Jitter spreads the paused workers out so they don't all retry at the same instant
+            if pause > 0 and self._stop.wait(pause * random.uniform(1.0, 1.25)):
+                raise PipelineError("Pipeline stopped")
+            try:
+                return fn(*args)
+            except Exception as e:
+                if not is_retryable(e) or self._stop.is_set():
+                    raise
+                is_rate_limit = _status_of(e) == 429
+                if is_rate_limit:
+                    rate_limited += 1
+                else:
+                    attempts += 1
+                if attempts >= self.retry.max_attempts or rate_limited >= self.retry.max_rate_limited:
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is not None:
+                    delay = min(delay, self.retry.max_delay)
+                else:
+                    # Exponent counts 429s too, so backoff grows against a rate limit without Retry-After
+                    backoff = self.retry.base_delay * 2 ** (attempts + rate_limited)
+                    delay = random.uniform(0, min(self.retry.max_delay, backoff))
+                with self._lock:
+                    self.stats.retries += 1
+                    if is_rate_limit:
+                        self.stats.rate_limited += 1
+                        resume_at = time.monotonic() + delay
+                        self._resume_at[fn] = max(self._resume_at.get(fn, 0.0), resume_at)
+                if not is_rate_limit and self._stop.wait(delay):
+                    raise
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up if the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns the sentinel if the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _SENTINEL
+
+    def _fail(self, e: BaseException):
+        with self._lock:
+            if self._error is None:
+                self._error = e
+        self._stop.set()
+
+    # --- Workers ---
+
+    def _embed_worker(self, embed_queue: queue.Queue, upsert_queue: queue.Queue):
+        while True:
+            work = self._get(embed_queue)
+            if work is _SENTINEL:
+                return
+            batch, estimated = work
+            try:
+                vectors, tokens = self._call(self.embed_fn, [item.text for item in batch])
+            except Exception as e:
+                self._fail(e)
+                return
+            with self._lock:
+                self.stats.embed_requests += 1
+                self.stats.tokens += tokens or 0
+                self.stats.estimated_tokens += estimated
+                self._in_flight += len(batch)
+                self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+            pairs = list(zip(batch, vectors))
+            for i in range(0, len(pairs), self.upsert_batch_size):
+                if not self._put(upsert_queue, pairs[i:i + self.upsert_batch_size]):
+                    return
+
+    def _upsert_worker(self, upsert_queue: queue.Queue):
+        while True:
+            pairs = self._get(upsert_queue)
+            if pairs is _SENTINEL:
+                return
+            vectors = [
+                {"id": item.id, "values": vector, "metadata": item.metadata}
+                for item, vector in pairs
+            ]
+            try:
+                self._call(self.upsert_fn, vectors)
+                with self._lock:
+                    if self.on_upserted is not None:
+                        self.on_upserted(pairs)
+                    self.stats.upsert_requests += 1
+                    self.stats.items += len(pairs)
+                    self._in_flight -= len(pairs)
+                    done = self.stats.items
+            except Exception as e:
+                self._fail(e)
+                return
+            if self.verbose and (done // 500) != ((done - len(pairs)) // 500):
+                print(f"  Upserted {done} vectors")
+
+    # --- Run ---
+
+    def run(self, items: Iterable[EmbeddingItem]) -> PipelineStats:
+        """Embed and upsert every item. Raises PipelineError if a batch fails for good."""
+        start = time.perf_counter()
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.embed_workers * 2)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        embedders = [
+            threading.Thread(target=self._embed_worker, args=(embed_queue, upsert_queue), daemon=True)
+            for _ in range(self.embed_workers)
+        ]
+        upserters = [
+            threading.Thread(target=self._upsert_worker, args=(upsert_queue,), daemon=True)
+            for _ in range(self.upsert_workers)
+        ]
+        for thread in embedders + upserters:
+            thread.start()
+
+        # Producer: blocks when the embed workers fall behind
+        for batch in token_batches(items, self.max_batch_tokens, self.max_batch_items):
+            if not self._put(embed_queue, batch):
+                break
+
+        # Drain: embed workers first, then upsert workers
+        for _ in embedders:
+            self._put(embed_queue, _SENTINEL)
+        for thread in embedders:
+            thread.join()
+        for _ in upserters:
+            self._put(upsert_queue, _SENTINEL)
+        for thread in upserters:
+            thread.join()
+
+        self.stats.wall_time = time.perf_counter() - start
+        if self._error is not None:
+            raise PipelineError(f"Ingestion stopped after {self.stats.items} vectors: {self._error}") from self._error
+        return self.stats
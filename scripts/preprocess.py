@@ -3,19 +3,34 @@
 Preprocessing script for focus group corpus.
 Converts markdown transcripts into structured JSON for retrieval.
 
+Incremental: only new or changed transcripts (by content hash, tracked in
+data/build_manifest.json) are parsed, in a process pool. Outputs are written
+atomically, and the chunk ids that changed are queued for
+enrich_chunks.py --changed.
+
 Output:
-- data/chunks/{focus_group_id}/chunk-{NNN}.json - Dialogue chunks (searchable)
+- data/chunks/{focus_group_id}/all_chunks.json - Dialogue chunks (searchable)
+- data/chunk_store/chunks.col - Columnar store of the above (read by enrich_chunks.py)
 - data/focus-groups/{focus_group_id}.json - Focus group metadata (context)
 - data/manifest.json - Index of all focus groups
+
+Run: python scripts/preprocess.py
+     python scripts/preprocess.py --force --workers 1   # full serial rebuild
 """
 
 import json
 import os
 import re
+import shutil
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.build_manifest import BuildManifest, atomic_write_json, diff_records, map_sources, read_json_list
+
 # Paths
 CORPUS_DIR = Path(__file__).parent.parent / "political-consulting-corpus"
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -280,85 +295,128 @@ def process_focus_group(transcript_path: Path) -> Tuple[List[Chunk], FocusGroupM
 
 
 def save_chunks(chunks: List[Chunk], focus_group_id: str):
-    """Save chunks to JSON files."""
-    chunk_dir = CHUNKS_DIR / focus_group_id
-    chunk_dir.mkdir(parents=True, exist_ok=True)
-
-    for chunk in chunks:
-        chunk_file = chunk_dir / f"{chunk.chunk_id.split('-')[-1]}.json"
-        with open(chunk_file, 'w') as f:
-            json.dump(asdict(chunk), f, indent=2)
-
-    # Also save all chunks in one file for convenience
-    all_chunks_file = chunk_dir / "all_chunks.json"
-    with open(all_chunks_file, 'w') as f:
-        json.dump([asdict(c) for c in chunks], f, indent=2)
+    """Save a focus group's chunks to one JSON file (indexed into the chunk store)."""
+    atomic_write_json(CHUNKS_DIR / focus_group_id / "all_chunks.json", [asdict(c) for c in chunks])
 
 
 def save_metadata(metadata: FocusGroupMetadata):
     """Save focus group metadata to JSON."""
-    FOCUS_GROUPS_DIR.mkdir(parents=True, exist_ok=True)
-    metadata_file = FOCUS_GROUPS_DIR / f"{metadata.focus_group_id}.json"
-    with open(metadata_file, 'w') as f:
-        json.dump(asdict(metadata), f, indent=2)
+    atomic_write_json(FOCUS_GROUPS_DIR / f"{metadata.focus_group_id}.json", asdict(metadata))
 
 
-def main():
-    """Process all focus group transcripts."""
-    print("=" * 60)
-    print("Focus Group Corpus Preprocessing")
-    print("=" * 60)
+def remove_focus_group(focus_group_id: str) -> List[str]:
+    """Delete a focus group's outputs (its transcript was removed). Returns its chunk ids."""
+    chunks_file = CHUNKS_DIR / focus_group_id / "all_chunks.json"
+    chunk_ids = [c["chunk_id"] for c in read_json_list(chunks_file)]
+    if chunks_file.parent.exists():
+        shutil.rmtree(chunks_file.parent)
+    (FOCUS_GROUPS_DIR / f"{focus_group_id}.json").unlink(missing_ok=True)
+    return chunk_ids
 
-    # Find all focus group transcripts
-    transcripts = list(CORPUS_DIR.glob("races/*/focus-groups/*.md"))
-    print(f"\nFound {len(transcripts)} focus group transcripts")
 
-    manifest = {
-        "total_focus_groups": 0,
-        "total_chunks": 0,
-        "focus_groups": []
+def manifest_entry(metadata: FocusGroupMetadata, chunk_count: int) -> Dict:
+    """Entry for data/manifest.json."""
+    return {
+        "focus_group_id": metadata.focus_group_id,
+        "race_name": metadata.race_name,
+        "location": metadata.location,
+        "chunk_count": chunk_count,
+        "outcome": metadata.outcome
     }
 
-    for transcript_path in sorted(transcripts):
-        print(f"\nProcessing: {transcript_path.name}")
 
-        try:
-            chunks, metadata = process_focus_group(transcript_path)
+def main():
+    """Process new or changed focus group transcripts."""
+    import argparse
 
-            # Save outputs
-            save_chunks(chunks, metadata.focus_group_id)
-            save_metadata(metadata)
+    parser = argparse.ArgumentParser(description="Preprocess focus group transcripts")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocess every transcript, not just new or changed ones")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel parser processes (default: CPU count)")
+    args = parser.parse_args()
 
-            # Update manifest
-            manifest["total_focus_groups"] += 1
-            manifest["total_chunks"] += len(chunks)
-            manifest["focus_groups"].append({
-                "focus_group_id": metadata.focus_group_id,
-                "race_name": metadata.race_name,
-                "location": metadata.location,
-                "chunk_count": len(chunks),
-                "outcome": metadata.outcome
-            })
+    print("=" * 60)
+    print("Focus Group Corpus Preprocessing")
+    print("=" * 60)
 
-            print(f"  ✓ {len(chunks)} chunks extracted")
+    # Find all focus group transcripts and decide what needs work
+    transcripts = sorted(CORPUS_DIR.glob("races/*/focus-groups/*.md"))
+    build = BuildManifest.load()
+    dirty, removed_sources = build.plan("transcripts", transcripts, code_file=Path(__file__), force=args.force)
+    print(f"\nFound {len(transcripts)} focus group transcripts: "
+          f"{len(dirty)} new or changed, {len(removed_sources)} removed, "
+          f"{len(transcripts) - len(dirty)} unchanged")
+
+    # Parse changed transcripts in parallel
+    results = []
+    for transcript_path, result, error in map_sources(process_focus_group, dirty, args.workers):
+        if error is not None:
+            print(f"  ✗ {transcript_path.name}: {error}")
+            continue
+        results.append((transcript_path, *result))
+
+    # Record chunk-level changes before touching outputs, so a crash can't lose them
+    changed_chunks = 0
+    for transcript_path, chunks, metadata in results:
+        fg_id = metadata.focus_group_id
+        old = read_json_list(CHUNKS_DIR / fg_id / "all_chunks.json")
+        upserted, removed = diff_records(old, [asdict(c) for c in chunks])
+        # Enrichment also depends on the focus group metadata (race name, location)
+        metadata_file = FOCUS_GROUPS_DIR / f"{fg_id}.json"
+        metadata_changed = not metadata_file.exists() or json.loads(metadata_file.read_text()) != asdict(metadata)
+        if upserted or removed or metadata_changed:
+            build.record_changes("chunks", upserted, removed, groups=[fg_id])
+        changed_chunks += len(upserted) + len(removed)
+    for source in removed_sources.values():
+        chunks_file = CHUNKS_DIR / source["group_id"] / "all_chunks.json"
+        build.record_changes(
+            "chunks", removed=[c["chunk_id"] for c in read_json_list(chunks_file)],
+            groups=[source["group_id"]]
+        )
+    build.save()
+
+    # Save outputs (atomically)
+    for transcript_path, chunks, metadata in results:
+        save_chunks(chunks, metadata.focus_group_id)
+        save_metadata(metadata)
+        build.record_source("transcripts", transcript_path, metadata.focus_group_id,
+                            manifest_entry(metadata, len(chunks)))
+        print(f"  ✓ {metadata.focus_group_id}: {len(chunks)} chunks extracted")
+    for key, source in removed_sources.items():
+        remove_focus_group(source["group_id"])
+        build.forget_source("transcripts", key)
+        print(f"  - {source['group_id']}: removed")
+
+    # Save manifest (unchanged focus groups keep their recorded entries)
+    entries = build.entries("transcripts")
+    manifest = {
+        "total_focus_groups": len(entries),
+        "total_chunks": sum(e["chunk_count"] for e in entries),
+        "focus_groups": entries
+    }
+    manifest_file = DATA_DIR / "manifest.json"
+    atomic_write_json(manifest_file, manifest)
 
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            import traceback
-            traceback.print_exc()
+    # Rebuild the columnar chunk store
+    if results or removed_sources:
+        from scripts.retrieval.chunk_store import build_table
+        build_table("chunks")
 
-    # Save manifest
-    manifest_file = DATA_DIR / "manifest.json"
-    with open(manifest_file, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    if len(results) == len(dirty):
+        build.finish_stage("transcripts")
+    build.save()
 
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"Focus groups processed: {manifest['total_focus_groups']}")
-    print(f"Total chunks created: {manifest['total_chunks']}")
+    print(f"Focus groups processed: {len(results)}/{len(dirty)} "
+          f"({manifest['total_focus_groups']} total)")
+    print(f"Chunks changed: {changed_chunks} ({manifest['total_chunks']} total)")
     print(f"Output directory: {DATA_DIR}")
     print(f"Manifest saved: {manifest_file}")
+    if changed_chunks:
+        print("Next: python scripts/enrich_chunks.py --changed")
 
 
 if __name__ == "__main__":
@@ -9,24 +9,41 @@ Chunking strategy:
 - Tables kept as single chunks
 - Rich metadata from race metadata.json
 
+Incremental: only new or changed memos (by content hash, tracked in
+data/build_manifest.json) are parsed, in a process pool, and section
+summaries are only regenerated for races whose chunks changed. Summaries are
+generated concurrently (--summary-workers) through one shared client and
+cached in data/summary_cache.jsonl by hash(section + content + model +
+prompt), so an unchanged section never costs another LLM call. Outputs are
+written atomically; changed chunk and parent ids are queued for the
+embedders (--changed-only).
+
 Output:
-- data/strategy_chunks/{race_id}/chunk-{NNN}.json
+- data/strategy_chunks/{race_id}/all_chunks.json
+- data/chunk_store/strategy.col (columnar store of the above)
 - data/strategy_chunks/hierarchical_parents.json
 - data/strategy_chunks/manifest.json (with section_summaries)
 
 Run: python scripts/preprocess_memos.py
 """
 
+import hashlib
 import json
+import os
 import re
+import shutil
 import sys
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from scripts.build_manifest import BuildManifest, atomic_write_json, diff_records, map_sources, read_json_list
+
 # Paths
 CORPUS_DIR = Path(__file__).parent.parent / "political-consulting-corpus"
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -93,30 +110,93 @@ def slugify(text: str) -> str:
     return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
 
 
+SUMMARY_PROMPT = """Summarize this section from a political campaign strategy memo in 2-3 sentences.
+Focus on: key lessons, what worked/failed, and actionable insights.
+Keep it factual and specific - include names, numbers, and quotes where relevant.
+
+Section: {section_name}
+Content:
+{section_content}
+
+Summary:"""
+SUMMARY_CACHE_FILE = DATA_DIR / "summary_cache.jsonl"
+SUMMARY_WORKERS = 8
+SUMMARY_MAX_RETRIES = 5  # openai client retries (429 / 5xx / timeouts, honoring Retry-After)
+HEADER_SUMMARY = "Race metadata and basic information."
+
+_summary_client = None
+_summary_client_lock = threading.Lock()
+
+
+def get_summary_client():
+    """One shared OpenRouter client (thread-safe, on the shared OpenRouter connection pool)."""
+    global _summary_client
+    with _summary_client_lock:
+        if _summary_client is None:
+            from eval.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL
+            from scripts.http_clients import openai_client
+            _summary_client = openai_client(
+                OPENROUTER_BASE_URL,
+                api_key=OPENROUTER_API_KEY,
+                max_retries=SUMMARY_MAX_RETRIES
+            )
+        return _summary_client
+
+
+def summary_cache_key(section_name: str, section_content: str, model: str) -> str:
+    """Cache key: hash of everything that determines the summary."""
+    digest = hashlib.sha256()
+    for part in (section_name, section_content, model, SUMMARY_PROMPT):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Section summaries already generated, keyed by summary_cache_key().
+
+    Append-only JSONL ({"key": ..., "summary": ...} per line), appended as each
+    summary arrives, so an interrupted run keeps what it paid for.
+    """
+
+    def __init__(self, path: Path = SUMMARY_CACHE_FILE):
+        self.path = path
+        self.summaries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a crash mid-write
+                    self.summaries[entry["key"]] = entry["summary"]
+
+    def get(self, key: str) -> Optional[str]:
+        return self.summaries.get(key)
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            self.summaries[key] = summary
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "summary": summary}) + "\n")
+
+
 def generate_section_summary(section_name: str, section_content: str) -> str:
     """Generate LLM summary for a section using OpenRouter."""
-    from eval.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, GEMINI_GENERATION_MODEL
-    import openai
-
-    client = openai.OpenAI(api_key=OPENROUTER_API_KEY, base_url=OPENROUTER_BASE_URL)
+    from eval.config import GEMINI_GENERATION_MODEL
 
     # Skip header sections - they're just metadata
     if section_name == "Header":
-        return "Race metadata and basic information."
+        return HEADER_SUMMARY
 
-    response = client.chat.completions.create(
+    response = get_summary_client().chat.completions.create(
         model=GEMINI_GENERATION_MODEL,
         messages=[{
             "role": "user",
-            "content": f"""Summarize this section from a political campaign strategy memo in 2-3 sentences.
-Focus on: key lessons, what worked/failed, and actionable insights.
-Keep it factual and specific - include names, numbers, and quotes where relevant.
-
-Section: {section_name}
-Content:
-{section_content[:4000]}
-
-Summary:"""
+            "content": SUMMARY_PROMPT.format(section_name=section_name, section_content=section_content[:4000])
         }],
         max_tokens=200,
         temperature=0
@@ -124,9 +204,54 @@ Summary:"""
     return response.choices[0].message.content.strip()
 
 
+def generate_section_summaries(
+    sections: List[Tuple[str, str]],
+    workers: int = SUMMARY_WORKERS,
+    cache: Optional[SummaryCache] = None
+) -> List[str]:
+    """
+    Summarize (section_name, section_content) pairs, reusing cached summaries.
+
+    Cache misses are generated concurrently by up to `workers` threads.
+    Returns summaries in input order.
+    """
+    from eval.config import GEMINI_GENERATION_MODEL
+
+    cache = cache if cache is not None else SummaryCache()
+    keys = [summary_cache_key(name, content, GEMINI_GENERATION_MODEL) for name, content in sections]
+    summaries: List[Optional[str]] = [
+        HEADER_SUMMARY if name == "Header" else cache.get(key)
+        for key, (name, _) in zip(keys, sections)
+    ]
+
+    # Deduplicate identical sections so each is generated once
+    missing: Dict[str, Tuple[str, str]] = {}
+    for key, section, summary in zip(keys, sections, summaries):
+        if summary is None and key not in missing:
+            missing[key] = section
+    print(f"    {len(sections)} sections: {len(sections) - len(missing)} cached, {len(missing)} to generate")
+
+    def generate(key: str) -> str:
+        summary = generate_section_summary(*missing[key])
+        cache.put(key, summary)
+        return summary
+
+    generated: Dict[str, str] = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+            futures = {pool.submit(generate, key): key for key in missing}
+            for done, future in enumerate(as_completed(futures), 1):
+                name = missing[futures[future]][0]
+                generated[futures[future]] = future.result()
+                print(f"    [{done}/{len(missing)}] {name[:40]}")
+
+    return [summary if summary is not None else generated[key] for key, summary in zip(keys, summaries)]
+
+
 def create_section_parents(
     all_chunks: Dict[str, List[StrategyMemoChunk]],
-    generate_summaries: bool = True
+    generate_summaries: bool = True,
+    workers: int = SUMMARY_WORKERS
 ) -> Tuple[List[StrategyMemoParent], Dict[str, Dict[str, str]]]:
     """
     Create section-level parents from chunks.
@@ -134,57 +259,58 @@ def create_section_parents(
     Args:
         all_chunks: Dict mapping race_id -> list of chunks
         generate_summaries: Whether to generate LLM summaries
+        workers: Concurrent LLM summary requests
 
     Returns:
         Tuple of (list of parents, dict mapping race_id -> section_summaries)
     """
-    all_parents = []
-    section_summaries_by_race = {}
-
+    # Group chunks by section
+    grouped = []
     for race_id, chunks in all_chunks.items():
-        # Group chunks by section
         sections = defaultdict(list)
         for chunk in chunks:
             sections[chunk.section].append(chunk)
-
-        section_summaries = {}
-
         for section_name, section_chunks in sections.items():
             # Combine all child content for summary
             section_content = "\n\n".join([c.content for c in section_chunks])
+            grouped.append((race_id, section_name, section_chunks, section_content))
 
-            # Generate or skip summary
-            if generate_summaries:
-                print(f"    Generating summary for: {section_name[:40]}...")
-                summary = generate_section_summary(section_name, section_content)
-            else:
-                # Fallback: concatenate subsection titles
-                subsections = [c.subsection for c in section_chunks if c.subsection]
-                summary = f"Subsections: {', '.join(subsections)}" if subsections else section_content[:200]
-
-            section_summaries[section_name] = summary
-
-            # Get metadata from first chunk
-            first_chunk = section_chunks[0]
-
-            parent = StrategyMemoParent(
-                id=f"parent-{race_id}-memo-{slugify(section_name)}",
-                race_id=race_id,
-                section=section_name,
-                summary=summary,
-                content=f"[{first_chunk.state} {first_chunk.year} | {first_chunk.outcome} | {first_chunk.margin:+.1f}%]\nSection: {section_name}\n\n{summary}",
-                chunk_count=len(section_chunks),
-                child_ids=[c.chunk_id for c in section_chunks],
-                outcome=first_chunk.outcome,
-                state=first_chunk.state,
-                year=first_chunk.year,
-                margin=first_chunk.margin
-            )
-            all_parents.append(parent)
+    # Generate or skip summaries
+    if generate_summaries:
+        summaries = generate_section_summaries(
+            [(section_name, content) for _, section_name, _, content in grouped], workers=workers
+        )
+    else:
+        # Fallback: concatenate subsection titles
+        summaries = []
+        for _, _, section_chunks, section_content in grouped:
+            subsections = [c.subsection for c in section_chunks if c.subsection]
+            summaries.append(f"Subsections: {', '.join(subsections)}" if subsections else section_content[:200])
 
-        section_summaries_by_race[race_id] = section_summaries
+    all_parents = []
+    section_summaries_by_race: Dict[str, Dict[str, str]] = defaultdict(dict)
+    for (race_id, section_name, section_chunks, _), summary in zip(grouped, summaries):
+        section_summaries_by_race[race_id][section_name] = summary
 
-    return all_parents, section_summaries_by_race
+        # Get metadata from first chunk
+        first_chunk = section_chunks[0]
+
+        parent = StrategyMemoParent(
+            id=f"parent-{race_id}-memo-{slugify(section_name)}",
+            race_id=race_id,
+            section=section_name,
+            summary=summary,
+            content=f"[{first_chunk.state} {first_chunk.year} | {first_chunk.outcome} | {first_chunk.margin:+.1f}%]\nSection: {section_name}\n\n{summary}",
+            chunk_count=len(section_chunks),
+            child_ids=[c.chunk_id for c in section_chunks],
+            outcome=first_chunk.outcome,
+            state=first_chunk.state,
+            year=first_chunk.year,
+            margin=first_chunk.margin
+        )
+        all_parents.append(parent)
+
+    return all_parents, dict(section_summaries_by_race)
 
 
 def load_race_metadata(race_dir: Path) -> Dict:
@@ -405,35 +531,39 @@ def process_strategy_memo(memo_path: Path) -> Tuple[List[StrategyMemoChunk], Str
 
 
 def save_chunks(chunks: List[StrategyMemoChunk], race_id: str):
-    """Save chunks to JSON files."""
-    chunk_dir = STRATEGY_CHUNKS_DIR / race_id
-    chunk_dir.mkdir(parents=True, exist_ok=True)
-
-    # Save individual chunks
-    for chunk in chunks:
-        chunk_num = chunk.chunk_id.split("-")[-1]
-        chunk_file = chunk_dir / f"chunk-{chunk_num}.json"
-        with open(chunk_file, 'w') as f:
-            json.dump(asdict(chunk), f, indent=2)
-
-    # Save all chunks in one file
-    all_chunks_file = chunk_dir / "all_chunks.json"
-    with open(all_chunks_file, 'w') as f:
-        json.dump([asdict(c) for c in chunks], f, indent=2)
+    """Save a race's chunks to one JSON file (indexed into the chunk store)."""
+    atomic_write_json(STRATEGY_CHUNKS_DIR / race_id / "all_chunks.json", [asdict(c) for c in chunks])
 
 
 def save_metadata(metadata: StrategyMemoMetadata):
     """Save strategy memo metadata."""
-    metadata_dir = STRATEGY_CHUNKS_DIR / "metadata"
-    metadata_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(STRATEGY_CHUNKS_DIR / "metadata" / f"{metadata.race_id}.json", asdict(metadata))
 
-    metadata_file = metadata_dir / f"{metadata.race_id}.json"
-    with open(metadata_file, 'w') as f:
-        json.dump(asdict(metadata), f, indent=2)
+
+def remove_race(race_id: str):
+    """Delete a race's chunk outputs (its strategy memo was removed)."""
+    race_dir = STRATEGY_CHUNKS_DIR / race_id
+    if race_dir.exists():
+        shutil.rmtree(race_dir)
+    (STRATEGY_CHUNKS_DIR / "metadata" / f"{race_id}.json").unlink(missing_ok=True)
+
+
+def manifest_entry(metadata: StrategyMemoMetadata) -> Dict:
+    """Entry for data/strategy_chunks/manifest.json (section_summaries added in Phase 2)."""
+    return {
+        "race_id": metadata.race_id,
+        "state": metadata.state,
+        "year": metadata.year,
+        "outcome": metadata.outcome,
+        "margin": metadata.margin,
+        "office": metadata.office,
+        "chunk_count": metadata.chunk_count,
+        "sections": metadata.sections,
+    }
 
 
 def main():
-    """Process all strategy memos."""
+    """Process new or changed strategy memos."""
     import argparse
 
     parser = argparse.ArgumentParser(description="Preprocess strategy memos")
@@ -441,6 +571,12 @@ def main():
                         help="Skip LLM summary generation (use concatenated titles)")
     parser.add_argument("--parents-only", action="store_true",
                         help="Only generate parents (assumes chunks already exist)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocess every memo, not just new or changed ones")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel parser processes (default: CPU count)")
+    parser.add_argument("--summary-workers", type=int, default=SUMMARY_WORKERS,
+                        help=f"Concurrent LLM summary requests (default: {SUMMARY_WORKERS})")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -448,19 +584,14 @@ def main():
     print("=" * 60)
 
     # Find all strategy memos
-    memos = list(CORPUS_DIR.glob("races/*/strategy-memo.md"))
-    print(f"\nFound {len(memos)} strategy memos")
-
-    manifest = {
-        "total_memos": 0,
-        "total_chunks": 0,
-        "total_parents": 0,
-        "by_outcome": {"win": 0, "loss": 0, "unknown": 0},
-        "memos": []
-    }
+    memos = sorted(CORPUS_DIR.glob("races/*/strategy-memo.md"))
+    build = BuildManifest.load()
+    parents_file = STRATEGY_CHUNKS_DIR / "hierarchical_parents.json"
+    manifest_file = STRATEGY_CHUNKS_DIR / "manifest.json"
+    existing_parents = read_json_list(parents_file)
 
-    # Collect all chunks by race_id for parent generation
-    all_chunks_by_race: Dict[str, List[StrategyMemoChunk]] = {}
+    removed_races = set()
+    processed = 0
 
     # Phase 1: Process chunks (unless --parents-only)
     if not args.parents_only:
@@ -468,78 +599,125 @@ def main():
         print("Phase 1: Extracting chunks")
         print("-" * 40)
 
-        for memo_path in sorted(memos):
-            print(f"\nProcessing: {memo_path.parent.name}/strategy-memo.md")
-
-            try:
-                chunks, metadata = process_strategy_memo(memo_path)
-
-                # Save outputs
-                save_chunks(chunks, metadata.race_id)
-                save_metadata(metadata)
-
-                # Collect for parent generation
-                all_chunks_by_race[metadata.race_id] = chunks
-
-                # Update manifest (will add section_summaries later)
-                manifest["total_memos"] += 1
-                manifest["total_chunks"] += len(chunks)
-                manifest["by_outcome"][metadata.outcome] = manifest["by_outcome"].get(metadata.outcome, 0) + 1
-
-                manifest["memos"].append({
-                    "race_id": metadata.race_id,
-                    "state": metadata.state,
-                    "year": metadata.year,
-                    "outcome": metadata.outcome,
-                    "margin": metadata.margin,
-                    "office": metadata.office,
-                    "chunk_count": metadata.chunk_count,
-                    "sections": metadata.sections,
-                    "section_summaries": {}  # Will be filled in Phase 2
-                })
-
-                print(f"  ✓ {len(chunks)} chunks extracted")
-
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                import traceback
-                traceback.print_exc()
+        dirty, removed_sources = build.plan("memos", memos, code_file=Path(__file__), force=args.force)
+        print(f"\nFound {len(memos)} strategy memos: "
+              f"{len(dirty)} new or changed, {len(removed_sources)} removed, "
+              f"{len(memos) - len(dirty)} unchanged")
+
+        # Parse changed memos in parallel
+        results = []
+        for memo_path, result, error in map_sources(process_strategy_memo, dirty, args.workers):
+            if error is not None:
+                print(f"  ✗ {memo_path.parent.name}/strategy-memo.md: {error}")
+                continue
+            results.append((memo_path, *result))
+
+        # Record chunk-level changes before touching outputs, so a crash can't lose them
+        for memo_path, chunks, metadata in results:
+            old = read_json_list(STRATEGY_CHUNKS_DIR / metadata.race_id / "all_chunks.json")
+            upserted, removed = diff_records(old, [asdict(c) for c in chunks])
+            if upserted or removed:
+                build.record_changes("strategy", upserted, removed, groups=[metadata.race_id])
+        for source in removed_sources.values():
+            race_id = source["group_id"]
+            removed_races.add(race_id)
+            old = read_json_list(STRATEGY_CHUNKS_DIR / race_id / "all_chunks.json")
+            parent_ids = [p["id"] for p in existing_parents if p["race_id"] == race_id]
+            build.record_changes("strategy", removed=[c["chunk_id"] for c in old] + parent_ids,
+                                 groups=[race_id])
+        build.save()
+
+        # Save outputs (atomically)
+        for memo_path, chunks, metadata in results:
+            save_chunks(chunks, metadata.race_id)
+            save_metadata(metadata)
+            build.record_source("memos", memo_path, metadata.race_id, manifest_entry(metadata))
+            print(f"  ✓ {metadata.race_id}: {len(chunks)} chunks extracted")
+        for key, source in removed_sources.items():
+            remove_race(source["group_id"])
+            build.forget_source("memos", key)
+            print(f"  - {source['group_id']}: removed")
+
+        processed = len(results)
+        if results or removed_sources:
+            from scripts.retrieval.chunk_store import build_table
+            build_table("strategy")
+        if len(results) == len(dirty):
+            build.finish_stage("memos")
+        build.save()
+
+        # Manifest entries of every built memo (unchanged ones come from the build manifest)
+        manifest = {
+            "total_memos": 0,
+            "total_chunks": 0,
+            "total_parents": 0,
+            "by_outcome": {"win": 0, "loss": 0, "unknown": 0},
+            "memos": []
+        }
+        for entry in build.entries("memos"):
+            manifest["total_memos"] += 1
+            manifest["total_chunks"] += entry["chunk_count"]
+            manifest["by_outcome"][entry["outcome"]] = manifest["by_outcome"].get(entry["outcome"], 0) + 1
+            manifest["memos"].append({**entry, "section_summaries": {}})  # Filled in Phase 2
+
+        # Races whose chunks changed since parents were last generated (or that have none)
+        races_with_parents = {p["race_id"] for p in existing_parents}
+        parent_races = build.pending("parents", "strategy").groups | {
+            e["race_id"] for e in manifest["memos"] if e["race_id"] not in races_with_parents
+        }
     else:
-        # Load existing chunks
-        print("\nLoading existing chunks...")
-        for race_dir in sorted(STRATEGY_CHUNKS_DIR.iterdir()):
-            if race_dir.is_dir() and race_dir.name.startswith("race-"):
-                chunks_file = race_dir / "all_chunks.json"
-                if chunks_file.exists():
-                    with open(chunks_file) as f:
-                        chunk_dicts = json.load(f)
-                        chunks = [StrategyMemoChunk(**c) for c in chunk_dicts]
-                        all_chunks_by_race[race_dir.name] = chunks
-                        print(f"  Loaded {len(chunks)} chunks from {race_dir.name}")
-
         # Load existing manifest
-        manifest_file = STRATEGY_CHUNKS_DIR / "manifest.json"
         if manifest_file.exists():
             with open(manifest_file) as f:
                 manifest = json.load(f)
-
-    # Phase 2: Generate parents with LLM summaries
+        else:
+            manifest = {"total_memos": 0, "total_chunks": 0, "total_parents": 0,
+                        "by_outcome": {}, "memos": []}
+        parent_races = {
+            race_dir.name for race_dir in STRATEGY_CHUNKS_DIR.iterdir()
+            if race_dir.is_dir() and race_dir.name.startswith("race-")
+        }
+
+    # Load existing chunks of the races whose parents need (re)generating
+    all_chunks_by_race: Dict[str, List[StrategyMemoChunk]] = {}
+    for race_id in sorted(parent_races - removed_races):
+        chunks_file = STRATEGY_CHUNKS_DIR / race_id / "all_chunks.json"
+        if chunks_file.exists():
+            chunks = [StrategyMemoChunk(**c) for c in read_json_list(chunks_file)]
+            all_chunks_by_race[race_id] = chunks
+            print(f"  Loaded {len(chunks)} chunks from {race_id}")
+
+    # Phase 2: Generate parents with LLM summaries (changed races only)
     print("\n" + "-" * 40)
     print("Phase 2: Generating section parents")
     print("-" * 40)
 
     generate_summaries = not args.skip_summaries
-    if generate_summaries:
-        print("Using LLM to generate section summaries...")
+    if not all_chunks_by_race:
+        print("No changed races - keeping existing parents")
+    elif generate_summaries:
+        print(f"Using LLM to generate section summaries for {len(all_chunks_by_race)} race(s)...")
     else:
         print("Using concatenated subsection titles (--skip-summaries)")
 
-    parents, section_summaries_by_race = create_section_parents(
+    new_parents, _ = create_section_parents(
         all_chunks_by_race,
-        generate_summaries=generate_summaries
+        generate_summaries=generate_summaries,
+        workers=args.summary_workers
     )
+    new_parent_dicts = [asdict(p) for p in new_parents]
+
+    # Unchanged races keep their parents; output stays in race order
+    kept = [
+        p for p in existing_parents
+        if p["race_id"] not in all_chunks_by_race and p["race_id"] not in removed_races
+    ]
+    parents = sorted(kept + new_parent_dicts, key=lambda p: p["race_id"])
 
     # Update manifest with section_summaries
+    section_summaries_by_race: Dict[str, Dict[str, str]] = defaultdict(dict)
+    for parent in parents:
+        section_summaries_by_race[parent["race_id"]][parent["section"]] = parent["summary"]
     for memo_entry in manifest["memos"]:
         race_id = memo_entry["race_id"]
         if race_id in section_summaries_by_race:
@@ -547,22 +725,30 @@ def main():
 
     manifest["total_parents"] = len(parents)
 
+    # Queue parent changes for the embedders (before writing, so a crash can't lose them)
+    for race_id in all_chunks_by_race:
+        old = [p for p in existing_parents if p["race_id"] == race_id]
+        new = [p for p in new_parent_dicts if p["race_id"] == race_id]
+        upserted, removed = diff_records(old, new, key="id")
+        if upserted or removed:
+            build.record_changes("strategy", upserted, removed, groups=[race_id])
+    build.save()
+
     # Save parents
-    parents_file = STRATEGY_CHUNKS_DIR / "hierarchical_parents.json"
-    with open(parents_file, 'w') as f:
-        json.dump([asdict(p) for p in parents], f, indent=2)
-    print(f"\n  ✓ {len(parents)} parents saved to {parents_file}")
+    atomic_write_json(parents_file, parents)
+    print(f"\n  ✓ {len(parents)} parents saved to {parents_file} ({len(new_parents)} regenerated)")
 
     # Save manifest
-    manifest_file = STRATEGY_CHUNKS_DIR / "manifest.json"
-    STRATEGY_CHUNKS_DIR.mkdir(parents=True, exist_ok=True)
-    with open(manifest_file, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    atomic_write_json(manifest_file, manifest)
+
+    # Parents are up to date with every chunk change so far
+    build.acknowledge("parents", "strategy")
+    build.save()
 
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"Strategy memos processed: {manifest['total_memos']}")
+    print(f"Strategy memos processed: {processed} ({manifest['total_memos']} total)")
     print(f"Total chunks (children): {manifest['total_chunks']}")
     print(f"Total parents: {manifest['total_parents']}")
     print(f"By outcome: {manifest['by_outcome']}")
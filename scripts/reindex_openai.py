@@ -3,12 +3,30 @@
 Re-index Pinecone with OpenAI embeddings.
 
 Creates vectors in a new 'openai' namespace, keeping BGE-M3 vectors as backup.
+
+Incremental: a local ledger (data/embedding_ledger/openai.jsonl, see
+scripts/embedding_ledger.py) records the text hash, model, dimensions and
+vector checksum of every upserted vector. Each run embeds only new or changed
+texts, updates metadata in place when only metadata changed, and deletes
+vectors of chunks that disappeared. The ledger is appended after every
+upserted batch, so an interrupted run resumes where it stopped.
+
+Embedding and upserting run as a streaming pipeline (scripts/ingest.py):
+concurrent token-sized embedding requests that honor 429 Retry-After, feeding
+concurrent upserts through a bounded queue.
+
+Run: python scripts/reindex_openai.py
+     python scripts/reindex_openai.py --dry-run    # Show the plan only
+     python scripts/reindex_openai.py --verify     # Also repair vectors missing from the index
+     python scripts/reindex_openai.py --full       # Re-embed everything
 """
 
 import os
 import sys
 import json
+import time
 from pathlib import Path
+from typing import Dict
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -16,46 +34,38 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv()
 
-from pinecone import Pinecone
+from scripts.http_clients import pinecone_client
+from scripts.build_manifest import DELETE_BATCH_SIZE
+from scripts.embedding_ledger import EmbeddingItem, EmbeddingLedger, vector_checksum
 from scripts.embeddings import OpenAIEmbedder
+from scripts.ingest import DEFAULT_BATCH_TOKENS, IngestPipeline
+from scripts.retrieval.chunk_store import load_chunks
 
 # Config
 INDEX_NAME = "focus-group-v3"
 NAMESPACE = "openai"  # New namespace for OpenAI embeddings
 DATA_DIR = Path(__file__).parent.parent / "data"
-BATCH_SIZE = 100
+BATCH_SIZE = 100  # metadata update progress interval
+FETCH_BATCH_SIZE = 100
+MODEL = "text-embedding-3-small"
+DIMENSIONS = 1024
 
 
 def load_all_chunks():
     """Load all chunks from enriched data (focus groups + strategy memos)."""
-    chunks = []
-
     # Focus group chunks
     print("  Loading focus group chunks...")
-    chunks_dir = DATA_DIR / "chunks_enriched"
-    for fg_dir in sorted(chunks_dir.iterdir()):
-        if fg_dir.is_dir():
-            chunk_file = fg_dir / "all_chunks.json"
-            if chunk_file.exists():
-                with open(chunk_file) as f:
-                    fg_chunks = json.load(f)
-                    chunks.extend(fg_chunks)
-                    print(f"    Loaded {len(fg_chunks)} chunks from {fg_dir.name}")
+    chunks = load_chunks("focus_groups")
+    print(f"    Loaded {len(chunks)} chunks")
 
     # Strategy memo chunks
     print("  Loading strategy memo chunks...")
-    strategy_dir = DATA_DIR / "strategy_chunks"
-    for race_dir in sorted(strategy_dir.iterdir()):
-        if race_dir.is_dir() and race_dir.name.startswith("race-"):
-            chunk_file = race_dir / "all_chunks.json"
-            if chunk_file.exists():
-                with open(chunk_file) as f:
-                    strat_chunks = json.load(f)
-                    # Mark as strategy_memo type for filtering
-                    for chunk in strat_chunks:
-                        chunk["type"] = "strategy_memo"
-                    chunks.extend(strat_chunks)
-                    print(f"    Loaded {len(strat_chunks)} chunks from {race_dir.name}")
+    strat_chunks = load_chunks("strategy")
+    # Mark as strategy_memo type for filtering
+    for chunk in strat_chunks:
+        chunk["type"] = "strategy_memo"
+    chunks.extend(strat_chunks)
+    print(f"    Loaded {len(strat_chunks)} chunks")
 
     return chunks
 
@@ -86,15 +96,123 @@ def load_hierarchical_parents():
     return parents
 
 
+def chunk_item(chunk: Dict) -> EmbeddingItem:
+    """Text to embed + metadata for a focus group or strategy memo chunk."""
+    # Same text as BGE-M3 indexing: content + profile
+    text = chunk.get("content", "")
+    profile = chunk.get("participant_profile", "")
+    if profile:
+        text = f"{text}\n\nParticipant: {profile}"
+
+    if chunk.get("type", "child") == "strategy_memo":
+        # Strategy memo metadata
+        metadata = {
+            "race_id": chunk.get("race_id", ""),
+            "section": chunk.get("section", ""),
+            "subsection": chunk.get("subsection", "") or "",
+            "content": chunk.get("content", "")[:1000],
+            "content_original": chunk.get("content_original", chunk.get("content", ""))[:500],
+            "state": chunk.get("state", ""),
+            "year": chunk.get("year", 0),
+            "outcome": chunk.get("outcome", ""),
+            "margin": chunk.get("margin", 0.0),
+            "source_file": chunk.get("source_file", ""),
+            "line_number": chunk.get("line_number", 0),
+            "type": "strategy_memo",
+        }
+    else:
+        # Focus group metadata (default)
+        metadata = {
+            "focus_group_id": chunk.get("focus_group_id", ""),
+            "participant": chunk.get("participant", ""),
+            "participant_profile": chunk.get("participant_profile", ""),
+            "section": chunk.get("section", ""),
+            "content": chunk.get("content", "")[:1000],
+            "content_original": chunk.get("content_original", chunk.get("content", ""))[:500],
+            "source_file": chunk.get("source_file", ""),
+            "line_number": chunk.get("line_number", 0),
+            "preceding_moderator_q": chunk.get("preceding_moderator_q", ""),
+            "type": "child",
+        }
+
+    return EmbeddingItem(id=chunk["chunk_id"], text=text, metadata=metadata)
+
+
+def parent_item(parent: Dict) -> EmbeddingItem:
+    """Text to embed + metadata for a focus group or strategy memo parent."""
+    text = parent.get("summary", parent.get("content", ""))
+
+    if parent.get("type", "parent") == "strategy_parent":
+        # Strategy memo parent metadata
+        metadata = {
+            "race_id": parent.get("race_id", ""),
+            "section": parent.get("section", ""),
+            "content": text[:1000],
+            "content_original": text,
+            "child_ids": json.dumps(parent.get("child_chunk_ids", [])),
+            "type": "strategy_parent",
+        }
+    else:
+        # Focus group parent metadata (default)
+        metadata = {
+            "focus_group_id": parent.get("focus_group_id", ""),
+            "section": parent.get("section", ""),
+            "content": text[:1000],
+            "content_original": text,
+            "child_ids": json.dumps(parent.get("child_chunk_ids", [])),
+            "type": "parent",
+        }
+
+    return EmbeddingItem(id=parent.get("id", ""), text=text, metadata=metadata)
+
+
+def verify_ledger(index, ledger: EmbeddingLedger) -> int:
+    """
+    Check the ledger against the index: ids whose vector is missing or differs
+    from the recorded checksum are forgotten, so this run re-embeds them.
+
+    Returns:
+        Number of ids forgotten
+    """
+    ids = sorted(ledger.entries)
+    stale = []
+    for i in range(0, len(ids), FETCH_BATCH_SIZE):
+        batch = ids[i:i + FETCH_BATCH_SIZE]
+        fetched = index.fetch(ids=batch, namespace=NAMESPACE).vectors
+        for chunk_id in batch:
+            vector = fetched.get(chunk_id)
+            if vector is None or vector_checksum(vector.values) != ledger.get(chunk_id)["checksum"]:
+                stale.append(chunk_id)
+    ledger.forget(stale)
+    return len(stale)
+
+
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-index Pinecone with OpenAI embeddings")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the ledger and re-embed everything")
+    parser.add_argument("--verify", action="store_true",
+                        help="Fetch ledgered vectors first and re-embed any that are missing or differ")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--embed-workers", type=int, default=4, help="Concurrent embedding requests")
+    parser.add_argument("--upsert-workers", type=int, default=2, help="Concurrent upsert requests")
+    parser.add_argument("--batch-tokens", type=int, default=DEFAULT_BATCH_TOKENS,
+                        help="Max estimated tokens per embedding request")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Re-indexing Pinecone with OpenAI embeddings")
     print("=" * 60)
+    start = time.perf_counter()
 
     # Initialize
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    pc = pinecone_client(os.getenv("PINECONE_API_KEY"))
     index = pc.Index(INDEX_NAME)
-    embedder = OpenAIEmbedder(dimensions=1024)
+    embedder = OpenAIEmbedder(model=MODEL, dimensions=DIMENSIONS, max_retries=0)  # pipeline retries
+    ledger = EmbeddingLedger.open(NAMESPACE)
+    print(f"Ledger: {len(ledger)} vectors ({ledger.path})")
 
     # Load data
     print("\nLoading chunks...")
@@ -104,128 +222,74 @@ def main():
     parents = load_hierarchical_parents()
     print(f"Hierarchical parents: {len(parents)}")
 
-    # Embed and upsert chunks
-    print(f"\nEmbedding and upserting to namespace '{NAMESPACE}'...")
-
-    # Prepare texts for embedding
-    texts = []
-    for chunk in chunks:
-        # Same text as BGE-M3 indexing: content + profile
-        text = chunk.get("content", "")
-        profile = chunk.get("participant_profile", "")
-        if profile:
-            text = f"{text}\n\nParticipant: {profile}"
-        texts.append(text)
-
-    # Embed in batches
-    print(f"Embedding {len(texts)} texts...")
-    embeddings = embedder.encode(texts, show_progress_bar=True)
-
-    # Prepare vectors for upsert
-    vectors = []
-    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        chunk_id = chunk.get("chunk_id", f"chunk-{i}")
-        chunk_type = chunk.get("type", "child")
-
-        if chunk_type == "strategy_memo":
-            # Strategy memo metadata
-            metadata = {
-                "race_id": chunk.get("race_id", ""),
-                "section": chunk.get("section", ""),
-                "subsection": chunk.get("subsection", "") or "",
-                "content": chunk.get("content", "")[:1000],
-                "content_original": chunk.get("content_original", chunk.get("content", ""))[:500],
-                "state": chunk.get("state", ""),
-                "year": chunk.get("year", 0),
-                "outcome": chunk.get("outcome", ""),
-                "margin": chunk.get("margin", 0.0),
-                "source_file": chunk.get("source_file", ""),
-                "line_number": chunk.get("line_number", 0),
-                "type": "strategy_memo",
-            }
-        else:
-            # Focus group metadata (default)
-            metadata = {
-                "focus_group_id": chunk.get("focus_group_id", ""),
-                "participant": chunk.get("participant", ""),
-                "participant_profile": chunk.get("participant_profile", ""),
-                "section": chunk.get("section", ""),
-                "content": chunk.get("content", "")[:1000],
-                "content_original": chunk.get("content_original", chunk.get("content", ""))[:500],
-                "source_file": chunk.get("source_file", ""),
-                "line_number": chunk.get("line_number", 0),
-                "preceding_moderator_q": chunk.get("preceding_moderator_q", ""),
-                "type": "child",
-            }
-
-        vectors.append({
-            "id": chunk_id,
-            "values": embedding,
-            "metadata": metadata,
-        })
-
-    # Upsert in batches
-    print(f"\nUpserting {len(vectors)} vectors...")
-    for i in range(0, len(vectors), BATCH_SIZE):
-        batch = vectors[i:i + BATCH_SIZE]
-        index.upsert(vectors=batch, namespace=NAMESPACE)
-        print(f"  Upserted {min(i + BATCH_SIZE, len(vectors))}/{len(vectors)}")
-
-    # Now embed and upsert parent chunks
-    print(f"\nProcessing {len(parents)} parent chunks...")
-    parent_vectors = []
-
-    # Parents is a list of dicts with 'id' field
-    parent_texts = [p.get("summary", p.get("content", "")) for p in parents]
-    parent_embeddings = embedder.encode(parent_texts, show_progress_bar=True)
-
-    for parent, embedding in zip(parents, parent_embeddings):
-        parent_id = parent.get("id", "")
-        parent_type = parent.get("type", "parent")
-
-        if parent_type == "strategy_parent":
-            # Strategy memo parent metadata
-            metadata = {
-                "race_id": parent.get("race_id", ""),
-                "section": parent.get("section", ""),
-                "content": parent.get("summary", parent.get("content", ""))[:1000],
-                "content_original": parent.get("summary", parent.get("content", "")),
-                "child_ids": json.dumps(parent.get("child_chunk_ids", [])),
-                "type": "strategy_parent",
-            }
-        else:
-            # Focus group parent metadata (default)
-            metadata = {
-                "focus_group_id": parent.get("focus_group_id", ""),
-                "section": parent.get("section", ""),
-                "content": parent.get("summary", parent.get("content", ""))[:1000],
-                "content_original": parent.get("summary", parent.get("content", "")),
-                "child_ids": json.dumps(parent.get("child_chunk_ids", [])),
-                "type": "parent",
-            }
-
-        parent_vectors.append({
-            "id": parent_id,
-            "values": embedding,
-            "metadata": metadata,
-        })
-
-    # Upsert parents
-    for i in range(0, len(parent_vectors), BATCH_SIZE):
-        batch = parent_vectors[i:i + BATCH_SIZE]
-        index.upsert(vectors=batch, namespace=NAMESPACE)
-        print(f"  Upserted parents {min(i + BATCH_SIZE, len(parent_vectors))}/{len(parent_vectors)}")
+    items = [chunk_item(c) for c in chunks] + [parent_item(p) for p in parents]
+
+    if args.full:
+        ledger.forget(list(ledger.entries))
+    elif args.verify:
+        print("\nVerifying ledger against the index...")
+        print(f"  {verify_ledger(index, ledger)} vectors missing or changed")
+
+    plan = ledger.plan(items, model=MODEL, dims=DIMENSIONS)
+    print(f"\nPlan for namespace '{NAMESPACE}': {len(plan.embed)} to embed, "
+          f"{len(plan.update)} metadata updates, {len(plan.skip)} unchanged, "
+          f"{len(plan.delete)} to delete")
+
+    if args.dry_run:
+        chars = sum(len(item.text) for item in plan.embed)
+        print(f"\n[DRY RUN] Would embed {len(plan.embed)} texts ({chars:,} chars, ~{chars // 4:,} tokens)")
+        return
+
+    # Embed and upsert new/changed texts concurrently; each batch is recorded once upserted
+    if plan.embed:
+        pipeline = IngestPipeline(
+            embed_fn=embedder.embed_batch,
+            upsert_fn=lambda vectors: index.upsert(vectors=vectors, namespace=NAMESPACE),
+            on_upserted=lambda pairs: ledger.record([
+                ledger.entry(item, vector, MODEL, DIMENSIONS) for item, vector in pairs
+            ]),
+            embed_workers=args.embed_workers,
+            upsert_workers=args.upsert_workers,
+            max_batch_tokens=args.batch_tokens,
+        )
+        print(f"\nEmbedding + upserting {len(plan.embed)} texts "
+              f"({args.embed_workers} embed / {args.upsert_workers} upsert workers)...")
+        stats = pipeline.run(plan.embed)
+        print(f"  {stats.summary()}")
+
+    # Metadata-only changes: no re-embedding
+    for n, item in enumerate(plan.update, 1):
+        index.update(id=item.id, set_metadata=item.metadata, namespace=NAMESPACE)
+        ledger.record_metadata([item])
+        if n % BATCH_SIZE == 0 or n == len(plan.update):
+            print(f"  Updated metadata {n}/{len(plan.update)}")
+
+    # Vectors of chunks that disappeared
+    for i in range(0, len(plan.delete), DELETE_BATCH_SIZE):
+        batch = plan.delete[i:i + DELETE_BATCH_SIZE]
+        index.delete(ids=batch, namespace=NAMESPACE)
+        ledger.delete(batch)
+    if plan.delete:
+        print(f"  Deleted {len(plan.delete)} vectors")
+
+    ledger.compact()
+    elapsed = time.perf_counter() - start
 
     # Verify
     print("\nVerifying...")
     stats = index.describe_index_stats()
     openai_count = stats.namespaces.get(NAMESPACE, {}).vector_count if NAMESPACE in stats.namespaces else 0
-    print(f"Vectors in '{NAMESPACE}' namespace: {openai_count}")
+    print(f"Vectors in '{NAMESPACE}' namespace: {openai_count} (ledger: {len(ledger)})")
 
     print("\n" + "=" * 60)
-    print("Done! OpenAI embeddings indexed to 'openai' namespace.")
-    print("Update retrieval code to use namespace='openai'")
+    print("Summary")
     print("=" * 60)
+    print(f"Embedded:         {len(plan.embed)}")
+    print(f"Metadata updated: {len(plan.update)}")
+    print(f"Skipped:          {len(plan.skip)}")
+    print(f"Deleted:          {len(plan.delete)}")
+    print(f"API tokens:       {embedder.usage_tokens:,}")
+    print(f"Wall time:        {elapsed:.1f}s")
 
 
 if __name__ == "__main__":
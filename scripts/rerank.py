@@ -7,10 +7,12 @@ Uses sentence-transformers CrossEncoder models.
 import math
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from scripts.tracing import span
+
 
 def sigmoid(x: float) -> float:
     """Normalize unbounded score to 0-1 range."""
@@ -18,13 +20,44 @@ def sigmoid(x: float) -> float:
 
 
 class Reranker:
-    """Cross-encoder reranker for retrieval results."""
-
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L6-v2"):
+    """
+    Cross-encoder reranker for retrieval results.
+
+    compact=True (memory budget mode) runs torch on one thread and swaps the
+    model's Linear layers for dynamically quantized int8 ones - about a
+    quarter of the fp32 weight memory, with near-identical rankings.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L6-v2",
+        max_length: Optional[int] = None,
+        compact: bool = False
+    ):
         from sentence_transformers import CrossEncoder
 
         self.model_name = model_name
-        self.model = CrossEncoder(model_name)
+        self.compact = compact
+        if compact:
+            import torch
+            torch.set_num_threads(1)
+        self.model = CrossEncoder(model_name, max_length=max_length)
+        if compact:
+            self._quantize()
+
+    def _quantize(self):
+        """Replace the wrapped transformer's Linear layers with int8 dynamic-quantized ones."""
+        import torch
+        try:
+            self.model.model = torch.ao.quantization.quantize_dynamic(
+                self.model.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        except Exception as e:
+            print(f"Warning: reranker quantization failed, keeping fp32 weights: {e}")
+
+    def warmup(self):
+        """Score one dummy pair so the first real query skips lazy init (tokenizer, kernels)."""
+        self.model.predict([("warmup query", "warmup passage")])
 
     def rerank(self, query: str, results: List, top_k: int = 5) -> List:
         """
@@ -45,7 +78,8 @@ class Reranker:
         pairs = [(query, r.content) for r in results]
 
         # Get scores from cross-encoder
-        scores = self.model.predict(pairs)
+        with span("rerank", candidates=len(pairs), top_k=top_k):
+            scores = self.model.predict(pairs)
 
         # Combine results with scores and sort
         scored_results = list(zip(results, scores))
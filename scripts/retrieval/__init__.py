@@ -3,6 +3,8 @@ Retrieval package for focus groups and strategy memos.
 
 This package provides:
 - SharedResources: Singleton for expensive resources (embedding model, Pinecone index)
+- MetadataRegistry: In-memory index of all manifests (focus groups, races, paths)
+- ChunkStore: Memory-mapped full chunk records, used to hydrate slim vector queries
 - LLMRouter: Query routing to relevant content
 - FocusGroupRetrieverV2: Focus group transcript retrieval
 - StrategyMemoRetriever: Strategy memo retrieval
@@ -13,74 +15,65 @@ Example usage:
 
     retriever = FocusGroupRetrieverV2(use_router=True)
     results = retriever.retrieve("What did voters say about the economy?")
+
+Exports are resolved lazily (PEP 562): importing a submodule such as
+scripts.retrieval.registry no longer pulls in the retrievers, numpy, or the
+hybrid/BM25 stack. Each name is imported from its module on first access.
 """
 
-# Re-export types
-from scripts.retrieval.types import (
-    RetrievalResult,
-    GroupedResults,
-    StrategyRetrievalResult,
-    StrategyGroupedResults,
-    RouterResult,
-)
+import importlib
 
-# Re-export shared resources
-from scripts.retrieval.base import (
-    SharedResources,
-    BaseRetriever,
-    INDEX_NAME,
-    DIMENSION,
-)
+# Exported name -> defining module
+_EXPORTS = {
+    # Types
+    "RetrievalResult": "scripts.retrieval.types",
+    "GroupedResults": "scripts.retrieval.types",
+    "StrategyRetrievalResult": "scripts.retrieval.types",
+    "StrategyGroupedResults": "scripts.retrieval.types",
+    "RouterResult": "scripts.retrieval.types",
+    # Shared resources
+    "SharedResources": "scripts.retrieval.base",
+    "BaseRetriever": "scripts.retrieval.base",
+    "INDEX_NAME": "scripts.retrieval.base",
+    "DIMENSION": "scripts.retrieval.base",
+    # Metadata registry
+    "MetadataRegistry": "scripts.retrieval.registry",
+    "MetadataSnapshot": "scripts.retrieval.registry",
+    # Chunk store
+    "ChunkStore": "scripts.retrieval.chunk_store",
+    # Router
+    "LLMRouter": "scripts.retrieval.router",
+    # For backward compatibility, retrievers come from the original module
+    "FocusGroupRetrieverV2": "scripts.retrieve",
+    "StrategyMemoRetriever": "scripts.retrieve",
+    "format_results_for_display": "scripts.retrieve",
+    "format_strategy_results": "scripts.retrieve",
+    # Hybrid retrieval (BM25 + dense fusion)
+    "BM25Retriever": "scripts.retrieval.bm25",
+    "BM25Result": "scripts.retrieval.bm25",
+    "HybridFocusGroupRetriever": "scripts.retrieval.hybrid",
+    "HybridResult": "scripts.retrieval.hybrid",
+    "FusionStrategy": "scripts.retrieval.hybrid",
+}
+_OPTIONAL_MODULES = {"scripts.retrieval.bm25", "scripts.retrieval.hybrid"}
 
-# Re-export router
-from scripts.retrieval.router import LLMRouter
 
-# For backward compatibility, also import from the original module
-# This allows existing code to keep working while we migrate
-from scripts.retrieve import (
-    FocusGroupRetrieverV2,
-    StrategyMemoRetriever,
-    format_results_for_display,
-    format_strategy_results,
-)
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module_name), name)
+    except ImportError:
+        if module_name not in _OPTIONAL_MODULES:
+            raise
+        value = None  # Hybrid stack unavailable
+    globals()[name] = value
+    return value
 
-# Hybrid retrieval (BM25 + dense fusion) - lazy import to avoid rank_bm25 dependency in prod
-try:
-    from scripts.retrieval.bm25 import BM25Retriever, BM25Result
-    from scripts.retrieval.hybrid import HybridFocusGroupRetriever, HybridResult, FusionStrategy
-    _HYBRID_AVAILABLE = True
-except ImportError:
-    BM25Retriever = None
-    BM25Result = None
-    HybridFocusGroupRetriever = None
-    HybridResult = None
-    FusionStrategy = None
-    _HYBRID_AVAILABLE = False
 
-__all__ = [
-    # Types
-    "RetrievalResult",
-    "GroupedResults",
-    "StrategyRetrievalResult",
-    "StrategyGroupedResults",
-    "RouterResult",
-    # Base
-    "SharedResources",
-    "BaseRetriever",
-    "INDEX_NAME",
-    "DIMENSION",
-    # Router
-    "LLMRouter",
-    # Retrievers
-    "FocusGroupRetrieverV2",
-    "StrategyMemoRetriever",
-    "BM25Retriever",
-    "HybridFocusGroupRetriever",
-    # Result types
-    "BM25Result",
-    "HybridResult",
-    "FusionStrategy",
-    # Formatters
-    "format_results_for_display",
-    "format_strategy_results",
-]
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
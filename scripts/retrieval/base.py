@@ -5,6 +5,7 @@ Implements singleton pattern for expensive resources (embedding model, Pinecone
 
 import os
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -12,8 +13,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from eval.config import (
     PINECONE_API_KEY,
+    PINECONE_HOST,
     EMBEDDING_MODEL_LOCAL,
     RERANKER_MODEL,
+    RERANKER_MAX_LENGTH,
+    MEMORY_BUDGET_MODE,
+    OPENROUTER_API_KEY,
+    OPENROUTER_BASE_URL,
 )
 
 # Index configuration
@@ -30,52 +36,118 @@ DIMENSION = MODEL_DIMENSIONS.get(EMBEDDING_MODEL_LOCAL, 1024)
 USE_OPENAI_EMBEDDINGS = os.getenv("USE_OPENAI_EMBEDDINGS", "true").lower() == "true"
 PINECONE_NAMESPACE = "openai" if USE_OPENAI_EMBEDDINGS else ""  # Empty = default namespace
 
+# Query Pinecone for ids/scores only and read chunk text from the local chunk store
+USE_CHUNK_HYDRATION = os.getenv("USE_CHUNK_HYDRATION", "true").lower() == "true"
+
 
 class SharedResources:
     """
     Singleton manager for expensive resources.
     Loads embedding model and Pinecone index once, shared across all retrievers.
+    The OpenRouter client and LLM router are shared too (one copy of the
+    routing prompt); HTTP pools are shared per host (scripts/http_clients.py).
+
+    Getters are thread-safe (double-checked, one lock per resource), so the
+    API can build different resources in parallel at startup.
     """
+    _locks = {
+        name: threading.Lock()
+        for name in ("embedding", "reranker", "pinecone", "chunk_store", "openrouter", "router")
+    }
     _embedding_model = None
     _reranker_model = None
     _pinecone_client = None
     _pinecone_index = None
+    _chunk_store = None
+    _openrouter_client = None
+    _router = None
 
     @classmethod
     def get_embedding_model(cls):
         """Get or create shared embedding model (OpenAI or local)."""
         if cls._embedding_model is None:
-            if USE_OPENAI_EMBEDDINGS:
-                from scripts.embeddings import OpenAIEmbedder
-                print("Loading embedding model: OpenAI text-embedding-3-small (API)")
-                cls._embedding_model = OpenAIEmbedder(dimensions=1024)
-            else:
-                from sentence_transformers import SentenceTransformer
-                print(f"Loading embedding model: {EMBEDDING_MODEL_LOCAL}")
-                cls._embedding_model = SentenceTransformer(EMBEDDING_MODEL_LOCAL)
+            with cls._locks["embedding"]:
+                if cls._embedding_model is None:
+                    if USE_OPENAI_EMBEDDINGS:
+                        from scripts.embeddings import OpenAIEmbedder
+                        print("Loading embedding model: OpenAI text-embedding-3-small (API)")
+                        cls._embedding_model = OpenAIEmbedder(dimensions=1024)
+                    else:
+                        from sentence_transformers import SentenceTransformer
+                        print(f"Loading embedding model: {EMBEDDING_MODEL_LOCAL}")
+                        cls._embedding_model = SentenceTransformer(EMBEDDING_MODEL_LOCAL)
         return cls._embedding_model
 
     @classmethod
     def get_reranker_model(cls):
         """Get or create shared reranker (wrapper with .rerank() method)."""
         if cls._reranker_model is None:
-            from scripts.rerank import Reranker
-            print(f"Loading reranker model: {RERANKER_MODEL}")
-            cls._reranker_model = Reranker(model_name=RERANKER_MODEL)
+            with cls._locks["reranker"]:
+                if cls._reranker_model is None:
+                    from scripts.rerank import Reranker
+                    print(f"Loading reranker model: {RERANKER_MODEL}{' (int8, budget mode)' if MEMORY_BUDGET_MODE else ''}")
+                    cls._reranker_model = Reranker(
+                        model_name=RERANKER_MODEL,
+                        max_length=RERANKER_MAX_LENGTH,
+                        compact=MEMORY_BUDGET_MODE
+                    )
         return cls._reranker_model
 
     @classmethod
     def get_pinecone_index(cls):
         """Get or create shared Pinecone index connection."""
         if cls._pinecone_index is None:
-            from pinecone import Pinecone
-            cls._pinecone_client = Pinecone(api_key=PINECONE_API_KEY)
-            cls._pinecone_index = cls._pinecone_client.Index(INDEX_NAME)
+            with cls._locks["pinecone"]:
+                if cls._pinecone_index is None:
+                    from scripts.http_clients import pinecone_client
+                    cls._pinecone_client = pinecone_client(PINECONE_API_KEY)
+                    if PINECONE_HOST:
+                        cls._pinecone_index = cls._pinecone_client.Index(host=PINECONE_HOST)
+                    else:
+                        cls._pinecone_index = cls._pinecone_client.Index(INDEX_NAME)
         return cls._pinecone_index
 
+    @classmethod
+    def get_chunk_store(cls):
+        """
+        Get the shared memory-mapped chunk store, or None when hydration is
+        disabled or no chunk files exist (retrievers then use Pinecone metadata).
+        """
+        if not USE_CHUNK_HYDRATION:
+            return None
+        if cls._chunk_store is None:
+            with cls._locks["chunk_store"]:
+                if cls._chunk_store is None:
+                    from scripts.retrieval.chunk_store import ChunkStore
+                    cls._chunk_store = ChunkStore.open()
+        return cls._chunk_store
+
+    @classmethod
+    def get_openrouter_client(cls):
+        """Get or create the shared OpenRouter client (router + synthesis)."""
+        if cls._openrouter_client is None:
+            with cls._locks["openrouter"]:
+                if cls._openrouter_client is None:
+                    from scripts.http_clients import openai_client
+                    cls._openrouter_client = openai_client(OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
+        return cls._openrouter_client
+
+    @classmethod
+    def get_router(cls):
+        """Get or create the shared LLM router."""
+        if cls._router is None:
+            with cls._locks["router"]:
+                if cls._router is None:
+                    from scripts.retrieve import LLMRouter
+                    cls._router = LLMRouter()
+        return cls._router
+
     @classmethod
     def reset(cls):
         """Reset all shared resources (useful for testing)."""
+        cls._openrouter_client = None
+        cls._router = None
+        cls._chunk_store = None
         cls._embedding_model = None
         cls._reranker_model = None
         cls._pinecone_client = None
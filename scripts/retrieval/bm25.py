@@ -1,21 +1,48 @@
 """
 BM25 retriever for hybrid search.
-Loads all focus group chunks into memory and indexes with BM25.
+Indexes every focus group chunk with BM25 (Okapi, same scoring as rank_bm25's
+BM25Okapi: k1=1.5, b=0.75, epsilon=0.25).
+
+Compact representation - no chunk dicts, token lists or per-document
+frequency dicts are kept after the build:
+- vocabulary: term -> term id
+- postings: CSR arrays (term id -> int32 doc ids + float64 term frequencies)
+- per-document length normalization: one float64 array
+- chunk fields: read from the memory-mapped 'focus_groups' chunk store,
+  focus group filtering runs on its int32 focus_group_id codes
+
+Scoring only touches the postings of the query terms.
+
+With SHARED_INDEX=true (multi-worker serving, api/serve.py) the arrays and
+vocabulary are attached from the shared bm25.seg segment instead of being
+built: every worker reads the same mapped pages (scripts/retrieval/shared_index.py).
 """
 
-import json
+import math
+import re
 import sys
+from array import array
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from rank_bm25 import BM25Okapi
-from eval.config import DATA_DIR
+from scripts.retrieval.chunk_store import open_table
+from scripts.retrieval.shared_index import key_index_arrays, open_segment, write_segment
+
+# BM25Okapi parameters
+K1 = 1.5
+B = 0.75
+EPSILON = 0.25
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+INDEXED_FIELDS = ("content_original", "participant_profile", "participant")
 
 
-@dataclass
+@dataclass(slots=True)
 class BM25Result:
     """Single BM25 retrieval result."""
     chunk_id: str
@@ -40,10 +67,13 @@ class BM25Retriever:
     """
 
     _instance = None
-    _chunks = None
-    _bm25 = None
-    _chunk_index = None
-    _tokenized_corpus = None
+    _table = None
+    _vocab = None
+    _idf = None
+    _indptr = None
+    _postings = None
+    _frequencies = None
+    _length_norm = None
     _initialized = False
 
     def __new__(cls, verbose: bool = False):
@@ -63,42 +93,97 @@ class BM25Retriever:
         self._initialized = True
 
     def _load_and_index(self):
-        """Load all chunks and build BM25 index."""
-        chunks_dir = DATA_DIR / "chunks_enriched"
-
+        """Tokenize all chunks once and build the compact BM25 index."""
         if self.verbose:
-            print(f"Loading chunks from {chunks_dir}...")
+            print("Loading chunks from the 'focus_groups' chunk store...")
 
-        # Load all chunks from all focus groups
-        all_chunks = []
-        for fg_dir in sorted(chunks_dir.iterdir()):
-            if not fg_dir.is_dir():
-                continue
-            chunks_file = fg_dir / "all_chunks.json"
-            if chunks_file.exists():
-                with open(chunks_file) as f:
-                    chunks = json.load(f)
-                    all_chunks.extend(chunks)
+        table = open_table("focus_groups", verbose=self.verbose)
+        if table is None:
+            raise FileNotFoundError("No enriched focus group chunks found (run scripts/enrich_chunks.py)")
+        self._table = table
+        if self._attach_segment(table):
+            return
 
-        self._chunks = all_chunks
-        self._chunk_index = {c["chunk_id"]: c for c in all_chunks}
+        # Stream records: (term id, doc, tf) triples in flat arrays, terms in first-seen order
+        vocab: Dict[str, int] = {}
+        term_ids, doc_ids, frequencies = array("i"), array("i"), array("d")
+        doc_lengths = np.zeros(len(table), dtype=np.float64)
+        for doc, chunk in enumerate(self._indexable_fields(table)):
+            tokens = self._tokenize(self._get_indexable_text(chunk))
+            doc_lengths[doc] = len(tokens)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_ids.append(vocab.setdefault(token, len(vocab)))
+                doc_ids.append(doc)
+                frequencies.append(count)
+
+        # CSR postings: term id -> (doc ids, frequencies), docs ascending
+        term_ids_np = np.frombuffer(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids_np, kind="stable")
+        self._postings = np.frombuffer(doc_ids, dtype=np.int32)[order]
+        self._frequencies = np.frombuffer(frequencies, dtype=np.float64)[order]
+        document_frequency = np.bincount(term_ids_np, minlength=len(vocab))
+        self._indptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+        self._vocab = vocab
+
+        # Okapi idf, negative idfs floored at epsilon * average idf (summed in term order, as rank_bm25)
+        corpus_size = len(table)
+        idf = [math.log(corpus_size - df + 0.5) - math.log(df + 0.5) for df in document_frequency.tolist()]
+        average_idf = sum(idf) / len(idf) if idf else 0.0
+        self._idf = np.array([value if value >= 0 else EPSILON * average_idf for value in idf])
+
+        avgdl = doc_lengths.sum() / corpus_size if corpus_size else 1.0
+        self._length_norm = K1 * (1 - B + B * doc_lengths / avgdl)
 
         if self.verbose:
-            print(f"Loaded {len(all_chunks)} chunks from {len(list(chunks_dir.iterdir()))} focus groups")
-
-        # Build BM25 index
-        # Index content_original + participant_profile for keyword matching
-        corpus = []
-        for chunk in all_chunks:
-            text = self._get_indexable_text(chunk)
-            corpus.append(text)
-
-        # Tokenize corpus (simple whitespace + lowercase)
-        self._tokenized_corpus = [self._tokenize(doc) for doc in corpus]
-        self._bm25 = BM25Okapi(self._tokenized_corpus)
-
+            fg_count = len(np.unique(table.column("focus_group_id").codes))
+            print(f"Built BM25 index with {corpus_size} documents from {fg_count} focus groups "
+                  f"({len(vocab)} terms, {len(self._postings)} postings)")
+
+    @staticmethod
+    def _segment_signature(table) -> Dict:
+        """What a shared segment must have been built from: the chunk table and the scoring parameters."""
+        return {"table": table.signature, "params": [K1, B, EPSILON, list(INDEXED_FIELDS)]}
+
+    def _attach_segment(self, table) -> bool:
+        """Use the shared bm25.seg arrays (zero-copy). False if there is none for this table."""
+        segment = open_segment("bm25", self._segment_signature(table), verbose=self.verbose)
+        if segment is None:
+            return False
+        self._indptr = segment.array("indptr")
+        self._postings = segment.array("postings")
+        self._frequencies = segment.array("frequencies")
+        self._idf = segment.array("idf")
+        self._length_norm = segment.array("length_norm")
+        self._vocab = segment.key_index("vocab")
         if self.verbose:
-            print(f"Built BM25 index with {len(corpus)} documents")
+            print(f"Attached shared BM25 index ({len(table)} documents, {len(self._vocab)} terms, "
+                  f"{len(self._postings)} postings) from {segment.path}")
+        return True
+
+    def save_segment(self) -> int:
+        """Write the index to the shared bm25.seg segment. Returns its size in bytes."""
+        arrays = {
+            "indptr": self._indptr,
+            "postings": self._postings,
+            "frequencies": self._frequencies,
+            "idf": self._idf,
+            "length_norm": self._length_norm,
+            **key_index_arrays("vocab", list(self._vocab)),  # term ids are insertion order
+        }
+        return write_segment("bm25", arrays, self._segment_signature(self._table),
+                             meta={"documents": len(self._table), "terms": len(self._vocab)})
+
+    @staticmethod
+    def _indexable_fields(table) -> Iterator[Dict]:
+        """Yield just the indexed fields of each chunk (decodes three columns, not whole records)."""
+        names = [name for name in INDEXED_FIELDS if name in table.column_names]
+        columns = [iter(table.column(name)) for name in names]
+        for _ in range(len(table)):
+            values = [next(column) for column in columns]
+            yield {name: value for name, value in zip(names, values) if isinstance(value, str)}
 
     def _get_indexable_text(self, chunk: Dict) -> str:
         """Combine fields for BM25 indexing."""
@@ -120,10 +205,21 @@ class BM25Retriever:
 
     def _tokenize(self, text: str) -> List[str]:
         """Simple tokenization: lowercase, split on whitespace and punctuation."""
-        import re
         # Lowercase and split on non-alphanumeric (keeping apostrophes for contractions)
-        tokens = re.findall(r"[a-z0-9']+", text.lower())
-        return tokens
+        return _TOKEN_RE.findall(text.lower())
+
+    def get_scores(self, query_tokens: List[str]) -> np.ndarray:
+        """BM25 score of every chunk (same values as BM25Okapi.get_scores)."""
+        scores = np.zeros(len(self._table))
+        for token in query_tokens:
+            term = self._vocab.get(token)
+            if term is None:
+                continue
+            start, end = self._indptr[term], self._indptr[term + 1]
+            docs = self._postings[start:end]
+            tf = self._frequencies[start:end]
+            scores[docs] += self._idf[term] * (tf * (K1 + 1) / (tf + self._length_norm[docs]))
+        return scores
 
     def retrieve(
         self,
@@ -148,30 +244,27 @@ class BM25Retriever:
         if not query_tokens:
             return []
 
-        # Get BM25 scores for all documents
-        scores = self._bm25.get_scores(query_tokens)
-
-        # Pair chunks with scores and filter
-        results = []
-        for idx, (chunk, score) in enumerate(zip(self._chunks, scores)):
-            # Apply focus group filter if specified
-            if filter_focus_groups and chunk["focus_group_id"] not in filter_focus_groups:
-                continue
-
-            # Skip zero scores
-            if score <= 0:
-                continue
+        # Get BM25 scores for all documents, skip zero scores
+        scores = self.get_scores(query_tokens)
+        keep = scores > 0
 
-            results.append((chunk, score))
+        # Apply focus group filter if specified
+        if filter_focus_groups:
+            fg_column = self._table.column("focus_group_id")
+            codes = [fg_column.code_of(fg_id) for fg_id in filter_focus_groups]
+            keep &= np.isin(fg_column.codes, [code for code in codes if code is not None])
 
-        # Sort by score descending
-        results.sort(key=lambda x: x[1], reverse=True)
+        # Sort by score descending (stable: ties keep chunk order)
+        candidates = np.flatnonzero(keep)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_k]]
 
         # Convert to BM25Result objects
-        return [
-            BM25Result(
+        results = []
+        for i in top.tolist():
+            chunk = self._table.row(i)
+            results.append(BM25Result(
                 chunk_id=chunk["chunk_id"],
-                bm25_score=score,
+                bm25_score=float(scores[i]),
                 content=chunk.get("content", ""),
                 content_original=chunk.get("content_original", ""),
                 focus_group_id=chunk["focus_group_id"],
@@ -181,27 +274,37 @@ class BM25Retriever:
                 source_file=chunk.get("source_file", ""),
                 line_number=chunk.get("line_number", 0),
                 preceding_moderator_q=chunk.get("preceding_moderator_q", ""),
-            )
-            for chunk, score in results[:top_k]
-        ]
+            ))
+        return results
 
     def get_chunk(self, chunk_id: str) -> Optional[Dict]:
         """Get chunk by ID."""
-        return self._chunk_index.get(chunk_id)
+        return self._table.get(chunk_id)
 
     @property
     def num_chunks(self) -> int:
         """Total number of indexed chunks."""
-        return len(self._chunks) if self._chunks else 0
+        return len(self._table) if self._table is not None else 0
+
+    def memory_components(self) -> Dict[str, object]:
+        """The objects that make up the index, for memory accounting."""
+        return {
+            "vocabulary": self._vocab,
+            "postings": (self._indptr, self._postings, self._frequencies),
+            "idf + length norms": (self._idf, self._length_norm),
+        }
 
     @classmethod
     def reset(cls):
         """Reset singleton (useful for testing)."""
         cls._instance = None
-        cls._chunks = None
-        cls._bm25 = None
-        cls._chunk_index = None
-        cls._tokenized_corpus = None
+        cls._table = None
+        cls._vocab = None
+        cls._idf = None
+        cls._indptr = None
+        cls._postings = None
+        cls._frequencies = None
+        cls._length_norm = None
 
 
 if __name__ == "__main__":
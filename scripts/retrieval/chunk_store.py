@@ -0,0 +1,551 @@
+"""
+Columnar chunk store: one memory-mapped file per chunk collection.
+
+Every consumer of chunk data (hydration, BM25, enrichment, embedding,
+re-indexing) reads through this module instead of parsing JSON trees.
+
+Collections (each built from the per-group all_chunks.json files that
+preprocessing writes, and rebuilt automatically when any of them changes):
+
+- chunks:        data/chunks/{fg_id}/all_chunks.json           (preprocess.py)
+- focus_groups:  data/chunks_enriched/{fg_id}/all_chunks.json  (enrich_chunks.py)
+- strategy:      data/strategy_chunks/{race_id}/all_chunks.json (preprocess_memos.py)
+
+File format (data/chunk_store/{collection}.col), all buffers 8-byte aligned:
+
+    b"CHUNKCOL" | u64 header length | JSON header | column buffers
+
+Column kinds:
+- str:   int64 offsets (rows + 1) + UTF-8 data - string-offset table
+- code:  int32 codes + dictionary in the header (low-cardinality strings
+         such as focus_group_id, race_id, section)
+- int / float: int64 / float64 arrays
+- json:  like str, but each value is JSON text; an empty value means the
+         key is absent from that record (mixed-type or optional fields)
+
+Column access is zero-copy: numpy arrays and memoryviews over the mapping.
+Rows are rebuilt as dicts on demand, with the original key order.
+
+Usage:
+    from scripts.retrieval.chunk_store import open_table, load_chunks, ChunkStore
+
+    table = open_table("focus_groups")
+    table.column("chunk_id")[0]                   # str, decoded on access
+    table.column("focus_group_id").codes          # int32 ndarray view
+    table.get("race-001-fg-001-detroit-suburbs-chunk-001")
+    table.select("focus_group_id", "race-001-fg-001-detroit-suburbs")
+
+    load_chunks("strategy")                       # list of dicts
+
+    ChunkStore.open().get(chunk_id)               # hydration across collections
+
+    python scripts/retrieval/chunk_store.py       # (re)build all collections
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from eval.config import DATA_DIR
+
+CHUNKS_DIR = DATA_DIR / "chunks"
+CHUNKS_ENRICHED_DIR = DATA_DIR / "chunks_enriched"
+STRATEGY_CHUNKS_DIR = DATA_DIR / "strategy_chunks"
+CHUNK_STORE_DIR = DATA_DIR / "chunk_store"
+
+# collection -> (source directory, glob for per-group chunk files)
+COLLECTIONS = {
+    "chunks": (CHUNKS_DIR, "*/all_chunks.json"),
+    "focus_groups": (CHUNKS_ENRICHED_DIR, "*/all_chunks.json"),
+    "strategy": (STRATEGY_CHUNKS_DIR, "race-*/all_chunks.json"),
+}
+
+# Collections the retrievers hydrate Pinecone matches from
+HYDRATION_COLLECTIONS = ("focus_groups", "strategy")
+
+MAGIC = b"CHUNKCOL"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# A str column is dictionary-encoded when it has at most this share of distinct values
+CODE_MAX_DISTINCT_RATIO = 0.25
+
+# Marks a key missing from a record (distinct from a JSON null)
+_ABSENT = object()
+
+
+def table_path(collection: str) -> Path:
+    return CHUNK_STORE_DIR / f"{collection}.col"
+
+
+def _source_files(collection: str) -> List[Path]:
+    source_dir, pattern = COLLECTIONS[collection]
+    if not source_dir.exists():
+        return []
+    return sorted(source_dir.glob(pattern))
+
+
+def _signature(collection: str) -> List:
+    """[path, mtime_ns, size] for every source file (JSON-friendly)."""
+    signature = []
+    for path in _source_files(collection):
+        stat = path.stat()
+        signature.append([str(path.relative_to(DATA_DIR)), stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+# ============ Writing ============
+
+def _column_kind(values: List[Any]) -> str:
+    """Pick the narrowest column kind that round-trips every value exactly."""
+    if any(v is _ABSENT for v in values):
+        return "json"
+    if all(isinstance(v, str) for v in values):
+        distinct = len(set(values))
+        if distinct <= max(1, int(len(values) * CODE_MAX_DISTINCT_RATIO)):
+            return "code"
+        return "str"
+    if all(type(v) is int for v in values):
+        return "int"
+    if all(type(v) is float for v in values):
+        return "float"
+    return "json"
+
+
+def _string_buffers(encoded: List[bytes]) -> Tuple[bytes, bytes]:
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def write_table(path: Path, records: List[Dict], signature: Optional[List] = None) -> int:
+    """
+    Write records to a columnar file (atomically, via rename).
+
+    Returns:
+        File size in bytes
+    """
+    # Column order = first-seen key order, so rows rebuild with the same layout
+    names: List[str] = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                names.append(key)
+
+    columns = []
+    buffers: List[bytes] = []
+    position = 0
+
+    def add_buffer(data: bytes) -> List[int]:
+        nonlocal position
+        padding = (-len(data)) % ALIGNMENT
+        buffers.append(data + b"\0" * padding)
+        span = [position, len(data)]
+        position += len(data) + padding
+        return span
+
+    for name in names:
+        values = [record.get(name, _ABSENT) for record in records]
+        kind = _column_kind(values)
+        column: Dict[str, Any] = {"name": name, "kind": kind}
+
+        if kind == "code":
+            dictionary = sorted(set(values))
+            lookup = {value: i for i, value in enumerate(dictionary)}
+            codes = np.fromiter((lookup[v] for v in values), dtype=np.int32, count=len(values))
+            column["dictionary"] = dictionary
+            column["codes"] = add_buffer(codes.tobytes())
+        elif kind == "int":
+            column["values"] = add_buffer(np.asarray(values, dtype=np.int64).tobytes())
+        elif kind == "float":
+            column["values"] = add_buffer(np.asarray(values, dtype=np.float64).tobytes())
+        else:
+            if kind == "str":
+                encoded = [v.encode("utf-8") for v in values]
+            else:
+                encoded = [
+                    b"" if v is _ABSENT else json.dumps(v, ensure_ascii=False).encode("utf-8")
+                    for v in values
+                ]
+            offsets, data = _string_buffers(encoded)
+            column["offsets"] = add_buffer(offsets)
+            column["data"] = add_buffer(data)
+        columns.append(column)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "rows": len(records),
+        "signature": signature or [],
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix_length = len(MAGIC) + 8 + len(header_bytes)
+    header_bytes += b" " * ((-prefix_length) % ALIGNMENT)  # JSON ignores trailing whitespace
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for buffer in buffers:
+            f.write(buffer)
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+def build_table(collection: str, verbose: bool = True) -> int:
+    """
+    (Re)build one collection from its all_chunks.json files.
+
+    Returns:
+        Number of chunks written
+    """
+    start = time.time()
+    signature = _signature(collection)
+    records: List[Dict] = []
+    for path in _source_files(collection):
+        with open(path) as f:
+            records.extend(json.load(f))
+
+    size = write_table(table_path(collection), records, signature)
+    _drop_cached(collection)
+
+    if verbose:
+        print(f"Built chunk store '{collection}': {len(records)} chunks, {size / 1e6:.1f}MB "
+              f"({(time.time() - start) * 1000:.0f}ms)")
+    return len(records)
+
+
+def build_chunk_store(verbose: bool = True) -> int:
+    """Rebuild every collection that has source files. Returns total chunks."""
+    return sum(
+        build_table(collection, verbose=verbose)
+        for collection in COLLECTIONS if _source_files(collection)
+    )
+
+
+# ============ Reading ============
+
+def _read_header(buffer) -> Tuple[Dict, int]:
+    """Parse the header of a mapped/read file. Returns (header, data start offset)."""
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a chunk store file")
+    (header_length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+    header_start = len(MAGIC) + 8
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported chunk store version: {header.get('version')}")
+    return header, header_start + header_length
+
+
+class StringColumn:
+    """
+    Zero-copy string column: int64 offsets view + UTF-8 data memoryview.
+
+    Indexing decodes a single value; raw() returns the undecoded bytes.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> memoryview:
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.raw(i), "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        data = self.data
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield str(data[start:end], "utf-8")
+
+
+class JsonColumn(StringColumn):
+    """String-offset column of JSON values; ABSENT where a record lacked the key."""
+    ABSENT = _ABSENT
+
+    def __getitem__(self, i: int) -> Any:
+        raw = self.raw(i)
+        return json.loads(bytes(raw)) if len(raw) else _ABSENT
+
+    def __iter__(self) -> Iterator[Any]:
+        for text in super().__iter__():
+            yield json.loads(text) if text else _ABSENT
+
+
+class CodeColumn:
+    """Dictionary-encoded strings: int32 codes view + value dictionary."""
+
+    def __init__(self, codes: np.ndarray, dictionary: List[str]):
+        self.codes = codes
+        self.dictionary = dictionary
+        self._lookup = {value: i for i, value in enumerate(dictionary)}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.dictionary[self.codes[i]]
+
+    def __iter__(self) -> Iterator[str]:
+        dictionary = self.dictionary
+        for code in self.codes.tolist():
+            yield dictionary[code]
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._lookup.get(value)
+
+
+class ChunkTable:
+    """
+    Read-only, memory-mapped columnar chunk table.
+
+    Columns are decoded lazily and share the mapping; get() and row()
+    rebuild one record. The chunk_id -> row index is built on first use
+    (or attached from a shared segment, see shared_index.py).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header, self._base = _read_header(self._mmap)
+        self.rows: int = header["rows"]
+        self.signature: List = header["signature"]
+        self._specs: Dict[str, Dict] = {c["name"]: c for c in header["columns"]}
+        self.column_names: List[str] = [c["name"] for c in header["columns"]]
+        self._columns: Dict[str, Any] = {}
+        self._row_index: Optional[Mapping[str, int]] = None
+        self._view = memoryview(self._mmap)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.row_index
+
+    def _array(self, span: List[int], dtype) -> np.ndarray:
+        start, length = span
+        return np.frombuffer(self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize,
+                             offset=self._base + start)
+
+    def _bytes(self, span: List[int]) -> memoryview:
+        start, length = span
+        return self._view[self._base + start:self._base + start + length]
+
+    def column(self, name: str):
+        """
+        Zero-copy column: StringColumn, JsonColumn, CodeColumn or a numpy array.
+
+        Raises:
+            KeyError: if the collection has no such column
+        """
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+
+        spec = self._specs[name]
+        kind = spec["kind"]
+        if kind == "code":
+            column = CodeColumn(self._array(spec["codes"], np.int32), spec["dictionary"])
+        elif kind == "int":
+            column = self._array(spec["values"], np.int64)
+        elif kind == "float":
+            column = self._array(spec["values"], np.float64)
+        else:
+            column_class = JsonColumn if kind == "json" else StringColumn
+            column = column_class(self._array(spec["offsets"], np.int64), self._bytes(spec["data"]))
+        self._columns[name] = column
+        return column
+
+    @property
+    def row_index(self) -> Mapping[str, int]:
+        """chunk_id -> row: the shared index when workers share one (SHARED_INDEX), else a dict."""
+        if self._row_index is None:
+            from scripts.retrieval.shared_index import shared_row_index
+            self._row_index = shared_row_index(self) or {
+                chunk_id: i for i, chunk_id in enumerate(self.column("chunk_id"))
+            }
+        return self._row_index
+
+    def row(self, i: int) -> Dict:
+        """Rebuild record i as a dict (original key order)."""
+        record = {}
+        for name in self.column_names:
+            value = self.column(name)[i]
+            if value is _ABSENT:
+                continue
+            if isinstance(value, np.generic):
+                value = value.item()
+            record[name] = value
+        return record
+
+    def get(self, chunk_id: str) -> Optional[Dict]:
+        """Full chunk record, or None if the id isn't in this table."""
+        i = self.row_index.get(chunk_id)
+        return None if i is None else self.row(i)
+
+    def select(self, name: str, value: str) -> List[Dict]:
+        """Records whose dictionary-encoded column equals value (vectorized on codes)."""
+        column = self.column(name)
+        if isinstance(column, CodeColumn):
+            code = column.code_of(value)
+            if code is None:
+                return []
+            rows = np.flatnonzero(column.codes == code).tolist()
+        else:
+            rows = [i for i, v in enumerate(column) if v == value]
+        return [self.row(i) for i in rows]
+
+    def records(self) -> Iterator[Dict]:
+        """All records as dicts, decoding each column once."""
+        columns = []
+        for name in self.column_names:
+            column = self.column(name)
+            columns.append((name, column.tolist() if isinstance(column, np.ndarray) else list(column)))
+        for i in range(self.rows):
+            record = {}
+            for name, values in columns:
+                value = values[i]
+                if value is not _ABSENT:
+                    record[name] = value
+            yield record
+
+
+_tables: Dict[str, ChunkTable] = {}
+_tables_lock = threading.Lock()
+
+
+def _drop_cached(collection: str):
+    with _tables_lock:
+        _tables.pop(collection, None)
+
+
+def _is_stale(collection: str, signature: List) -> bool:
+    path = table_path(collection)
+    if not path.exists():
+        return True
+    try:
+        with open(path, "rb") as f:
+            prefix = f.read(len(MAGIC) + 8)
+            (header_length,) = struct.unpack_from("<Q", prefix, len(MAGIC))
+            header, _ = _read_header(prefix + f.read(header_length))
+        return header["signature"] != signature
+    except (OSError, ValueError, struct.error):
+        return True
+
+
+def open_table(collection: str, verbose: bool = True) -> Optional[ChunkTable]:
+    """
+    Shared table for a collection, (re)built first if missing or stale.
+
+    Returns None when the collection has no source files.
+    """
+    if collection not in COLLECTIONS:
+        raise KeyError(f"Unknown chunk collection: {collection} (expected one of {list(COLLECTIONS)})")
+
+    table = _tables.get(collection)
+    if table is not None:
+        return table
+
+    signature = _signature(collection)
+    if not signature:
+        return None
+
+    if _is_stale(collection, signature):
+        if verbose:
+            print(f"Chunk store '{collection}' missing or stale, rebuilding...")
+        build_table(collection, verbose=verbose)
+
+    with _tables_lock:
+        if collection not in _tables:
+            _tables[collection] = ChunkTable(table_path(collection))
+        return _tables[collection]
+
+
+def load_chunks(collection: str, verbose: bool = False) -> List[Dict]:
+    """All chunks of a collection as dicts ([] if it has no source files)."""
+    table = open_table(collection, verbose=verbose)
+    return list(table.records()) if table is not None else []
+
+
+class ChunkStore:
+    """
+    Chunk lookup by id across the hydration collections (focus group and
+    strategy memo chunks), used to hydrate ids-only vector matches.
+    """
+    _shared: Optional["ChunkStore"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, tables: List[ChunkTable]):
+        self.tables = tables
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.tables)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return any(chunk_id in table for table in self.tables)
+
+    def get(self, chunk_id: str) -> Optional[Dict]:
+        """Full chunk record, or None if the id isn't in the store."""
+        for table in self.tables:
+            record = table.get(chunk_id)
+            if record is not None:
+                return record
+        return None
+
+    @classmethod
+    def open(cls, verbose: bool = True) -> Optional["ChunkStore"]:
+        """Shared store; None when there are no chunk files to build from."""
+        if cls._shared is not None:
+            return cls._shared
+
+        with cls._lock:
+            if cls._shared is None:
+                tables = [open_table(c, verbose=verbose) for c in HYDRATION_COLLECTIONS]
+                tables = [t for t in tables if t is not None]
+                if not tables:
+                    return None
+                store = cls(tables)
+                # Build the id indexes now rather than on the first request
+                for table in tables:
+                    table.row_index
+                cls._shared = store
+            return cls._shared
+
+    @classmethod
+    def reset(cls):
+        """Drop the shared store and tables (useful for testing)."""
+        with cls._lock:
+            cls._shared = None
+        with _tables_lock:
+            _tables.clear()
+
+
+if __name__ == "__main__":
+    build_chunk_store()
+    for collection in COLLECTIONS:
+        path = table_path(collection)
+        if path.exists():
+            table = ChunkTable(path)
+            kinds = ", ".join(f"{name}:{table._specs[name]['kind']}" for name in table.column_names)
+            print(f"  {path.name}: {len(table)} rows, {path.stat().st_size / 1e6:.1f}MB [{kinds}]")
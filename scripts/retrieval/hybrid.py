@@ -18,7 +18,8 @@ from scripts.retrieve import (
     LLMRouter,
 )
 from scripts.retrieval.bm25 import BM25Retriever
-from eval.config import DATA_DIR
+from scripts.retrieval.registry import MetadataRegistry
+from scripts.tracing import span
 
 
 class FusionStrategy(Enum):
@@ -252,26 +253,30 @@ class HybridFocusGroupRetriever:
         # Get dense results (respects router/filter for focused semantic search)
         if self.verbose:
             print(f"Dense retrieval (top_k={candidate_k}, filtered={filter_focus_groups is not None})...")
-        dense_results = self.dense_retriever.retrieve(
-            query,
-            top_k=candidate_k,
-            filter_focus_groups=filter_focus_groups,
-        )
+        with span("dense", top_k=candidate_k):
+            dense_results = self.dense_retriever.retrieve(
+                query,
+                top_k=candidate_k,
+                filter_focus_groups=filter_focus_groups,
+            )
 
         # Get BM25 results (searches ALL FGs - fast enough, catches router misses)
         if self.verbose:
             print(f"BM25 retrieval (top_k={candidate_k}, searching ALL FGs)...")
-        bm25_results = self.bm25_retriever.retrieve(
-            query,
-            top_k=candidate_k,
-            filter_focus_groups=None,  # Always search all - BM25 is fast
-        )
+        with span("bm25", top_k=candidate_k) as bm25_span:
+            bm25_results = self.bm25_retriever.retrieve(
+                query,
+                top_k=candidate_k,
+                filter_focus_groups=None,  # Always search all - BM25 is fast
+            )
+            bm25_span.set(results=len(bm25_results))
 
         if self.verbose:
             print(f"Fusing {len(dense_results)} dense + {len(bm25_results)} BM25 results...")
 
         # Fuse results
-        fused = self._fuse_results(dense_results, bm25_results)
+        with span("fusion", dense=len(dense_results), bm25=len(bm25_results)):
+            fused = self._fuse_results(dense_results, bm25_results)
 
         # Optional reranking
         if self.use_reranker and self.reranker and fused:
@@ -291,6 +296,7 @@ class HybridFocusGroupRetriever:
         top_k_per_fg: int = 5,
         score_threshold: float = 0.50,
         filter_focus_groups: Optional[List[str]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> Dict[str, List[RetrievalResult]]:
         """
         Per-focus-group hybrid retrieval.
@@ -302,6 +308,7 @@ class HybridFocusGroupRetriever:
             top_k_per_fg: Max results per focus group
             score_threshold: Minimum hybrid score to include
             filter_focus_groups: Optional list of FG IDs
+            query_embedding: Optional precomputed query embedding (dense side)
 
         Returns:
             Dict mapping focus_group_id -> list of results
@@ -316,12 +323,8 @@ class HybridFocusGroupRetriever:
             if self.verbose:
                 print(f"Router selected {len(fg_ids)} focus groups")
         else:
-            # Fallback to all FGs from manifest
-            import json
-            manifest_file = DATA_DIR / "manifest.json"
-            with open(manifest_file) as f:
-                data = json.load(f)
-            fg_ids = [fg["focus_group_id"] for fg in data["focus_groups"]]
+            # Fallback to all FGs from the registry
+            fg_ids = list(MetadataRegistry.get().fg_ids)
 
         # Get candidates from both retrievers (more than needed)
         candidate_k = top_k_per_fg * 6 * len(fg_ids)  # Enough for all FGs
@@ -330,21 +333,26 @@ class HybridFocusGroupRetriever:
             print(f"Getting candidates from dense (filtered) and BM25 (all FGs)...")
 
         # Dense respects router filter
-        dense_results = self.dense_retriever.retrieve(
-            query,
-            top_k=candidate_k,
-            filter_focus_groups=fg_ids,
-        )
+        with span("dense", top_k=candidate_k):
+            dense_results = self.dense_retriever.retrieve(
+                query,
+                top_k=candidate_k,
+                filter_focus_groups=fg_ids,
+                query_embedding=query_embedding,
+            )
 
         # BM25 searches ALL FGs to catch router misses (fast enough)
-        bm25_results = self.bm25_retriever.retrieve(
-            query,
-            top_k=candidate_k,
-            filter_focus_groups=None,  # Search all - catches entities router doesn't recognize
-        )
+        with span("bm25", top_k=candidate_k) as bm25_span:
+            bm25_results = self.bm25_retriever.retrieve(
+                query,
+                top_k=candidate_k,
+                filter_focus_groups=None,  # Search all - catches entities router doesn't recognize
+            )
+            bm25_span.set(results=len(bm25_results))
 
         # Fuse all results first
-        fused = self._fuse_results(dense_results, bm25_results)
+        with span("fusion", dense=len(dense_results), bm25=len(bm25_results)):
+            fused = self._fuse_results(dense_results, bm25_results)
 
         # Group by focus group and apply threshold
         # Note: We don't filter by fg_ids here - BM25 may have found good results
@@ -0,0 +1,257 @@
+"""
+Metadata registry: every manifest loaded once and indexed in memory.
+
+Replaces per-request reads of:
+- data/manifest.json (focus group list)
+- data/focus-groups/{fg_id}.json (focus group metadata)
+- data/strategy_chunks/manifest.json (strategy memo list)
+- political-consulting-corpus/race-index.json (race_id -> directory)
+
+Snapshots are immutable: a reload builds a complete new snapshot and swaps
+the reference, so readers never see a half-loaded registry. Source files are
+re-checked at most every METADATA_RELOAD_INTERVAL seconds (default 5).
+
+With SHARED_INDEX=true (multi-worker serving, api/serve.py) a snapshot whose
+sources haven't changed is attached from the shared registry.seg segment:
+its mappings decode one entry per lookup from pages every worker shares.
+
+Usage:
+    from scripts.retrieval.registry import MetadataRegistry
+
+    registry = MetadataRegistry.get()
+    registry.fg_metadata["race-007-fg-001-cleveland-suburbs"]
+    registry.race_metadata["race-007"]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from eval.config import DATA_DIR, FOCUS_GROUPS_DIR, PROJECT_ROOT
+from scripts.retrieval.shared_index import json_arrays, mapping_arrays, open_segment, write_segment
+
+CORPUS_DIR = PROJECT_ROOT / "political-consulting-corpus"
+FG_MANIFEST_FILE = DATA_DIR / "manifest.json"
+STRATEGY_MANIFEST_FILE = DATA_DIR / "strategy_chunks" / "manifest.json"
+RACE_INDEX_FILE = CORPUS_DIR / "race-index.json"
+
+METADATA_RELOAD_INTERVAL = float(os.getenv("METADATA_RELOAD_INTERVAL", "5"))
+
+
+@dataclass(frozen=True)
+class MetadataSnapshot:
+    """
+    One consistent view of all corpus metadata.
+
+    Mappings are read-only proxies (or SharedMappings over the shared
+    segment); the dicts they hold are shared, so treat them as read-only too.
+    """
+    fg_ids: Tuple[str, ...]
+    fg_manifest: Mapping[str, Dict]        # fg_id -> data/manifest.json entry
+    fg_metadata: Mapping[str, Dict]        # fg_id -> data/focus-groups/{fg_id}.json
+    fg_file_paths: Mapping[str, str]       # fg_id -> transcript path relative to corpus root
+    race_ids: Tuple[str, ...]
+    race_metadata: Mapping[str, Dict]      # race_id -> strategy manifest memo entry
+    race_paths: Mapping[str, str]          # race_id -> "races/race-001-michigan-gov-2022"
+    strategy_file_paths: Mapping[str, str] # race_id -> memo path relative to corpus root
+    corpus_listing: Sequence[Dict]         # CorpusItem-shaped dicts for /corpus
+    loaded_at: float
+    signature: Tuple
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return None
+
+
+def _watched_files() -> List[Path]:
+    files = [FG_MANIFEST_FILE, STRATEGY_MANIFEST_FILE, RACE_INDEX_FILE]
+    if FOCUS_GROUPS_DIR.exists():
+        files.extend(sorted(FOCUS_GROUPS_DIR.glob("*.json")))
+    return files
+
+
+def _signature() -> Tuple:
+    """(path, mtime_ns, size) for every source file - changes on any rewrite."""
+    signature = []
+    for path in _watched_files():
+        try:
+            stat = path.stat()
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+def _build_snapshot() -> MetadataSnapshot:
+    """Read every source file once and build all indexes."""
+    signature = _signature()
+
+    race_index = _read_json(RACE_INDEX_FILE) or {}
+    race_paths = {r["race_id"]: r["path"] for r in race_index.get("races", [])}
+
+    # Focus groups
+    fg_data = _read_json(FG_MANIFEST_FILE) or {}
+    fg_manifest: Dict[str, Dict] = {}
+    fg_metadata: Dict[str, Dict] = {}
+    fg_file_paths: Dict[str, str] = {}
+    corpus_listing: List[Dict] = []
+
+    for fg in fg_data.get("focus_groups", []):
+        fg_id = fg["focus_group_id"]
+        fg_manifest[fg_id] = fg
+        fg_metadata[fg_id] = _read_json(FOCUS_GROUPS_DIR / f"{fg_id}.json") or {}
+
+        # race-XXX-fg-YYY-location -> {race_dir}/focus-groups/fg-YYY-location.md
+        parts = fg_id.split("-fg-")
+        if len(parts) < 2:
+            continue
+        race_id = parts[0]
+        race_dir = race_paths.get(race_id, f"races/{race_id}")
+        filename_suffix = fg_id.replace(f"{race_id}-", "")
+        file_path = f"{race_dir}/focus-groups/{filename_suffix}.md"
+        fg_file_paths[fg_id] = file_path
+
+        corpus_listing.append({
+            "id": fg_id,
+            "type": "focus_group",
+            "title": f"{fg.get('location', 'Unknown')} ({fg.get('race_name', 'Unknown')})",
+            "date": fg.get("date"),
+            "location": fg.get("location"),
+            "race_name": fg.get("race_name"),
+            "outcome": fg.get("outcome"),
+            "file_path": file_path,
+        })
+
+    # Strategy memos
+    strategy_data = _read_json(STRATEGY_MANIFEST_FILE) or {}
+    race_metadata: Dict[str, Dict] = {}
+    strategy_file_paths: Dict[str, str] = {}
+
+    for memo in strategy_data.get("memos", []):
+        race_id = memo["race_id"]
+        race_metadata[race_id] = memo
+        race_dir = race_paths.get(race_id, f"races/{race_id}")
+        strategy_file_paths[race_id] = f"{race_dir}/strategy-memo.md"
+
+        corpus_listing.append({
+            "id": race_id,
+            "type": "strategy_memo",
+            "title": f"Strategy: {memo.get('state')} {memo.get('year')} ({memo.get('outcome')})",
+            "date": str(memo.get("year")),
+            "location": memo.get("state"),
+            "race_name": f"{memo.get('state')} {memo.get('office')}",
+            "outcome": memo.get("outcome"),
+            "file_path": strategy_file_paths[race_id],
+        })
+
+    return MetadataSnapshot(
+        fg_ids=tuple(fg_manifest),
+        fg_manifest=MappingProxyType(fg_manifest),
+        fg_metadata=MappingProxyType(fg_metadata),
+        fg_file_paths=MappingProxyType(fg_file_paths),
+        race_ids=tuple(race_metadata),
+        race_metadata=MappingProxyType(race_metadata),
+        race_paths=MappingProxyType(race_paths),
+        strategy_file_paths=MappingProxyType(strategy_file_paths),
+        corpus_listing=tuple(corpus_listing),
+        loaded_at=time.time(),
+        signature=signature,
+    )
+
+
+# Snapshot mappings stored in the shared segment, by field name
+_SHARED_MAPPINGS = (
+    "fg_manifest", "fg_metadata", "fg_file_paths", "race_metadata", "race_paths", "strategy_file_paths",
+)
+
+
+def write_registry_segment(snapshot: MetadataSnapshot) -> int:
+    """Write a snapshot to the shared registry.seg segment. Returns its size in bytes."""
+    arrays = json_arrays("corpus_listing", snapshot.corpus_listing)
+    for name in _SHARED_MAPPINGS:
+        arrays.update(mapping_arrays(name, getattr(snapshot, name)))
+    return write_segment("registry", arrays, snapshot.signature, meta={
+        "fg_ids": list(snapshot.fg_ids), "race_ids": list(snapshot.race_ids), "loaded_at": snapshot.loaded_at,
+    })
+
+
+def _attach_snapshot(signature: Tuple) -> Optional[MetadataSnapshot]:
+    """The snapshot in the shared segment, if it was built from these source files."""
+    segment = open_segment("registry", signature)
+    if segment is None:
+        return None
+    return MetadataSnapshot(
+        fg_ids=tuple(segment.meta["fg_ids"]),
+        race_ids=tuple(segment.meta["race_ids"]),
+        corpus_listing=segment.json_values("corpus_listing"),
+        loaded_at=segment.meta["loaded_at"],
+        signature=signature,
+        **{name: segment.mapping(name) for name in _SHARED_MAPPINGS},
+    )
+
+
+def _load_snapshot() -> MetadataSnapshot:
+    return _attach_snapshot(_signature()) or _build_snapshot()
+
+
+class MetadataRegistry:
+    """
+    Process-wide holder of the current MetadataSnapshot.
+
+    get() is O(1) on the hot path: source files are only stat'ed once the
+    reload interval has elapsed, and only re-read if they changed.
+    """
+    _snapshot: Optional[MetadataSnapshot] = None
+    _last_check = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> MetadataSnapshot:
+        """Return the current snapshot, loading or reloading it if needed."""
+        snapshot = cls._snapshot
+        if snapshot is not None and time.monotonic() - cls._last_check < METADATA_RELOAD_INTERVAL:
+            return snapshot
+
+        with cls._lock:
+            # Another thread may have refreshed while we waited
+            if cls._snapshot is not None and time.monotonic() - cls._last_check < METADATA_RELOAD_INTERVAL:
+                return cls._snapshot
+
+            cls._last_check = time.monotonic()
+            if cls._snapshot is None:
+                cls._snapshot = _load_snapshot()
+            elif _signature() != cls._snapshot.signature:
+                print("Metadata files changed, reloading registry...")
+                cls._snapshot = _load_snapshot()
+            return cls._snapshot
+
+    @classmethod
+    def reload(cls) -> MetadataSnapshot:
+        """Force a rebuild (e.g. right after preprocessing)."""
+        snapshot = _build_snapshot()
+        with cls._lock:
+            cls._snapshot = snapshot
+            cls._last_check = time.monotonic()
+        return snapshot
+
+    @classmethod
+    def reset(cls):
+        """Drop the loaded snapshot (useful for testing)."""
+        with cls._lock:
+            cls._snapshot = None
+            cls._last_check = 0.0
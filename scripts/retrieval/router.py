@@ -4,21 +4,23 @@ LLM Router for query routing to focus groups and strategy memos.
 
 import json
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from eval.config import (
-    OPENROUTER_API_KEY,
-    OPENROUTER_BASE_URL,
     ROUTER_MODEL,
     DATA_DIR,
     FOCUS_GROUPS_DIR,
 )
 from scripts.retrieval.types import RouterResult
+from scripts.retrieval.registry import MetadataRegistry
+from scripts.usage import chat_completion
 
 
+@lru_cache(maxsize=None)
 def _load_prompt(name: str) -> str:
     """Load a prompt from the prompts directory."""
     prompt_file = Path(__file__).parent.parent.parent / "prompts" / f"{name}.txt"
@@ -30,18 +32,26 @@ def _load_prompt(name: str) -> str:
 class LLMRouter:
     """Routes queries to relevant content (focus groups and/or strategy memos)."""
 
-    # Load prompt from file (can be overridden for testing)
-    SYSTEM_PROMPT = _load_prompt("router_unified")
+    # Prompt file name; read on first use, not at import (set SYSTEM_PROMPT to override for testing)
+    PROMPT_NAME = "router_unified"
+    SYSTEM_PROMPT: Optional[str] = None
 
     def __init__(self, model: str = ROUTER_MODEL):
-        import openai
-        self.client = openai.OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url=OPENROUTER_BASE_URL
-        )
+        from scripts.retrieval.base import SharedResources
+        self.client = SharedResources.get_openrouter_client()
         self.model = model
-        self.fg_manifest = self._load_fg_manifest()
-        self.strategy_manifest = self._load_strategy_manifest()
+        self._system_prompt: Optional[str] = None
+
+    @property
+    def system_prompt(self) -> str:
+        """Routing prompt with both manifests, built on first use and reused."""
+        if self._system_prompt is None:
+            template = self.SYSTEM_PROMPT or _load_prompt(self.PROMPT_NAME)
+            self._system_prompt = template.format(
+                fg_manifest=self._load_fg_manifest(),
+                strategy_manifest=self._load_strategy_manifest()
+            )
+        return self._system_prompt
 
     def _load_fg_manifest(self) -> str:
         """Load focus group manifest for prompt."""
@@ -97,15 +107,11 @@ class LLMRouter:
 
     def route_unified(self, query: str) -> RouterResult:
         """Route query to content type(s) and specific IDs."""
-        prompt = self.SYSTEM_PROMPT.format(
-            fg_manifest=self.fg_manifest,
-            strategy_manifest=self.strategy_manifest
-        )
-
-        response = self.client.chat.completions.create(
+        response = chat_completion(
+            self.client, "router",
             model=self.model,
             messages=[
-                {"role": "system", "content": prompt},
+                {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": query}
             ],
             max_tokens=500,
@@ -160,7 +166,8 @@ class LLMRouter:
                 content_type="both",
                 focus_group_ids=None,
                 race_ids=None,
-                outcome_filter=None
+                outcome_filter=None,
+                fallback=True
             )
 
     def route(self, query: str) -> Optional[List[str]]:
@@ -170,16 +177,8 @@ class LLMRouter:
 
     def _get_all_fg_ids(self) -> List[str]:
         """Get all focus group IDs."""
-        manifest_file = DATA_DIR / "manifest.json"
-        with open(manifest_file) as f:
-            data = json.load(f)
-        return [fg["focus_group_id"] for fg in data["focus_groups"]]
+        return list(MetadataRegistry.get().fg_ids)
 
     def _get_all_race_ids(self) -> List[str]:
         """Get all race IDs from strategy memos."""
-        manifest_file = DATA_DIR / "strategy_chunks" / "manifest.json"
-        if not manifest_file.exists():
-            return []
-        with open(manifest_file) as f:
-            data = json.load(f)
-        return [memo["race_id"] for memo in data.get("memos", [])]
+        return list(MetadataRegistry.get().race_ids)
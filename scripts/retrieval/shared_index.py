@@ -0,0 +1,414 @@
+"""
+Shared read-only index segments for multi-worker serving.
+
+Every structure the API builds at startup is private to its process, so N
+workers hold N copies. The large read-only ones are instead written once,
+before the workers start, to segment files that every worker memory-maps:
+
+- bm25.seg:              BM25 postings, idf, length norms and vocabulary
+- rows.{collection}.seg: chunk_id -> row index of each hydration collection
+                         (the chunk store itself is already a mapped file)
+- registry.seg:          the metadata registry snapshot
+- vectors.seg:           eval/local_backend.py's vector matrix, ids and metadata
+
+Mapped pages are page cache: one physical copy, whatever the number of
+workers. Put SHARED_INDEX_DIR on tmpfs (/dev/shm/...) to keep them off disk.
+
+File format (data/shared_index/{name}.seg), all buffers 8-byte aligned:
+
+    b"SHAREDIX" | u64 header length | JSON header | array buffers
+
+The header lists each array's dtype, shape and span, plus the signature of
+the sources the segment was built from. A worker whose sources changed
+since the build gets None from open_segment() and builds privately.
+
+String -> int lookups use KeyIndex instead of a dict: sorted 64-bit key
+hashes and the key's position, with the keys in a string-offset table to
+confirm a match. Nothing is decoded until a key is looked up.
+
+Segments are only attached with SHARED_INDEX=true (api/serve.py sets it).
+
+Usage:
+    from scripts.retrieval.shared_index import build_shared_index, open_segment
+
+    build_shared_index()                          # in the launcher, before the workers start
+    segment = open_segment("bm25", signature)     # in a worker; None if off, missing or stale
+    segment.array("postings")                     # zero-copy ndarray
+    segment.key_index("vocab").get("steel")       # term id
+    segment.mapping("fg_metadata")["race-007-fg-001-cleveland-suburbs"]
+
+    python scripts/retrieval/shared_index.py      # build every segment and list them
+"""
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from eval.config import DATA_DIR
+from scripts.retrieval.chunk_store import JsonColumn, StringColumn
+
+SHARED_INDEX = os.getenv("SHARED_INDEX", "false").lower() == "true"
+SHARED_INDEX_DIR = Path(os.getenv("SHARED_INDEX_DIR", str(DATA_DIR / "shared_index")))
+
+MAGIC = b"SHAREDIX"
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+
+def segment_path(name: str) -> Path:
+    return SHARED_INDEX_DIR / f"{name}.seg"
+
+
+def _key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _normalized(signature: Any) -> Any:
+    """Signature as it reads back from the JSON header (tuples become lists)."""
+    return json.loads(json.dumps(signature))
+
+
+# ============ Writing ============
+
+def string_arrays(name: str, values: Iterable[str]) -> Dict[str, np.ndarray]:
+    """String-offset table: {name}.offsets (int64, rows + 1) and {name}.data (UTF-8)."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return {f"{name}.offsets": offsets, f"{name}.data": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+
+
+def json_arrays(name: str, values: Iterable[Any]) -> Dict[str, np.ndarray]:
+    """String-offset table of JSON values (read back as a chunk store JsonColumn)."""
+    return string_arrays(name, (json.dumps(value, ensure_ascii=False) for value in values))
+
+
+def key_index_arrays(name: str, keys: Sequence[str], store_keys: bool = True) -> Dict[str, np.ndarray]:
+    """
+    KeyIndex over keys: key -> position in keys.
+
+    Args:
+        store_keys: False when the reader already has the keys in the same
+            order (a chunk store column) and passes them to key_index()
+    """
+    hashes = np.fromiter((_key_hash(key) for key in keys), dtype=np.uint64, count=len(keys))
+    order = np.argsort(hashes, kind="stable")
+    arrays = {f"{name}.hashes": hashes[order], f"{name}.positions": order.astype(np.int64)}
+    if store_keys:
+        arrays.update(string_arrays(f"{name}.keys", keys))
+    return arrays
+
+
+def mapping_arrays(name: str, mapping: Mapping) -> Dict[str, np.ndarray]:
+    """Read-only str -> JSON value mapping (read back with Segment.mapping)."""
+    keys = list(mapping)
+    return {**key_index_arrays(name, keys), **json_arrays(f"{name}.values", (mapping[k] for k in keys))}
+
+
+def write_segment(name: str, arrays: Dict[str, np.ndarray], signature: Any, meta: Optional[Dict] = None) -> int:
+    """
+    Write arrays to {SHARED_INDEX_DIR}/{name}.seg (atomically, via rename).
+
+    Workers that have the old file mapped keep reading it until they reopen.
+
+    Returns:
+        File size in bytes
+    """
+    specs = {}
+    buffers: List[bytes] = []
+    position = 0
+    for array_name, array in arrays.items():
+        data = np.ascontiguousarray(array).tobytes()
+        padding = (-len(data)) % ALIGNMENT
+        buffers.append(data + b"\0" * padding)
+        specs[array_name] = {"dtype": array.dtype.str, "shape": list(array.shape), "span": [position, len(data)]}
+        position += len(data) + padding
+
+    header = {
+        "version": FORMAT_VERSION,
+        "name": name,
+        "built_at": time.time(),
+        "signature": _normalized(signature),
+        "meta": meta or {},
+        "arrays": specs,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix_length = len(MAGIC) + 8 + len(header_bytes)
+    header_bytes += b" " * ((-prefix_length) % ALIGNMENT)  # JSON ignores trailing whitespace
+
+    path = segment_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".seg.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for buffer in buffers:
+            f.write(buffer)
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+# ============ Reading ============
+
+class KeyIndex(Mapping):
+    """
+    Read-only str -> int mapping over shared arrays (key -> its position).
+
+    Lookup: hash the key, binary-search the sorted hashes, confirm against
+    the stored key. Iterates keys in position order.
+    """
+
+    def __init__(self, hashes: np.ndarray, positions: np.ndarray, keys: Sequence[str]):
+        self.hashes = hashes
+        self.positions = positions
+        self.keys_table = keys
+        self._hash_view = memoryview(hashes).cast("B").cast("Q")  # plain ints for bisect
+
+    def get(self, key: str, default=None):
+        if not isinstance(key, str):
+            return default
+        target = _key_hash(key)
+        hashes = self._hash_view
+        i = bisect.bisect_left(hashes, target)
+        while i < len(hashes) and hashes[i] == target:
+            position = int(self.positions[i])
+            if self.keys_table[position] == key:
+                return position
+            i += 1
+        return default
+
+    def __getitem__(self, key: str) -> int:
+        position = self.get(key)
+        if position is None:
+            raise KeyError(key)
+        return position
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_table)
+
+
+class SharedMapping(Mapping):
+    """Read-only str -> value mapping; values are JSON, decoded on each access."""
+
+    def __init__(self, index: KeyIndex, values: JsonColumn):
+        self.index = index
+        self.values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[self.index[key]]
+
+    def get(self, key: str, default=None):
+        position = self.index.get(key)
+        return default if position is None else self.values[position]
+
+    def __contains__(self, key) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+
+class Segment:
+    """One memory-mapped segment file; every accessor is a view over the mapping."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a shared index segment: {path}")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported shared index version: {header.get('version')}")
+        self._base = header_start + header_length
+        self.name: str = header["name"]
+        self.built_at: float = header["built_at"]
+        self.signature = header["signature"]
+        self.meta: Dict = header["meta"]
+        self._specs: Dict[str, Dict] = header["arrays"]
+        self._view = memoryview(self._mmap)
+
+    def __len__(self) -> int:
+        return len(self._mmap)
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self._specs[name]
+        dtype = np.dtype(spec["dtype"])
+        start, length = spec["span"]
+        array = np.frombuffer(self._mmap, dtype=dtype, count=length // dtype.itemsize, offset=self._base + start)
+        return array.reshape(spec["shape"])
+
+    def _bytes(self, name: str) -> memoryview:
+        start, length = self._specs[name]["span"]
+        return self._view[self._base + start:self._base + start + length]
+
+    def strings(self, name: str) -> StringColumn:
+        return StringColumn(self.array(f"{name}.offsets"), self._bytes(f"{name}.data"))
+
+    def json_values(self, name: str) -> JsonColumn:
+        return JsonColumn(self.array(f"{name}.offsets"), self._bytes(f"{name}.data"))
+
+    def key_index(self, name: str, keys: Optional[Sequence[str]] = None) -> KeyIndex:
+        """KeyIndex written by key_index_arrays (pass keys if they weren't stored)."""
+        if keys is None:
+            keys = self.strings(f"{name}.keys")
+        return KeyIndex(self.array(f"{name}.hashes"), self.array(f"{name}.positions"), keys)
+
+    def mapping(self, name: str) -> SharedMapping:
+        return SharedMapping(self.key_index(name), self.json_values(f"{name}.values"))
+
+
+_segments: Dict[str, Segment] = {}
+_segments_lock = threading.Lock()
+_building = False  # build_shared_index() running: build from the sources, never from an old segment
+
+
+def open_segment(name: str, signature: Any, verbose: bool = True) -> Optional[Segment]:
+    """
+    The shared segment for name, if sharing is on and it was built from these sources.
+
+    Returns None (build privately) when SHARED_INDEX is off, the file is
+    missing or unreadable, or its signature doesn't match.
+    """
+    if not SHARED_INDEX or _building:
+        return None
+    expected = _normalized(signature)
+    with _segments_lock:
+        segment = _segments.get(name)
+        if segment is None or segment.signature != expected:
+            path = segment_path(name)
+            try:
+                segment = Segment(path)
+            except FileNotFoundError:
+                if verbose:
+                    print(f"No shared segment '{name}' in {SHARED_INDEX_DIR}, building it in this process")
+                return None
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Shared segment '{name}' unreadable ({e}), building it in this process")
+                return None
+            if segment.signature != expected:
+                if verbose:
+                    print(f"Shared segment '{name}' is stale (sources changed since it was built), "
+                          f"building it in this process")
+                return None
+            _segments[name] = segment
+        return segment
+
+
+def shared_index_stats() -> Dict[str, Any]:
+    """Whether sharing is on and the segments this process has attached (for /stats)."""
+    with _segments_lock:
+        attached = {
+            name: {"mb": round(len(segment) / 1e6, 2), "built_at": segment.built_at}
+            for name, segment in _segments.items()
+        }
+    return {"enabled": SHARED_INDEX, "dir": str(SHARED_INDEX_DIR), "attached": attached}
+
+
+def reset_segments():
+    """Forget opened segments (useful for testing)."""
+    with _segments_lock:
+        _segments.clear()
+
+
+# ============ Chunk id indexes ============
+
+def write_row_index(table) -> int:
+    """chunk_id -> row index of a chunk table (keys stay in the table's own chunk_id column)."""
+    arrays = key_index_arrays("chunk_id", list(table.column("chunk_id")), store_keys=False)
+    return write_segment(f"rows.{table.path.stem}", arrays, table.signature, meta={"rows": len(table)})
+
+
+def shared_row_index(table) -> Optional[KeyIndex]:
+    """The table's shared chunk_id index, or None (ChunkTable then builds a dict)."""
+    segment = open_segment(f"rows.{table.path.stem}", table.signature)
+    if segment is None:
+        return None
+    return segment.key_index("chunk_id", keys=table.column("chunk_id"))
+
+
+# ============ Build ============
+
+def build_shared_index(bm25: bool = True, verbose: bool = True) -> Dict[str, int]:
+    """
+    Write every segment from the current sources (run before starting workers).
+
+    Builds in this process, then drops what it built, so workers forked
+    afterwards attach to the files instead of inheriting private copies.
+
+    Returns:
+        {segment name: file size in bytes}
+    """
+    from scripts.retrieval.chunk_store import ChunkStore
+    from scripts.retrieval.registry import MetadataRegistry
+
+    global _building
+    start = time.time()
+    sizes: Dict[str, int] = {}
+    _building = True
+    try:
+        sizes.update(_build_segments(bm25, verbose))
+    finally:
+        _building = False
+
+    MetadataRegistry.reset()
+    ChunkStore.reset()
+    reset_segments()
+
+    if verbose:
+        listing = ", ".join(f"{name} {size / 1e6:.2f}MB" for name, size in sizes.items())
+        print(f"Built shared index in {SHARED_INDEX_DIR} ({(time.time() - start) * 1000:.0f}ms): {listing}")
+    return sizes
+
+
+def _build_segments(bm25: bool, verbose: bool) -> Dict[str, int]:
+    """Write each segment from its sources. Returns {segment name: file size in bytes}."""
+    from scripts.retrieval.chunk_store import HYDRATION_COLLECTIONS, open_table
+    from scripts.retrieval.registry import MetadataRegistry, write_registry_segment
+
+    sizes: Dict[str, int] = {}
+    for collection in HYDRATION_COLLECTIONS:
+        table = open_table(collection, verbose=verbose)
+        if table is not None:
+            sizes[f"rows.{collection}"] = write_row_index(table)
+
+    sizes["registry"] = write_registry_segment(MetadataRegistry.reload())
+
+    if bm25:
+        from scripts.retrieval.bm25 import BM25Retriever
+        sizes["bm25"] = BM25Retriever(verbose=verbose).save_segment()
+        BM25Retriever.reset()
+    return sizes
+
+
+if __name__ == "__main__":
+    build_shared_index()
+    for path in sorted(SHARED_INDEX_DIR.glob("*.seg")):
+        segment = Segment(path)
+        arrays = ", ".join(f"{name}{tuple(spec['shape'])}" for name, spec in segment._specs.items())
+        print(f"  {path.name}: {len(segment) / 1e6:.2f}MB [{arrays}]")
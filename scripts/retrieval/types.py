@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """Single retrieval result."""
     chunk_id: str
@@ -30,7 +30,7 @@ class GroupedResults:
     chunks: List[RetrievalResult]
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyRetrievalResult:
     """Single strategy memo retrieval result."""
     chunk_id: str
@@ -63,3 +63,4 @@ class RouterResult:
     race_ids: Optional[List[str]] = None  # None means search all races
     outcome_filter: Optional[str] = None  # "win", "loss", or None
     reasoning: Optional[str] = None  # Optional reasoning for debugging
+    fallback: bool = False  # True when the router's answer couldn't be parsed
@@ -13,15 +13,13 @@ Run: python scripts/retrieve.py "What did Ohio voters say about the economy?"
 import json
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import Any, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from eval.config import (
     OPENAI_API_KEY,
-    OPENROUTER_API_KEY,
-    OPENROUTER_BASE_URL,
     ROUTER_MODEL,
     PINECONE_API_KEY,
     DATA_DIR,
@@ -29,6 +27,9 @@ from eval.config import (
     EMBEDDING_MODEL_LOCAL,
     RERANKER_MODEL,
 )
+from scripts.retrieval.registry import MetadataRegistry
+from scripts.tracing import span
+from scripts.usage import chat_completion
 
 # V3 index constants (bge-m3 with 1024 dims)
 INDEX_NAME = "focus-group-v3"
@@ -40,7 +41,7 @@ MODEL_DIMENSIONS = {
 DIMENSION = MODEL_DIMENSIONS.get(EMBEDDING_MODEL_LOCAL, 1024)
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """Single retrieval result."""
     chunk_id: str
@@ -64,7 +65,7 @@ class GroupedResults:
     chunks: List[RetrievalResult]
 
 
-@dataclass
+@dataclass(slots=True)
 class StrategyRetrievalResult:
     """Single strategy memo retrieval result."""
     chunk_id: str
@@ -96,6 +97,75 @@ class RouterResult:
     focus_group_ids: Optional[List[str]]  # None means search all FGs
     race_ids: Optional[List[str]]  # None means search all races
     outcome_filter: Optional[str]  # "win", "loss", or None
+    fallback: bool = False  # True when the router's answer couldn't be parsed
+
+
+# ============ Chunk Hydration ============
+
+def _fg_result(chunk_id: str, score: float, meta: Dict) -> RetrievalResult:
+    """Build a RetrievalResult from a chunk store record or Pinecone metadata (same keys)."""
+    return RetrievalResult(
+        chunk_id=chunk_id,
+        score=score,
+        content=meta.get("content", ""),
+        content_original=meta.get("content_original", ""),
+        focus_group_id=meta.get("focus_group_id", ""),
+        participant=meta.get("participant", ""),
+        participant_profile=meta.get("participant_profile", ""),
+        section=meta.get("section", ""),
+        source_file=meta.get("source_file", ""),
+        line_number=int(meta.get("line_number", 0)),
+        preceding_moderator_q=meta.get("preceding_moderator_q") or "",
+    )
+
+
+def _strategy_result(chunk_id: str, score: float, meta: Dict) -> StrategyRetrievalResult:
+    """Build a StrategyRetrievalResult from a chunk store record or Pinecone metadata."""
+    return StrategyRetrievalResult(
+        chunk_id=chunk_id,
+        score=score,
+        content=meta.get("content", ""),
+        race_id=meta.get("race_id", ""),
+        section=meta.get("section", ""),
+        subsection=meta.get("subsection") or "",
+        outcome=meta.get("outcome", ""),
+        state=meta.get("state", ""),
+        year=int(meta.get("year", 0)),
+        margin=float(meta.get("margin", 0.0)),
+        source_file=meta.get("source_file", ""),
+        line_number=int(meta.get("line_number", 0)),
+    )
+
+
+def _hydrate_matches(matches: List[Any], chunk_store, index, namespace: str) -> List[Tuple[Any, Dict]]:
+    """
+    Pair each Pinecone match with its full chunk record.
+
+    Records come from the local chunk store (untruncated text). Ids the store
+    doesn't know - the index is newer than the local chunk files - are
+    fetched from Pinecone in one call. Without a store, each match's own
+    metadata is used (queries then ran with include_metadata=True).
+    """
+    if chunk_store is None:
+        return [(match, match.metadata or {}) for match in matches]
+
+    with span("hydrate", matches=len(matches)) as hydrate_span:
+        records: Dict[str, Dict] = {}
+        missing = []
+        for match in matches:
+            record = chunk_store.get(match.id)
+            if record is None:
+                missing.append(match.id)
+            else:
+                records[match.id] = record
+
+        if missing:
+            hydrate_span.set(fetched=len(missing))
+            fetched = index.fetch(ids=missing, namespace=namespace)
+            for vector_id, vector in fetched.vectors.items():
+                records[vector_id] = vector.metadata or {}
+
+    return [(match, records.get(match.id, {})) for match in matches]
 
 
 class LLMRouter:
@@ -139,14 +209,20 @@ Examples:
 - "Why did we lose Wisconsin 2022?" → {{"content_type": "lessons", "focus_groups": {{"ids": []}}, "strategy": {{"race_ids": ["race-003"], "outcome_filter": "loss"}}}}"""
 
     def __init__(self, model: str = ROUTER_MODEL):
-        import openai
-        self.client = openai.OpenAI(
-            api_key=OPENROUTER_API_KEY,
-            base_url=OPENROUTER_BASE_URL
-        )
+        from scripts.retrieval.base import SharedResources
+        self.client = SharedResources.get_openrouter_client()
         self.model = model
-        self.fg_manifest = self._load_fg_manifest()
-        self.strategy_manifest = self._load_strategy_manifest()
+        self._system_prompt: Optional[str] = None
+
+    @property
+    def system_prompt(self) -> str:
+        """Routing prompt with both manifests, built on first use and reused."""
+        if self._system_prompt is None:
+            self._system_prompt = self.SYSTEM_PROMPT.format(
+                fg_manifest=self._load_fg_manifest(),
+                strategy_manifest=self._load_strategy_manifest()
+            )
+        return self._system_prompt
 
     def _load_fg_manifest(self) -> str:
         """Load focus group manifest for prompt."""
@@ -202,20 +278,17 @@ Examples:
 
     def route_unified(self, query: str) -> RouterResult:
         """Route query to content type(s) and specific IDs."""
-        prompt = self.SYSTEM_PROMPT.format(
-            fg_manifest=self.fg_manifest,
-            strategy_manifest=self.strategy_manifest
-        )
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": query}
-            ],
-            max_tokens=500,
-            temperature=0
-        )
+        with span("router_llm", model=self.model):
+            response = chat_completion(
+                self.client, "router",
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": query}
+                ],
+                max_tokens=500,
+                temperature=0
+            )
 
         result_text = response.choices[0].message.content.strip()
 
@@ -265,7 +338,8 @@ Examples:
                 content_type="both",
                 focus_group_ids=None,
                 race_ids=None,
-                outcome_filter=None
+                outcome_filter=None,
+                fallback=True
             )
 
     def route(self, query: str) -> Optional[List[str]]:
@@ -275,19 +349,11 @@ Examples:
 
     def _get_all_fg_ids(self) -> List[str]:
         """Get all focus group IDs."""
-        manifest_file = DATA_DIR / "manifest.json"
-        with open(manifest_file) as f:
-            data = json.load(f)
-        return [fg["focus_group_id"] for fg in data["focus_groups"]]
+        return list(MetadataRegistry.get().fg_ids)
 
     def _get_all_race_ids(self) -> List[str]:
         """Get all race IDs from strategy memos."""
-        manifest_file = DATA_DIR / "strategy_chunks" / "manifest.json"
-        if not manifest_file.exists():
-            return []
-        with open(manifest_file) as f:
-            data = json.load(f)
-        return [memo["race_id"] for memo in data.get("memos", [])]
+        return list(MetadataRegistry.get().race_ids)
 
 
 class FocusGroupRetrieverV2:
@@ -312,7 +378,7 @@ class FocusGroupRetrieverV2:
         if use_router:
             if verbose:
                 print("Initializing LLM router...")
-            self.router = LLMRouter()
+            self.router = SharedResources.get_router()
         else:
             self.router = None
 
@@ -331,29 +397,28 @@ class FocusGroupRetrieverV2:
         self.model = SharedResources.get_embedding_model()
         self.index = SharedResources.get_pinecone_index()
 
-        # Cache for focus group metadata
-        self._fg_metadata_cache: Dict[str, Dict] = {}
+        # Child queries fetch ids/scores only; survivors are hydrated from here
+        self.chunk_store = SharedResources.get_chunk_store()
+
+    def _hydrate(self, matches: List[Any]) -> List[RetrievalResult]:
+        """Turn surviving Pinecone matches into full RetrievalResults."""
+        return [
+            _fg_result(match.id, match.score, meta)
+            for match, meta in _hydrate_matches(matches, self.chunk_store, self.index, self.namespace)
+        ]
 
     def _embed_query(self, query: str) -> List[float]:
         """Embed query using shared model (OpenAI or local)."""
-        if self.use_openai_embeddings:
-            # OpenAI embedder returns list of embeddings
-            return self.model.encode([query])[0]
-        else:
-            return self.model.encode(query).tolist()
+        with span("embed"):
+            if self.use_openai_embeddings:
+                # OpenAI embedder returns list of embeddings
+                return self.model.encode([query])[0]
+            else:
+                return self.model.encode(query).tolist()
 
     def _load_focus_group_metadata(self, fg_id: str) -> Dict:
-        """Load focus group metadata from file."""
-        if fg_id in self._fg_metadata_cache:
-            return self._fg_metadata_cache[fg_id]
-
-        fg_file = FOCUS_GROUPS_DIR / f"{fg_id}.json"
-        if fg_file.exists():
-            with open(fg_file) as f:
-                metadata = json.load(f)
-                self._fg_metadata_cache[fg_id] = metadata
-                return metadata
-        return {}
+        """Look up focus group metadata in the shared registry."""
+        return MetadataRegistry.get().fg_metadata.get(fg_id, {})
 
     def retrieve(
         self,
@@ -361,6 +426,7 @@ class FocusGroupRetrieverV2:
         top_k: int = 5,
         filter_focus_groups: Optional[List[str]] = None,
         parent_top_k: int = 3,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[RetrievalResult]:
         """
         Two-stage hierarchical retrieval.
@@ -368,6 +434,8 @@ class FocusGroupRetrieverV2:
         1. Route query to relevant focus groups (if router enabled)
         2. Query parent summaries
         3. Return children from matched parents
+
+        Pass query_embedding to reuse an embedding the caller already computed.
         """
         # Step 1: Route
         if filter_focus_groups:
@@ -383,7 +451,8 @@ class FocusGroupRetrieverV2:
             fg_ids = None
 
         # Step 2: Query
-        query_embedding = self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
 
         # If searching ALL focus groups (no filter), skip parents and search children directly
         # This is faster and hierarchical grouping provides less value without pre-filtering
@@ -397,13 +466,16 @@ class FocusGroupRetrieverV2:
         filter_dict = {"type": "parent"}
         filter_dict["focus_group_id"] = {"$in": fg_ids}
 
-        parent_results = self.index.query(
-            vector=query_embedding,
-            top_k=parent_top_k,
-            filter=filter_dict,
-            include_metadata=True,
-            namespace=self.namespace
-        )
+        # Parents are few and carry child_ids in metadata, so they keep it
+        with span("vector_query", level="parent") as query_span:
+            parent_results = self.index.query(
+                vector=query_embedding,
+                top_k=parent_top_k,
+                filter=filter_dict,
+                include_metadata=True,
+                namespace=self.namespace
+            )
+            query_span.set(matches=len(parent_results.matches))
 
         if self.verbose:
             print(f"Found {len(parent_results.matches)} matching parents")
@@ -433,61 +505,40 @@ class FocusGroupRetrieverV2:
 
         # Get more candidates when reranking is enabled
         candidate_k = top_k * 4 if self.use_reranker else top_k * 2
-        child_results = self.index.query(
-            vector=query_embedding,
-            top_k=candidate_k,
-            filter=child_filter,
-            include_metadata=True,
-            namespace=self.namespace
-        )
+        with span("vector_query", level="child") as query_span:
+            child_results = self.index.query(
+                vector=query_embedding,
+                top_k=candidate_k,
+                filter=child_filter,
+                include_metadata=self.chunk_store is None,
+                namespace=self.namespace
+            )
+            query_span.set(matches=len(child_results.matches))
 
         # Filter to only children from matched parents and limit
-        results = []
+        child_id_set = set(child_ids)
+        selected = []
         seen_ids = set()
         for match in child_results.matches:
-            if match.id in child_ids and match.id not in seen_ids:
+            if match.id in child_id_set and match.id not in seen_ids:
                 seen_ids.add(match.id)
-                meta = match.metadata
-                results.append(RetrievalResult(
-                    chunk_id=match.id,
-                    score=match.score,
-                    content=meta.get("content", ""),
-                    content_original=meta.get("content_original", ""),
-                    focus_group_id=meta.get("focus_group_id", ""),
-                    participant=meta.get("participant", ""),
-                    participant_profile=meta.get("participant_profile", ""),
-                    section=meta.get("section", ""),
-                    source_file=meta.get("source_file", ""),
-                    line_number=meta.get("line_number", 0),
-                    preceding_moderator_q=meta.get("preceding_moderator_q", ""),
-                ))
+                selected.append(match)
                 # When reranking, collect more candidates; otherwise limit early
-                if not self.use_reranker and len(results) >= top_k:
+                if not self.use_reranker and len(selected) >= top_k:
                     break
 
         # If we didn't get enough from parent-filtered, add more from direct search
         max_results = top_k * 4 if self.use_reranker else top_k
-        if len(results) < max_results:
+        if len(selected) < max_results:
             for match in child_results.matches:
                 if match.id not in seen_ids:
                     seen_ids.add(match.id)
-                    meta = match.metadata
-                    results.append(RetrievalResult(
-                        chunk_id=match.id,
-                        score=match.score,
-                        content=meta.get("content", ""),
-                        content_original=meta.get("content_original", ""),
-                        focus_group_id=meta.get("focus_group_id", ""),
-                        participant=meta.get("participant", ""),
-                        participant_profile=meta.get("participant_profile", ""),
-                        section=meta.get("section", ""),
-                        source_file=meta.get("source_file", ""),
-                        line_number=meta.get("line_number", 0),
-                        preceding_moderator_q=meta.get("preceding_moderator_q", ""),
-                    ))
-                    if not self.use_reranker and len(results) >= top_k:
+                    selected.append(match)
+                    if not self.use_reranker and len(selected) >= top_k:
                         break
 
+        # Only the selected children are hydrated
+        results = self._hydrate(selected)
         return self._maybe_rerank(query, results, top_k)
 
     def _maybe_rerank(self, query: str, results: List[RetrievalResult], top_k: int) -> List[RetrievalResult]:
@@ -512,30 +563,17 @@ class FocusGroupRetrieverV2:
         if fg_ids:
             filter_dict["focus_group_id"] = {"$in": fg_ids}
 
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            filter=filter_dict,
-            include_metadata=True,
-            namespace=self.namespace
-        )
-
-        return [
-            RetrievalResult(
-                chunk_id=match.id,
-                score=match.score,
-                content=match.metadata.get("content", ""),
-                content_original=match.metadata.get("content_original", ""),
-                focus_group_id=match.metadata.get("focus_group_id", ""),
-                participant=match.metadata.get("participant", ""),
-                participant_profile=match.metadata.get("participant_profile", ""),
-                section=match.metadata.get("section", ""),
-                source_file=match.metadata.get("source_file", ""),
-                line_number=match.metadata.get("line_number", 0),
-                preceding_moderator_q=match.metadata.get("preceding_moderator_q", ""),
+        with span("vector_query", level="child") as query_span:
+            results = self.index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                filter=filter_dict,
+                include_metadata=self.chunk_store is None,
+                namespace=self.namespace
             )
-            for match in results.matches
-        ]
+            query_span.set(matches=len(results.matches))
+
+        return self._hydrate(results.matches)
 
     def fetch_qa_block(self, chunk: RetrievalResult) -> str:
         """
@@ -661,6 +699,7 @@ class FocusGroupRetrieverV2:
         top_k_per_fg: int = 5,
         score_threshold: float = 0.75,
         filter_focus_groups: Optional[List[str]] = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> Dict[str, List[RetrievalResult]]:
         """
         Per-focus-group retrieval: query each FG independently.
@@ -673,6 +712,7 @@ class FocusGroupRetrieverV2:
             top_k_per_fg: Max results per focus group (capped at 5)
             score_threshold: Minimum similarity score to include (default 0.75)
             filter_focus_groups: Optional list of FG IDs to search
+            query_embedding: Optional precomputed query embedding
 
         Returns:
             Dict mapping focus_group_id -> list of results for that FG
@@ -688,14 +728,12 @@ class FocusGroupRetrieverV2:
             if self.verbose:
                 print(f"Router selected {len(fg_ids)} focus groups: {fg_ids}")
         else:
-            # No router - need to get all IDs
-            manifest_file = DATA_DIR / "manifest.json"
-            with open(manifest_file) as f:
-                data = json.load(f)
-            fg_ids = [fg["focus_group_id"] for fg in data["focus_groups"]]
+            # No router - search all FGs
+            fg_ids = list(MetadataRegistry.get().fg_ids)
 
         # Step 2: Embed query once
-        query_embedding = self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
 
         # Step 3: Query each focus group independently
         results_by_fg: Dict[str, List[RetrievalResult]] = {}
@@ -709,40 +747,24 @@ class FocusGroupRetrieverV2:
                 "focus_group_id": fg_id
             }
 
-            fg_results = self.index.query(
-                vector=query_embedding,
-                top_k=search_k,
-                filter=filter_dict,
-                include_metadata=True,
-                namespace=self.namespace
-            )
-
-            # Convert to RetrievalResult and apply score threshold
-            fg_chunks = []
-            for match in fg_results.matches:
-                if match.score < score_threshold:
-                    continue  # Skip low-scoring results
-
-                meta = match.metadata
-                fg_chunks.append(RetrievalResult(
-                    chunk_id=match.id,
-                    score=match.score,
-                    content=meta.get("content", ""),
-                    content_original=meta.get("content_original", ""),
-                    focus_group_id=meta.get("focus_group_id", ""),
-                    participant=meta.get("participant", ""),
-                    participant_profile=meta.get("participant_profile", ""),
-                    section=meta.get("section", ""),
-                    source_file=meta.get("source_file", ""),
-                    line_number=meta.get("line_number", 0),
-                    preceding_moderator_q=meta.get("preceding_moderator_q", ""),
-                ))
-
-            # Rerank within this focus group if enabled
-            if self.use_reranker and self.reranker and fg_chunks:
-                fg_chunks = self.reranker.rerank(query, fg_chunks, top_k=top_k_per_fg)
+            with span("vector_query", focus_group_id=fg_id) as query_span:
+                fg_results = self.index.query(
+                    vector=query_embedding,
+                    top_k=search_k,
+                    filter=filter_dict,
+                    include_metadata=self.chunk_store is None,
+                    namespace=self.namespace
+                )
+                query_span.set(matches=len(fg_results.matches))
+
+            # Apply score threshold before hydrating anything
+            matches = [match for match in fg_results.matches if match.score >= score_threshold]
+
+            # Rerank within this focus group if enabled (needs text for every candidate)
+            if self.use_reranker and self.reranker and matches:
+                fg_chunks = self.reranker.rerank(query, self._hydrate(matches), top_k=top_k_per_fg)
             else:
-                fg_chunks = fg_chunks[:top_k_per_fg]
+                fg_chunks = self._hydrate(matches[:top_k_per_fg])
 
             # Only include FGs with results above threshold
             if fg_chunks:
@@ -849,35 +871,27 @@ class StrategyMemoRetriever:
         self.model = SharedResources.get_embedding_model()
         self.index = SharedResources.get_pinecone_index()
 
-        # Load strategy manifest for metadata
-        self._manifest_cache: Optional[Dict] = None
+        # Child queries fetch ids/scores only; survivors are hydrated from here
+        self.chunk_store = SharedResources.get_chunk_store()
 
-    def _load_manifest(self) -> Dict:
-        """Load strategy manifest."""
-        if self._manifest_cache:
-            return self._manifest_cache
-
-        manifest_file = DATA_DIR / "strategy_chunks" / "manifest.json"
-        if manifest_file.exists():
-            with open(manifest_file) as f:
-                self._manifest_cache = json.load(f)
-                return self._manifest_cache
-        return {"memos": []}
+    def _hydrate(self, matches: List[Any]) -> List[StrategyRetrievalResult]:
+        """Turn surviving Pinecone matches into full StrategyRetrievalResults."""
+        return [
+            _strategy_result(match.id, match.score, meta)
+            for match, meta in _hydrate_matches(matches, self.chunk_store, self.index, self.namespace)
+        ]
 
     def _get_race_metadata(self, race_id: str) -> Dict:
-        """Get metadata for a specific race from manifest."""
-        manifest = self._load_manifest()
-        for memo in manifest.get("memos", []):
-            if memo["race_id"] == race_id:
-                return memo
-        return {}
+        """Look up strategy memo metadata for a race in the shared registry."""
+        return MetadataRegistry.get().race_metadata.get(race_id, {})
 
     def _embed_query(self, query: str) -> List[float]:
         """Embed query using shared model (OpenAI or local)."""
-        if self.use_openai_embeddings:
-            return self.model.encode([query])[0]
-        else:
-            return self.model.encode(query).tolist()
+        with span("embed"):
+            if self.use_openai_embeddings:
+                return self.model.encode([query])[0]
+            else:
+                return self.model.encode(query).tolist()
 
     def retrieve(
         self,
@@ -887,6 +901,7 @@ class StrategyMemoRetriever:
         state_filter: Optional[str] = None,
         year_filter: Optional[int] = None,
         parent_top_k: int = 5,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[StrategyRetrievalResult]:
         """
         Retrieve strategy memo chunks.
@@ -902,8 +917,10 @@ class StrategyMemoRetriever:
             state_filter: Filter by state name
             year_filter: Filter by year
             parent_top_k: Number of parent vectors to query
+            query_embedding: Optional precomputed query embedding
         """
-        query_embedding = self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
 
         # Build filter for parents
         parent_filter: Dict = {"type": "strategy_parent"}
@@ -918,13 +935,16 @@ class StrategyMemoRetriever:
             print(f"Querying strategy parents with filter: {parent_filter}")
 
         # Step 1: Query parents
-        parent_results = self.index.query(
-            vector=query_embedding,
-            top_k=parent_top_k,
-            filter=parent_filter,
-            include_metadata=True,
-            namespace=self.namespace
-        )
+        # Parents are few and carry child_ids in metadata, so they keep it
+        with span("vector_query", level="parent") as query_span:
+            parent_results = self.index.query(
+                vector=query_embedding,
+                top_k=parent_top_k,
+                filter=parent_filter,
+                include_metadata=True,
+                namespace=self.namespace
+            )
+            query_span.set(matches=len(parent_results.matches))
 
         if self.verbose:
             print(f"Found {len(parent_results.matches)} matching parents")
@@ -955,61 +975,38 @@ class StrategyMemoRetriever:
             child_filter["year"] = year_filter
 
         candidate_k = top_k * 4 if self.use_reranker else top_k * 2
-        child_results = self.index.query(
-            vector=query_embedding,
-            top_k=candidate_k,
-            filter=child_filter,
-            include_metadata=True,
-            namespace=self.namespace
-        )
+        with span("vector_query", level="child") as query_span:
+            child_results = self.index.query(
+                vector=query_embedding,
+                top_k=candidate_k,
+                filter=child_filter,
+                include_metadata=self.chunk_store is None,
+                namespace=self.namespace
+            )
+            query_span.set(matches=len(child_results.matches))
 
         # Filter to children from matched parents
-        results = []
+        child_id_set = set(child_ids)
+        selected = []
         seen_ids = set()
         for match in child_results.matches:
-            if match.id in child_ids and match.id not in seen_ids:
+            if match.id in child_id_set and match.id not in seen_ids:
                 seen_ids.add(match.id)
-                meta = match.metadata
-                results.append(StrategyRetrievalResult(
-                    chunk_id=match.id,
-                    score=match.score,
-                    content=meta.get("content", ""),
-                    race_id=meta.get("race_id", ""),
-                    section=meta.get("section", ""),
-                    subsection=meta.get("subsection", ""),
-                    outcome=meta.get("outcome", ""),
-                    state=meta.get("state", ""),
-                    year=meta.get("year", 0),
-                    margin=meta.get("margin", 0.0),
-                    source_file=meta.get("source_file", ""),
-                    line_number=meta.get("line_number", 0),
-                ))
-                if not self.use_reranker and len(results) >= top_k:
+                selected.append(match)
+                if not self.use_reranker and len(selected) >= top_k:
                     break
 
         # If we need more, add from direct results
-        if len(results) < top_k:
+        if len(selected) < top_k:
             for match in child_results.matches:
                 if match.id not in seen_ids:
                     seen_ids.add(match.id)
-                    meta = match.metadata
-                    results.append(StrategyRetrievalResult(
-                        chunk_id=match.id,
-                        score=match.score,
-                        content=meta.get("content", ""),
-                        race_id=meta.get("race_id", ""),
-                        section=meta.get("section", ""),
-                        subsection=meta.get("subsection", ""),
-                        outcome=meta.get("outcome", ""),
-                        state=meta.get("state", ""),
-                        year=meta.get("year", 0),
-                        margin=meta.get("margin", 0.0),
-                        source_file=meta.get("source_file", ""),
-                        line_number=meta.get("line_number", 0),
-                    ))
-                    if not self.use_reranker and len(results) >= top_k:
+                    selected.append(match)
+                    if not self.use_reranker and len(selected) >= top_k:
                         break
 
+        # Only the selected children are hydrated
+        results = self._hydrate(selected)
         return self._maybe_rerank(query, results, top_k)
 
     def _direct_search(
@@ -1029,31 +1026,17 @@ class StrategyMemoRetriever:
         if year_filter:
             filter_dict["year"] = year_filter
 
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            filter=filter_dict,
-            include_metadata=True,
-            namespace=self.namespace
-        )
-
-        return [
-            StrategyRetrievalResult(
-                chunk_id=match.id,
-                score=match.score,
-                content=match.metadata.get("content", ""),
-                race_id=match.metadata.get("race_id", ""),
-                section=match.metadata.get("section", ""),
-                subsection=match.metadata.get("subsection", ""),
-                outcome=match.metadata.get("outcome", ""),
-                state=match.metadata.get("state", ""),
-                year=match.metadata.get("year", 0),
-                margin=match.metadata.get("margin", 0.0),
-                source_file=match.metadata.get("source_file", ""),
-                line_number=match.metadata.get("line_number", 0),
+        with span("vector_query", level="child") as query_span:
+            results = self.index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                filter=filter_dict,
+                include_metadata=self.chunk_store is None,
+                namespace=self.namespace
             )
-            for match in results.matches
-        ]
+            query_span.set(matches=len(results.matches))
+
+        return self._hydrate(results.matches)
 
     def _maybe_rerank(
         self,
@@ -1080,6 +1063,7 @@ class StrategyMemoRetriever:
         state_filter: Optional[str] = None,
         year_filter: Optional[int] = None,
         score_threshold: float = 0.55,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[StrategyGroupedResults]:
         """
         Retrieve and group results by race.
@@ -1091,6 +1075,7 @@ class StrategyMemoRetriever:
             state_filter: Filter by state
             year_filter: Filter by year
             score_threshold: Minimum score threshold
+            query_embedding: Optional precomputed query embedding
         """
         results = self.retrieve(
             query,
@@ -1098,6 +1083,7 @@ class StrategyMemoRetriever:
             outcome_filter=outcome_filter,
             state_filter=state_filter,
             year_filter=year_filter,
+            query_embedding=query_embedding,
         )
 
         # Filter by score threshold
@@ -13,8 +13,8 @@ from dataclasses import dataclass
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from openai import OpenAI, APIError, RateLimitError, APIStatusError
-from eval.config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, SYNTHESIS_MODEL
+from eval.config import SYNTHESIS_MODEL
+from scripts.usage import chat_completion
 
 
 # User-friendly error messages for API issues
@@ -25,6 +25,8 @@ GENERIC_ERROR_MSG = "Unable to generate synthesis. Please try again."
 
 def get_friendly_error(e: Exception) -> str:
     """Convert API errors to user-friendly messages."""
+    from openai import RateLimitError, APIStatusError  # imported here to keep module import light
+
     error_str = str(e).lower()
 
     # Check for rate limiting
@@ -41,7 +43,7 @@ def get_friendly_error(e: Exception) -> str:
     return GENERIC_ERROR_MSG
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrievalResult:
     """Mirror of the dataclass from retrieve.py"""
     chunk_id: str
@@ -61,10 +63,8 @@ class FocusGroupSynthesizer:
     """Generate summaries and synthesis from retrieved focus group quotes."""
 
     def __init__(self, model: str = SYNTHESIS_MODEL, verbose: bool = False):
-        self.client = OpenAI(
-            base_url=OPENROUTER_BASE_URL,
-            api_key=OPENROUTER_API_KEY,
-        )
+        from scripts.retrieval.base import SharedResources
+        self.client = SharedResources.get_openrouter_client()
         self.model = model
         self.verbose = verbose
 
@@ -109,7 +109,8 @@ Summarize the key sentiment from these quotes in 1-2 sentences. Be specific abou
 Summary:"""
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client, "light_summary",
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
@@ -174,7 +175,8 @@ Provide a synthesis that:
 Keep it to 2-3 paragraphs. Be analytical, not just descriptive."""
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client, "deep_synthesis",
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1200,
@@ -247,7 +249,8 @@ Format:
 Be specific and analytical. Avoid generic observations."""
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client, "macro_synthesis",
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1500,
@@ -327,7 +330,8 @@ Format as markdown with **Theme: [Name]** headers.
 Be specific and analytical. Every claim needs a citation. Avoid generic observations."""
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                self.client, "light_macro",
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=2000,
@@ -392,7 +396,8 @@ Format as markdown with **Theme: [Name]** headers.
 Be specific and analytical. Every claim needs a citation. Avoid generic observations."""
 
         try:
-            stream = self.client.chat.completions.create(
+            stream = chat_completion(
+                self.client, "light_macro",
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=2000,
@@ -483,7 +488,8 @@ OUTPUT FORMAT (valid JSON only, no markdown):
 }}"""
 
         try:
-            stage1_response = self.client.chat.completions.create(
+            stage1_response = chat_completion(
+                self.client, "deep_macro_themes",
                 model=self.model,
                 messages=[{"role": "user", "content": stage1_prompt}],
                 max_tokens=1200,
@@ -567,7 +573,8 @@ For this specific theme ({theme_name}):
 Write 2-3 paragraphs with specific quote citations. Be analytical, not just descriptive."""
 
             try:
-                stage2_response = self.client.chat.completions.create(
+                stage2_response = chat_completion(
+                    self.client, "deep_macro_theme",
                     model=self.model,
                     messages=[{"role": "user", "content": stage2_prompt}],
                     max_tokens=1200,
@@ -678,7 +685,8 @@ OUTPUT FORMAT (valid JSON only, no markdown):
 }}"""
 
         try:
-            stage1_response = self.client.chat.completions.create(
+            stage1_response = chat_completion(
+                self.client, "deep_macro_themes",
                 model=self.model,
                 messages=[{"role": "user", "content": stage1_prompt}],
                 max_tokens=1200,
@@ -762,7 +770,8 @@ For this specific theme ({theme_name}):
 Write 2-3 paragraphs with specific quote citations. Be analytical, not just descriptive."""
 
             try:
-                stream = self.client.chat.completions.create(
+                stream = chat_completion(
+                    self.client, "deep_macro_theme",
                     model=self.model,
                     messages=[{"role": "user", "content": stage2_prompt}],
                     max_tokens=1200,
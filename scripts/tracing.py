@@ -0,0 +1,163 @@
+"""
+Lightweight nested spans for the retrieval pipeline.
+
+A trace is started per request by the API (api/observability.QueryTracer);
+library code opens child spans without knowing whether anyone is tracing:
+
+    from scripts.tracing import span
+
+    with span("vector_query", focus_group_id=fg_id) as s:
+        results = index.query(...)
+        s.set(matches=len(results.matches))
+
+The current span lives in a ContextVar, so spans nest across function and
+module boundaries (router -> embed -> per-group vector queries -> fusion ->
+rerank -> hydration) and stay separate per request thread. When no trace is
+active or the trace wasn't sampled, span() returns a shared no-op after one
+ContextVar lookup - untraced code pays well under a microsecond.
+
+Timestamps are time.perf_counter_ns() (monotonic); each trace keeps one
+wall-clock anchor so exporters can convert to Unix time.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+@dataclass(slots=True)
+class Trace:
+    """All spans of one request; finished spans are appended as they end."""
+    trace_id: str
+    sampled: bool
+    wall_start_ns: int          # time.time_ns() at perf_start_ns
+    perf_start_ns: int
+    spans: List["Span"] = field(default_factory=list)
+
+    def unix_ns(self, perf_ns: int) -> int:
+        return self.wall_start_ns + (perf_ns - self.perf_start_ns)
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace: Trace
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Tuple[int, str, Dict[str, Any]]] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.events.append((time.perf_counter_ns(), name, attributes or {}))
+
+
+class _NoopSpan:
+    """Stands in for a span when nothing is traced; every method does nothing."""
+    __slots__ = ()
+    span_id = None
+
+    def set(self, **attributes: Any):
+        pass
+
+    def event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _SpanScope:
+    """Context manager for one sampled span: makes it current, ends it on exit."""
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.end_ns = time.perf_counter_ns()
+        if exc is not None:
+            span.status = "error"
+            span.error = f"{exc_type.__name__}: {exc}"
+        span.trace.spans.append(span)
+        _current.reset(self._token)
+        return False
+
+
+def span(name: str, **attributes: Any):
+    """Child span of the current one; a no-op when there is no sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return _SpanScope(Span(
+        name=name,
+        trace=parent.trace,
+        span_id=_new_id(8),
+        parent_id=parent.span_id,
+        start_ns=time.perf_counter_ns(),
+        attributes=attributes,
+    ))
+
+
+def current_span():
+    """The active span (NOOP_SPAN when nothing is traced)."""
+    return _current.get() or NOOP_SPAN
+
+
+def start_trace(name: str, sampled: bool, **attributes: Any) -> Tuple[Optional[Span], Any]:
+    """
+    Start a root span and make it current.
+
+    Returns:
+        (root span or None if unsampled, token for end_trace)
+    """
+    if not sampled:
+        return None, _current.set(None)
+    perf_now = time.perf_counter_ns()
+    trace = Trace(trace_id=_new_id(16), sampled=True, wall_start_ns=time.time_ns(), perf_start_ns=perf_now)
+    root = Span(name=name, trace=trace, span_id=_new_id(8), parent_id=None, start_ns=perf_now, attributes=attributes)
+    return root, _current.set(root)
+
+
+def end_trace(root: Optional[Span], token: Any) -> Optional[Trace]:
+    """End the root span, restore the previous current span; returns the finished trace."""
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Ended from another context (e.g. a different thread): just clear it there
+        _current.set(None)
+    if root is None:
+        return None
+    root.end_ns = time.perf_counter_ns()
+    root.trace.spans.append(root)
+    return root.trace
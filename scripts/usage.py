@@ -0,0 +1,195 @@
+"""
+Token, latency and cost accounting for LLM and embedding calls.
+
+The SDKs return token counts on every response (response.usage) and nothing
+kept them. Calls on the API's request path now go through two thin wrappers
+that time the upstream call and read its usage:
+
+    chat_completion(client, component, **create_kwargs)
+    create_embeddings(client, component, **create_kwargs)
+
+Streams ask for a final usage chunk (stream_options.include_usage); the
+wrapper swallows that chunk, so callers still see only content chunks.
+
+Each call becomes an LLMCall, which is
+- attached to the current trace span as an "llm_usage" event (scripts/tracing.py),
+- added to the current request's RequestUsage (begin_request/end_request,
+  called by the API's metrics middleware), and
+- handed to observers when the request ends - api/metrics.py aggregates
+  them per endpoint, component and model. Calls made outside a request
+  (startup warmup, offline scripts) are reported at once as "background".
+
+Cost is the upstream-reported cost when there is one (OpenRouter's
+usage.cost), otherwise tokens x LLM_PRICES_PER_MTOK from eval/config.py.
+
+Usage:
+    response = chat_completion(client, "router", model=ROUTER_MODEL, messages=messages)
+    for chunk in chat_completion(client, "deep_synthesis", model=model, messages=messages, stream=True):
+        ...
+    current_usage().totals()   # {"llm_calls": 2, "prompt_tokens": 5210, ...}
+"""
+
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from eval.config import LLM_PRICES_PER_MTOK
+from scripts.tracing import current_span
+
+
+@dataclass(slots=True)
+class LLMCall:
+    """One upstream completion or embedding request."""
+    component: str               # router, embedding, light_summary, deep_synthesis, ...
+    model: str
+    kind: str                    # "chat" or "embedding"
+    prompt_tokens: int
+    completion_tokens: int
+    seconds: float               # until the response (or the last stream chunk) arrived
+    cost_usd: Optional[float]    # None when the model has no known price
+    first_token_seconds: Optional[float] = None  # streams only
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "component": self.component,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "upstream_ms": round(self.seconds * 1000, 1),
+            "cost_usd": self.cost_usd,
+        }
+        if self.first_token_seconds is not None:
+            data["first_token_ms"] = round(self.first_token_seconds * 1000, 1)
+        return data
+
+
+@dataclass
+class RequestUsage:
+    """LLM calls made while handling one HTTP request (shared by its threads)."""
+    calls: List[LLMCall] = field(default_factory=list)
+
+    def totals(self) -> Dict[str, Any]:
+        chat = [c for c in self.calls if c.kind == "chat"]
+        return {
+            "llm_calls": len(chat),
+            "prompt_tokens": sum(c.prompt_tokens for c in chat),
+            "completion_tokens": sum(c.completion_tokens for c in chat),
+            "embedding_tokens": sum(c.prompt_tokens for c in self.calls if c.kind == "embedding"),
+            "upstream_ms": round(sum(c.seconds for c in self.calls) * 1000, 1),
+            "cost_usd": round(sum(c.cost_usd or 0.0 for c in self.calls), 6),
+        }
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+_observers: List[Callable[[LLMCall, str], None]] = []
+
+BACKGROUND = "background"
+
+
+def add_usage_observer(observer: Callable[[LLMCall, str], None]):
+    """Register observer(call, endpoint), called once per call when its request ends."""
+    _observers.append(observer)
+
+
+def _notify(calls: List[LLMCall], endpoint: str):
+    for observer in _observers:
+        for call in calls:
+            observer(call, endpoint)
+
+
+def begin_request():
+    """Start collecting calls for the current request; returns a token for end_request."""
+    return _request_usage.set(RequestUsage())
+
+
+def end_request(token, endpoint: str) -> RequestUsage:
+    """Stop collecting, report the request's calls to observers under endpoint."""
+    usage = _request_usage.get()
+    _request_usage.reset(token)
+    if usage is not None and usage.calls:
+        _notify(usage.calls, endpoint)
+    return usage
+
+
+def current_usage() -> Optional[RequestUsage]:
+    return _request_usage.get()
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    price = LLM_PRICES_PER_MTOK.get(model)
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1e6
+
+
+def record_usage(
+    component: str,
+    model: str,
+    usage: Any,
+    seconds: float,
+    kind: str = "chat",
+    first_token_seconds: Optional[float] = None,
+) -> LLMCall:
+    """Account for one call from its SDK usage object (None when the upstream sent none)."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    cost = getattr(usage, "cost", None)  # OpenRouter reports the billed cost
+    call = LLMCall(
+        component=component,
+        model=model,
+        kind=kind,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        seconds=seconds,
+        cost_usd=float(cost) if cost is not None else estimate_cost(model, prompt_tokens, completion_tokens),
+        first_token_seconds=first_token_seconds,
+    )
+    current_span().event("llm_usage", call.to_dict())
+    request = _request_usage.get()
+    if request is not None:
+        request.calls.append(call)
+    else:
+        _notify([call], BACKGROUND)
+    return call
+
+
+def _metered_stream(stream: Iterator, component: str, model: str, started: float) -> Iterator:
+    """Yield content chunks; record usage from the trailing usage chunk when the stream ends."""
+    usage = None
+    first_token = None
+    try:
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue  # the usage-only chunk include_usage adds at the end
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            yield chunk
+    finally:
+        record_usage(component, model, usage, time.perf_counter() - started, first_token_seconds=first_token)
+
+
+def chat_completion(client, component: str, **kwargs):
+    """client.chat.completions.create(**kwargs), with its tokens and latency recorded."""
+    model = kwargs.get("model", "")
+    started = time.perf_counter()
+    if kwargs.get("stream"):
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return _metered_stream(client.chat.completions.create(**kwargs), component, model, started)
+    response = client.chat.completions.create(**kwargs)
+    record_usage(component, model, response.usage, time.perf_counter() - started)
+    return response
+
+
+def create_embeddings(client, component: str, **kwargs):
+    """client.embeddings.create(**kwargs), with its tokens and latency recorded."""
+    started = time.perf_counter()
+    response = client.embeddings.create(**kwargs)
+    record_usage(component, kwargs.get("model", ""), response.usage, time.perf_counter() - started, kind="embedding")
+    return response